@@ -55,6 +55,7 @@ class DBSBlock:
                           'close_settings':       {}}   # Dict of info about block close settings
 
         self.files     = []
+        self.fileIDs   = set()
         self.encoder   = JSONRequests()
         self.status    = 'Open'
         self.inBuff    = False
@@ -100,7 +101,7 @@ class DBSBlock:
 
         Add a DBSBufferFile object to our block
         """
-        if dbsFile['id'] in [x['id'] for x in self.files]:
+        if dbsFile['id'] in self.fileIDs:
             msg =  "Duplicate file inserted into DBSBlock: %i\n" % (dbsFile['id'])
             msg += "Ignoring this file for now!\n"
             logging.error(msg)
@@ -115,6 +116,7 @@ class DBSBlock:
                 self.data['close_settings'][setting] = dbsFile[setting]
 
         self.files.append(dbsFile)
+        self.fileIDs.add(dbsFile['id'])
         self.data['block']['block_size'] += int(dbsFile['size'])
         self.data['block']['file_count'] += 1
         self.data['block']['block_events'] += int(dbsFile['events'])
@@ -92,7 +92,7 @@ def sortListByKey(input, key):
         value = entry.get(key)
         if type(value) == set:
             value = value.pop()
-        if not value in final.keys():
+        if not value in final:
             final[value] = []
         final[value].append(entry)
 
@@ -200,6 +200,7 @@ class DBSUploadPoller(BaseWorkerThread):
         self.datasetType    = getattr(self.config.DBS3Upload, "datasetType", "PRODUCTION")
         self.primaryDatasetType = getattr(self.config.DBS3Upload, "primaryDatasetType", "mc")
         self.blockCount     = 0
+        self.pipelineUpload = getattr(self.config.DBS3Upload, "pipelineUpload", False)
         self.dbsApi = DbsApi(url = self.dbsUrl)
 
         # List of blocks currently in processing
@@ -406,6 +407,11 @@ class DBSUploadPoller(BaseWorkerThread):
 
         Load all files that need to be loaded.  I will do this by DAS for now to
         break the monstrous calls down into smaller chunks.
+
+        Only the files that are not in a block yet are loaded, the open blocks
+        are kept in the block cache between cycles.  With pipelineUpload the
+        blocks closed while loading a DAS are handed to the upload workers
+        right away instead of after all the DAS are loaded.
         """
         # Grab all the Dataset-Algo combindations
         dasList = self.dbsUtil.findUploadableDAS()
@@ -416,6 +422,7 @@ class DBSUploadPoller(BaseWorkerThread):
 
         readyBlocks = []
         for dasInfo in dasList:
+            closedBlocks = False
 
             dasID = dasInfo['DAS_ID']
 
@@ -459,6 +466,7 @@ class DBSUploadPoller(BaseWorkerThread):
                         # Then we have to close the block and get a new one
                         currentBlock.setPendingAndCloseBlock()
                         readyBlocks.append(currentBlock)
+                        closedBlocks = True
                         currentBlock = self.getBlock(newFile = newFile,
                                                      location = location,
                                                      das = dasID)
@@ -473,6 +481,11 @@ class DBSUploadPoller(BaseWorkerThread):
                 readyBlocks.append(currentBlock)
 
             # Should be done with the DAS once we've added all files
+            if self.pipelineUpload and closedBlocks:
+                # Start uploading the closed blocks while we load the rest
+                for block in readyBlocks:
+                    self.blockCache[block.getName()] = block
+                self.inputBlocks()
 
         # Update the blockCache with what is now ready.
         for block in readyBlocks:
@@ -649,11 +662,21 @@ class DBSUploadPoller(BaseWorkerThread):
         for block in createInDBSBuffer:
             self.blockCache.get(block.getName()).inBuff = True
 
-        # Record new file/block associations in DBSBuffer.
+        # Record new file/block associations in DBSBuffer.  Only the blocks
+        # already in DBSBuffer can be referenced, keep the other files for
+        # later.
+        filesToSet  = []
+        filesToKeep = []
+        for binds in self.filesToUpdate:
+            block = self.blockCache.get(binds['block'])
+            if block != None and block.inBuff:
+                filesToSet.append(binds)
+            else:
+                filesToKeep.append(binds)
         try:
             myThread.transaction.begin()
-            self.dbsUtil.setBlockFiles(binds = self.filesToUpdate)
-            self.filesToUpdate = []
+            self.dbsUtil.setBlockFiles(binds = filesToSet)
+            self.filesToUpdate = filesToKeep
             myThread.transaction.commit()
         except WMException:
             myThread.transaction.rollback()
@@ -39,6 +39,7 @@ class FindDASToUpload(DBFormatter):
              WHERE EXISTS (SELECT id FROM dbsbuffer_file dbsfile
                              WHERE dbsfile.dataset_algo = dbsbuffer_algo_dataset_assoc.id
                              AND dbsfile.status = :status
+                             AND dbsfile.block_id IS NULL
                              AND NOT EXISTS (SELECT id FROM dbsbuffer_file dbf2
                                               INNER JOIN dbsbuffer_file_parent dbfp ON dbf2.id = dbfp.parent
                                               WHERE dbf2.status = 'NOTUPLOADED'
@@ -38,6 +38,7 @@ class LoadDBSFilesByDAS(DBFormatter):
                dbsbuffer_workflow.id = files.workflow
              WHERE dbsbuffer_algo_dataset_assoc.id = :das
              AND files.status = :status
+             AND files.block_id IS NULL
              AND NOT EXISTS (SELECT parent FROM dbsbuffer_file_parent dbfp
                               INNER JOIN dbsbuffer_file dbf2 ON dbfp.parent = dbf2.id
                               WHERE dbfp.child = files.id AND dbf2.status = :status)
@@ -67,7 +68,33 @@ class LoadDBSFilesByDAS(DBFormatter):
                             INNER JOIN dbsbuffer_file dbfb ON dfp.child = dbfb.id
                             WHERE dbfb.id = :fileid """
 
+    # The same lookups for all the files of a DAS that are not in a block yet,
+    # one query each instead of one per file.
+    dasFilesSQL = """WHERE files.dataset_algo = :das
+                       AND files.status = :status
+                       AND files.block_id IS NULL"""
 
+    getDASLocationSQL = """SELECT dbsbuffer_location.se_name as location, files.id as id
+                             FROM dbsbuffer_location
+                             INNER JOIN dbsbuffer_file_location dfl ON dfl.location = dbsbuffer_location.id
+                             INNER JOIN dbsbuffer_file files ON files.id = dfl.filename
+                             %s""" % dasFilesSQL
+
+    getDASChecksumSQL = """SELECT cst.type AS cktype, fcs.cksum AS cksum, fcs.fileid AS id FROM
+                             dbsbuffer_file_checksums fcs INNER JOIN
+                             dbsbuffer_checksum_type cst ON fcs.typeid = cst.id
+                             INNER JOIN dbsbuffer_file files ON files.id = fcs.fileid
+                             %s""" % dasFilesSQL
+
+    getDASRunLumiSQL = """SELECT flr.run AS run, flr.lumi AS lumi, files.id AS id
+                            FROM dbsbuffer_file_runlumi_map flr
+                            INNER JOIN dbsbuffer_file files ON files.id = flr.filename
+                            %s""" % dasFilesSQL
+
+    getDASParentLFNSQL = """SELECT dbfa.lfn AS lfn, files.id AS id FROM dbsbuffer_file dbfa
+                              INNER JOIN dbsbuffer_file_parent dfp ON dfp.parent = dbfa.id
+                              INNER JOIN dbsbuffer_file files ON dfp.child = files.id
+                              %s""" % dasFilesSQL
 
 
 
@@ -124,7 +151,7 @@ class LoadDBSFilesByDAS(DBFormatter):
         interimDictionary = {}
 
         for entry in resultList:
-            if entry['id'] not in interimDictionary.keys():
+            if entry['id'] not in interimDictionary:
                 interimDictionary[entry['id']] = set()
             interimDictionary[entry['id']].add(entry['location'])
 
@@ -151,7 +178,7 @@ class LoadDBSFilesByDAS(DBFormatter):
         interimDictionary = {}
 
         for entry in resultList:
-            if entry['id'] not in interimDictionary.keys():
+            if entry['id'] not in interimDictionary:
                 interimDictionary[entry['id']] = {}
             interimDictionary[entry['id']][entry['cktype']] = entry['cksum']
 
@@ -176,9 +203,9 @@ class LoadDBSFilesByDAS(DBFormatter):
         interimDictionary = {}
 
         for entry in resultList:
-            if entry['id'] not in interimDictionary.keys():
+            if entry['id'] not in interimDictionary:
                 interimDictionary[entry['id']] = {}
-            if entry['run'] not in interimDictionary[entry['id']].keys():
+            if entry['run'] not in interimDictionary[entry['id']]:
                 interimDictionary[entry['id']][entry['run']] = []
             interimDictionary[entry['id']][entry['run']].append(entry['lumi'])
 
@@ -203,7 +230,7 @@ class LoadDBSFilesByDAS(DBFormatter):
         interimDictionary = {}
 
         for entry in resultList:
-            if entry['id'] not in interimDictionary.keys():
+            if entry['id'] not in interimDictionary:
                 interimDictionary[entry['id']] = []
             interimDictionary[entry['id']].append(entry['lfn'])
 
@@ -230,22 +257,22 @@ class LoadDBSFilesByDAS(DBFormatter):
         Execute multiple SQL queries to extract all binding information
         Use the first query to get the fileIDs
 
+        Only the files that are not in a block yet are loaded, the other
+        queries look up the information of all of them at once.
         """
-        result   = self.dbi.processData(self.fileInfoSQL, {'das': das, 'status': 'NOTUPLOADED'},
+        binds    = {'das': das, 'status': 'NOTUPLOADED'}
+        result   = self.dbi.processData(self.fileInfoSQL, binds,
                                         conn = conn,
                                         transaction = transaction)
         fileInfo = self.formatFileInfo(result)
 
-        fileIDs  = [x['id'] for x in fileInfo]
-        binds    = self.getBinds(fileIDs)
-
         if len(fileInfo) == 0:
             # Then we have no files for this DAS
             return []
 
 
         # Do locations
-        result   = self.dbi.processData(self.getLocationSQL, binds,
+        result   = self.dbi.processData(self.getDASLocationSQL, binds,
                                         conn = conn,
                                         transaction = transaction)
         locInfo  = self.locInfo(result)
@@ -253,7 +280,7 @@ class LoadDBSFilesByDAS(DBFormatter):
 
 
         # Do checksums
-        result   = self.dbi.processData(self.getChecksumSQL, binds,
+        result   = self.dbi.processData(self.getDASChecksumSQL, binds,
                                         conn = conn,
                                         transaction = transaction)
 
@@ -262,7 +289,7 @@ class LoadDBSFilesByDAS(DBFormatter):
 
 
         # Do runLumi
-        result      = self.dbi.processData(self.getRunLumiSQL, binds,
+        result      = self.dbi.processData(self.getDASRunLumiSQL, binds,
                                            conn = conn,
                                            transaction = transaction)
         runInfo  = self.runInfo(result)
@@ -271,7 +298,7 @@ class LoadDBSFilesByDAS(DBFormatter):
 
 
         # Do parents
-        result   = self.dbi.processData(self.getParentLFNSQL, binds,
+        result   = self.dbi.processData(self.getDASParentLFNSQL, binds,
                                         conn = conn,
                                         transaction = transaction)
         parInfo  = self.parentInfo(result)
@@ -288,13 +315,14 @@ class LoadDBSFilesByDAS(DBFormatter):
 
         Merge together two file lists based on the ID field
         """
+        entriesB = {}
+        for entryB in listB:
+            entriesB.setdefault(entryB[field], entryB)
 
         for entryA in listA:
-            for entryB in listB:
-                if entryA[field] == entryB[field]:
-                    # Then we've found a match
-                    entryA.update(entryB)
-                    break
+            if entryA[field] in entriesB:
+                # Then we've found a match
+                entryA.update(entriesB[entryA[field]])
 
 
         return listA
@@ -310,7 +338,7 @@ class LoadDBSFilesByDAS(DBFormatter):
         interimDictionary = {}
 
         for entry in inputList:
-            if entry['id'] not in interimDictionary.keys():
+            if entry['id'] not in interimDictionary:
                 interimDictionary[entry['id']] = set()
             interimDictionary[entry['id']].add(entry[key])
 
@@ -37,6 +37,7 @@ class FindDASToUpload(MySQLFindDASToUpload):
              WHERE EXISTS (SELECT id FROM dbsbuffer_file dbsfile
                              WHERE dbsfile.dataset_algo = das.id
                              AND dbsfile.status = :status
+                             AND dbsfile.block_id IS NULL
                              AND NOT EXISTS (SELECT id FROM dbsbuffer_file dbf2
                                               INNER JOIN dbsbuffer_file_parent dbfp ON dbf2.id = dbfp.parent
                                               WHERE dbf2.status = 'NOTUPLOADED'
@@ -26,6 +26,11 @@ config.ErrorHandler.passExitCodes:  This should be a list of exitCodes that you
 immediately to the 'created' state, skipping cooloff.  It defaults to [].
 
 Note that failureExitCodes has precedence over passExitCodes.
+
+The FWJRs are classified from their summary header, the full report is only
+loaded for reports written by older versions.  With
+config.ErrorHandler.readFWJRProcesses larger than 1 the FWJRs are read by a
+pool of that many processes.
 """
 __all__ = []
 
@@ -34,6 +39,7 @@ import os.path
 import threading
 import logging
 import traceback
+import multiprocessing
 
 from WMCore.WorkerThreads.BaseWorkerThread import BaseWorkerThread
 
@@ -54,6 +60,54 @@ class ErrorHandlerException(WMException):
     pass
 
 
+def classifyFWJR(reportPath, maxFailTime, exitCodes, passCodes):
+    """
+    _classifyFWJR_
+
+    Decide what to do with a failed job from its FWJR.  Only the summary
+    header of the report is read unless it was written by an older version.
+    Return a tuple with the decision, one of 'maxFailTime', 'failureExitCode',
+    'passExitCode', 'cooloff' or 'error', and its details.
+    """
+    try:
+        report = Report()
+        if not report.readSummary(reportPath):
+            report.load(reportPath)
+
+        # First let's check the time conditions
+        times = report.getFirstStartLastStop()
+        startTime = None
+        stopTime = None
+        if times is not None:
+            startTime = times['startTime']
+            stopTime = times['stopTime']
+
+        # Without the times we have no information to make a decision
+        hasTimes = startTime != None and stopTime != None
+        if hasTimes and stopTime - startTime > maxFailTime:
+            return ('maxFailTime', stopTime - startTime)
+
+        reportExitCodes = report.getExitCodes()
+        if len([x for x in reportExitCodes if x in exitCodes]):
+            return ('failureExitCode', reportExitCodes)
+
+        if len([x for x in reportExitCodes if x in passCodes]):
+            return ('passExitCode', reportExitCodes)
+
+        return ('cooloff', hasTimes)
+
+    except Exception, ex:
+        return ('error', str(ex))
+
+def classifyFWJRWorker(parameters):
+    """
+    _classifyFWJRWorker_
+
+    Unpack the parameters of classifyFWJR for the process pool.
+    """
+    return classifyFWJR(*parameters)
+
+
 class ErrorHandlerPoller(BaseWorkerThread):
     """
     Polls for Error Conditions, handles them
@@ -83,6 +137,7 @@ class ErrorHandlerPoller(BaseWorkerThread):
         self.maxFailTime    = getattr(self.config.ErrorHandler, 'maxFailTime', 32 * 3600)
         self.readFWJR       = getattr(self.config.ErrorHandler, 'readFWJR', False)
         self.passCodes      = getattr(self.config.ErrorHandler, 'passExitCodes', [])
+        self.readFWJRProcesses = getattr(self.config.ErrorHandler, 'readFWJRProcesses', 1)
 
         self.getJobs    = self.daoFactory(classname = "Jobs.GetAllJobs")
         self.idLoad     = self.daoFactory(classname = "Jobs.LoadFromIDWithType")
@@ -205,8 +260,8 @@ class ErrorHandlerPoller(BaseWorkerThread):
         cooloffJobs = []
         passJobs = []
         exhaustJobs = []
+        reportJobs = []
         for job in jobList:
-            report     = Report()
             reportPath = job['fwjr_path']
             if reportPath is None:
                 logging.error("No FWJR in job %i, ErrorHandler can't process it.\n Passing it to cooloff." % job['id'])
@@ -216,47 +271,57 @@ class ErrorHandlerPoller(BaseWorkerThread):
                 logging.error("Failed to find FWJR for job %i in location %s.\n Passing it to cooloff." % (job['id'], reportPath))
                 cooloffJobs.append(job)
                 continue
-            try:
-                report.load(reportPath)
-                # First let's check the time conditions
-                times = report.getFirstStartLastStop()
-                startTime = None
-                stopTime = None
-                if times is not None:
-                    startTime = times['startTime']
-                    stopTime = times['stopTime']
-
-                if startTime == None or stopTime == None:
-                    # We have no information to make a decision, keep going.
-                    logging.debug("No start, stop times for steps for job %i" % job['id'])
-                elif stopTime - startTime > self.maxFailTime:
-                    msg = "Job %i exhausted after running on node for %i seconds" % (job['id'], stopTime - startTime)
-                    logging.debug(msg)
-                    exhaustJobs.append(job)
-                    continue
-
-                if len([x for x in report.getExitCodes() if x in self.exitCodes]):
-                    msg = "Job %i exhausted due to a bad exit code (%s)" % (job['id'], str(report.getExitCodes()))
-                    logging.error(msg)
-                    self.sendAlert(4, msg = msg)
-                    exhaustJobs.append(job)
-                    continue
-
-                if len([x for x in report.getExitCodes() if x in self.passCodes]):
-                    msg = "Job %i restarted immediately due to an exit code (%s)" % (job['id'], str(report.getExitCodes()))
-                    passJobs.append(job)
-                    continue
-
-                cooloffJobs.append(job)
+            reportJobs.append(job)
 
-            except Exception, ex:
+        results = self.classifyFWJRs([x['fwjr_path'] for x in reportJobs])
+        for job, (decision, details) in zip(reportJobs, results):
+            if decision == 'maxFailTime':
+                msg = "Job %i exhausted after running on node for %i seconds" % (job['id'], details)
+                logging.debug(msg)
+                exhaustJobs.append(job)
+            elif decision == 'failureExitCode':
+                msg = "Job %i exhausted due to a bad exit code (%s)" % (job['id'], str(details))
+                logging.error(msg)
+                self.sendAlert(4, msg = msg)
+                exhaustJobs.append(job)
+            elif decision == 'passExitCode':
+                msg = "Job %i restarted immediately due to an exit code (%s)" % (job['id'], str(details))
+                logging.debug(msg)
+                passJobs.append(job)
+            elif decision == 'error':
                 logging.warning("Exception while trying to check jobs for failures!")
-                logging.warning(str(ex))
+                logging.warning(details)
                 logging.warning("Ignoring and sending job to cooloff")
                 cooloffJobs.append(job)
+            else:
+                if not details:
+                    # We had no information to make a decision
+                    logging.debug("No start, stop times for steps for job %i" % job['id'])
+                cooloffJobs.append(job)
 
         return cooloffJobs, passJobs, exhaustJobs
 
+    def classifyFWJRs(self, reportPaths):
+        """
+        _classifyFWJRs_
+
+        Run classifyFWJR on all the reports, on a pool of processes if
+        readFWJRProcesses is larger than 1 and there is enough work for it.
+        """
+        parameters = [(x, self.maxFailTime, self.exitCodes, self.passCodes) for x in reportPaths]
+        if self.readFWJRProcesses <= 1 or len(parameters) <= self.readFWJRProcesses:
+            return map(classifyFWJRWorker, parameters)
+
+        chunkSize = max(1, len(parameters) // (4 * self.readFWJRProcesses))
+        pool = multiprocessing.Pool(processes = self.readFWJRProcesses)
+        try:
+            results = pool.map(classifyFWJRWorker, parameters, chunkSize)
+        finally:
+            pool.close()
+            pool.join()
+
+        return results
+
     def handleRetryDoneJobs(self, jobList):
         """
         _handleRetryDoneJobs_
@@ -22,4 +22,7 @@ class JobAccountant(Harness):
     def preInitialization(self):
         pollInterval = self.config.JobAccountant.pollInterval
         myThread = threading.currentThread()
-        myThread.workerThreadManager.addWorker(JobAccountantPoller(self.config), pollInterval)
+        # Optional adaptive polling
+        maxPollInterval = getattr(self.config.JobAccountant, 'maxPollInterval', None)
+        myThread.workerThreadManager.addWorker(JobAccountantPoller(self.config), pollInterval,
+                                               maxIdleTime = maxPollInterval)
@@ -64,7 +64,7 @@ class JobAccountantPoller(BaseWorkerThread):
         _algorithm_
 
         Poll WMBS for jobs in the 'Complete' state and then pass them to the
-        accountant worker.
+        accountant worker.  Return whether there were complete jobs.
         """
         completeJobs = self.getJobsAction.execute(state = "complete")
         logging.info("Found %d completed jobs" % len(completeJobs))
@@ -72,7 +72,7 @@ class JobAccountantPoller(BaseWorkerThread):
         if len(completeJobs) == 0:
             # Then we have no work to do.  Bye!
             logging.debug("No work to do; exiting")
-            return
+            return False
 
         while len(completeJobs) > self.accountantWorkSize:
             try:
@@ -109,4 +109,4 @@ class JobAccountantPoller(BaseWorkerThread):
             logging.debug(completeJobs)
             raise JobAccountantPollerException(msg)
 
-        return
+        return True
@@ -25,7 +25,7 @@ from subprocess import Popen, PIPE
 
 from WMCore.DAOFactory        import DAOFactory
 
-from WMCore.WMSpec.WMWorkload               import WMWorkload, WMWorkloadHelper
+from WMCore.WMSpec.WorkloadCache            import getWorkloadCache
 
 from WMCore.WMException import WMException
 
@@ -110,8 +110,7 @@ def getMasterName(startDir, wmWorkload = None, workflow = None):
         logging.error(msg)
         raise CreateWorkAreaException(msg)
     else:
-        wmWorkload = WMWorkloadHelper(WMWorkload("workload"))
-        wmWorkload.load(workflow.spec)
+        wmWorkload = getWorkloadCache().getWorkload(workflow.spec)
 
         workload = wmWorkload.name()
 
@@ -29,10 +29,11 @@ from WMCore.JobSplitting.Generators.GeneratorManager import GeneratorManager
 
 from WMCore.JobStateMachine.ChangeState     import ChangeState
 from WMComponent.JobCreator.CreateWorkArea  import CreateWorkArea
+from WMComponent.JobCreator.JobMetadataStore import JobMetadataStore, getStorePath
 from WMCore.JobSplitting.SplitterFactory    import SplitterFactory
 from WMCore.WMBS.Subscription               import Subscription
 from WMCore.WMBS.Workflow                   import Workflow
-from WMCore.WMSpec.WMWorkload               import WMWorkload, WMWorkloadHelper
+from WMCore.WMSpec.WorkloadCache            import getWorkloadCache
 from WMCore.Database.CMSCouch               import CouchServer
 from WMCore.FwkJobReport.Report             import Report
 
@@ -41,7 +42,8 @@ def retrieveWMSpec(workflow = None, wmWorkloadURL = None):
     """
     _retrieveWMSpec_
 
-    Given a subscription, this function loads the WMSpec associated with that workload
+    Given a subscription, this function loads the WMSpec associated with that workload.
+    Specs come from the workload cache of the process so they must not be modified.
     """
     if not wmWorkloadURL and workflow:
         wmWorkloadURL = workflow.spec
@@ -50,13 +52,10 @@ def retrieveWMSpec(workflow = None, wmWorkloadURL = None):
         logging.error("WMWorkloadURL %s is empty" % (wmWorkloadURL))
         return None
 
-    wmWorkload = WMWorkloadHelper(WMWorkload("workload"))
-    wmWorkload.load(wmWorkloadURL)
+    return getWorkloadCache().getWorkload(wmWorkloadURL)
 
-    return wmWorkload
 
-
-def retrieveJobSplitParams(wmWorkload, task):
+def retrieveJobSplitParams(wmWorkload, task, wmTask = None):
     """
     _retrieveJobSplitParams_
 
@@ -77,7 +76,10 @@ def retrieveJobSplitParams(wmWorkload, task):
     if not wmWorkload:
         logging.error("Could not find wmWorkload for splitting")
         return {"files_per_job": 5}
-    task = wmWorkload.getTaskByPath(task)
+    if wmTask:
+        task = wmTask
+    else:
+        task = wmWorkload.getTaskByPath(task)
     if not task:
         return {"files_per_job": 5}
     else:
@@ -136,11 +138,41 @@ def saveJob(job, workflow, sandbox, wmTask = None, jobNumber = 0,
     return
 
 
-def creatorProcess(work, jobCacheDir):
+def saveJobMetadata(jobs):
+    """
+    _saveJobMetadata_
+
+    Add the jobs to the metadata store of their task directory, this is what
+    the JobSubmitter reads instead of the job.pkl files.  The job.pkl files
+    are already written and the JobSubmitter falls back to them, so a store
+    that can't be written is only logged.
+    """
+    jobsByStore = {}
+    for job in jobs:
+        jobsByStore.setdefault(getStorePath(job['cache_dir']), []).append(job)
+
+    for storePath in jobsByStore.keys():
+        try:
+            store = JobMetadataStore(storePath)
+            try:
+                store.saveJobs(jobsByStore[storePath])
+            finally:
+                store.close()
+        except Exception, ex:
+            msg =  "Could not save %i jobs in the job metadata store %s\n" % (len(jobsByStore[storePath]),
+                                                                               storePath)
+            msg += str(ex)
+            logging.error(msg)
+
+    return
+
+
+def creatorProcess(work, jobCacheDir, useMetadataStore = False):
     """
     _creatorProcess_
 
-    Creator work areas and pickle job objects
+    Creator work areas and pickle job objects, save them in the job
+    metadata store as well if useMetadataStore is set.
     """
     createWorkArea  = CreateWorkArea()
 
@@ -204,6 +236,9 @@ def creatorProcess(work, jobCacheDir):
         logging.error(msg)
         raise JobCreatorException(msg)
 
+    if useMetadataStore:
+        saveJobMetadata(wmbsJobGroup.jobs)
+
     return wmbsJobGroup
 
 
@@ -348,6 +383,12 @@ class JobCreatorPoller(BaseWorkerThread):
         self.defaultJobType     = config.JobCreator.defaultJobType
         self.limit              = getattr(config.JobCreator, 'fileLoadLimit', 500)
         self.agentNumber        = int(getattr(config.Agent, 'agentNumber', 0))
+        # Only fill the job metadata store if the JobSubmitter reads it
+        self.useMetadataStore   = getattr(getattr(config, 'JobSubmitter', None),
+                                          'useJobMetadataStore', False)
+
+        getWorkloadCache().setLimits(maxEntries = getattr(config.JobCreator, 'workloadCacheEntries', None),
+                                     maxSize = getattr(config.JobCreator, 'workloadCacheSize', None))
 
         # initialize the alert framework (if available - config.Alert present)
         #    self.sendAlert will be then be available
@@ -471,7 +512,7 @@ class JobCreatorPoller(BaseWorkerThread):
             logging.debug("Have loaded subscription %i with workflow %i\n" % (subscriptionID, workflow.id))
 
             # Set task object
-            wmTask = wmWorkload.getTaskByPath(workflow.task)
+            wmTask = getWorkloadCache().getTask(workflow.spec, workflow.task)
 
             # Get generators
             # If you fail to load the generators, pass on the job
@@ -492,7 +533,7 @@ class JobCreatorPoller(BaseWorkerThread):
 
             logging.debug("Going to call wmbsJobFactory for sub %i with limit %i" % (subscriptionID, self.limit))
 
-            splitParams = retrieveJobSplitParams(wmWorkload, workflow.task)
+            splitParams = retrieveJobSplitParams(wmWorkload, workflow.task, wmTask)
             logging.debug("Split Params: %s" % splitParams)
 
             # My hope is that the job factory is smart enough only to split un-split jobs
@@ -568,7 +609,8 @@ class JobCreatorPoller(BaseWorkerThread):
                     tempDict['agentNumber'] = self.agentNumber
 
                     jobGroup = creatorProcess(work = tempDict,
-                                              jobCacheDir = self.jobCacheDir)
+                                              jobCacheDir = self.jobCacheDir,
+                                              useMetadataStore = self.useMetadataStore)
                     jobNumber += jobsInGroup
 
                     # Set jobCache for group
@@ -607,6 +649,8 @@ class JobCreatorPoller(BaseWorkerThread):
             # Close the jobFactory
             wmbsJobFactory.close()
 
+        logging.info("Workload cache: %(entries)i specs, %(hits)i hits, %(misses)i misses, %(evictions)i evictions, %(loadTime).2f secs loading specs" % \
+                     getWorkloadCache().getStats())
         return
 
 
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+"""
+_JobMetadataStore_
+
+SQLite sidecar that keeps the attributes the JobSubmitter needs for every job
+created in a task directory of the job cache, along with the DataStructs
+version of the job that goes into the job packages.  It lets the JobSubmitter
+load the jobs of a workflow with a few queries instead of opening and
+unpickling one job.pkl file per job.
+
+The job.pkl file is still written for every job, it is what the runtime
+sandbox uses.
+"""
+
+import os
+import cPickle
+import logging
+import sqlite3
+
+from WMCore.WMException import WMException
+
+STORE_NAME = "JobMetadata.db"
+
+# Maximum number of job ids in a single SELECT, SQLite allows 999 variables
+LOAD_CHUNK_SIZE = 500
+
+SUBMIT_ATTRIBUTES = ["id", "name", "workflow", "sandbox", "cache_dir",
+                     "ownerDN", "ownerGroup", "ownerRole", "scramArch",
+                     "swVersion", "proxyPath", "estimatedJobTime",
+                     "estimatedDiskUsage", "estimatedMemoryUsage",
+                     "siteWhitelist", "siteBlacklist"]
+
+ATTRIBUTE_DEFAULTS = {"ownerGroup": '', "ownerRole": '',
+                      "siteWhitelist": [], "siteBlacklist": []}
+
+
+def getStorePath(cacheDir):
+    """
+    _getStorePath_
+
+    Path of the store for a job given its cache directory.  Job cache
+    directories live in taskDir/JobCollection_X_Y/job_Z, so the store is
+    kept in the task directory and it is removed together with it.
+    """
+    taskDir = os.path.dirname(os.path.dirname(os.path.normpath(cacheDir)))
+    return os.path.join(taskDir, STORE_NAME)
+
+
+def getSubmitAttributes(job):
+    """
+    _getSubmitAttributes_
+
+    Extract the attributes used by the JobSubmitter from a job object.
+    """
+    attributes = {}
+    for attribute in SUBMIT_ATTRIBUTES:
+        attributes[attribute] = job.get(attribute, ATTRIBUTE_DEFAULTS.get(attribute, None))
+
+    attributes["siteWhitelist"] = list(attributes["siteWhitelist"])
+    attributes["siteBlacklist"] = list(attributes["siteBlacklist"])
+
+    # All the files in a job have the same set of locations
+    if len(job["input_files"]) > 0:
+        attributes["locations"] = sorted(job["input_files"][0]["locations"])
+    else:
+        attributes["locations"] = []
+
+    return attributes
+
+
+class JobMetadataStoreException(WMException):
+    """
+    _JobMetadataStoreException_
+
+    Raised when the store can't be read or written.
+    """
+    pass
+
+
+class JobMetadataStore(object):
+    """
+    _JobMetadataStore_
+
+    Job metadata store of a task directory.  Each row holds the pickled
+    submit attributes and the pickled DataStructs job, keyed by the WMBS job
+    id.
+    """
+    def __init__(self, path, timeout = 60):
+        self.path = path
+        self.timeout = timeout
+        self.conn = None
+        return
+
+    def exists(self):
+        """
+        _exists_
+
+        Check whether the store has been written.
+        """
+        return os.path.isfile(self.path)
+
+    def connect(self):
+        """
+        _connect_
+
+        Open the database, creating the schema if necessary.
+        """
+        if self.conn != None:
+            return self.conn
+
+        try:
+            self.conn = sqlite3.connect(self.path, timeout = self.timeout)
+            self.conn.text_factory = str
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS job_metadata (
+                                   id         INTEGER PRIMARY KEY,
+                                   attributes BLOB NOT NULL,
+                                   job        BLOB NOT NULL)""")
+            self.conn.commit()
+        except sqlite3.Error, ex:
+            self.conn = None
+            msg = "Error opening job metadata store %s: %s" % (self.path, str(ex))
+            logging.error(msg)
+            raise JobMetadataStoreException(msg)
+
+        return self.conn
+
+    def close(self):
+        """
+        _close_
+
+        Close the connection to the database.
+        """
+        if self.conn != None:
+            self.conn.close()
+            self.conn = None
+        return
+
+    def saveJobs(self, jobs):
+        """
+        _saveJobs_
+
+        Store a list of WMBS jobs in a single transaction, replacing the rows
+        of jobs that were already stored.
+        """
+        binds = []
+        for job in jobs:
+            attributes = getSubmitAttributes(job)
+            binds.append((job["id"],
+                          sqlite3.Binary(cPickle.dumps(attributes, cPickle.HIGHEST_PROTOCOL)),
+                          sqlite3.Binary(cPickle.dumps(job.getDataStructsJob(),
+                                                       cPickle.HIGHEST_PROTOCOL))))
+
+        conn = self.connect()
+        try:
+            conn.executemany("""INSERT OR REPLACE INTO job_metadata (id, attributes, job)
+                                VALUES (?, ?, ?)""", binds)
+            conn.commit()
+        except sqlite3.Error, ex:
+            conn.rollback()
+            msg = "Error saving %i jobs in %s: %s" % (len(binds), self.path, str(ex))
+            logging.error(msg)
+            raise JobMetadataStoreException(msg)
+
+        return
+
+    def _load(self, column, jobIDs):
+        """
+        _load_
+
+        Load and unpickle a column for a list of job ids, jobs that are not in
+        the store are not in the result.
+        """
+        result = {}
+        if not self.exists():
+            return result
+
+        conn = self.connect()
+        jobIDs = list(jobIDs)
+        try:
+            for index in range(0, len(jobIDs), LOAD_CHUNK_SIZE):
+                chunk = jobIDs[index:index + LOAD_CHUNK_SIZE]
+                sql = "SELECT id, %s FROM job_metadata WHERE id IN (%s)" % \
+                      (column, ", ".join(["?"] * len(chunk)))
+                for jobID, value in conn.execute(sql, chunk):
+                    result[jobID] = cPickle.loads(str(value))
+        except sqlite3.Error, ex:
+            msg = "Error loading jobs from %s: %s" % (self.path, str(ex))
+            logging.error(msg)
+            raise JobMetadataStoreException(msg)
+
+        return result
+
+    def loadSubmitAttributes(self, jobIDs):
+        """
+        _loadSubmitAttributes_
+
+        Return a dictionary of submit attributes keyed by job id.
+        """
+        return self._load("attributes", jobIDs)
+
+    def loadJobs(self, jobIDs):
+        """
+        _loadJobs_
+
+        Return a dictionary of DataStructs jobs keyed by job id.
+        """
+        return self._load("job", jobIDs)
@@ -43,7 +43,10 @@ class JobSubmitter(Harness):
 
         pollInterval = self.config.JobSubmitter.pollInterval
         logging.info("Setting poll interval to %s seconds" % pollInterval)
+        # Optional adaptive polling
+        maxPollInterval = getattr(self.config.JobSubmitter, 'maxPollInterval', None)
         myThread.workerThreadManager.addWorker(JobSubmitterPoller(self.config),
-                                               pollInterval)
+                                               pollInterval,
+                                               maxIdleTime = maxPollInterval)
 
         return
@@ -10,6 +10,8 @@ _JobSubmitterPoller_t_
 Submit jobs for execution.
 """
 
+import time
+import heapq
 import random
 import logging
 import threading
@@ -27,6 +29,8 @@ from WMCore.DataStructs.JobPackage            import JobPackage
 from WMCore.FwkJobReport.Report               import Report
 from WMCore.WMException                       import WMException
 from WMCore.BossAir.BossAirAPI                import BossAirAPI
+from WMComponent.JobCreator.JobMetadataStore  import JobMetadataStore, JobMetadataStoreException
+from WMComponent.JobCreator.JobMetadataStore  import getStorePath, getSubmitAttributes
 
 def siteListCompare(a, b):
     """
@@ -94,9 +98,13 @@ class JobSubmitterPoller(BaseWorkerThread):
         self.drainSites         = set()
         self.abortSites         = set()
         self.sortedSites        = []
+        self.workflowHeaps      = {}
+        self.cycleTimes         = {}
         self.packageSize        = getattr(self.config.JobSubmitter, 'packageSize', 500)
         self.collSize           = getattr(self.config.JobSubmitter, 'collectionSize',
                                           self.packageSize * 1000)
+        self.useMetadataStore   = getattr(self.config.JobSubmitter, 'useJobMetadataStore', False)
+        self.storeChunkSize     = getattr(self.config.JobSubmitter, 'jobMetadataChunkSize', 5000)
 
         # initialize the alert framework (if available)
         self.initAlerts(compName = "JobSubmitter")
@@ -167,11 +175,13 @@ class JobSubmitterPoller(BaseWorkerThread):
         numberList.sort()
         return numberList[-1] + 1
 
-    def addJobsToPackage(self, loadedJob):
+    def addJobsToPackage(self, loadedJob, packageJob):
         """
         _addJobsToPackage_
 
         Add a job to a job package and then return the batch ID for the job.
+        The loadedJob holds the submit attributes of the job and the
+        packageJob is the DataStructs job that goes into the package.
         Packages are only written out to disk when they contain 100 jobs.  The
         flushJobsPackages() method must be called after all jobs have been added
         to the cache and before they are actually submitted to make sure all the
@@ -194,7 +204,7 @@ class JobSubmitterPoller(BaseWorkerThread):
                                                          "package": JobPackage(directory = collectionDir)}
 
         jobPackage = self.jobsToPackage[loadedJob["workflow"]]["package"]
-        jobPackage[loadedJob["id"]] = loadedJob.getDataStructsJob()
+        jobPackage[loadedJob["id"]] = packageJob
         batchDir = jobPackage['directory']
 
         if len(jobPackage.keys()) == self.packageSize:
@@ -229,6 +239,147 @@ class JobSubmitterPoller(BaseWorkerThread):
 
         return
 
+    def loadPickledJob(self, newJob):
+        """
+        _loadPickledJob_
+
+        Load the submit attributes and the DataStructs job from the job.pkl
+        file in the job cache directory.  Returns (None, None) if there is no
+        job.pkl file.
+        """
+        pickledJobPath = os.path.join(newJob["cache_dir"], "job.pkl")
+
+        if not os.path.isfile(pickledJobPath):
+            # Then we have a problem - there's no file
+            logging.error("Could not find pickled jobObject %s" % pickledJobPath)
+            return None, None
+        try:
+            jobHandle = open(pickledJobPath, "r")
+            loadedJob = cPickle.load(jobHandle)
+            jobHandle.close()
+        except Exception, ex:
+            msg =  "Error while loading pickled job object %s\n" % pickledJobPath
+            msg += str(ex)
+            logging.error(msg)
+            self.sendAlert(6, msg = msg)
+            raise JobSubmitterPollerException(msg)
+
+        return getSubmitAttributes(loadedJob), loadedJob.getDataStructsJob()
+
+    def loadJobsToSubmit(self, newJobs):
+        """
+        _loadJobsToSubmit_
+
+        Generator over the new jobs that yields tuples with the job
+        information from WMBS, the submit attributes and the DataStructs job.
+        Jobs are read in bulk from the job metadata store of their task
+        directory, the ones missing from it are read from their job.pkl file.
+        The submit attributes and the job are None if the job can't be found.
+        """
+        jobsByStore = {}
+        for newJob in newJobs:
+            jobsByStore.setdefault(getStorePath(newJob['cache_dir']), []).append(newJob)
+
+        for storePath in jobsByStore.keys():
+            store = JobMetadataStore(storePath)
+            storeJobs = jobsByStore[storePath]
+            try:
+                for index in range(0, len(storeJobs), self.storeChunkSize):
+                    chunk = storeJobs[index:index + self.storeChunkSize]
+                    storedAttributes = {}
+                    storedJobs = {}
+                    if self.useMetadataStore and store.exists():
+                        try:
+                            jobIDs = [x['id'] for x in chunk]
+                            storedAttributes = store.loadSubmitAttributes(jobIDs)
+                            storedJobs = store.loadJobs(jobIDs)
+                        except JobMetadataStoreException:
+                            logging.error("Falling back to job.pkl files for %i jobs" % len(chunk))
+                            storedAttributes = {}
+                            storedJobs = {}
+
+                    for newJob in chunk:
+                        jobID = newJob['id']
+                        if jobID in storedAttributes and jobID in storedJobs:
+                            loadedJob = storedAttributes[jobID]
+                            packageJob = storedJobs[jobID]
+                        else:
+                            loadedJob, packageJob = self.loadPickledJob(newJob)
+
+                        if loadedJob != None:
+                            loadedJob['retry_count'] = newJob['retry_count']
+                            packageJob['retry_count'] = newJob['retry_count']
+
+                        yield newJob, loadedJob, packageJob
+            finally:
+                store.close()
+
+        return
+
+    def workflowKey(self, workflow):
+        """
+        _workflowKey_
+
+        Sorting key of a workflow in the priority heaps, the highest workflow
+        priority goes first and then the oldest subscription.
+        """
+        return (-(self.workflowPrios.get(workflow) or 0),
+                self.workflowTimestamps.get(workflow, 0),
+                workflow)
+
+    def getWorkflowHeap(self, siteName, taskType):
+        """
+        _getWorkflowHeap_
+
+        Return the priority heap of workflows with cached jobs for the given
+        site and task type, building it from the job cache if it doesn't
+        exist yet.
+
+        Entries are never removed from the middle of the heap, the ones for
+        workflows that left the cache or whose key changed are discarded when
+        they reach the top.  The heap is rebuilt when the stale entries
+        outnumber the valid ones.
+        """
+        siteHeaps = self.workflowHeaps.setdefault(siteName, {})
+        heap = siteHeaps.get(taskType, None)
+        taskCache = self.cachedJobs.get(siteName, {}).get(taskType, {})
+
+        if heap is None or len(heap) > 2 * len(taskCache) + 10:
+            heap = [self.workflowKey(x) for x in taskCache.keys()]
+            heapq.heapify(heap)
+            siteHeaps[taskType] = heap
+
+        return heap
+
+    def pushWorkflow(self, siteName, taskType, workflow):
+        """
+        _pushWorkflow_
+
+        Add a workflow to the priority heap of a site and task type, this has
+        to be called when the workflow is added to the job cache of the site
+        and task type or when its priority changes.
+        """
+        heapq.heappush(self.getWorkflowHeap(siteName, taskType),
+                       self.workflowKey(workflow))
+        return
+
+    def updateWorkflowPriority(self, workflow, priority):
+        """
+        _updateWorkflowPriority_
+
+        Change the priority of a cached workflow and reposition it in every
+        heap it is in.  The old heap entries become stale.
+        """
+        if self.workflowPrios.get(workflow) == priority:
+            return
+
+        self.workflowPrios[workflow] = priority
+        for siteName in self.cachedJobs.keys():
+            for taskType in self.cachedJobs[siteName].keys():
+                if workflow in self.cachedJobs[siteName][taskType]:
+                    self.pushWorkflow(siteName, taskType, workflow)
+        return
+
     def refreshCache(self):
         """
         _refreshCache_
@@ -252,7 +403,7 @@ class JobSubmitterPoller(BaseWorkerThread):
         workflows = self.listWorkflows.execute()
         workflows = filter(lambda x: x['name'] in self.workflowPrios, workflows)
         for workflow in workflows:
-            self.workflowPrios[workflow['name']] = workflow['priority']
+            self.updateWorkflowPriority(workflow['name'], workflow['priority'])
 
         logging.info("Querying WMBS for jobs to be submitted...")
         newJobs = self.listJobsAction.execute()
@@ -260,35 +411,22 @@ class JobSubmitterPoller(BaseWorkerThread):
 
         logging.info("Determining possible sites for new jobs...")
         jobCount = 0
+        jobsToLoad = []
         for newJob in newJobs:
+            dbJobs.add(newJob['id'])
+            if newJob['id'] not in self.cachedJobIDs:
+                jobsToLoad.append(newJob)
+
+        for newJob, loadedJob, packageJob in self.loadJobsToSubmit(jobsToLoad):
             jobID = newJob['id']
-            dbJobs.add(jobID)
-            if jobID in self.cachedJobIDs:
-                continue
 
             jobCount += 1
             if jobCount % 5000 == 0:
-                logging.info("Processed %d/%d new jobs." % (jobCount, len(newJobs)))
-
-            pickledJobPath = os.path.join(newJob["cache_dir"], "job.pkl")
+                logging.info("Processed %d/%d new jobs." % (jobCount, len(jobsToLoad)))
 
-            if not os.path.isfile(pickledJobPath):
-                # Then we have a problem - there's no file
-                logging.error("Could not find pickled jobObject %s" % pickledJobPath)
+            if loadedJob == None:
                 badJobs[61103].append(newJob)
                 continue
-            try:
-                jobHandle = open(pickledJobPath, "r")
-                loadedJob = cPickle.load(jobHandle)
-                jobHandle.close()
-            except Exception, ex:
-                msg =  "Error while loading pickled job object %s\n" % pickledJobPath
-                msg += str(ex)
-                logging.error(msg)
-                self.sendAlert(6, msg = msg)
-                raise JobSubmitterPollerException(msg)
-
-            loadedJob['retry_count'] = newJob['retry_count']
 
             # Grab the possible locations
             # This should be in terms of siteNames
@@ -296,7 +434,7 @@ class JobSubmitterPoller(BaseWorkerThread):
             # And each of them can be a separate location
             # Note that all the files in a job have the same set of locations
             possibleLocations = set()
-            rawLocations      = loadedJob["input_files"][0]["locations"]
+            rawLocations      = loadedJob["locations"]
 
             # Create another set of locations that may change when a site goes white/black listed
             # Does not care about the non_draining or aborted sites, they may change and that is the point
@@ -351,7 +489,7 @@ class JobSubmitterPoller(BaseWorkerThread):
                     badJobs[61104].append(newJob)
                     continue
 
-            batchDir = self.addJobsToPackage(loadedJob)
+            batchDir = self.addJobsToPackage(loadedJob, packageJob)
             self.cachedJobIDs.add(jobID)
 
             for possibleLocation in possibleLocations:
@@ -364,14 +502,15 @@ class JobSubmitterPoller(BaseWorkerThread):
                 workflowName = newJob['workflow']
                 timestamp    = newJob['timestamp']
                 prio         = newJob['task_priority']
-                if not locTypeCache.has_key(workflowName):
-                    locTypeCache[workflowName] = set()
                 if not self.jobDataCache.has_key(workflowName):
                     self.jobDataCache[workflowName] = {}
                 if not workflowName in self.workflowTimestamps:
                     self.workflowTimestamps[workflowName] = timestamp
                 if workflowName not in self.workflowPrios:
                     self.workflowPrios[workflowName] = prio
+                if not locTypeCache.has_key(workflowName):
+                    locTypeCache[workflowName] = set()
+                    self.pushWorkflow(possibleLocation, newJob["type"], workflowName)
 
                 locTypeCache[workflowName].add(jobID)
 
@@ -500,6 +639,7 @@ class JobSubmitterPoller(BaseWorkerThread):
             self.cachedJobIDs       = set()
             self.cachedJobs         = {}
             self.jobDataCache       = {}
+            self.workflowHeaps      = {}
 
         #Sort the sites using the following criteria:
         #T1 sites go first, then T2, then T3
@@ -591,6 +731,7 @@ class JobSubmitterPoller(BaseWorkerThread):
                     continue
 
                 taskCache = self.cachedJobs[siteName][taskType]
+                workflowHeap = self.getWorkflowHeap(siteName, taskType)
 
                 # Calculate number of jobs we need
                 nJobsRequired = min(totalPendingSlots - totalPending, taskPendingSlots - taskPending)
@@ -605,22 +746,16 @@ class JobSubmitterPoller(BaseWorkerThread):
                     cachedJob = None
                     cachedJobWorkflow = None
 
-                    workflows = taskCache.keys()
-                    # Sorting by prio and timestamp on the subscription
-                    def sortingCmp(x, y):
-                        if (x not in self.workflowTimestamps) or (y not in self.workflowTimestamps):
-                            return -1
-                        if (x not in self.workflowPrios) or (y not in self.workflowPrios):
-                            return -1
-                        if self.workflowPrios[x] > self.workflowPrios[y]:
-                            return -1
-                        elif self.workflowPrios[x] == self.workflowPrios[y]:
-                            return cmp(self.workflowTimestamps[x], self.workflowTimestamps[y])
-                        else:
-                            return 1
-                    workflows.sort(cmp = sortingCmp)
+                    # The top of the heap is the workflow with the highest prio
+                    # and the oldest subscription, it stays there until it runs
+                    # out of jobs for this site and task type.
+                    while len(workflowHeap) > 0:
+                        workflow = workflowHeap[0][2]
+                        if workflow not in taskCache or workflowHeap[0] != self.workflowKey(workflow):
+                            # Stale entry
+                            heapq.heappop(workflowHeap)
+                            continue
 
-                    for workflow in workflows:
                         # Run a while loop until you get a job
                         while len(taskCache[workflow]) > 0:
                             cachedJobID = taskCache[workflow].pop()
@@ -639,6 +774,7 @@ class JobSubmitterPoller(BaseWorkerThread):
                         # Remove the entry in the cache for the workflow if it is empty.
                         if len(self.cachedJobs[siteName][taskType][workflow]) == 0:
                             del self.cachedJobs[siteName][taskType][workflow]
+                            heapq.heappop(workflowHeap)
                         if self.jobDataCache.has_key(workflow) and len(self.jobDataCache[workflow].keys()) == 0:
                             del self.jobDataCache[workflow]
 
@@ -649,9 +785,11 @@ class JobSubmitterPoller(BaseWorkerThread):
                     # Check to see if we need to delete this site from the cache
                     if len(self.cachedJobs[siteName][taskType].keys()) == 0:
                         del self.cachedJobs[siteName][taskType]
+                        self.workflowHeaps[siteName].pop(taskType, None)
                         breakLoop = True
                     if len(self.cachedJobs[siteName].keys()) == 0:
                         del self.cachedJobs[siteName]
+                        self.workflowHeaps.pop(siteName, None)
                         breakLoop = True
 
                     if not cachedJob:
@@ -699,7 +837,7 @@ class JobSubmitterPoller(BaseWorkerThread):
                                'estimatedJobTime' : cachedJob[14],
                                'estimatedDiskUsage' : cachedJob[15],
                                'estimatedMemoryUsage' : cachedJob[16],
-                               'taskPriority' : self.workflowPrios[workflow],
+                               'taskPriority' : self.workflowPrios[cachedJobWorkflow],
                                'taskName' : cachedJob[17],
                                'potentialSites' : potentialSites}
 
@@ -807,15 +945,31 @@ class JobSubmitterPoller(BaseWorkerThread):
         1) Refresh the cache
         2) Find jobs for all the necessary sites
         3) Submit the jobs to the plugin
+
+        Return whether there were jobs to submit.
         """
 
         try:
             myThread = threading.currentThread()
+            cycleStart = time.time()
             self.getThresholds()
+            thresholdsDone = time.time()
             self.refreshCache()
+            refreshDone = time.time()
             jobsToSubmit = self.assignJobLocations()
+            assignDone = time.time()
             self.submitJobs(jobsToSubmit = jobsToSubmit)
-
+            submitDone = time.time()
+
+            self.cycleTimes = {'getThresholds': thresholdsDone - cycleStart,
+                               'refreshCache': refreshDone - thresholdsDone,
+                               'assignJobLocations': assignDone - refreshDone,
+                               'submitJobs': submitDone - assignDone,
+                               'total': submitDone - cycleStart}
+            logging.info("JobSubmitter cycle took %.3f secs: getThresholds %.3f, refreshCache %.3f, assignJobLocations %.3f, submitJobs %.3f" % \
+                         (self.cycleTimes['total'], self.cycleTimes['getThresholds'],
+                          self.cycleTimes['refreshCache'], self.cycleTimes['assignJobLocations'],
+                          self.cycleTimes['submitJobs']))
 
         except WMException:
             if getattr(myThread, 'transaction', None) != None:
@@ -832,7 +986,7 @@ class JobSubmitterPoller(BaseWorkerThread):
                 myThread.transaction.rollback()
             raise JobSubmitterPollerException(msg)
 
-        return
+        return len(jobsToSubmit) > 0
 
 
 
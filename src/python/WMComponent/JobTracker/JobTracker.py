@@ -47,6 +47,9 @@ class JobTracker(Harness):
 
         pollInterval = self.config.JobTracker.pollInterval
         logging.info("Setting poll interval to %s seconds" %pollInterval)
-        myThread.workerThreadManager.addWorker(JobTrackerPoller(self.config), pollInterval)
+        # Optional adaptive polling
+        maxPollInterval = getattr(self.config.JobTracker, 'maxPollInterval', None)
+        myThread.workerThreadManager.addWorker(JobTrackerPoller(self.config), pollInterval,
+                                               maxIdleTime = maxPollInterval)
 
         return
@@ -90,11 +90,13 @@ class JobTrackerPoller(BaseWorkerThread):
         """
         Performs the archiveJobs method, looking for each type of failure
         And deal with it as desired.
+
+        Return whether there were executing jobs.
         """
         logging.info("Running Tracker algorithm")
         myThread = threading.currentThread()
         try:
-            self.trackJobs()
+            workFound = self.trackJobs()
         except WMException, ex:
             if getattr(myThread, 'transaction', None):
                 myThread.transaction.rollback()
@@ -109,14 +111,15 @@ class JobTrackerPoller(BaseWorkerThread):
             logging.error(msg)
             raise JobTrackerException(msg)
 
-        return
+        return workFound
 
     def trackJobs(self):
         """
         _trackJobs_
 
         Finds a list of running jobs and the sites that they're running at,
-        and passes that off to tracking.
+        and passes that off to tracking.  Return False if there are no
+        running jobs.
         """
 
         passedJobs = []
@@ -128,7 +131,7 @@ class JobTrackerPoller(BaseWorkerThread):
 
         if jobList == []:
             # No jobs: do nothing
-            return
+            return False
 
         logging.info("Have list of %i executing jobs" % len(jobList))
 
@@ -151,7 +154,7 @@ class JobTrackerPoller(BaseWorkerThread):
         self.passJobs(passedJobs)
         self.failJobs(failedJobs)
 
-        return
+        return True
 
 
     def failJobs(self, failedJobs):
@@ -12,6 +12,7 @@ from collections import defaultdict
 from httplib import HTTPException
 
 from WMCore.WorkerThreads.BaseWorkerThread import BaseWorkerThread
+from WMCore.ThreadPool.WorkQueue import ThreadPool
 
 from WMCore.Services.PhEDEx import XMLDrop
 from WMCore.Services.PhEDEx.PhEDEx import PhEDEx
@@ -46,7 +47,7 @@ class PhEDExInjectorPoller(BaseWorkerThread):
         """
         BaseWorkerThread.__init__(self)
         self.config = config
-        self.phedex = PhEDEx({"endpoint": config.PhEDExInjector.phedexurl}, "json")
+        self.phedex = self.connectPhEDEx()
         self.dbsUrl = config.DBSInterface.globalDBSUrl
         self.group = getattr(config.PhEDExInjector, "group", "DataOps")
 
@@ -57,9 +58,19 @@ class PhEDExInjectorPoller(BaseWorkerThread):
         self.seMap = {}
         self.nodeNames = []
 
+        # Built from seMap, map SE and PhEDEx node names to the node to use
+        # when injecting files and when closing blocks.
+        self.injectionNodes = {}
+        self.closingNodes = {}
+
         self.diskSites = getattr(config.PhEDExInjector, "diskSites", ["storm-fe-cms.cr.cnaf.infn.it",
                                                                       "srm-cms-disk.gridpp.rl.ac.uk"])
 
+        # Files are injected in chunks of at most injectionChunkSize files,
+        # with injectionThreads chunks being injected at the same time.
+        self.injectionThreads = getattr(config.PhEDExInjector, "injectionThreads", 1)
+        self.injectionChunkSize = getattr(config.PhEDExInjector, "injectionChunkSize", 5000)
+
         # initialize the alert framework (if available - config.Alert present)
         #    self.sendAlert will be then be available
         self.initAlerts(compName = "PhEDExInjector")
@@ -100,6 +111,41 @@ class PhEDExInjectorPoller(BaseWorkerThread):
             self.seMap[node["kind"]][node["se"]] = node["name"]
             self.nodeNames.append(node["name"])
 
+        self.buildNodeLookups()
+        return
+
+    def connectPhEDEx(self):
+        """
+        _connectPhEDEx_
+
+        Create a new connection to the PhEDEx data service, the injection
+        threads can't share one.
+        """
+        return PhEDEx({"endpoint": self.config.PhEDExInjector.phedexurl}, "json")
+
+    def buildNodeLookups(self):
+        """
+        _buildNodeLookups_
+
+        Map the SE names stored in DBSBuffer to PhEDEx node names.  Blocks are
+        closed at the Buffer node of an SE, or its MSS or Disk node if there
+        isn't one.  Files are injected the same way except for the SEs in
+        diskSites, which prefer the Disk node, then the Buffer and MSS ones.
+        PhEDEx node names map to themselves.
+        """
+        self.closingNodes = {}
+        for kind in ["Disk", "MSS", "Buffer"]:
+            self.closingNodes.update(self.seMap.get(kind, {}))
+
+        self.injectionNodes = dict(self.closingNodes)
+        for kind in ["MSS", "Buffer", "Disk"]:
+            for seName, nodeName in self.seMap.get(kind, {}).iteritems():
+                if seName in self.diskSites:
+                    self.injectionNodes[seName] = nodeName
+
+        for nodeName in self.nodeNames:
+            self.injectionNodes[nodeName] = nodeName
+            self.closingNodes[nodeName] = nodeName
         return
 
     def createInjectionSpec(self, injectionData):
@@ -160,45 +206,85 @@ class PhEDExInjectorPoller(BaseWorkerThread):
                     
         return sortedBlocks
     
+    def createInjectionChunks(self, injectionData):
+        """
+        _createInjectionChunks_
+
+        Split the files of a location, in the format used by
+        createInjectionSpec, in chunks of at most injectionChunkSize files.
+        Blocks with more files than that are split over several chunks.
+        """
+        chunkSize = max(self.injectionChunkSize, 1)
+        chunks = []
+        chunk = {}
+        nFiles = 0
+        for datasetPath in injectionData:
+            for fileBlockName, fileBlock in injectionData[datasetPath].iteritems():
+                files = fileBlock["files"]
+                while files:
+                    if nFiles == chunkSize:
+                        chunks.append(chunk)
+                        chunk = {}
+                        nFiles = 0
+                    chunkFiles = files[:chunkSize - nFiles]
+                    files = files[len(chunkFiles):]
+                    chunk.setdefault(datasetPath, {})[fileBlockName] = {"is-open": fileBlock["is-open"],
+                                                                       "files": chunkFiles}
+                    nFiles += len(chunkFiles)
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def injectChunks(self, injections):
+        """
+        _injectChunks_
+
+        Inject a list of (location, chunk) tuples in PhEDEx, in
+        injectionThreads threads each one with its own connection.  Return
+        the list of (result, exception) tuples in the same order.
+        """
+        def injectChunk(phedex, location, chunk):
+            """
+            Never raises so that the thread pool can't lose a worker.
+            """
+            try:
+                return (phedex.injectBlocks(location, self.createInjectionSpec(chunk)), None)
+            except Exception, ex:
+                logging.debug("Traceback: %s" % str(traceback.format_exc()))
+                return (None, ex)
+
+        nThreads = min(self.injectionThreads, len(injections))
+        if nThreads <= 1:
+            return [injectChunk(self.phedex, *x) for x in injections]
+
+        slaves = []
+        for i in range(nThreads):
+            phedex = self.connectPhEDEx()
+            slaves.append(lambda location, chunk, phedex = phedex: injectChunk(phedex, location, chunk))
+        pool = ThreadPool(slaves)
+        for i, (location, chunk) in enumerate(injections):
+            pool.enqueue(i, location, chunk)
+        return [x[1] for x in sorted(pool)]
+
     def injectFiles(self):
         """
         _injectFiles_
 
-        Inject any uninjected files in PhEDEx.
+        Inject any uninjected files in PhEDEx.  The files of every location
+        are split in chunks which are injected in parallel, the files of each
+        successful chunk are marked as injected in their own transaction.
+        A failed chunk doesn't stop the other ones, the first error is raised
+        once all of them were injected.
         """
         myThread = threading.currentThread()
         uninjectedFiles = self.getUninjected.execute()
 
-        injectedFiles = []
+        injections = []
         for siteName in uninjectedFiles.keys():
             # SE names can be stored in DBSBuffer as that is what is returned in
             # the framework job report.  We'll try to map the SE name to a
             # PhEDEx node name here.
-            location = None
-
-            if siteName in self.nodeNames:
-                location = siteName
-            else:
-                if siteName in self.diskSites:
-                    if self.seMap.has_key("Disk") and \
-                           self.seMap["Disk"].has_key(siteName):
-                        location = self.seMap["Disk"][siteName]
-                    elif self.seMap.has_key("Buffer") and \
-                             self.seMap["Buffer"].has_key(siteName):
-                        location = self.seMap["Buffer"][siteName]
-                    elif self.seMap.has_key("MSS") and \
-                             self.seMap["MSS"].has_key(siteName):
-                        location = self.seMap["MSS"][siteName]
-                else:
-                    if self.seMap.has_key("Buffer") and \
-                           self.seMap["Buffer"].has_key(siteName):
-                        location = self.seMap["Buffer"][siteName]
-                    elif self.seMap.has_key("MSS") and \
-                             self.seMap["MSS"].has_key(siteName):
-                        location = self.seMap["MSS"][siteName]
-                    elif self.seMap.has_key("Disk") and \
-                             self.seMap["Disk"].has_key(siteName):
-                        location = self.seMap["Disk"][siteName]
+            location = self.injectionNodes.get(siteName, None)
 
             if location == None:
                 msg = "Could not map SE %s to PhEDEx node." % siteName
@@ -206,47 +292,55 @@ class PhEDExInjectorPoller(BaseWorkerThread):
                 self.sendAlert(7, msg = msg)
                 continue
 
-            myThread.transaction.begin()
-            xmlData = self.createInjectionSpec(uninjectedFiles[siteName])
-            try:
-                injectRes = self.phedex.injectBlocks(location, xmlData)
-            except HTTPException, ex:
-                # If we get an HTTPException of certain types, raise it as an error
-                if ex.status == 400:
-                    # assume it is duplicate injection error. but if that is not the case
-                    # needs to be investigated
-                    self.filesToRecover = self.createRecoveryFileFormat(uninjectedFiles[siteName])
-                
-                msg = "PhEDEx injection failed with %s error: %s" % (ex.status, ex.result)
-                raise PhEDExInjectorPassableError(msg)
-            except Exception, ex:
-                # If we get an error here, assume that it's temporary (it usually is)
-                # log it, and ignore it in the algorithm() loop
-                msg =  "Encountered error while attempting to inject blocks to PhEDEx.\n"
-                msg += str(ex)
+            for chunk in self.createInjectionChunks(uninjectedFiles[siteName]):
+                injections.append((location, chunk))
+
+        firstError = None
+        results = self.injectChunks(injections)
+        for (location, chunk), (injectRes, ex) in zip(injections, results):
+            if ex != None:
+                if isinstance(ex, HTTPException):
+                    if ex.status == 400:
+                        # assume it is duplicate injection error. but if that is not the case
+                        # needs to be investigated
+                        if self.filesToRecover == None:
+                            self.filesToRecover = defaultdict(set)
+                        for blockName, lfns in self.createRecoveryFileFormat(chunk).iteritems():
+                            self.filesToRecover[blockName].update(lfns)
+                    msg = "PhEDEx injection failed with %s error: %s" % (ex.status, ex.result)
+                else:
+                    # If we get an error here, assume that it's temporary (it usually is)
+                    # log it, and ignore it in the algorithm() loop
+                    msg =  "Encountered error while attempting to inject blocks to PhEDEx.\n"
+                    msg += str(ex)
                 logging.error(msg)
-                logging.debug("Traceback: %s" % str(traceback.format_exc()))
-                
-                raise PhEDExInjectorPassableError(msg)
-            logging.info("Injection result: %s" % injectRes)
+                if firstError == None:
+                    firstError = msg
+                continue
 
-            if not injectRes.has_key("error"):
-                for datasetName in uninjectedFiles[siteName]:
-                    for blockName in uninjectedFiles[siteName][datasetName]:
-                        for file in uninjectedFiles[siteName][datasetName][blockName]["files"]:
-                            injectedFiles.append(file["lfn"])
-            else:
+            logging.info("Injection result for %s: %s" % (location, injectRes))
+            if injectRes.has_key("error"):
                 msg = ("Error injecting data %s: %s" %
-                       (uninjectedFiles[siteName], injectRes["error"]))
+                       (chunk, injectRes["error"]))
                 logging.error(msg)
                 self.sendAlert(6, msg = msg)
+                continue
 
+            injectedFiles = []
+            for datasetName in chunk:
+                for blockName in chunk[datasetName]:
+                    for file in chunk[datasetName][blockName]["files"]:
+                        injectedFiles.append(file["lfn"])
+
+            myThread.transaction.begin()
             self.setStatus.execute(injectedFiles, 1,
                                    conn = myThread.transaction.conn,
                                    transaction = myThread.transaction)
-            injectedFiles = []
             myThread.transaction.commit()
 
+        if firstError != None:
+            raise PhEDExInjectorPassableError(firstError)
+
         return
 
     def closeBlocks(self):
@@ -262,20 +356,7 @@ class PhEDExInjectorPoller(BaseWorkerThread):
             # SE names can be stored in DBSBuffer as that is what is returned in
             # the framework job report.  We'll try to map the SE name to a
             # PhEDEx node name here.
-            location = None
-
-            if siteName in self.nodeNames:
-                location = siteName
-            else:
-                if self.seMap.has_key("Buffer") and \
-                       self.seMap["Buffer"].has_key(siteName):
-                    location = self.seMap["Buffer"][siteName]
-                elif self.seMap.has_key("MSS") and \
-                         self.seMap["MSS"].has_key(siteName):
-                    location = self.seMap["MSS"][siteName]
-                elif self.seMap.has_key("Disk") and \
-                         self.seMap["Disk"].has_key(siteName):
-                    location = self.seMap["Disk"][siteName]
+            location = self.closingNodes.get(siteName, None)
 
             if location == None:
                 msg = "Could not map SE %s to PhEDEx node." % siteName
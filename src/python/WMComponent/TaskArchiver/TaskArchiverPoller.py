@@ -52,10 +52,12 @@ from WMCore.WMException                          import WMException
 from WMCore.WorkQueue.WorkQueue                  import localQueue
 from WMCore.WorkQueue.WorkQueueExceptions        import WorkQueueNoMatchingElements
 from WMCore.WorkerThreads.BaseWorkerThread       import BaseWorkerThread
+from WMCore.ThreadPool.WorkQueue                 import ThreadPool
 from WMCore.BossAir.Plugins.gLitePlugin          import getDefaultDelegation
 from WMCore.Credential.Proxy                     import Proxy
 from WMComponent.JobCreator.CreateWorkArea       import getMasterName
 from WMComponent.JobCreator.JobCreatorPoller     import retrieveWMSpec
+from WMCore.WMSpec.WorkloadCache                 import getWorkloadCache
 from WMCore.Services.WMStats.WMStatsWriter       import WMStatsWriter
 from WMCore.Services.RequestManager.RequestManager import RequestManager
 
@@ -210,6 +212,8 @@ class TaskArchiverPoller(BaseWorkerThread):
         self.maxProcessSize    = getattr(self.config.TaskArchiver, 'maxProcessSize', 250)
         self.timeout           = getattr(self.config.TaskArchiver, "timeOut", None)
         self.nOffenders        = getattr(self.config.TaskArchiver, 'nOffenders', 3)
+        self.logLookupBatchSize = getattr(self.config.TaskArchiver, 'logLookupBatchSize', 100)
+        self.logLookupThreads  = getattr(self.config.TaskArchiver, 'logLookupThreads', 4)
         self.useReqMgrForCompletionCheck   = getattr(self.config.TaskArchiver, 'useReqMgrForCompletionCheck', True)
         self.uploadPublishInfo = getattr(self.config.TaskArchiver, 'uploadPublishInfo', False)
         self.uploadPublishDir  = getattr(self.config.TaskArchiver, 'uploadPublishDir', None)
@@ -242,6 +246,7 @@ class TaskArchiverPoller(BaseWorkerThread):
             workDBurl        = getattr(self.config.TaskArchiver, 'workloadSummaryCouchURL')
             jobDBurl         = sanitizeURL(self.config.JobStateMachine.couchurl)['url']
             jobDBName        = self.config.JobStateMachine.couchDBName
+            self.jobDBName   = jobDBName
             self.jobCouchdb  = CouchServer(jobDBurl)
             self.workCouchdb = CouchServer(workDBurl)
 
@@ -530,6 +535,10 @@ class TaskArchiverPoller(BaseWorkerThread):
                     else:
                         logging.error("Attempted to delete sandbox dir but it was already gone: %s" % sandboxDir)
 
+                # The spec is not needed anymore
+                for wmbsWorkflow in wmbsWorkflows:
+                    getWorkloadCache().invalidate(wmbsWorkflow.spec)
+
             except Exception, ex:
                 msg = "Critical error while deleting workflow %s\n" % workflow
                 msg += str(ex)
@@ -783,16 +792,21 @@ class TaskArchiverPoller(BaseWorkerThread):
         _handleCouchPerformance_
 
         The couch performance stuff is convoluted enough I think I want to handle it separately.
+
+        The values of each task, step and key are gathered in a single pass
+        and converted to arrays (NumPy ones if available) before computing
+        the statistics, see MathAlgos.
         """
         perf = self.fwjrdatabase.loadView("FWJRDump", "performanceByWorkflowName",
                                           options = {"startkey": [workflowName],
                                                      "endkey": [workflowName],
                                                      "stale" : "update_after"})['rows']
                                                      
-        failedJobs = self.getFailedJobs(workflowName)
+        failedJobs = set(self.getFailedJobs(workflowName))
 
         taskList   = {}
         finalTask  = {}
+        allOffenders = []
 
         for row in perf:
             taskName = row['value']['taskName']
@@ -816,18 +830,19 @@ class TaskArchiverPoller(BaseWorkerThread):
                 # keyed by the name of the value
                 for row in taskList[taskName][stepName]:
                     masterList.append(row)
+                    jobFailed = row['jobID'] in failedJobs
                     for key in row.keys():
                         if key in ['startTime', 'stopTime', 'taskName', 'stepName', 'jobID']:
                             continue
-                        if not key in output.keys():
+                        if not key in output:
                             output[key] = []
                             if len(failedJobs) > 0 :
                                 outputFailed[key] = []
                         try:
-                            output[key].append(float(row[key]))
-                            if (row['jobID'] in failedJobs):
-                                outputFailed[key].append(float(row[key]))
-                                
+                            value = float(row[key])
+                            output[key].append(value)
+                            if jobFailed:
+                                outputFailed[key].append(value)
                         except TypeError:
                             # Why do we get None values here?
                             # We may want to look into it
@@ -841,7 +856,7 @@ class TaskArchiverPoller(BaseWorkerThread):
                         output['jobTime'].append(jobTime)
                         row['jobTime'] = jobTime
                         # Account job running time here only if the job has failed
-                        if (row['jobID'] in failedJobs):
+                        if jobFailed:
                             outputFailed['jobTime'].append(jobTime)
                     except TypeError:
                         # One of those didn't have a real value
@@ -855,58 +870,139 @@ class TaskArchiverPoller(BaseWorkerThread):
                     # i.e., those with the highest values
                     offenders = MathAlgos.getLargestValues(dictList = masterList, key = key,
                                                            n = self.nOffenders)
-                    for x in offenders:
-                        try:
-                            logArchive = self.fwjrdatabase.loadView("FWJRDump", "logArchivesByJobID",
-                                                                    options = {"startkey": [x['jobID']],
-                                                                               "endkey": [x['jobID'],
-                                                                                          x['retry_count']],
-                                                                               "stale" : "update_after"})['rows'][0]['value']['lfn']
-                            logCollectID = self.jobsdatabase.loadView("JobDump", "jobsByInputLFN",
-                                                                      options = {"startkey": [workflowName, logArchive],
-                                                                                 "endkey": [workflowName, logArchive],
-                                                                                 "stale" : "update_after"})['rows'][0]['value']
-                            logCollect = self.fwjrdatabase.loadView("FWJRDump", "outputByJobID",
-                                                                    options = {"startkey": logCollectID,
-                                                                               "endkey": logCollectID,
-                                                                               "stale" : "update_after"})['rows'][0]['value']['lfn']
-                            x['logArchive'] = logArchive.split('/')[-1]
-                            x['logCollect'] = logCollect
-                        except IndexError, ex:
-                            logging.debug("Unable to find final logArchive tarball for %i" % x['jobID'])
-                            logging.debug(str(ex))
-                        except KeyError, ex:
-                            logging.debug("Unable to find final logArchive tarball for %i" % x['jobID'])
-                            logging.debug(str(ex))
-
+                    allOffenders.append((final[stepName][key], key, offenders))
 
                     if key in self.histogramKeys:
                         # Usual histogram that was always done
-                        histogram = MathAlgos.createHistogram(numList = output[key],
+                        histogram = MathAlgos.createHistogram(numList = MathAlgos.toArray(output[key]),
                                                               nBins = self.histogramBins,
                                                               limit = self.histogramLimit)
                         final[stepName][key]['histogram'] = histogram
                         # Histogram only picking values from failed jobs
                         # Operators  can use it to find out quicker why a workflow/task/step is failing :
                         if len(failedJobs) > 0 :
-                            failedJobsHistogram = MathAlgos.createHistogram(numList = outputFailed[key],
+                            failedJobsHistogram = MathAlgos.createHistogram(numList = MathAlgos.toArray(outputFailed[key]),
                                                                   nBins = self.histogramBins,
                                                                   limit = self.histogramLimit)
                                                         
                             final[stepName][key]['errorsHistogram'] = failedJobsHistogram
                     else:
-                        average, stdDev = MathAlgos.getAverageStdDev(numList = output[key])
+                        average, stdDev = MathAlgos.getAverageStdDev(numList = MathAlgos.toArray(output[key]))
                         final[stepName][key]['average'] = average
                         final[stepName][key]['stdDev']  = stdDev
 
-                    final[stepName][key]['worstOffenders'] = [{'jobID': x['jobID'], 'value': x.get(key, 0.0),
-                                                               'log': x.get('logArchive', None),
-                                                               'logCollect': x.get('logCollect', None)} for x in offenders]
-
-
             finalTask[taskName] = final
+
+        # The log archives of the offenders of all the keys are looked up together
+        self.addLogArchives(workflowName, [x for (keyFinal, key, offenders) in allOffenders
+                                           for x in offenders])
+        for keyFinal, key, offenders in allOffenders:
+            keyFinal['worstOffenders'] = [{'jobID': x['jobID'], 'value': x.get(key, 0.0),
+                                           'log': x.get('logArchive', None),
+                                           'logCollect': x.get('logCollect', None)} for x in offenders]
         return finalTask
 
+    def addLogArchives(self, workflowName, offenders):
+        """
+        _addLogArchives_
+
+        Add the name of the logArchive tarball and the LFN of the logCollect
+        tarball that contains it to the offender performance rows.  Each job
+        is looked up once, whatever the number of keys it is an offender for,
+        with one multi-key request per view and batch of jobs.
+        """
+        jobs = {}
+        for offender in offenders:
+            retryCount = offender.get('retry_count', None)
+            if type(retryCount) not in (int, long):
+                logging.debug("Unable to find final logArchive tarball for %i" % offender['jobID'])
+                continue
+            jobs.setdefault((offender['jobID'], retryCount), []).append(offender)
+        if not jobs:
+            return
+
+        # The first log archive of the job up to its retry count
+        archiveKeys = set()
+        for jobID, retryCount in jobs.keys():
+            archiveKeys.update([(jobID, x) for x in range(retryCount + 1)])
+        archiveRows = self.loadViewByKeys("fwjrs", "FWJRDump", "logArchivesByJobID",
+                                          [list(x) for x in sorted(archiveKeys)])
+        logArchives = {}
+        for jobID, retryCount in jobs.keys():
+            for retry in range(retryCount + 1):
+                if archiveRows.get((jobID, retry), None):
+                    logArchives[(jobID, retryCount)] = archiveRows[(jobID, retry)][0].get('lfn', None)
+                    break
+
+        lfns = set([x for x in logArchives.values() if x != None])
+        collectRows = self.loadViewByKeys("jobs", "JobDump", "jobsByInputLFN",
+                                          [[workflowName, x] for x in sorted(lfns)])
+        logCollectIDs = set([x[0] for x in collectRows.values()])
+        outputRows = self.loadViewByKeys("fwjrs", "FWJRDump", "outputByJobID",
+                                         sorted(logCollectIDs))
+
+        for job, jobOffenders in jobs.items():
+            logArchive = logArchives.get(job, None)
+            logCollectID = collectRows.get((workflowName, logArchive), [None])[0]
+            logCollect = outputRows.get(logCollectID, [{}])[0].get('lfn', None)
+            if logArchive == None or logCollect == None:
+                logging.debug("Unable to find final logArchive tarball for %i" % job[0])
+                continue
+            for offender in jobOffenders:
+                offender['logArchive'] = logArchive.split('/')[-1]
+                offender['logCollect'] = logCollect
+        return
+
+    def loadViewByKeys(self, dbName, design, view, keys):
+        """
+        _loadViewByKeys_
+
+        Load the rows of a view of the jobs or fwjrs database for a list of
+        keys, with one multi-key request per batch of logLookupBatchSize keys.
+        The batches run on a pool of logLookupThreads threads, each one with
+        its own connection to the database.
+
+        Returns a dict of key (a tuple for list keys) to the list of values,
+        keys without rows are missing.
+        """
+        batchSize = max(self.logLookupBatchSize, 1)
+        batches = [keys[i:i + batchSize] for i in range(0, len(keys), batchSize)]
+
+        def loadBatch(database, batch):
+            """
+            Never raises so that the thread pool can't lose a worker.
+            """
+            try:
+                return database.loadView(design, view, options = {"stale": "update_after"},
+                                         keys = batch)['rows']
+            except Exception, ex:
+                logging.error("Error loading %s view for %i keys: %s" % (view, len(batch), str(ex)))
+                return []
+
+        nThreads = min(self.logLookupThreads, len(batches))
+        if nThreads > 1:
+            slaves = []
+            for i in range(nThreads):
+                database = self.jobCouchdb.connectDatabase("%s/%s" % (self.jobDBName, dbName),
+                                                           create = False)
+                slaves.append(lambda batch, database = database: loadBatch(database, batch))
+            pool = ThreadPool(slaves)
+            for i, batch in enumerate(batches):
+                pool.enqueue(i, batch)
+            batchRows = [x[1] for x in sorted(pool)]
+        else:
+            database = {"jobs": self.jobsdatabase, "fwjrs": self.fwjrdatabase}[dbName]
+            batchRows = [loadBatch(database, x) for x in batches]
+
+        result = {}
+        for rows in batchRows:
+            for row in rows:
+                key = row['key']
+                if type(key) == list:
+                    key = tuple(key)
+                result.setdefault(key, []).append(row['value'])
+        return result
+
     def getFailedJobs(self, workflowName):
         # We want ALL the jobs, and I'm sorry, CouchDB doesn't support wildcards, above-than-absurd values will do:
         errorView = self.fwjrdatabase.loadView("FWJRDump", "errorsByWorkflowName",
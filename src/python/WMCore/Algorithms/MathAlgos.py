@@ -5,12 +5,22 @@ _MathAlgos_
 
 Simple mathematical tools and tricks that might prove to
 be useful.
+
+getAverageStdDev and createHistogram also take the NumPy arrays returned by
+toArray, when NumPy is available, and give the same results as for lists.
 """
 
 import math
+import heapq
+import bisect
 import decimal
 import logging
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from WMCore.WMException import WMException
 
 
@@ -29,6 +39,9 @@ def getAverageStdDev(numList):
     standard deviation.
     """
 
+    if numpy != None and isinstance(numList, numpy.ndarray):
+        return _getArrayAverageStdDev(numList)
+
     if len(numList) < 0:
         # Nothing to do here
         return 0.0, 0.0
@@ -77,6 +90,48 @@ def getAverageStdDev(numList):
     return average, stdDev
 
 
+def _getArrayAverageStdDev(numArray):
+    """
+    _getArrayAverageStdDev_
+
+    getAverageStdDev for a NumPy array.  The sums are accumulated in order,
+    like the loops over lists do, so that the results are the same.
+    """
+    finite = numpy.isfinite(numArray)
+    length = int(finite.sum())
+    if length < 1:
+        return 0.0, 0.0
+
+    # the loop starts from 0.0, which turns a sum of -0.0 into 0.0
+    total = 0.0 + float(numpy.add.accumulate(numArray[finite])[-1])
+    average = total/length
+    if math.isinf(average):
+        return 0.0, 0.0
+    if length < len(numArray):
+        # NaN and inf values make the standard deviation meaningless
+        return average, 0.0
+
+    deviations = numArray - average
+    stdBase = float(numpy.add.accumulate(deviations * deviations)[-1])
+    stdDev = math.sqrt(stdBase/length)
+    if math.isnan(stdDev) or math.isinf(stdDev):
+        stdDev = 0.0
+
+    return average, stdDev
+
+
+def toArray(numList):
+    """
+    _toArray_
+
+    Convert a list of numbers to a NumPy array of floats if NumPy is
+    available, return the list otherwise.
+    """
+    if numpy == None:
+        return numList
+    return numpy.array(numList, dtype = float)
+
+
 def createHistogram(numList, nBins, limit):
     """
     _createHistogram_
@@ -87,18 +142,31 @@ def createHistogram(numList, nBins, limit):
 
     average, stdDev = getAverageStdDev(numList = numList)
 
-    underflow  = []
-    overflow   = []
-    histEvents = []
     histogram  = []
-    for value in numList:
-        if math.fabs(average - value) <= limit * stdDev:
-            # Then we counted this event
-            histEvents.append(value)
-        elif average < value:
-            overflow.append(value)
-        elif average > value:
-            underflow.append(value)
+    if numpy != None and isinstance(numList, numpy.ndarray):
+        # NaN values are in none of them
+        with numpy.errstate(invalid = 'ignore'):
+            inHistogram = numpy.fabs(average - numList) <= limit * stdDev
+            outside = numList[~inHistogram]
+            underflow = outside[average > outside]
+            overflow = outside[average < outside]
+        # A stable sort keeps the order of 0.0 and -0.0 as for lists
+        histEvents = numpy.sort(numList[inHistogram], kind = 'mergesort')
+        searchSorted = lambda value, side: int(numpy.searchsorted(histEvents, value, side))
+    else:
+        underflow  = []
+        overflow   = []
+        histEvents = []
+        for value in numList:
+            if math.fabs(average - value) <= limit * stdDev:
+                # Then we counted this event
+                histEvents.append(value)
+            elif average < value:
+                overflow.append(value)
+            elif average > value:
+                underflow.append(value)
+        histEvents.sort()
+        searchSorted = lambda value, side: getattr(bisect, "bisect_%s" % side)(histEvents, value)
 
 
     if len(underflow) > 0:
@@ -118,9 +186,9 @@ def createHistogram(numList, nBins, limit):
         return histogram
 
 
-    histEvents.sort()
-    upperBound = max(histEvents)
-    lowerBound = min(histEvents)
+    # First of the largest values, like max
+    upperBound = histEvents[searchSorted(histEvents[-1], 'left')]
+    lowerBound = histEvents[0]
     if lowerBound == upperBound:
         # This is a problem
         logging.error("Only one value in the histogram!")
@@ -142,20 +210,10 @@ def createHistogram(numList, nBins, limit):
     for bin in histogram:
         if bin['type'] != 'standard':
             continue
-        binList = []
-        for value in histEvents:
-            if value >= bin['lowerEdge'] and value <= bin['upperEdge']:
-                # Then we're in the bin
-                binList.append(value)
-            elif value > bin['upperEdge']:
-                # Because this is a sorted list we are now out of the bin range
-                # Calculate our values and break
-                break
-            else:
-                continue
+        # The events are sorted, the ones in the bin are contiguous
+        binList = histEvents[searchSorted(bin['lowerEdge'], 'left'):
+                             searchSorted(bin['upperEdge'], 'right')]
 
-        # If we get here, it's because we're out of values in the bin
-        # Time to do some math
         if len(binList) < 1:
             # Nothing to do here, leave defaults
             continue
@@ -209,13 +267,11 @@ def getLargestValues(dictList, key, n = 1):
     Take a list of dictionaries, sort them by the value of a
     particular key, and return the n largest entries.
 
-    Key must be a numerical key.
+    Key must be a numerical key.  Only the n largest entries are
+    sorted, in the same order as sortDictionaryListByKey would.
     """
 
-    sortedList = sortDictionaryListByKey(dictList = dictList, key = key,
-                                         reverse = True)
-
-    return sortedList[:n]
+    return heapq.nlargest(n, dictList, key = lambda k: k.get(key, 0.0))
 
 def validateNumericInput(value):
     """
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+"""
+_ProcessSampler_
+
+Sample the memory and CPU usage of a process and all its children by
+reading /proc directly instead of running ps.
+
+All the memory figures are in kB, like the ones returned by ps.
+"""
+
+import os
+import time
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") / 1024
+CLOCK_TICKS = float(os.sysconf("SC_CLK_TCK"))
+
+
+def readProcStat(pid):
+    """
+    _readProcStat_
+
+    Return (ppid, utime + stime in seconds) from /proc/<pid>/stat or None if
+    the process doesn't exist anymore.
+    """
+    try:
+        handle = open("/proc/%i/stat" % pid)
+        try:
+            content = handle.read()
+        finally:
+            handle.close()
+    except (IOError, OSError):
+        return None
+
+    # The command name can contain spaces and parentheses
+    fields = content[content.rfind(")") + 2:].split()
+    return (int(fields[1]), (int(fields[11]) + int(fields[12])) / CLOCK_TICKS)
+
+
+def readProcStatm(pid):
+    """
+    _readProcStatm_
+
+    Return (vsize, rss) in kB from /proc/<pid>/statm or None if the process
+    doesn't exist anymore.
+    """
+    try:
+        handle = open("/proc/%i/statm" % pid)
+        try:
+            fields = handle.read().split()
+        finally:
+            handle.close()
+    except (IOError, OSError):
+        return None
+
+    return (int(fields[0]) * PAGE_SIZE, int(fields[1]) * PAGE_SIZE)
+
+
+def readProcPSS(pid):
+    """
+    _readProcPSS_
+
+    Return the proportional set size in kB from /proc/<pid>/smaps_rollup or
+    None if the kernel doesn't provide it.
+    """
+    try:
+        handle = open("/proc/%i/smaps_rollup" % pid)
+        try:
+            for line in handle:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1])
+        finally:
+            handle.close()
+    except (IOError, OSError):
+        pass
+
+    return None
+
+
+def getProcessTree(pid):
+    """
+    _getProcessTree_
+
+    Return the list of PIDs of a process and all its descendants.
+    """
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        stat = readProcStat(int(entry))
+        if stat != None:
+            children.setdefault(stat[0], []).append(int(entry))
+
+    tree = []
+    toVisit = [pid]
+    while toVisit:
+        current = toVisit.pop()
+        tree.append(current)
+        toVisit.extend(children.get(current, []))
+    return tree
+
+
+class ProcessSampler(object):
+    """
+    _ProcessSampler_
+
+    Sample the process tree of a PID.  The CPU percentage is computed from
+    the CPU time used by the tree since the previous sample.
+    """
+    def __init__(self, pid):
+        self.pid = pid
+        self.lastTime = None
+        self.lastCPUTime = None
+        return
+
+    def sample(self):
+        """
+        _sample_
+
+        Return a dict with the time of the sample, the number of processes
+        in the tree, their total rss, vsize, pss (None if not available) and
+        pcpu.  Return None if the process doesn't exist anymore.
+        """
+        if readProcStat(self.pid) == None:
+            return None
+
+        sampleTime = time.time()
+        result = {"time": sampleTime, "processes": 0, "rss": 0, "vsize": 0,
+                  "pss": 0, "pcpu": 0.0}
+        cpuTime = 0.0
+        for pid in getProcessTree(self.pid):
+            stat = readProcStat(pid)
+            statm = readProcStatm(pid)
+            if stat == None or statm == None:
+                # The process exited while we were looking at it
+                continue
+
+            result["processes"] += 1
+            cpuTime += stat[1]
+            result["vsize"] += statm[0]
+            result["rss"] += statm[1]
+            if result["pss"] != None:
+                pss = readProcPSS(pid)
+                if pss == None:
+                    result["pss"] = None
+                else:
+                    result["pss"] += pss
+
+        if self.lastTime != None and sampleTime > self.lastTime:
+            # Children that exited take their CPU time with them
+            result["pcpu"] = max(0.0, 100.0 * (cpuTime - self.lastCPUTime) / \
+                                 (sampleTime - self.lastTime))
+        self.lastTime = sampleTime
+        self.lastCPUTime = cpuTime
+
+        return result
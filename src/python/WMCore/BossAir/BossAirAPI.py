@@ -495,23 +495,16 @@ class BossAirAPI(WMConnectionBase):
          on runjobIDs.  This takes a list of integer IDs.
         """
 
-        jobsToChange   = []
-        jobsToComplete = []
-        jobsToReturn   = []
         returnList     = []
 
-        jobsToTrack = {}
-
         runningJobs = self._listRunJobs(active = True)
 
         if runJobIDs:
-            for job in runningJobs:
-                if not job['id'] in runJobIDs:
-                    runningJobs.remove(job)
+            runJobIDs   = set(runJobIDs)
+            runningJobs = [x for x in runningJobs if x['id'] in runJobIDs]
         if wmbsIDs:
-            for job in runningJobs:
-                if not job['jobid'] in wmbsIDs:
-                    runningJobs.remove(job)
+            wmbsIDs     = set(wmbsIDs)
+            runningJobs = [x for x in runningJobs if x['jobid'] in wmbsIDs]
 
         if len(runningJobs) < 1:
             # Then we have no running jobs
@@ -523,14 +516,47 @@ class BossAirAPI(WMConnectionBase):
 
         logging.info("About to look for %i loadedJobs.\n" % len(loadedJobs))
 
-        for runningJob in loadedJobs:
-            plugin = runningJob['plugin']
-            if not plugin in jobsToTrack.keys():
-                jobsToTrack[plugin] = []
-            jobsToTrack[plugin].append(runningJob)
+        jobsToReturn, jobsToChange, jobsToComplete = self._trackPlugins(jobs = loadedJobs)
 
-        for plugin in jobsToTrack.keys():
-            if not plugin in self.plugins.keys():
+        logging.info("About to change %i jobs\n" % len(jobsToChange))
+        logging.debug("JobsToChange: %s" % jobsToChange)
+        logging.info("About to complete %i jobs\n" % len(jobsToComplete))
+        logging.debug("JobsToComplete: %s" % jobsToComplete)
+
+        self._updateJobs(jobs = jobsToChange)
+        self._complete(jobs = jobsToComplete)
+
+
+        # We should have a globalState variable for changed jobs
+        # from the plugin
+        # Return that to the calling function
+        for rj in jobsToReturn:
+            job = rj.buildWMBSJob()
+            job['globalState'] = rj['globalState']
+            returnList.append(job)
+
+        return returnList
+
+    def _trackPlugins(self, jobs):
+        """
+        _trackPlugins_
+
+        Send the runJobs to the plugins that submitted them, return the
+        running jobs, the jobs to change and the jobs to complete.
+
+        Every category is keyed by runJob ID, so a job reported twice is only
+        handled once.  Jobs a plugin reports neither as running nor as
+        complete have vanished from it, they are left as they are.
+        """
+        jobsToTrack = {}
+        for runningJob in jobs:
+            jobsToTrack.setdefault(runningJob['plugin'], []).append(runningJob)
+
+        running,  runningIDs  = [], set()
+        changed,  changedIDs  = [], set()
+        complete, completeIDs = [], set()
+        for plugin, pluginJobs in jobsToTrack.iteritems():
+            if not plugin in self.plugins:
                 msg =  "Jobs tracking with non-existant plugin %s\n" % (plugin)
                 msg += "They were submitted but can't be tracked?\n"
                 msg += "That's too strange to continue\n"
@@ -540,40 +566,41 @@ class BossAirAPI(WMConnectionBase):
                 # Then we send them to the plugins
                 # Should give you a lit of jobs to change and jobs to complete
                 pluginInst = self.plugins[plugin]
-                localRunning, localChanges, localCompletes = pluginInst.track(jobs = jobsToTrack[plugin])
-                jobsToReturn.extend(localRunning)
-                jobsToChange.extend(localChanges)
-                jobsToComplete.extend(localCompletes)
-                logging.debug("Changing/completing %i/%i jobs in plugin %s.\n" % (len(localChanges),
-                                                                                  len(localCompletes),
-                                                                                  plugin))
+                localRunning, localChanges, localCompletes = pluginInst.track(jobs = pluginJobs)
             except WMException:
                 raise
             except Exception, ex:
                 msg =  "Unhandled Exception while tracking jobs for plugin %s!\n" % plugin
                 msg += str(ex)
                 logging.error(msg)
-                logging.debug("JobsToTrack: %s" % (jobsToTrack[plugin]))
+                logging.debug("JobsToTrack: %s" % (pluginJobs))
                 raise BossAirException(msg)
 
-        logging.info("About to change %i jobs\n" % len(jobsToChange))
-        logging.debug("JobsToChange: %s" % jobsToChange)
-        logging.info("About to complete %i jobs\n" % len(jobsToComplete))
-        logging.debug("JobsToComplete: %s" % jobsToComplete)
+            self._addUnique(running, runningIDs, localRunning)
+            self._addUnique(changed, changedIDs, localChanges)
+            self._addUnique(complete, completeIDs, localCompletes)
+            vanished = set([x['id'] for x in pluginJobs]) - runningIDs - completeIDs
 
-        self._updateJobs(jobs = jobsToChange)
-        self._complete(jobs = jobsToComplete)
+            logging.debug("Changing/completing %i/%i jobs in plugin %s.\n" % (len(localChanges),
+                                                                              len(localCompletes),
+                                                                              plugin))
+            if vanished:
+                logging.debug("%i jobs not reported by plugin %s.\n" % (len(vanished), plugin))
 
+        return running, changed, complete
 
-        # We should have a globalState variable for changed jobs
-        # from the plugin
-        # Return that to the calling function
-        for rj in jobsToReturn:
-            job = rj.buildWMBSJob()
-            job['globalState'] = rj['globalState']
-            returnList.append(job)
+    @staticmethod
+    def _addUnique(jobs, jobIDs, newJobs):
+        """
+        _addUnique_
 
-        return returnList
+        Append the new jobs whose ID is not in jobIDs yet
+        """
+        for job in newJobs:
+            if not job['id'] in jobIDs:
+                jobIDs.add(job['id'])
+                jobs.append(job)
+        return
 
     def _complete(self, jobs):
         """
@@ -592,9 +619,7 @@ class BossAirAPI(WMConnectionBase):
         idsToComplete  = []
 
         for job in jobs:
-            if not job['plugin'] in jobsToComplete.keys():
-                jobsToComplete[job['plugin']] = []
-            jobsToComplete[job['plugin']].append(job)
+            jobsToComplete.setdefault(job['plugin'], []).append(job)
             idsToComplete.append(job['id'])
 
         try:
@@ -834,13 +859,10 @@ class BossAirAPI(WMConnectionBase):
         finalJobs = []
 
         loadedJobs = self._loadByID(jobs = runJobs)
+        runJobsByID = dict([(rj['id'], rj) for rj in runJobs])
 
         for loadJob in loadedJobs:
-            runJob = None
-            for rj in runJobs:
-                if rj['id'] == loadJob['id']:
-                    runJob = rj
-                    break
+            runJob = runJobsByID[loadJob['id']]
             # We should have two instances of the job
             for key in runJob.keys():
                 # Fill one from the other
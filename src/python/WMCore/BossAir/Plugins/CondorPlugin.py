@@ -26,6 +26,7 @@ from WMCore.DAOFactory                 import DAOFactory
 from WMCore.WMException                import WMException
 from WMCore.WMInit                     import getWMBASE
 from WMCore.BossAir.Plugins.BasePlugin import BasePlugin, BossAirPluginException
+from WMCore.BossAir.Plugins.CondorTracker import CondorTracker
 from WMCore.FwkJobReport.Report        import Report
 from WMCore.Algorithms                 import SubprocessAlgos
 
@@ -191,6 +192,11 @@ class CondorPlugin(BasePlugin):
         self.defaultTaskPriority = getattr(config.BossAir, 'defaultTaskPriority', 0)
         self.maxTaskPriority     = getattr(config.BossAir, 'maxTaskPriority', 1e7)
 
+        # Retrieve the classAds through the htcondor bindings if available
+        self.tracker    = CondorTracker(self.agent,
+                                        getattr(config.BossAir, 'useHTCondorBindings', True))
+        self.statNames  = {}
+
         # Build ourselves a pool
         self.pool     = []
         self.input    = None
@@ -552,15 +558,22 @@ class CondorPlugin(BasePlugin):
         noInfoFlag   = False
 
         # Get the job
-        jobInfo = self.getClassAds()
+        jobInfo, changedIDs = self.tracker.getChanges()
         if jobInfo == None:
             return runningList, changeList, completeList
-        if len(jobInfo.keys()) == 0:
+        if len(jobInfo) == 0:
             noInfoFlag = True
 
+        # Only the ads that changed since the last poll need a new state
+        for jobID in changedIDs:
+            self.statNames[jobID] = self.stateName(jobInfo[jobID])
+        for jobID in self.statNames.keys():
+            if not jobID in jobInfo:
+                del self.statNames[jobID]
+
         for job in jobs:
             # Now go over the jobs from WMBS and see what we have
-            if not job['jobid'] in jobInfo.keys():
+            if not job['jobid'] in jobInfo:
                 # Two options here, either put in removed, or not
                 # Only cycle through Removed if condor_q is sending
                 # us no information
@@ -578,28 +591,7 @@ class CondorPlugin(BasePlugin):
                     completeList.append(job)
             else:
                 jobAd     = jobInfo.get(job['jobid'])
-                jobStatus = int(jobAd.get('JobStatus', 0))
-                statName  = 'Unknown'
-                if jobStatus == 1:
-                    # Job is Idle, waiting for something to happen
-                    statName = 'Idle'
-                elif jobStatus == 5:
-                    # Job is Held; experienced an error
-                    statName = 'Held'
-                elif jobStatus == 2 or jobStatus == 6:
-                    # Job is Running, doing what it was supposed to
-                    # NOTE: Status 6 is transferring output
-                    # I'm going to list this as running for now because it fits.
-                    statName = 'Running'
-                elif jobStatus == 3:
-                    # Job is in X-state: List as error
-                    statName = 'Error'
-                elif jobStatus == 4:
-                    # Job is completed
-                    statName = 'Complete'
-                else:
-                    # What state are we in?
-                    logging.info("Job in unknown state %i" % jobStatus)
+                statName  = self.statNames[job['jobid']]
 
                 # Get the global state
                 job['globalState'] = CondorPlugin.stateMap()[statName]
@@ -627,6 +619,38 @@ class CondorPlugin(BasePlugin):
 
         return runningList, changeList, completeList
 
+    @staticmethod
+    def stateName(jobAd):
+        """
+        _stateName_
+
+        The plugin state of a job from the JobStatus of its classAd
+        """
+        jobStatus = int(jobAd.get('JobStatus', 0))
+        statName  = 'Unknown'
+        if jobStatus == 1:
+            # Job is Idle, waiting for something to happen
+            statName = 'Idle'
+        elif jobStatus == 5:
+            # Job is Held; experienced an error
+            statName = 'Held'
+        elif jobStatus == 2 or jobStatus == 6:
+            # Job is Running, doing what it was supposed to
+            # NOTE: Status 6 is transferring output
+            # I'm going to list this as running for now because it fits.
+            statName = 'Running'
+        elif jobStatus == 3:
+            # Job is in X-state: List as error
+            statName = 'Error'
+        elif jobStatus == 4:
+            # Job is completed
+            statName = 'Complete'
+        else:
+            # What state are we in?
+            logging.info("Job in unknown state %i" % jobStatus)
+
+        return statName
+
 
     def complete(self, jobs):
         """
@@ -1030,60 +1054,6 @@ class CondorPlugin(BasePlugin):
         """
         _getClassAds_
 
-        Grab classAds from condor_q using xml parsing
+        Grab the classAds of the jobs of this agent, keyed by WMAgent_JobID
         """
-
-        jobInfo = {}
-
-        command = ['condor_q', '-constraint', 'WMAgent_JobID =!= UNDEFINED',
-                   '-constraint', 'WMAgent_AgentName == \"%s\"' % (self.agent),
-                   '-format', '(JobStatus:\%s)  ', 'JobStatus',
-                   '-format', '(stateTime:\%s)  ', 'EnteredCurrentStatus',
-                   '-format', '(runningTime:\%s)  ', 'JobStartDate',
-                   '-format', '(submitTime:\%s)  ', 'QDate',
-                   '-format', '(DESIRED_Sites:\%s)  ', 'DESIRED_Sites',                   
-                   '-format', '(ExtDESIRED_Sites:\%s)  ', 'ExtDESIRED_Sites',                   
-                   '-format', '(runningCMSSite:\%s)  ', 'MATCH_EXP_JOBGLIDEIN_CMSSite',
-                   '-format', '(WMAgentID:\%d):::',  'WMAgent_JobID']
-
-        pipe = subprocess.Popen(command, stdout = subprocess.PIPE, stderr = subprocess.PIPE, shell = False)
-        stdout, _ = pipe.communicate()
-        classAdsRaw = stdout.split(':::')
-
-        if not pipe.returncode == 0:
-            # Then things have gotten bad - condor_q is not responding
-            logging.error("condor_q returned non-zero value %s" % str(pipe.returncode))
-            logging.error("Skipping classAd processing this round")
-            return None
-
-        if classAdsRaw == '':
-            # We have no jobs
-            return jobInfo
-
-        for ad in classAdsRaw:
-            # There should be one for every job
-            if not re.search("\(", ad):
-                # There is no ad.
-                # Don't know what happened here
-                continue
-            statements = ad.split('(')
-            tmpDict = {}
-            for statement in statements:
-                # One for each value
-                if not re.search(':', statement):
-                    # Then we have an empty statement
-                    continue
-                key = str(statement.split(':')[0])
-                value = statement.split(':')[1].split(')')[0]
-                tmpDict[key] = value
-            if not 'WMAgentID' in tmpDict.keys():
-                # Then we have an invalid job somehow
-                logging.error("Invalid job discovered in condor_q")
-                logging.error(tmpDict)
-                continue
-            else:
-                jobInfo[int(tmpDict['WMAgentID'])] = tmpDict
-
-        logging.info("Retrieved %i classAds" % len(jobInfo))
-
-        return jobInfo
+        return self.tracker.getClassAds()
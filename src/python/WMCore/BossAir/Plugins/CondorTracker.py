@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+"""
+_CondorTracker_
+
+Retrieve the classAds of the WMAgent jobs in the schedd for the tracking of
+the CondorPlugin.
+
+Only the attributes needed for tracking are asked for.  The htcondor python
+bindings are used where they exist, otherwise the output of condor_q is
+parsed while it is read.  The ads are indexed by WMAgent_JobID and the
+previous poll is kept so the ads that changed since can be told apart.
+"""
+
+import re
+import logging
+import tempfile
+import subprocess
+
+try:
+    import htcondor
+except ImportError:
+    htcondor = None
+
+# The projected condor attributes and the keys they get in the ads
+trackedAttributes = [('JobStatus', 'JobStatus'),
+                     ('EnteredCurrentStatus', 'stateTime'),
+                     ('JobStartDate', 'runningTime'),
+                     ('QDate', 'submitTime'),
+                     ('DESIRED_Sites', 'DESIRED_Sites'),
+                     ('ExtDESIRED_Sites', 'ExtDESIRED_Sites'),
+                     ('MATCH_EXP_JOBGLIDEIN_CMSSite', 'runningCMSSite'),
+                     ('WMAgent_JobID', 'WMAgentID')]
+
+adSeparator = ':::'
+statementRegex = re.compile(r"\((\w+):([^)]*)\)")
+
+
+def parseClassAds(stream, chunkSize = 65536):
+    """
+    _parseClassAds_
+
+    Parse the condor_q -format output of CondorTracker.condorQCommand from a
+    file like object, chunk by chunk.  Return a dictionary of the ads keyed
+    by WMAgent_JobID.
+    """
+    jobInfo = {}
+    remainder = ''
+    while True:
+        chunk = stream.read(chunkSize)
+        if not chunk:
+            break
+        classAdsRaw = (remainder + chunk).split(adSeparator)
+        remainder = classAdsRaw.pop()
+        for ad in classAdsRaw:
+            addClassAd(jobInfo, dict(statementRegex.findall(ad)))
+
+    if remainder.strip():
+        addClassAd(jobInfo, dict(statementRegex.findall(remainder)))
+
+    return jobInfo
+
+
+def addClassAd(jobInfo, tmpDict):
+    """
+    _addClassAd_
+
+    Index an ad by WMAgent_JobID, ads without it are skipped.
+    """
+    if not tmpDict:
+        # There is no ad.
+        return
+    if not 'WMAgentID' in tmpDict:
+        # Then we have an invalid job somehow
+        logging.error("Invalid job discovered in condor_q")
+        logging.error(tmpDict)
+        return
+    jobInfo[int(tmpDict['WMAgentID'])] = tmpDict
+    return
+
+
+class CondorTracker(object):
+    """
+    _CondorTracker_
+
+    Query the schedd for the ads of the jobs of one agent.
+    """
+    def __init__(self, agentName, useBindings = True, schedd = None):
+        self.agentName = agentName
+        self.schedd = schedd
+        self.useBindings = schedd != None or (useBindings and htcondor != None)
+        self.previousAds = {}
+        return
+
+    def constraint(self):
+        """
+        _constraint_
+
+        The WMAgent jobs of this agent.
+        """
+        return 'WMAgent_JobID =!= UNDEFINED && WMAgent_AgentName == "%s"' % self.agentName
+
+    def condorQCommand(self):
+        """
+        _condorQCommand_
+
+        condor_q printing the tracked attributes of every job as
+        (key:value) statements, with the ads separated by :::
+        """
+        command = ['condor_q', '-constraint', 'WMAgent_JobID =!= UNDEFINED',
+                   '-constraint', 'WMAgent_AgentName == \"%s\"' % (self.agentName)]
+        for attribute, key in trackedAttributes:
+            if attribute == 'WMAgent_JobID':
+                command.extend(['-format', '(%s:\%%d)%s' % (key, adSeparator), attribute])
+            else:
+                command.extend(['-format', '(%s:\%%s)  ' % key, attribute])
+        return command
+
+    def getClassAds(self):
+        """
+        _getClassAds_
+
+        Return the ads keyed by WMAgent_JobID, None if the schedd couldn't
+        be queried.
+        """
+        if self.useBindings:
+            return self.queryBindings()
+        return self.queryCondorQ()
+
+    def queryBindings(self):
+        """
+        _queryBindings_
+
+        Stream the projected ads from the schedd through the htcondor
+        bindings.
+        """
+        projection = [x[0] for x in trackedAttributes]
+        try:
+            if self.schedd == None:
+                self.schedd = htcondor.Schedd()
+            if hasattr(self.schedd, 'xquery'):
+                results = self.schedd.xquery(self.constraint(), projection)
+            else:
+                results = self.schedd.query(self.constraint(), projection)
+
+            jobInfo = {}
+            for result in results:
+                tmpDict = {}
+                for attribute, key in trackedAttributes:
+                    value = result.get(attribute)
+                    if value != None:
+                        tmpDict[key] = str(value)
+                addClassAd(jobInfo, tmpDict)
+        except Exception, ex:
+            # Drop the schedd, it is looked up again in the next round
+            self.schedd = None
+            logging.error("Querying the schedd failed: %s" % str(ex))
+            logging.error("Skipping classAd processing this round")
+            return None
+
+        logging.info("Retrieved %i classAds" % len(jobInfo))
+        return jobInfo
+
+    def queryCondorQ(self):
+        """
+        _queryCondorQ_
+
+        Parse the output of condor_q while it is read.
+        """
+        errorFile = tempfile.TemporaryFile()
+        pipe = subprocess.Popen(self.condorQCommand(), stdout = subprocess.PIPE,
+                                stderr = errorFile, shell = False)
+        jobInfo = parseClassAds(pipe.stdout)
+        pipe.wait()
+
+        if not pipe.returncode == 0:
+            # Then things have gotten bad - condor_q is not responding
+            errorFile.seek(0)
+            logging.error("condor_q returned non-zero value %s" % str(pipe.returncode))
+            logging.error(errorFile.read())
+            logging.error("Skipping classAd processing this round")
+            errorFile.close()
+            return None
+        errorFile.close()
+
+        logging.info("Retrieved %i classAds" % len(jobInfo))
+        return jobInfo
+
+    def getChanges(self):
+        """
+        _getChanges_
+
+        Return the ads and the IDs of the jobs whose ad is new or differs from
+        the previous poll.  The ads are None if the schedd couldn't be queried,
+        the previous poll is kept then.
+        """
+        jobInfo = self.getClassAds()
+        if jobInfo == None:
+            return None, set()
+
+        changed = set()
+        for jobID, ad in jobInfo.iteritems():
+            if self.previousAds.get(jobID) != ad:
+                changed.add(jobID)
+
+        self.previousAds = jobInfo
+        return jobInfo, changed
@@ -3,15 +3,28 @@
 _JobPackage_
 
 Data structure for storing and retreiving multiple job objects.
-"""
 
+Packages are saved in an indexed format so that a single job can be loaded
+without unpickling the whole package:
 
+  MAGIC
+  header: offset of the extra keys, offset and number of index entries
+  one pickle per job
+  pickled dict of the keys that aren't job IDs (the directory)
+  index: (job ID, offset, length) entries sorted by job ID
 
+Packages saved as a single pickle by older versions can still be loaded.
+"""
 
 import cPickle
+import struct
 
 from WMCore.DataStructs.WMObject import WMObject
 
+MAGIC = "WMCoreJobPackage2\n"
+HEADER = struct.Struct("!QQQ")
+INDEX_ENTRY = struct.Struct("!qQQ")
+
 class JobPackage(WMObject, dict):
     """
     _JobPackage_
@@ -32,10 +45,29 @@ class JobPackage(WMObject, dict):
         """
         _save_
 
-        Pickle this object and save it to disk.
+        Pickle every job and save them to disk with an index of their
+        position in the file.
         """
-        fileHandle = open(fileName, "w")
-        cPickle.dump(self, fileHandle, -1)
+        jobIDs = sorted([x for x in self.keys() if type(x) in (int, long)])
+        extraKeys = dict([(x, self[x]) for x in self.keys() if not type(x) in (int, long)])
+
+        fileHandle = open(fileName, "wb")
+        fileHandle.write(MAGIC)
+        fileHandle.write(HEADER.pack(0, 0, 0))
+
+        index = []
+        for jobID in jobIDs:
+            record = cPickle.dumps(self[jobID], -1)
+            index.append(INDEX_ENTRY.pack(jobID, fileHandle.tell(), len(record)))
+            fileHandle.write(record)
+
+        extraOffset = fileHandle.tell()
+        cPickle.dump(extraKeys, fileHandle, -1)
+        indexOffset = fileHandle.tell()
+        fileHandle.write("".join(index))
+
+        fileHandle.seek(len(MAGIC))
+        fileHandle.write(HEADER.pack(extraOffset, indexOffset, len(index)))
         fileHandle.close()
         return
 
@@ -43,10 +75,90 @@ class JobPackage(WMObject, dict):
         """
         _load_
 
-        Load a pickled JobPackage object.
+        Load all the jobs of a JobPackage file.
         """
-        fileHandle = open(fileName, "r")
-        loadedJobPackage = cPickle.load(fileHandle)
+        fileHandle = open(fileName, "rb")
+        try:
+            if fileHandle.read(len(MAGIC)) != MAGIC:
+                fileHandle.seek(0)
+                loadedJobPackage = cPickle.load(fileHandle)
+            else:
+                loadedJobPackage = self._readExtraKeys(fileHandle)
+                for (jobID, offset, length) in self._readIndex(fileHandle):
+                    fileHandle.seek(offset)
+                    loadedJobPackage[jobID] = cPickle.loads(fileHandle.read(length))
+        finally:
+            fileHandle.close()
+
         self.clear()
         self.update(loadedJobPackage)
         return
+
+    def loadJob(self, fileName, jobID):
+        """
+        _loadJob_
+
+        Load a single job from a JobPackage file without loading the other
+        jobs.  Only the package directory is loaded in this object, the job
+        is returned.  Raises a KeyError if the job isn't in the package.
+        """
+        fileHandle = open(fileName, "rb")
+        try:
+            if fileHandle.read(len(MAGIC)) != MAGIC:
+                fileHandle.close()
+                self.load(fileName)
+                return self[jobID]
+
+            self.clear()
+            self.update(self._readExtraKeys(fileHandle))
+
+            # Binary search of the index
+            (extraOffset, indexOffset, nEntries) = self._readHeader(fileHandle)
+            fileHandle.seek(indexOffset)
+            index = fileHandle.read(nEntries * INDEX_ENTRY.size)
+            low = 0
+            high = nEntries
+            while low < high:
+                middle = (low + high) // 2
+                (entryID, offset, length) = INDEX_ENTRY.unpack_from(index, middle * INDEX_ENTRY.size)
+                if entryID < jobID:
+                    low = middle + 1
+                elif entryID > jobID:
+                    high = middle
+                else:
+                    fileHandle.seek(offset)
+                    return cPickle.loads(fileHandle.read(length))
+        finally:
+            fileHandle.close()
+
+        raise KeyError(jobID)
+
+    def _readHeader(self, fileHandle):
+        """
+        _readHeader_
+
+        Read the offsets of the extra keys and index.
+        """
+        fileHandle.seek(len(MAGIC))
+        return HEADER.unpack(fileHandle.read(HEADER.size))
+
+    def _readExtraKeys(self, fileHandle):
+        """
+        _readExtraKeys_
+
+        Read the dict of keys that aren't jobs.
+        """
+        (extraOffset, indexOffset, nEntries) = self._readHeader(fileHandle)
+        fileHandle.seek(extraOffset)
+        return cPickle.loads(fileHandle.read(indexOffset - extraOffset))
+
+    def _readIndex(self, fileHandle):
+        """
+        _readIndex_
+
+        Return the list of (job ID, offset, length) index entries.
+        """
+        (extraOffset, indexOffset, nEntries) = self._readHeader(fileHandle)
+        fileHandle.seek(indexOffset)
+        index = fileHandle.read(nEntries * INDEX_ENTRY.size)
+        return [INDEX_ENTRY.unpack_from(index, i * INDEX_ENTRY.size) for i in range(nEntries)]
@@ -18,6 +18,8 @@ import json
 import re
 import urllib2
 
+from WMCore.DataStructs.LumiRanges import LumiRanges
+
 class LumiList(object):
     """
     Deal with lists of lumis in several different forms:
@@ -105,63 +107,21 @@ class LumiList(object):
                     self.compactList[runString] = compactList[run]
 
 
-    def __sub__(self, other): # Things from self not in other
-        result = {}
-        for run in sorted(self.compactList.keys()):
-            alumis = sorted(self.compactList[run])
-            blumis = sorted(other.compactList.get(run, []))
-            alist = []                    # verified part
-            for alumi in alumis:
-                tmplist = [alumi[0], alumi[1]] # may be part
-                for blumi in blumis:
-                    if blumi[0] <= tmplist[0] and blumi[1] >= tmplist[1]: # blumi has all of alumi
-                        tmplist = []
-                        break # blumi is has all of alumi
-                    if blumi[0] > tmplist[0] and blumi[1] < tmplist[1]: # blumi is part of alumi
-                        alist.append([tmplist[0], blumi[0]-1])
-                        tmplist = [blumi[1]+1, tmplist[1]]
-                    elif blumi[0] <= tmplist[0] and blumi[1] < tmplist[1] and blumi[1]>=tmplist[0]: # overlaps start
-                        tmplist = [blumi[1]+1, tmplist[1]]
-                    elif blumi[0] > tmplist[0] and blumi[1] >= tmplist[1] and blumi[0]<=tmplist[1]: # overlaps end
-                        alist.append([tmplist[0], blumi[0]-1])
-                        tmplist = []
-                        break
-                if tmplist:
-                    alist.append(tmplist)
-            result[run] = alist
+    def getLumiRanges(self):
+        """
+        Return the lumis as a LumiRanges object
+        """
+        return LumiRanges(compactList = self.compactList)
 
-        return LumiList(compactList = result)
 
+    def __sub__(self, other): # Things from self not in other
+        result = self.getLumiRanges() - other.getLumiRanges()
+        return LumiList(compactList = result.getCompactList())
 
-    def __and__(self, other): # Things in both
-        result = {}
-        aruns = set(self.compactList.keys())
-        bruns = set(other.compactList.keys())
-        for run in aruns & bruns:
-            lumiList = []                    # List for this run
-            unique = []                    # List for this run
-            for alumi in self.compactList[run]:
-                for blumi in other.compactList[run]:
-                    if blumi[0] <= alumi[0] and blumi[1] >= alumi[1]: # blumi has all of alumi
-                        lumiList.append(alumi)
-                    if blumi[0] > alumi[0] and blumi[1] < alumi[1]: # blumi is part of alumi
-                        lumiList.append(blumi)
-                    elif blumi[0] <= alumi[0] and blumi[1] < alumi[1] and blumi[1] >= alumi[0]: # overlaps start
-                        lumiList.append([alumi[0], blumi[1]])
-                    elif blumi[0] > alumi[0] and blumi[1] >= alumi[1] and blumi[0] <= alumi[1]: # overlaps end
-                        lumiList.append([blumi[0], alumi[1]])
-
-
-            if lumiList:
-                unique = [lumiList[0]]
-            for pair in lumiList[1:]:
-                if pair[0] == unique[-1][1]+1:
-                    unique[-1][1] = copy.deepcopy(pair[1])
-                else:
-                    unique.append(copy.deepcopy(pair))
 
-            result[run] = unique
-        return LumiList(compactList = result)
+    def __and__(self, other): # Things in both
+        result = self.getLumiRanges() & other.getLumiRanges()
+        return LumiList(compactList = result.getCompactList())
 
 
     def __or__(self, other):
@@ -195,13 +155,11 @@ class LumiList(object):
         lumilist is of the simple form
         [(run1,lumi1),(run1,lumi2),(run2,lumi1)]
         """
+        lumiRanges = self.getLumiRanges()
         filteredList = []
         for (run, lumi) in lumiList:
-            runsInLumi = self.compactList.get(str(run), [[0, -1]])
-            for (first, last) in runsInLumi:
-                if lumi >= first and lumi <= last:
-                    filteredList.append((run, lumi))
-                    break
+            if lumiRanges.contains(run, lumi):
+                filteredList.append((run, lumi))
         return filteredList
 
 
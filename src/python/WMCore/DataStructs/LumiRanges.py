@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+"""
+_LumiRanges_
+
+Compact representation of a set of lumi sections per run.
+
+For every run the lumi sections are kept as sorted, disjoint and
+non-adjacent closed intervals, stored as two parallel lists of first and
+last lumis.  Membership is answered with a binary search and the set
+operations walk both interval lists once, so none of the operations expand
+the ranges into individual lumi sections.
+"""
+
+import logging
+from bisect import bisect_right
+
+
+def mergeRanges(ranges):
+    """
+    _mergeRanges_
+
+    Given an iterable of [first, last] pairs return the (firsts, lasts) lists
+    of the sorted, merged intervals.  Adjacent intervals are merged as well,
+    invalid ranges are logged and ignored.
+    """
+    validRanges = []
+    for lumiRange in ranges:
+        if len(lumiRange) != 2 or int(lumiRange[0]) > int(lumiRange[1]):
+            logging.error("Invalid lumi range %s, ignoring it" % str(lumiRange))
+            continue
+        validRanges.append((int(lumiRange[0]), int(lumiRange[1])))
+
+    firsts = []
+    lasts = []
+    for first, last in sorted(validRanges):
+        if lasts and first <= lasts[-1] + 1:
+            if last > lasts[-1]:
+                lasts[-1] = last
+        else:
+            firsts.append(first)
+            lasts.append(last)
+
+    return firsts, lasts
+
+
+class LumiRanges(object):
+    """
+    _LumiRanges_
+
+    Set of lumi sections per run stored as sorted intervals.  It can be
+    built from the compact list format used by LumiList and the job masks:
+      {run: [[first, last], [first, last], ...]}
+    where run can be an integer or a string.
+    """
+    def __init__(self, compactList = None):
+        self.runs = {}
+        if compactList:
+            for run, ranges in compactList.items():
+                self.addRanges(run, ranges)
+
+    def addRanges(self, run, ranges):
+        """
+        _addRanges_
+
+        Add a list of [first, last] pairs to a run.  A run added with an
+        empty list of ranges is known to the set but contains no lumis.
+        """
+        run = int(run)
+        if run in self.runs:
+            ranges = list(ranges) + self.getRanges(run)
+        self.runs[run] = mergeRanges(ranges)
+        return
+
+    def hasRun(self, run):
+        """
+        _hasRun_
+
+        Check if there are lumis for the run.
+        """
+        return int(run) in self.runs
+
+    def contains(self, run, lumi):
+        """
+        _contains_
+
+        Check if the lumi section of the run is in the set.
+        """
+        intervals = self.runs.get(int(run), None)
+        if intervals is None:
+            return False
+
+        firsts, lasts = intervals
+        index = bisect_right(firsts, lumi) - 1
+        return index >= 0 and lumi <= lasts[index]
+
+    def __contains__(self, runLumi):
+        return self.contains(runLumi[0], runLumi[1])
+
+    def filterLumis(self, run, lumis):
+        """
+        _filterLumis_
+
+        Return the lumis of the given run that are in the set, in the order
+        they were passed in.
+        """
+        intervals = self.runs.get(int(run), None)
+        if intervals is None:
+            return []
+
+        firsts, lasts = intervals
+        filteredLumis = []
+        for lumi in lumis:
+            index = bisect_right(firsts, lumi) - 1
+            if index >= 0 and lumi <= lasts[index]:
+                filteredLumis.append(lumi)
+
+        return filteredLumis
+
+    def getRanges(self, run):
+        """
+        _getRanges_
+
+        Return the list of [first, last] pairs for a run.
+        """
+        firsts, lasts = self.runs.get(int(run), ([], []))
+        return [[first, last] for first, last in zip(firsts, lasts)]
+
+    def getCompactList(self):
+        """
+        _getCompactList_
+
+        Return the compact list representation, runs are strings as in
+        LumiList.
+        """
+        compactList = {}
+        for run in self.runs.keys():
+            compactList[str(run)] = self.getRanges(run)
+        return compactList
+
+    def getRuns(self):
+        """
+        _getRuns_
+
+        Return the sorted list of runs in the set.
+        """
+        return sorted(self.runs.keys())
+
+    def __len__(self):
+        """
+        Number of runs in the set
+        """
+        return len(self.runs)
+
+    def __eq__(self, other):
+        return isinstance(other, LumiRanges) and self.runs == other.runs
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __and__(self, other):
+        """
+        Lumis in both sets.
+        """
+        result = LumiRanges()
+        for run in set(self.runs.keys()) & set(other.runs.keys()):
+            aFirsts, aLasts = self.runs[run]
+            bFirsts, bLasts = other.runs[run]
+            firsts = []
+            lasts = []
+            i = j = 0
+            while i < len(aFirsts) and j < len(bFirsts):
+                first = max(aFirsts[i], bFirsts[j])
+                last = min(aLasts[i], bLasts[j])
+                if first <= last:
+                    firsts.append(first)
+                    lasts.append(last)
+                if aLasts[i] < bLasts[j]:
+                    i += 1
+                else:
+                    j += 1
+            if firsts:
+                result.runs[run] = (firsts, lasts)
+
+        return result
+
+    def __sub__(self, other):
+        """
+        Lumis in this set that are not in the other one.
+        """
+        result = LumiRanges()
+        for run, (aFirsts, aLasts) in self.runs.items():
+            if run not in other.runs:
+                result.runs[run] = (list(aFirsts), list(aLasts))
+                continue
+
+            bFirsts, bLasts = other.runs[run]
+            firsts = []
+            lasts = []
+            j = 0
+            for first, last in zip(aFirsts, aLasts):
+                # Skip the subtracted intervals that end before this one
+                while j < len(bFirsts) and bLasts[j] < first:
+                    j += 1
+                k = j
+                while k < len(bFirsts) and bFirsts[k] <= last:
+                    if bFirsts[k] > first:
+                        firsts.append(first)
+                        lasts.append(bFirsts[k] - 1)
+                    first = bLasts[k] + 1
+                    if first > last:
+                        break
+                    k += 1
+                if first <= last:
+                    firsts.append(first)
+                    lasts.append(last)
+            if firsts:
+                result.runs[run] = (firsts, lasts)
+
+        return result
+
+    def __or__(self, other):
+        """
+        Lumis in either set.
+        """
+        result = LumiRanges()
+        for run in set(self.runs.keys()) | set(other.runs.keys()):
+            ranges = self.getRanges(run) + other.getRanges(run)
+            result.runs[run] = mergeRanges(ranges)
+
+        return result
@@ -14,6 +14,7 @@ import logging
 
 from WMCore.DataStructs.Run import Run
 from WMCore.DataStructs.LumiList import LumiList
+from WMCore.DataStructs.LumiRanges import LumiRanges
 
 class Mask(dict):
     """
@@ -33,6 +34,19 @@ class Mask(dict):
         self.setdefault("FirstRun", None)
         self.setdefault("LastRun", None)
         self.setdefault("runAndLumis", {})
+        self._lumiRanges = None
+
+    def __getstate__(self):
+        """
+        Don't pickle the cached lumi ranges.
+        """
+        state = self.__dict__.copy()
+        state.pop("_lumiRanges", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lumiRanges = None
 
 
     def setMaxAndSkipEvents(self, maxEvents, skipEvents):
@@ -129,6 +143,7 @@ class Mask(dict):
         addRunWithLumiRanges(run=run, lumiList = [[start1,end1], [start2, end2], ...]
         """
         self['runAndLumis'][run] = lumiList
+        self._lumiRanges = None
         return
 
     def addRunAndLumis(self, run, lumis = []):
@@ -152,6 +167,7 @@ class Mask(dict):
             self['runAndLumis'][run] = []
 
         self['runAndLumis'][run].append([min(lumis), max(lumis)])
+        self._lumiRanges = None
 
         return
 
@@ -165,6 +181,7 @@ class Mask(dict):
         myLumis = LumiList(compactList=self['runAndLumis'])
         myLumis = myLumis - lumiList
         self['runAndLumis'] = myLumis.getCompactList()
+        self._lumiRanges = None
 
     def getRunAndLumis(self):
         """
@@ -175,6 +192,22 @@ class Mask(dict):
 
         return self['runAndLumis']
 
+    def getLumiRanges(self):
+        """
+        _getLumiRanges_
+
+        Return the runs and lumis of the mask as a LumiRanges object.  It is
+        built once and kept until runs or lumis are added to the mask, so it
+        must not be modified.
+        """
+        lumiRanges = getattr(self, '_lumiRanges', None)
+        if lumiRanges is None or lumiRanges[0] is not self['runAndLumis']:
+            # The runAndLumis dictionary can be replaced as a whole
+            lumiRanges = (self['runAndLumis'],
+                          LumiRanges(compactList = self['runAndLumis']))
+            self._lumiRanges = lumiRanges
+        return lumiRanges[1]
+
     def runLumiInMask(self, run, lumi):
         """
         _runLumiInMask_
@@ -187,16 +220,10 @@ class Mask(dict):
             # ALWAYS TRUE
             return True
 
-        if not run in self['runAndLumis'].keys():
+        if not run in self['runAndLumis']:
             return False
 
-        for pair in self['runAndLumis'][run]:
-            # Go through each max and min pair
-            if pair[0] <= lumi and pair[1] >= lumi:
-                # Then the lumi is bracketed
-                return True
-
-        return False
+        return self.getLumiRanges().contains(run, lumi)
 
 
     def filterRunLumisByMask(self, runs):
@@ -218,20 +245,14 @@ class Mask(dict):
             else:
                 runDict[r.run] = r
 
-        maskRuns = set(self["runAndLumis"].keys())
-        passedRuns = set([r.run for r in runs])
-        filteredRuns = maskRuns.intersection(passedRuns)
+        maskRanges = self.getLumiRanges()
 
         newRuns = set()
-        for runNumber in filteredRuns:
-            maskLumis = set()
-            for pair in self["runAndLumis"][runNumber]:
-                if pair[0] == pair[1]:
-                    maskLumis.add(pair[0])
-                else:
-                    maskLumis = maskLumis.union(range(pair[0], pair[1] + 1, 1))
-
-            filteredLumis = set(runDict[runNumber].lumis).intersection(maskLumis)
+        for runNumber in runDict.keys():
+            if not maskRanges.hasRun(runNumber):
+                continue
+
+            filteredLumis = set(maskRanges.filterLumis(runNumber, runDict[runNumber].lumis))
             if len(filteredLumis) > 0:
                 newRuns.add(Run(runNumber, *list(filteredLumis)))
 
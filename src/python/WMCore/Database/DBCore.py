@@ -9,6 +9,8 @@ Core Database APIs
 
 
 
+import re
+
 from WMCore.DataStructs.WMObject import WMObject
 from WMCore.Database.ResultSet import ResultSet
 from copy import copy
@@ -72,8 +74,80 @@ class DBInterface(WMObject):
         resultProxy.close()
         return result
 
+    def buildBulkSelect(self, s, b):
+        """
+        _buildBulkSelect_
+
+        Rewrite a select that is run once for every bind in b into a few
+        selects that use an IN list.  This is only possible if every bind has
+        the same single bind variable and if the SQL uses it exactly once, in
+        an equality like "WHERE id = :id".  Duplicate
+        values are only selected once and the IN lists are padded to a power
+        of two so the number of different statements stays small.
+
+        Returns a list of (sql, bind) tuples or None if the select can't be
+        rewritten.
+        """
+        if len(b) == 0 or b[0] == None or len(b[0]) != 1:
+            return None
+
+        bindName = b[0].keys()[0]
+        if len(re.findall(r":%s\b" % re.escape(bindName), s)) != 1:
+            return None
+        # Not the = of <=, >= or !=
+        bindRE = re.compile(r"\s*(?<![<>!])=\s*:%s\b" % re.escape(bindName))
+        if len(bindRE.findall(s)) != 1:
+            return None
+
+        values = []
+        seenValues = set()
+        for bind in b:
+            if len(bind) != 1 or not bindName in bind:
+                return None
+            if not bind[bindName] in seenValues:
+                seenValues.add(bind[bindName])
+                values.append(bind[bindName])
+
+        statements = []
+        for i in range(0, len(values), self.maxBindsPerQuery):
+            chunk = values[i:i + self.maxBindsPerQuery]
+            listSize = 1
+            while listSize < len(chunk):
+                listSize *= 2
+            listSize = min(listSize, self.maxBindsPerQuery)
+            chunk.extend([chunk[-1]] * (listSize - len(chunk)))
+
+            bindNames = ["%s_%i" % (bindName, j) for j in range(listSize)]
+            inList = " IN (%s)" % ", ".join([":%s" % x for x in bindNames])
+            statements.append((bindRE.sub(inList, s), dict(zip(bindNames, chunk))))
+
+        return statements
+
+    def executebulkselect(self, bulkStatements, connection=None,
+                          returnCursor=False):
+        """
+        _executebulkselect_
+
+        Run the statements built by buildBulkSelect, the rows of all of them
+        come back in the same ResultSet.
+        """
+        if returnCursor:
+            result = []
+            for (bulkSQL, bulkBind) in bulkStatements:
+                result.append(self.executebinds(bulkSQL, bulkBind, connection,
+                                                returnCursor = True))
+        else:
+            result = ResultSet()
+            for (bulkSQL, bulkBind) in bulkStatements:
+                resultproxy = self.executebinds(bulkSQL, bulkBind, connection,
+                                                returnCursor = True)
+                result.add(resultproxy)
+                resultproxy.close()
+
+        return self.makelist(result)
+
     def executemanybinds(self, s=None, b=None, connection=None,
-                         returnCursor=False):
+                         returnCursor=False, bulkSelect=False):
         """
         _executemanybinds_
         b is a list of dictionaries for the binds, e.g.:
@@ -87,6 +161,12 @@ class DBInterface(WMObject):
         This will return a list of sqlalchemy.engine.base.ResultProxy object's
         one for each set of binds.
 
+        If bulkSelect is True and the select has a single bind variable the
+        binds are folded into IN lists (see buildBulkSelect) so that the
+        whole list is selected with a few queries.  The rows come back in
+        the same ResultSet but rows selected by duplicate binds only appear
+        once.
+
         returns a list of sqlalchemy.engine.base.ResultProxy objects
         """
 
@@ -95,6 +175,12 @@ class DBInterface(WMObject):
             """
             Trying to select many
             """
+            if bulkSelect:
+                bulkStatements = self.buildBulkSelect(s, b)
+                if bulkStatements != None:
+                    return self.executebulkselect(bulkStatements, connection,
+                                                  returnCursor)
+
             if returnCursor:
                 result = []
                 for bind in b:
@@ -122,10 +208,12 @@ class DBInterface(WMObject):
 
 
     def processData(self, sqlstmt, binds={}, conn=None,
-                    transaction=False, returnCursor=False):
+                    transaction=False, returnCursor=False, bulkSelect=False):
         """
         set conn if you already have an active connection to reuse
         set transaction = True if you already have an active transaction
+        set bulkSelect = True to run a select with a list of binds on a
+        single bind variable as IN list queries (see executemanybinds)
 
         """
         connection = None
@@ -156,7 +244,11 @@ class DBInterface(WMObject):
                 #Run single SQL statement for a list of binds - use execute_many()
                 if not transaction:
                     trans = connection.begin()
-                while(len(binds) > self.maxBindsPerQuery):
+                # Bulk selects split the binds themselves once duplicates
+                # have been removed
+                bulkSelect = bulkSelect and \
+                             sqlstmt[0].strip().lower().startswith("select")
+                while(not bulkSelect and len(binds) > self.maxBindsPerQuery):
                     result.extend(self.processData(sqlstmt, binds[:self.maxBindsPerQuery],
                                                    conn=connection, transaction=True,
                                                    returnCursor=returnCursor))
@@ -164,7 +256,8 @@ class DBInterface(WMObject):
 
                 for i in sqlstmt:
                     result.extend(self.executemanybinds(i, binds, connection=connection,
-                                                        returnCursor=returnCursor))
+                                                        returnCursor=returnCursor,
+                                                        bulkSelect=bulkSelect))
                 if not transaction:
                     trans.commit()
             elif len(binds) == len(sqlstmt):
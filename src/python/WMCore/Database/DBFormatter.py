@@ -11,7 +11,10 @@ interactions.
 import datetime
 import time
 
+from itertools import izip
+
 from WMCore.DataStructs.WMObject import WMObject
+from WMCore.Database.ResultSet import ResultSet
 
 class DBFormatter(WMObject):
     def __init__(self, logger, dbinterface):
@@ -65,25 +68,47 @@ class DBFormatter(WMObject):
                 out.append(i)
         return out
 
-    def formatDict(self, result):
+    def formatKeys(self, result):
+        """
+        _formatKeys_
+
+        Return the lowercased column names of a ResultSet or a cursor.
+        """
+        # WARNING: Oracle returns table names in CAP!
+        keys = result.keys
+        if callable(keys):
+            keys = keys()
+        return tuple([str(x).lower() for x in keys])
+
+    def formatDict(self, result, size = 1000):
         """
         Returns an array of dictionaries representing the results
+
+        The results can either be ResultSets or, if the query was run with
+        returnCursor = True, cursors.  Rows are formatted size rows at a
+        time, cursors are read and closed without copying their rows into
+        a ResultSet.
         """
         dictOut = []
         for r in result:
-            descriptions = r.keys
-            for i in r.fetchall():
-                #WARNING: this can generate errors for some stupid reason
-                # in both oracle and mysql.
-                entry = {}
-                for index in xrange(0,len(descriptions)):
-                    # WARNING: Oracle returns table names in CAP!
-                    if type(i[index]) == unicode:
-                        entry[str(descriptions[index].lower())] = str(i[index])
-                    else:
-                        entry[str(descriptions[index].lower())] = i[index]
-
-                dictOut.append(entry)
+            if isinstance(r, ResultSet):
+                rows = r.fetchall()
+                rowBatches = [rows[i:i + size] for i in xrange(0, len(rows), size)]
+            elif r.closed:
+                continue
+            else:
+                rowBatches = iter(lambda: r.fetchmany(size), [])
+
+            keys = self.formatKeys(r)
+            for rows in rowBatches:
+                # Work on columns so that unicode values are only looked for
+                # once per column
+                columns = zip(*rows)
+                for index, column in enumerate(columns):
+                    if unicode in set(map(type, column)):
+                        columns[index] = [str(x) if type(x) == unicode else x
+                                          for x in column]
+                dictOut.extend([dict(izip(keys, row)) for row in izip(*columns)])
 
             r.close()
 
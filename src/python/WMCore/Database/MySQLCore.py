@@ -7,6 +7,8 @@ Handle bind variable parsing for MySQL.
 
 import copy
 
+from operator import itemgetter
+
 from WMCore.Database.DBCore import DBInterface
 from WMCore.Database.ResultSet import ResultSet
 
@@ -38,6 +40,64 @@ def stringLengthCompare(a, b):
     else:
         return 1
 
+# Cache of the parsed SQL statements keyed by the SQL and the set of bind
+# variable names.  DAO SQL is static, the cache is emptied when it fills up
+# to guard against DAOs that generate their SQL.
+substitutionCache = {}
+substitutionCacheSize = 2000
+
+def parseBindVariables(origSQL, bindVarNames):
+    """
+    _parseBindVariables_
+
+    Replace the bind variables in the SQL with %s and find the order the
+    variables appear in the SQL.  Returns a tuple with the updated SQL and the
+    tuple of bind variable names in the order they have to be passed to
+    MySQL.  Bind variables that don't appear in the SQL are ignored.
+    """
+    bindVarPositionList = []
+    updatedSQL = copy.copy(origSQL)
+    lowerSQL = origSQL.lower()
+
+    # We process bind variables from longest to shortest to avoid a shorter
+    # bind variable matching a longer one.  For example if we have two bind
+    # variables: RELEASE_VERSION and RELEASE_VERSION_ID the former will
+    # match against the latter, causing problems.  We'll sort the variable
+    # names by length to guard against this.
+    bindVarNames = list(bindVarNames)
+    bindVarNames.sort(stringLengthCompare)
+
+    bindPositions = {}
+    for bindName in bindVarNames:
+        searchPosition = 0
+
+        while True:
+            bindPosition = lowerSQL.find(":%s" % bindName.lower(),
+                                         searchPosition)
+            if bindPosition == -1:
+                break
+
+            if not bindPositions.has_key(bindPosition):
+                bindPositions[bindPosition] = 0
+                bindVarPositionList.append((bindName, bindPosition))
+            searchPosition = bindPosition + 1
+
+        searchPosition = 0
+        while True:
+            bindPosition = updatedSQL.lower().find(":%s" % bindName.lower(),
+                                                   searchPosition)
+
+            if bindPosition == -1:
+                break
+
+            left = updatedSQL[0:bindPosition]
+            right = updatedSQL[bindPosition + len(bindName) + 1:]
+            updatedSQL = left + "%s" + right
+
+    bindVarPositionList.sort(bindVarCompare)
+
+    return (updatedSQL, tuple([x[0] for x in bindVarPositionList]))
+
 class MySQLInterface(DBInterface):
     def substitute(self, origSQL, origBindsList):
         """
@@ -58,6 +118,9 @@ class MySQLInterface(DBInterface):
         :bind_name becomes %s.
 
         See: http://www.devshed.com/c/a/Python/MySQL-Connectivity-With-Python/5/
+
+        The parsing of the SQL is cached, subsequent calls with the same SQL
+        and bind variable names only build the tuples.
         """
         if origBindsList == None:
             return origSQL, None
@@ -65,53 +128,23 @@ class MySQLInterface(DBInterface):
         origBindsList = self.makelist(origBindsList)
         origBind = origBindsList[0]
 
-        bindVarPositionList = []
-        updatedSQL = copy.copy(origSQL)
-
-        # We process bind variables from longest to shortest to avoid a shorter
-        # bind variable matching a longer one.  For example if we have two bind
-        # variables: RELEASE_VERSION and RELEASE_VERSION_ID the former will
-        # match against the latter, causing problems.  We'll sort the variable
-        # names by length to guard against this.
-        bindVarNames = origBind.keys()
-        bindVarNames.sort(stringLengthCompare)
-
-        bindPositions = {}
-        for bindName in bindVarNames:
-            searchPosition = 0
-
-            while True:
-                bindPosition = origSQL.lower().find(":%s" % bindName.lower(),
-                                                    searchPosition)
-                if bindPosition == -1:
-                    break
+        cacheKey = (origSQL, frozenset(origBind.keys()))
+        substitution = substitutionCache.get(cacheKey, None)
+        if substitution == None:
+            substitution = parseBindVariables(origSQL, origBind.keys())
+            if len(substitutionCache) >= substitutionCacheSize:
+                substitutionCache.clear()
+            substitutionCache[cacheKey] = substitution
 
-                if not bindPositions.has_key(bindPosition):
-                    bindPositions[bindPosition] = 0
-                    bindVarPositionList.append((bindName, bindPosition))
-                searchPosition = bindPosition + 1
+        updatedSQL, bindVarNames = substitution
 
-            searchPosition = 0
-            while True:
-                bindPosition = updatedSQL.lower().find(":%s" % bindName.lower(),
-                                                       searchPosition)
-
-                if bindPosition == -1:
-                    break
-
-                left = updatedSQL[0:bindPosition]
-                right = updatedSQL[bindPosition + len(bindName) + 1:]
-                updatedSQL = left + "%s" + right
-
-        bindVarPositionList.sort(bindVarCompare)
-
-        mySQLBindVarsList = []
-        for origBind in origBindsList:
-            mySQLBindVars = []
-            for bindVarPosition in bindVarPositionList:
-                mySQLBindVars.append(origBind[bindVarPosition[0]])
-
-            mySQLBindVarsList.append(tuple(mySQLBindVars))
+        if len(bindVarNames) > 1:
+            mySQLBindVarsList = map(itemgetter(*bindVarNames), origBindsList)
+        elif len(bindVarNames) == 1:
+            bindVarName = bindVarNames[0]
+            mySQLBindVarsList = [(x[bindVarName],) for x in origBindsList]
+        else:
+            mySQLBindVarsList = [() for x in origBindsList]
 
         return (updatedSQL, mySQLBindVarsList)
 
@@ -127,13 +160,21 @@ class MySQLInterface(DBInterface):
         return DBInterface.executebinds(self, s, b, connection, returnCursor)
 
     def executemanybinds(self, s = None, b = None, connection = None,
-                         returnCursor = False):
+                         returnCursor = False, bulkSelect = False):
         """
         _executemanybinds_
 
         Execute a SQL statement that has multiple sets of bind variables.
         Transform the bind variables into the format that MySQL expects.
+        Bulk selects are rewritten before the substitution, the rewritten
+        queries are substituted by executebinds.
         """
+        if bulkSelect and s.strip().lower().startswith("select"):
+            bulkStatements = self.buildBulkSelect(s, b)
+            if bulkStatements != None:
+                return self.executebulkselect(bulkStatements, connection,
+                                              returnCursor)
+
         newsql, binds = self.substitute(s, b)
 
         return DBInterface.executemanybinds(self, newsql, binds, connection,
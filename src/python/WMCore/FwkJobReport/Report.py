@@ -15,6 +15,8 @@ import traceback
 import time
 import math
 import types
+import struct
+import json
 
 from WMCore.Configuration import ConfigSection
 
@@ -34,6 +36,16 @@ class FwkJobReportException(WMException):
     """
     pass
 
+# On disk format of persisted reports: a fixed size prefix with a magic
+# string, the format version and the length of a JSON header, followed by
+# the JSON header and the binary pickle of the report data.  The header
+# summarises the steps so that exit codes, step times and step status can be
+# read without unpickling the whole report.  Reports that don't start with
+# the magic string are plain pickles written by older versions.
+FWJR_MAGIC = "WMFWJR"
+FWJR_FORMAT_VERSION = 1
+FWJR_PREFIX = struct.Struct(">6sHI")
+
 def checkFileForCompletion(file):
     """
     _checkFileForCompletion_
@@ -107,6 +119,10 @@ class Report:
     The base class for the new jobReport
 
     """
+    # Header of the report on disk, only set while the report data loaded
+    # from the new format has not been unpickled yet.
+    summary = None
+
     def __init__(self, reportname = None):
         self.data = ConfigSection("FrameworkJobReport")
         self.data.steps = []
@@ -120,12 +136,35 @@ class Report:
     def __str__(self):
         return str(self.data)
 
+    def __getattr__(self, name):
+        """
+        Unpickle the report data on first access when the report was loaded
+        from the new on disk format.
+        """
+        if name == "data" and "pickledData" in self.__dict__:
+            self.data = cPickle.loads(self.__dict__.pop("pickledData"))
+            self.summary = None
+            return self.data
+        if name == "data" and "pickledFile" in self.__dict__:
+            filename, offset = self.__dict__.pop("pickledFile")
+            handle = open(filename, 'rb')
+            try:
+                handle.seek(offset)
+                self.data = cPickle.load(handle)
+            finally:
+                handle.close()
+            self.summary = None
+            return self.data
+        raise AttributeError(name)
+
     def listSteps(self):
         """
         _listSteps_
 
         List the names of all the steps in the report.
         """
+        if self.summary:
+            return self.summary["steps"]
         return self.data.steps
 
     def setStepStatus(self, stepName, status):
@@ -294,6 +333,9 @@ class Report:
 
         Returns a list of all non-zero exit codes in the step
         """
+        if self.summary and stepName in self.summary["stepInfo"]:
+            return set(self.summary["stepInfo"][stepName]["exitCodes"])
+
         returnCodes = set()
         reportStep = self.retrieveStep(stepName)
         errorCount = getattr(reportStep.errors, "errorCount", 0)
@@ -330,6 +372,9 @@ class Report:
         Get the exit code for a particular step
         Return 0 if none
         """
+        if self.summary and stepName in self.summary["stepInfo"]:
+            return self.summary["stepInfo"][stepName]["exitCode"]
+
         returnCode = 0
         reportStep = self.retrieveStep(stepName)
         errorCount = getattr(reportStep.errors, "errorCount", 0)
@@ -342,14 +387,50 @@ class Report:
 
         return returnCode
 
+    def buildSummary(self):
+        """
+        _buildSummary_
+
+        Build the header stored in front of the persisted report, it holds
+        the step names, status, exit codes, start and stop times, error
+        types and output file counts.
+        """
+        stepInfo = {}
+        for stepName in self.data.steps:
+            reportStep = self.retrieveStep(stepName)
+            if reportStep is None:
+                continue
+
+            errorTypes = []
+            errorCount = getattr(reportStep.errors, "errorCount", 0)
+            for i in range(errorCount):
+                reportError = getattr(reportStep.errors, "error%i" % i)
+                errorTypes.append(getattr(reportError, "type", None))
+
+            times = self.getTimes(stepName)
+            stepInfo[stepName] = {"status": getattr(reportStep, "status", 1),
+                                  "exitCodes": list(self.getStepExitCodes(stepName)),
+                                  "exitCode": self.getStepExitCode(stepName),
+                                  "errorTypes": errorTypes,
+                                  "startTime": times["startTime"],
+                                  "stopTime": times["stopTime"],
+                                  "fileCount": len(self.getAllFileRefsFromStep(stepName))}
+
+        return {"steps": list(self.data.steps),
+                "stepInfo": stepInfo}
+
     def persist(self, filename):
         """
         _persist_
 
-        Pickle this object and save it to disk.
+        Save the report to disk, a summary header followed by the binary
+        pickle of the report data.
         """
-        handle = open(filename, 'w')
-        cPickle.dump(self.data, handle)
+        header = json.dumps(self.buildSummary())
+        handle = open(filename, 'wb')
+        handle.write(FWJR_PREFIX.pack(FWJR_MAGIC, FWJR_FORMAT_VERSION, len(header)))
+        handle.write(header)
+        cPickle.dump(self.data, handle, cPickle.HIGHEST_PROTOCOL)
         handle.close()
         return
 
@@ -357,18 +438,85 @@ class Report:
         """
         _unpersist_
 
-        Load a pickled FWJR from disk.
+        Load a FWJR from disk, both the plain pickles of older versions and
+        the new format are supported.  For the new format only the header is
+        decoded, the report data is unpickled when it is first needed.
         """
-        handle = open(filename, 'r')
-        self.data = cPickle.load(handle)
+        handle = open(filename, 'rb')
+        content = handle.read()
         handle.close()
 
+        if content.startswith(FWJR_MAGIC):
+            magic, version, headerLength = FWJR_PREFIX.unpack_from(content)
+            self.checkFormatVersion(version, filename)
+
+            headerStart = FWJR_PREFIX.size
+            self.__dict__.pop("data", None)
+            self.__dict__.pop("pickledFile", None)
+            self.pickledData = content[headerStart + headerLength:]
+            self.summary = self.decodeSummary(content[headerStart:headerStart + headerLength])
+        else:
+            self.__dict__.pop("pickledData", None)
+            self.__dict__.pop("pickledFile", None)
+            self.data = cPickle.loads(content)
+            self.summary = None
+
         # old self.report (if it existed) became unattached
         if reportname:
             self.report = getattr(self.data, reportname)
 
         return
 
+    def readSummary(self, filename):
+        """
+        _readSummary_
+
+        Read only the summary header of a FWJR in the new format, the rest
+        of the file is read and unpickled if the report data is needed.
+        Return False without loading anything if the report is a plain
+        pickle written by an older version.
+        """
+        handle = open(filename, 'rb')
+        try:
+            prefix = handle.read(FWJR_PREFIX.size)
+            if len(prefix) < FWJR_PREFIX.size or not prefix.startswith(FWJR_MAGIC):
+                return False
+
+            magic, version, headerLength = FWJR_PREFIX.unpack(prefix)
+            self.checkFormatVersion(version, filename)
+            header = handle.read(headerLength)
+        finally:
+            handle.close()
+
+        self.__dict__.pop("data", None)
+        self.__dict__.pop("pickledData", None)
+        self.pickledFile = (filename, FWJR_PREFIX.size + headerLength)
+        self.summary = self.decodeSummary(header)
+        return True
+
+    def checkFormatVersion(self, version, filename):
+        """
+        _checkFormatVersion_
+
+        Fail on reports written in a format newer than this version.
+        """
+        if version > FWJR_FORMAT_VERSION:
+            msg = "Unsupported FWJR format version %s in %s" % (version, filename)
+            raise FwkJobReportException(msg)
+        return
+
+    def decodeSummary(self, header):
+        """
+        _decodeSummary_
+
+        Decode the JSON summary header, step names are turned back into
+        plain strings.
+        """
+        summary = json.loads(header)
+        summary["steps"] = [str(x) for x in summary["steps"]]
+        summary["stepInfo"] = dict((str(x), y) for x, y in summary["stepInfo"].items())
+        return summary
+
     def addOutputModule(self, moduleName):
         """
         _addOutputModule_
@@ -1002,6 +1150,10 @@ class Report:
 
         Determine wether or not a step was successful.
         """
+        if self.summary and stepName in self.summary["stepInfo"]:
+            status = self.summary["stepInfo"][stepName]["status"]
+            return status in [0, '0', 'success', 'Success']
+
         stepReport = self.retrieveStep(step = stepName)
         status = getattr(stepReport, 'status', 1)
         # We have too many possibilities
@@ -1019,13 +1171,13 @@ class Report:
         """
         value = True
 
-        if len(self.data.steps) == 0:
+        if len(self.listSteps()) == 0:
             # Mark jobs as failed if they have no steps
             msg = "Could not find any steps"
             logging.error(msg)
             return False
 
-        for stepName in self.data.steps:
+        for stepName in self.listSteps():
             # Ignore specified steps
             # i.e., logArch steps can fail without causing
             # the task to fail
@@ -1158,6 +1310,10 @@ class Report:
 
         Return a dictionary with the start and stop times
         """
+        if self.summary and stepName in self.summary["stepInfo"]:
+            stepInfo = self.summary["stepInfo"][stepName]
+            return {'startTime': stepInfo["startTime"], 'stopTime': stepInfo["stopTime"]}
+
         reportStep = self.retrieveStep(stepName)
 
         startTime = getattr(reportStep, 'startTime', None)
@@ -1387,6 +1543,39 @@ class Report:
         return
 
 
+    def setStepPSS(self, stepName, min, max, average):
+        """
+        _setStepPSS_
+
+        Set the Performance PSS information
+        """
+
+        reportStep = self.retrieveStep(stepName)
+        reportStep.performance.section_('PSSMemory')
+        reportStep.performance.PSSMemory.min     = min
+        reportStep.performance.PSSMemory.max     = max
+        reportStep.performance.PSSMemory.average = average
+
+        return
+
+    def setStepPerformanceSeries(self, stepName, times, rss, pss, vsize, pcpu):
+        """
+        _setStepPerformanceSeries_
+
+        Set the time series of the Performance RSS, PSS, VSize and PCPU
+        samples
+        """
+
+        reportStep = self.retrieveStep(stepName)
+        reportStep.performance.section_('TimeSeries')
+        reportStep.performance.TimeSeries.times = times
+        reportStep.performance.TimeSeries.rss   = rss
+        reportStep.performance.TimeSeries.pss   = pss
+        reportStep.performance.TimeSeries.vsize = vsize
+        reportStep.performance.TimeSeries.pcpu  = pcpu
+
+        return
+
     def setStepVSize(self, stepName, min, max, average):
         """
         _setStepVSize_
@@ -6,6 +6,7 @@ try:
           import getGlobalQueues
 except:
     logging.warning("Not part of ReqMgr")
+from WMCore.HTTPFrontEnd.GlobalMonitor.DataCache import DataCache, fanOut
 from WMCore.Services.RequestManager.RequestManager import RequestManager
 from WMCore.Services.WorkQueue.WorkQueue import WorkQueue
 from WMCore.Services.WMAgent.WMAgent import WMAgent
@@ -24,12 +25,13 @@ def getAgentOverview(serviceURL, serviceLevel):
 
 def getAgentInfoFromReqMgr(serviceURL):
     """ get agent info from request mgr """
-    reqMgr = RequestManager({'endpoint':serviceURL})
     try:
         if serviceURL.lower() == "local":
+            # needs the database connection of this thread
             gQueues = getGlobalQueues()
         else:
-            gQueues = reqMgr.getWorkQueue()
+            gQueues = DataCache.getEndpointData(("agent", "RequestManager", serviceURL),
+                                                getReqMgrQueues, serviceURL)
     except Exception, ex:
         logging.warning("Error: %s" % str(ex))
         errorInfo = {}
@@ -39,16 +41,20 @@ def getAgentInfoFromReqMgr(serviceURL):
         return [errorInfo]
 
     agents = []
-    for queue in gQueues:
-        agents.extend(getAgentInfoFromGlobalQueue(queue))
+    for queueAgents in fanOut(getAgentInfoFromGlobalQueue, gQueues):
+        agents.extend(queueAgents)
     return agents
 
+def getReqMgrQueues(serviceURL):
+    """ get the global queues from request mgr """
+    reqMgr = RequestManager({'endpoint':serviceURL})
+    return reqMgr.getWorkQueue()
+
 def getAgentInfoFromGlobalQueue(serviceURL):
 
-    url, dbName = splitCouchServiceURL(serviceURL)
-    globalQ = WorkQueue(url, dbName)
     try:
-        childQueues = globalQ.getChildQueues()
+        childQueues = DataCache.getEndpointData(("agent", "GlobalQueue", serviceURL),
+                                                getChildQueues, serviceURL)
     except Exception, ex:
         logging.warning("Error: %s" % str(ex))
         errorInfo = {}
@@ -58,38 +64,43 @@ def getAgentInfoFromGlobalQueue(serviceURL):
         return [errorInfo]
 
     agents = []
-    for childQueue in childQueues:
-        agents.extend(getAgentInfoFromLocalQueue(childQueue))
+    for queueAgents in fanOut(getAgentInfoFromLocalQueue, childQueues):
+        agents.extend(queueAgents)
     return agents
 
-def getAgentInfoFromLocalQueue(serviceURL):
-    """ get agent status from local agent """
+def getChildQueues(serviceURL):
+    """ get the child queues of a global queue """
     url, dbName = splitCouchServiceURL(serviceURL)
-    localQ = WorkQueue(url, dbName)
+    globalQ = WorkQueue(url, dbName)
+    return globalQ.getChildQueues()
 
+def getAgentInfoFromLocalQueue(serviceURL):
+    """ get agent status from local agent """
     try:
-        wmbsUrl = localQ.getWMBSUrl()
+        wmbsUrl = DataCache.getEndpointData(("agent", "LocalQueue", serviceURL),
+                                            getWMBSUrl, serviceURL)
     except Exception, ex:
         logging.warning("Error: %s" % str(ex))
         errorInfo = {}
         errorInfo['url'] = serviceURL
         errorInfo['status'] = "Local Queue down: %s" % serviceURL
         errorInfo['acdc'] = 'N/A'
-        return errorInfo
+        return [errorInfo]
 
-    agents = []
-    for url in wmbsUrl:
-        agents.append(getAgentInfoFromWMBS(url))
-    return agents
+    return fanOut(getAgentInfoFromWMBS, wmbsUrl)
+
+def getWMBSUrl(serviceURL):
+    """ get the wmbs urls of a local queue """
+    url, dbName = splitCouchServiceURL(serviceURL)
+    localQ = WorkQueue(url, dbName)
+    return localQ.getWMBSUrl()
 
 def getAgentInfoFromWMBS(serviceURL):
     agentInfo = {}
     agentURL = serviceURL.replace('wmbsservice/wmbs', 'wmbsservice/wmagent')
-    agentService = WMAgent({'endpoint': agentURL})
     try:
-        agent = agentService.getAgentStatus(detail = False)
-        status = agent['status']
-        acdcURL = agentService.getACDCInfo()['url']
+        status, acdcURL = DataCache.getEndpointData(("agent", "WMBS", agentURL),
+                                                    getAgentStatus, agentURL)
     except Exception, ex:
         logging.warning("Error: %s" % str(ex))
         status = "Agent Service down: %s" % agentURL
@@ -99,3 +110,9 @@ def getAgentInfoFromWMBS(serviceURL):
     agentInfo['status'] = status
     agentInfo['acdc'] = acdcURL
     return agentInfo
+
+def getAgentStatus(agentURL):
+    """ get the status and the acdc url of an agent """
+    agentService = WMAgent({'endpoint': agentURL})
+    agent = agentService.getAgentStatus(detail = False)
+    return agent['status'], agentService.getACDCInfo()['url']
@@ -8,6 +8,7 @@ except:
     logging.warning("Not part of ReqMgr")
 import WMCore.HTTPFrontEnd.GlobalMonitor.API.DataFormatter as DFormatter
 from WMCore.HTTPFrontEnd.GlobalMonitor.API.DataFormatter import combineListOfDict
+from WMCore.HTTPFrontEnd.GlobalMonitor.DataCache import DataCache, fanOut
 from WMCore.Lexicon import splitCouchServiceURL
 from WMCore.Services.RequestManager.RequestManager import RequestManager
 from WMCore.Services.WorkQueue.WorkQueue import WorkQueue
@@ -27,73 +28,84 @@ def getRequestOverview(serviceURL, serviceLevel):
 
 def getRequestInfoFromReqMgr(serviceURL):
     """ get the request info from requestManager """
-
-    ###TODO: add back when GlobalMonitor spins out as a separate application
-    service = RequestManager({'endpoint':serviceURL})
     try:
         ### use request manager funtion directly
         ### TODO: remove this when GlobalMonitor spins out as a separate application
         if serviceURL.lower() == "local":
-
-            baseResults = getOverview()
-            urls = getGlobalQueues()
+            # needs the database connection of this thread
+            baseResults, urls = getReqMgrData(serviceURL)
         else:
-            baseResults = service.getRequestNames()
-            urls = service.getWorkQueue()
+            baseResults, urls = DataCache.getEndpointData(
+                                    ("request", "RequestManager", serviceURL),
+                                    getReqMgrData, serviceURL)
     except Exception, ex:
         logging.error(str(ex))
         return DFormatter.errorFormatter(serviceURL, "RequestManger Down")
 
     globalResults = []
-    for url in urls:
-        globalResults.extend(getRequestOverview(url, "GlobalQueue"))
+    for results in fanOut(getRequestInfoFromGlobalQueue, urls):
+        globalResults.extend(results)
     return combineListOfDict('request_name', baseResults, globalResults,
                              'global_queue')
 
+def getReqMgrData(serviceURL):
+    """ get the requests and the global queues from requestManager """
+    if serviceURL.lower() == "local":
+        return getOverview(), getGlobalQueues()
+
+    ###TODO: add back when GlobalMonitor spins out as a separate application
+    service = RequestManager({'endpoint':serviceURL})
+    return service.getRequestNames(), service.getWorkQueue()
+
 def getRequestInfoFromGlobalQueue(serviceURL):
     """ get the request info from global queue """
-    url, dbName = splitCouchServiceURL(serviceURL)
-    service = WorkQueue(url, dbName)
     try:
-        jobInfo = service.getTopLevelJobsByRequest()
-        qInfo = service.getChildQueuesByRequest()
-        siteWhitelists = service.getSiteWhitelistByRequest()
-        childQueueURLs = set()
-        for item in qInfo:
-            childQueueURLs.add(item['local_queue'])
-
+        baseResults, childQueueURLs = DataCache.getEndpointData(
+                                          ("request", "GlobalQueue", serviceURL),
+                                          getGlobalQueueData, serviceURL)
     except Exception, ex:
         logging.error("%s: %s" % (serviceURL, str(ex)))
         return DFormatter.errorFormatter(serviceURL, "GlobalQueue Down")
-    else:
-        tempResults = combineListOfDict('request_name', jobInfo, qInfo,
+
+    localResults = []
+    # TODO: change if each queue has shares the workflow
+    # assume each queue has exclusive request
+    for results in fanOut(getRequestInfoFromLocalQueue, childQueueURLs):
+        localResults.extend(results)
+
+    localQRules = {'pending': DFormatter.add, 'cooloff': DFormatter.add,
+                   'running': DFormatter.add, 'success': DFormatter.add,
+                   'failure': DFormatter.add,
+                   'Pending': DFormatter.add, 'Running': DFormatter.add,
+                   'Complete': DFormatter.add,'Error': DFormatter.add,
+                   'inQueue': DFormatter.add, 'inWMBS': DFormatter.add
+                   }
+    return combineListOfDict('request_name', baseResults, localResults,
+                             'local_queue', **localQRules)
+
+def getGlobalQueueData(serviceURL):
+    """ get the requests and the child queues from global queue """
+    url, dbName = splitCouchServiceURL(serviceURL)
+    service = WorkQueue(url, dbName)
+    jobInfo = service.getTopLevelJobsByRequest()
+    qInfo = service.getChildQueuesByRequest()
+    siteWhitelists = service.getSiteWhitelistByRequest()
+    childQueueURLs = set()
+    for item in qInfo:
+        childQueueURLs.add(item['local_queue'])
+
+    tempResults = combineListOfDict('request_name', jobInfo, qInfo,
                                     local_queue = DFormatter.addToList)
-        baseResults = combineListOfDict('request_name', tempResults,
-                                        siteWhitelists)
-        localResults = []
-        for url in childQueueURLs:
-            # TODO: change if each queue has shares the workflow
-            # assume each queue has exclusive request
-            localResults.extend(getRequestOverview(url, "LocalQueue"))
-
-        localQRules = {'pending': DFormatter.add, 'cooloff': DFormatter.add,
-                       'running': DFormatter.add, 'success': DFormatter.add,
-                       'failure': DFormatter.add,
-                       'Pending': DFormatter.add, 'Running': DFormatter.add,
-                       'Complete': DFormatter.add,'Error': DFormatter.add,
-                       'inQueue': DFormatter.add, 'inWMBS': DFormatter.add
-                       }
-        return combineListOfDict('request_name', baseResults, localResults,
-                                 'local_queue', **localQRules)
+    baseResults = combineListOfDict('request_name', tempResults,
+                                    siteWhitelists)
+    return baseResults, list(childQueueURLs)
 
 def getRequestInfoFromLocalQueue(serviceURL):
     """ get the request info from local queue """
-
-    url, dbName = splitCouchServiceURL(serviceURL)
-    service = WorkQueue(url, dbName)
     try:
-        wmbsUrls = service.getWMBSUrl()
-        jobStatusInfo = service.getJobInjectStatusByRequest()
+        wmbsUrls, jobStatusInfo = DataCache.getEndpointData(
+                                      ("request", "LocalQueue", serviceURL),
+                                      getLocalQueueData, serviceURL)
     except Exception, ex:
         logging.error("%s: %s" % (serviceURL, str(ex)))
         return DFormatter.errorFormatter(serviceURL, "LocalQueue Down")
@@ -104,15 +116,31 @@ def getRequestInfoFromLocalQueue(serviceURL):
     else:
         return []
 
+def getLocalQueueData(serviceURL):
+    """ get the wmbs urls and the job status from local queue """
+    url, dbName = splitCouchServiceURL(serviceURL)
+    service = WorkQueue(url, dbName)
+    return service.getWMBSUrl(), service.getJobInjectStatusByRequest()
+
 def getRequestInfoFromWMBS(serviceURL, jobStatusInfo):
 
-    service = WMBS({'endpoint':serviceURL})
     try:
-        batchJobs = service.getBatchJobStatus()
+        batchJobs, couchJobs = DataCache.getEndpointData(
+                                   ("request", "WMBS", serviceURL),
+                                   getWMBSData, serviceURL)
     except Exception, ex:
         logging.error("%s: %s" % (serviceURL, str(ex)))
         return DFormatter.errorFormatter(serviceURL, "WMBS Service Dowtn")
 
+    baseResults = combineListOfDict('request_name', jobStatusInfo, couchJobs)
+
+    return combineListOfDict('request_name', baseResults, batchJobs)
+
+def getWMBSData(serviceURL):
+    """ get the batch and couch job summaries from wmbs """
+    service = WMBS({'endpoint':serviceURL})
+    batchJobs = service.getBatchJobStatus()
+
     try:
         couchJobs = service.getJobSummaryFromCouchDB()
     # this should be only CouchError, since localQueue error should be
@@ -125,7 +153,4 @@ def getRequestInfoFromWMBS(serviceURL, jobStatusInfo):
         if len(couchJobs)  == 1 and couchJobs[0].has_key("error"):
             couchJobs = DFormatter.errorFormatter(serviceURL,
                                                   couchJobs[0]['error'])
-
-    baseResults = combineListOfDict('request_name', jobStatusInfo, couchJobs)
-
-    return combineListOfDict('request_name', baseResults, batchJobs)
+    return batchJobs, couchJobs
@@ -6,6 +6,7 @@ try:
           import getGlobalQueues
 except:
     logging.warning("Not part of ReqMgr")
+from WMCore.HTTPFrontEnd.GlobalMonitor.DataCache import DataCache, fanOut
 from WMCore.Services.RequestManager.RequestManager import RequestManager
 from WMCore.Services.WorkQueue.WorkQueue import WorkQueue
 from WMCore.Services.WMBS.WMBS import WMBS
@@ -25,14 +26,15 @@ def getSiteOverview(serviceURL, serviceLevel):
 def getSiteInfoFromReqMgr(serviceURL):
     """ get agent info from request mgr """
 
-    reqMgr = RequestManager({'endpoint':serviceURL})
     #get information from global queue.
     try:
         if serviceURL.lower() == "local":
+            # needs the database connection of this thread
             queues = getGlobalQueues()
         ###TODO: add back when GlobalMonitor spins out as a separate application
         else:
-            queues = reqMgr.getWorkQueue()
+            queues = DataCache.getEndpointData(("site", "RequestManager", serviceURL),
+                                               getReqMgrQueues, serviceURL)
     except Exception, ex:
         logging.warning("Error: %s" % str(ex))
         errorInfo = {}
@@ -40,16 +42,20 @@ def getSiteInfoFromReqMgr(serviceURL):
         return [errorInfo]
 
     siteInfo = []
-    for queueURL in queues:
-        _combineSites(siteInfo, getSiteInfoFromGlobalQueue(queueURL))
+    for queueSites in fanOut(getSiteInfoFromGlobalQueue, queues):
+        _combineSites(siteInfo, queueSites)
     return siteInfo
 
+def getReqMgrQueues(serviceURL):
+    """ get the global queues from request mgr """
+    reqMgr = RequestManager({'endpoint':serviceURL})
+    return reqMgr.getWorkQueue()
+
 def getSiteInfoFromGlobalQueue(serviceURL):
 
-    url, dbName = splitCouchServiceURL(serviceURL)
-    globalQ = WorkQueue(url, dbName)
     try:
-        queues = globalQ.getChildQueues()
+        queues = DataCache.getEndpointData(("site", "GlobalQueue", serviceURL),
+                                           getChildQueues, serviceURL)
     except Exception, ex:
         logging.warning("Error: %s" % str(ex))
         errorInfo = {}
@@ -57,17 +63,22 @@ def getSiteInfoFromGlobalQueue(serviceURL):
         return [errorInfo]
 
     siteInfo = []
-    for queueURL in queues:
-        _combineSites(siteInfo, getSiteInfoFromLocalQueue(queueURL))
+    for queueSites in fanOut(getSiteInfoFromLocalQueue, queues):
+        _combineSites(siteInfo, queueSites)
     return siteInfo
 
+def getChildQueues(serviceURL):
+    """ get the child queues of a global queue """
+    url, dbName = splitCouchServiceURL(serviceURL)
+    globalQ = WorkQueue(url, dbName)
+    return globalQ.getChildQueues()
+
 def getSiteInfoFromLocalQueue(serviceURL):
     """ get agent status from local agent """
 
-    url, dbName = splitCouchServiceURL(serviceURL)
-    wqService = WorkQueue(url, dbName)
     try:
-        wmbsUrls = wqService.getWMBSUrl()
+        wmbsUrls = DataCache.getEndpointData(("site", "LocalQueue", serviceURL),
+                                             getWMBSUrl, serviceURL)
     except Exception, ex:
         logging.warning("Error: %s" % str(ex))
         errorInfo = {}
@@ -75,22 +86,31 @@ def getSiteInfoFromLocalQueue(serviceURL):
         return [errorInfo]
 
     siteInfo = []
-    for url in wmbsUrls:
-        _combineSites(siteInfo, getSiteInfoFromWMBSService(url))
+    for wmbsSites in fanOut(getSiteInfoFromWMBSService, wmbsUrls):
+        _combineSites(siteInfo, wmbsSites)
     return siteInfo
 
+def getWMBSUrl(serviceURL):
+    """ get the wmbs urls of a local queue """
+    url, dbName = splitCouchServiceURL(serviceURL)
+    wqService = WorkQueue(url, dbName)
+    return wqService.getWMBSUrl()
+
 def getSiteInfoFromWMBSService(serviceURL):
-    wmbsSvc = WMBS({'endpoint': serviceURL})
     try:
-        batchJobs = wmbsSvc.getBatchJobStatusBySite()
-        completeJobs = wmbsSvc.getSiteSummaryFromCouchDB()
-        _combineSites(completeJobs, batchJobs)
-        return completeJobs
+        return DataCache.getEndpointData(("site", "WMBS", serviceURL),
+                                         getWMBSSites, serviceURL)
     except Exception, ex:
         logging.warning("Error: %s" % str(ex))
         return []
 
-    return batchJobs
+def getWMBSSites(serviceURL):
+    """ get the batch and complete jobs by site from wmbs """
+    wmbsSvc = WMBS({'endpoint': serviceURL})
+    batchJobs = wmbsSvc.getBatchJobStatusBySite()
+    completeJobs = wmbsSvc.getSiteSummaryFromCouchDB()
+    _combineSites(completeJobs, batchJobs)
+    return completeJobs
 
 def _combineSites(results, batchJobs):
     """ get site information from each agent """
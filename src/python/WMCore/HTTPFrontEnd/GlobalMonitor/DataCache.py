@@ -1,7 +1,182 @@
+"""
+Caches of the GlobalMonitor data.
+
+DataCache keeps the merged request, agent and site overviews for a short time.
+EndpointCache keeps the data of every ReqMgr, WorkQueue and WMBS endpoint with
+its own expiration time, so a merged overview can be rebuilt from the endpoints
+that are up to date without waiting for the slow ones.
+"""
+
+import copy
 import time
+import logging
+import threading
+
+class EndpointTimeout(Exception):
+    """
+    _EndpointTimeout_
+
+    Raised when an endpoint didn't answer in time and there is no cached data
+    to use instead.
+    """
+    pass
+
+
+class _Fetch(object):
+    """
+    _Fetch_
+
+    State of a request to an endpoint running in its own thread.
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class EndpointCache(object):
+    """
+    _EndpointCache_
+
+    Cache of the data of each endpoint.
+
+    Data younger than duration seconds is returned as is.  Data younger than
+    staleDuration seconds is returned while it is refreshed in the background
+    (stale-while-revalidate).  Otherwise the endpoint is queried and the caller
+    waits up to timeout seconds for the answer, an answer arriving later is
+    still cached for the next caller.  Only one request per endpoint runs at a
+    time.
+    """
+    def __init__(self, duration = 300, staleDuration = 3600, timeout = 60):
+        self.duration = duration
+        self.staleDuration = staleDuration
+        self.timeout = timeout
+        self.data = {}
+        self.pending = {}
+        self.lock = threading.Lock()
+        return
+
+    def configure(self, duration = None, staleDuration = None, timeout = None):
+        """
+        _configure_
+
+        Change the expiration times and the timeout.
+        """
+        if duration != None:
+            self.duration = duration
+        if staleDuration != None:
+            self.staleDuration = staleDuration
+        if timeout != None:
+            self.timeout = timeout
+        return
+
+    def clear(self):
+        """
+        _clear_
+
+        Forget all the cached data.
+        """
+        with self.lock:
+            self.data.clear()
+        return
+
+    def _run(self, key, fetch, function, args):
+        """
+        _run_
+
+        Query the endpoint and cache the answer.
+        """
+        try:
+            fetch.value = function(*args)
+        except Exception, ex:
+            logging.error("Error getting %s: %s" % (str(key), str(ex)))
+            fetch.error = ex
+
+        with self.lock:
+            if fetch.error == None:
+                self.data[key] = (time.time(), fetch.value)
+            del self.pending[key]
+        fetch.done.set()
+        return
+
+    def get(self, key, function, *args):
+        """
+        _get_
+
+        Return the data of the endpoint identified by key, calling
+        function(*args) to get it when the cached data is too old.  Raises
+        the exception of the function or EndpointTimeout if there is no
+        usable data.
+
+        The returned data is a copy and can be modified.
+        """
+        now = time.time()
+        with self.lock:
+            cached = self.data.get(key, None)
+            if cached != None and now - cached[0] <= self.duration:
+                return copy.deepcopy(cached[1])
+
+            fetch = self.pending.get(key, None)
+            if fetch == None:
+                fetch = _Fetch()
+                self.pending[key] = fetch
+                thread = threading.Thread(target = self._run,
+                                          args = (key, fetch, function, args))
+                thread.setDaemon(True)
+                thread.start()
+
+        if cached != None and now - cached[0] <= self.staleDuration:
+            return copy.deepcopy(cached[1])
+
+        fetch.done.wait(self.timeout)
+        if not fetch.done.isSet():
+            raise EndpointTimeout("No answer from %s in %s seconds" % (str(key), self.timeout))
+        if fetch.error != None:
+            raise fetch.error
+        return copy.deepcopy(fetch.value)
+
+
+def fanOut(function, items):
+    """
+    _fanOut_
+
+    Call function(item) for every item in its own thread and return the list
+    of results in the order of the items.  The first exception raised by a
+    call is raised again once all the calls are done.
+    """
+    items = list(items)
+    results = [None] * len(items)
+    errors = [None] * len(items)
+
+    def call(index):
+        try:
+            results[index] = function(items[index])
+        except Exception, ex:
+            errors[index] = ex
+        return
+
+    if len(items) == 1:
+        call(0)
+    else:
+        threads = []
+        for index in range(len(items)):
+            thread = threading.Thread(target = call, args = (index,))
+            thread.setDaemon(True)
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+
+    for error in errors:
+        if error != None:
+            raise error
+    return results
+
 
 class DataCache(object):
-    _duration = 600 # ten minitues
+    # the merged overviews are rebuilt from the endpoint cache
+    _duration = 60 # one minute
+    _endpointCache = EndpointCache()
     _requestData = {};
     _agentData = {};
     _siteData = {};
@@ -14,6 +189,14 @@ class DataCache(object):
     def setDuration(sec):
         DataCache._duration = sec;
 
+    @staticmethod
+    def getEndpointCache():
+        return DataCache._endpointCache
+
+    @staticmethod
+    def getEndpointData(key, function, *args):
+        return DataCache._endpointCache.get(key, function, *args)
+
     @staticmethod
     def getRequestData():
         if (DataCache._requestData):
@@ -27,6 +27,14 @@ class GlobalMonitorRESTModel(RESTModel):
         self.serviceLevel = self.config.serviceLevel
         self.workloadSummaryCouchURL = self.config.workloadSummaryCouchURL
 
+        # the data of every endpoint is cached on its own, see DataCache
+        DataCache.setDuration(getattr(self.config, 'cacheDuration',
+                                      DataCache.getDuration()))
+        DataCache.getEndpointCache().configure(
+            duration = getattr(self.config, 'endpointCacheDuration', None),
+            staleDuration = getattr(self.config, 'endpointStaleDuration', None),
+            timeout = getattr(self.config, 'endpointTimeout', None))
+
         self._addMethod("GET", "requestmonitor", self.getRequestMonitor, secured=True) #expires=16000
         self._addMethod("GET", "agentmonitor", self.getAgentMonitor,
                        args = ['detail'], secured=True)
@@ -18,6 +18,7 @@ import traceback
 import math
 
 from WMCore.DataStructs.Run         import Run
+from WMCore.DataStructs.LumiRanges  import LumiRanges
 from WMCore.JobSplitting.JobFactory import JobFactory
 from WMCore.JobSplitting.LumiBased  import isGoodLumi, isGoodRun
 from WMCore.WMBS.File               import File
@@ -92,6 +93,9 @@ class EventAwareLumiBased(JobFactory):
                     logging.error(msg)
                     return
 
+        # Build the interval lookup once for the whole splitting
+        goodRunList = LumiRanges(compactList = goodRunList)
+
         lDict = self.sortByLocation()
         locationDict = {}
 
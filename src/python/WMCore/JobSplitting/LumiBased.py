@@ -17,6 +17,7 @@ import traceback
 
 from WMCore.DataStructs.Run import Run
 from WMCore.DataStructs.LumiList import LumiList
+from WMCore.DataStructs.LumiRanges import LumiRanges
 
 from WMCore.JobSplitting.JobFactory import JobFactory
 from WMCore.WMBS.File               import File
@@ -26,16 +27,18 @@ def isGoodLumi(goodRunList, run, lumi):
     """
     _isGoodLumi_
 
-    Checks to see if runs match a run-lumi combination in the goodRunList
-    This is a pain in the ass.
+    Checks to see if runs match a run-lumi combination in the goodRunList,
+    which is either a LumiRanges object or a compact list dictionary.
+    The ranges of a dictionary are scanned, build the LumiRanges object
+    once when checking many lumis.
     """
-    if goodRunList == None or goodRunList == {}:
+    if not goodRunList:
         return True
 
-    if not isGoodRun(goodRunList = goodRunList, run = run):
-        return False
+    if isinstance(goodRunList, LumiRanges):
+        return goodRunList.contains(run, lumi)
 
-    for runRange in goodRunList.get(str(run), [[]]):
+    for runRange in goodRunList.get(str(run), []):
         # For each run range, which should have 2 elements
         if not len(runRange) == 2:
             # Then we're very confused and should exit
@@ -51,14 +54,13 @@ def isGoodRun(goodRunList, run):
 
     Tell if this is a good run
     """
-    if goodRunList == None or goodRunList == {}:
+    if not goodRunList:
         return True
 
-    if str(run) in goodRunList.keys():
-        # @e can find a run
-        return True
+    if isinstance(goodRunList, LumiRanges):
+        return goodRunList.hasRun(run)
 
-    return False
+    return str(run) in goodRunList
 
 
 class LumiBased(JobFactory):
@@ -131,6 +133,9 @@ class LumiBased(JobFactory):
                     logging.error(msg)
                     return
 
+        # Build the interval lookup once for the whole splitting
+        goodRunList = LumiRanges(compactList = goodRunList)
+
         lDict = self.sortByLocation()
         locationDict = {}
 
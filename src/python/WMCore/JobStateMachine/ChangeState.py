@@ -58,6 +58,25 @@ def discardConflictingDocument(couchDbInstance, data, result):
         return result
 
 
+def appendStateTransition(jobDocument, oldstate, newstate, location, timestamp):
+    """
+    _appendStateTransition_
+
+    Append a state transition to the state history of a job document, this
+    does on the client what the JobDump stateTransition update handler does.
+    """
+    states = jobDocument.setdefault("states", {})
+    maxKey = 0
+    for key in states.keys():
+        maxKey = max(maxKey, int(key))
+
+    states[str(maxKey + 1)] = {"oldstate": oldstate,
+                               "newstate": newstate,
+                               "location": location,
+                               "timestamp": timestamp}
+    return jobDocument
+
+
 class ChangeState(WMObject, WMConnectionBase):
     """
     Propagate the state of a job through the JSM.
@@ -89,6 +108,7 @@ class ChangeState(WMObject, WMConnectionBase):
         self.updateLocationDAO = self.daofactory("Jobs.UpdateLocation")
 
         self.maxUploadedInputFiles = getattr(self.config.JobStateMachine, 'maxFWJRInputFiles', 1000)
+        self.bulkStateTransitions = getattr(self.config.JobStateMachine, 'bulkStateTransitions', False)
         return
 
     def _connectDatabases(self):
@@ -189,6 +209,12 @@ class ChangeState(WMObject, WMConnectionBase):
         Record relevant job information in couch. If the job does not yet exist
         in couch it will be saved as a seperate document.  If the job has a FWJR
         attached that will be saved as a seperate document.
+
+        If bulkStateTransitions is set in the JobStateMachine configuration
+        the state transitions of existing documents are not sent through the
+        update handlers one job at a time.  Instead the documents are loaded
+        with a single _all_docs request, updated here and written back with
+        the bulk commit of the queued documents.
         """
         if not self._connectDatabases():
             logging.error('Databases not connected properly')
@@ -197,6 +223,17 @@ class ChangeState(WMObject, WMConnectionBase):
         timestamp = int(time.time())
         couchRecordsToUpdate = []
 
+        jobDocs = {}
+        summaryDocs = {}
+        summaryCallback = None
+        if self.bulkStateTransitions:
+            summaryCallback = discardConflictingDocument
+            jobDocs = self.loadDocuments(self.jobsdatabase,
+                                         [job["couch_record"] for job in jobs if job.get("couch_record", None)])
+            if updatesummary:
+                summaryDocs = self.loadDocuments(self.jsumdatabase,
+                                                 [job["name"] for job in jobs])
+
         for job in jobs:
             couchDocID = job.get("couch_record", None)
 
@@ -259,6 +296,11 @@ class ChangeState(WMObject, WMConnectionBase):
                 couchRecordsToUpdate.append({"jobid": job["id"],
                                              "couchid": jobDocument["_id"]})
                 self.jobsdatabase.queue(jobDocument, callback = discardConflictingDocument)
+            elif self.bulkStateTransitions:
+                jobDocument = jobDocs.setdefault(couchDocID, {"_id": couchDocID,
+                                                              "states": {}})
+                appendStateTransition(jobDocument, oldstate, newstate,
+                                      jobLocation, timestamp)
             else:
                 # We send a PUT request to the stateTransition update handler.
                 # Couch expects the parameters to be passed as arguments to in
@@ -275,7 +317,21 @@ class ChangeState(WMObject, WMConnectionBase):
 
             # updating the status of the summary doc only when it is explicitely requested
             # doc is already in couch
-            if updatesummary:
+            if updatesummary and self.bulkStateTransitions:
+                jobSummaryId = job["name"]
+                # map retrydone state to jobfailed state for monitoring
+                if newstate == "retrydone":
+                    monitorState = "jobfailed"
+                else:
+                    monitorState = newstate
+                jobSummary = summaryDocs.setdefault(jobSummaryId, {"_id": jobSummaryId})
+                jobSummary["state"] = monitorState
+                jobSummary["timestamp"] = timestamp
+                jobSummary.setdefault("state_history", []).append({"oldstate": oldstate,
+                                                                   "newstate": monitorState,
+                                                                   "location": job["location"],
+                                                                   "timestamp": timestamp})
+            elif updatesummary:
                 jobSummaryId = job["name"]
                 updateUri = "/" + self.jsumdatabase.name + "/_design/WMStats/_update/jobSummaryState/" + jobSummaryId
                 # map retrydone state to jobfailed state for monitoring
@@ -381,8 +437,14 @@ class ChangeState(WMObject, WMConnectionBase):
                                   "output": outputs }
                     if couchDocID is not None:
                         try:
-                            currentJobDoc = self.jsumdatabase.document(id = jobSummaryId)
-                            jobSummary['_rev'] = currentJobDoc['_rev']
+                            if jobSummaryId in summaryDocs:
+                                # The bulk transition was already applied to
+                                # this document, replace it with the summary
+                                currentJobDoc = summaryDocs.pop(jobSummaryId)
+                            else:
+                                currentJobDoc = self.jsumdatabase.document(id = jobSummaryId)
+                            if "_rev" in currentJobDoc:
+                                jobSummary['_rev'] = currentJobDoc['_rev']
                             jobSummary['state_history'] = currentJobDoc.get('state_history', [])
                             # record final status transition
                             if newstate == 'success':
@@ -397,7 +459,13 @@ class ChangeState(WMObject, WMConnectionBase):
                                 jobSummary[prop] = jobSummary[prop] if jobSummary[prop] else currentJobDoc.get(prop, [])
                         except CouchNotFoundError:
                             pass
-                    self.jsumdatabase.queue(jobSummary, timestamp = True)
+                    self.jsumdatabase.queue(jobSummary, timestamp = True,
+                                            callback = summaryCallback)
+
+        for jobDocument in jobDocs.values():
+            self.jobsdatabase.queue(jobDocument, callback = discardConflictingDocument)
+        for jobSummary in summaryDocs.values():
+            self.jsumdatabase.queue(jobSummary, callback = summaryCallback)
 
         if len(couchRecordsToUpdate) > 0:
             self.setCouchDAO.execute(bulkList = couchRecordsToUpdate,
@@ -406,9 +474,29 @@ class ChangeState(WMObject, WMConnectionBase):
 
         self.jobsdatabase.commit(callback = discardConflictingDocument)
         self.fwjrdatabase.commit(callback = discardConflictingDocument)
-        self.jsumdatabase.commit()
+        self.jsumdatabase.commit(callback = summaryCallback)
         return
 
+    def loadDocuments(self, couchDbInstance, docIDs):
+        """
+        _loadDocuments_
+
+        Load the given documents from couch with a single _all_docs request,
+        return a dictionary of the documents that exist keyed by id.
+        """
+        docIDs = list(set(docIDs))
+        if len(docIDs) == 0:
+            return {}
+
+        documents = {}
+        result = couchDbInstance.allDocs(options = {"include_docs": True},
+                                         keys = docIDs)
+        for row in result["rows"]:
+            if row.get("doc", None):
+                documents[row["id"]] = row["doc"]
+
+        return documents
+
     def persist(self, jobs, newstate, oldstate):
         """
         _persist_
@@ -5,12 +5,14 @@ Utilities for reporting information to the dashboard
 """
 
 import time
+import Queue
 import logging
+import threading
 
 from WMCore import __version__
 from WMCore.WMException                     import WMException
 from WMCore.DataStructs.WMObject import WMObject
-from WMCore.Services.Dashboard.DashboardAPI import apmonSend, apmonFree
+from WMCore.Services.Dashboard.DashboardAPI import apmonSend, apmonFree, getApmonInstance
 
 class DashboardReporterException(WMException):
     """
@@ -22,6 +24,165 @@ class DashboardReporterException(WMException):
     pass
 
 
+class DashboardSender(object):
+    """
+    _DashboardSender_
+
+    Long lived sender shared by the dashboard reporters of a process.
+
+    The packages are queued and a background thread sends them in batches
+    through a single ApMon instance, instead of creating and freeing one for
+    every package.  When the queue is full the new packages are dropped, the
+    dashboard reporting must never hold back the job state changes.
+    Reporters sending directly free the ApMon instance after every job, so
+    they must not be mixed with a sender in the same process.
+    """
+
+    def __init__(self, queueSize = 10000, batchSize = 100, maxMsgRate = 10000):
+        self.queue = Queue.Queue(queueSize)
+        self.batchSize = batchSize
+        self.maxMsgRate = maxMsgRate
+        self.apmonServer = None
+
+        self.lock = threading.Lock()
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+
+        self.thread = threading.Thread(target = self.run,
+                                       name = "DashboardSender")
+        self.thread.setDaemon(True)
+        return
+
+    def start(self):
+        """
+        _start_
+
+        Start sending the queued packages.
+        """
+        self.thread.start()
+        return
+
+    def send(self, apmonServer, taskId, jobId, package):
+        """
+        _send_
+
+        Queue a package, return False if it was dropped.
+        """
+        try:
+            self.queue.put_nowait((apmonServer, taskId, jobId, package))
+        except Queue.Full:
+            with self.lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def flush(self):
+        """
+        _flush_
+
+        Wait until all the queued packages were sent.
+        """
+        self.queue.join()
+        return
+
+    def counters(self):
+        """
+        _counters_
+
+        Number of packages waiting, sent, dropped because the queue was full
+        and that failed to be sent.
+        """
+        with self.lock:
+            return {'queued': self.queue.qsize(), 'sent': self.sent,
+                    'dropped': self.dropped, 'failed': self.failed}
+
+    def getBatch(self):
+        """
+        _getBatch_
+
+        Wait for a package and take up to batchSize of them from the queue.
+        """
+        batch = [self.queue.get()]
+        while len(batch) < self.batchSize:
+            try:
+                batch.append(self.queue.get_nowait())
+            except Queue.Empty:
+                break
+        return batch
+
+    def sendBatch(self, batch):
+        """
+        _sendBatch_
+
+        Send the packages with the ApMon instance of the module, return the
+        number of them that were sent.
+        """
+        sent = 0
+        for apmonServer, taskId, jobId, package in batch:
+            if apmonServer != self.apmonServer:
+                # The ApMon instance only sends to its own destination
+                apmonFree()
+                self.apmonServer = apmonServer
+
+            # ApMon slows down above maxMsgRate messages per second, which
+            # a short lived instance never reaches
+            apm = getApmonInstance(logging, apmonServer)
+            if apm != None:
+                apm.maxMsgRate = self.maxMsgRate
+
+            result = apmonSend(taskid = taskId, jobid = jobId,
+                               params = package, logr = logging,
+                               apmonServer = apmonServer)
+            if result != 0:
+                logging.error("Error %i sending info for %s via UDP" % (result, jobId))
+                logging.debug("Package sent: %s\n" % package)
+                # Try a new instance with the next package
+                apmonFree()
+                continue
+            sent += 1
+        return sent
+
+    def run(self):
+        """
+        _run_
+
+        Send the queued packages until the process ends.
+        """
+        while True:
+            batch = self.getBatch()
+            try:
+                sent = self.sendBatch(batch)
+            except Exception, ex:
+                logging.error("Error sending %i packages to the dashboard: %s" \
+                              % (len(batch), str(ex)))
+                apmonFree()
+                sent = 0
+
+            with self.lock:
+                self.sent += sent
+                self.failed += len(batch) - sent
+            for _ in batch:
+                self.queue.task_done()
+
+
+_senderLock = threading.Lock()
+_sender = None
+
+def getDashboardSender(queueSize = 10000, batchSize = 100, maxMsgRate = 10000):
+    """
+    _getDashboardSender_
+
+    Return the sender of the process, start it the first time.
+    """
+    global _sender
+    with _senderLock:
+        if _sender == None:
+            _sender = DashboardSender(queueSize, batchSize, maxMsgRate)
+            _sender.start()
+    return _sender
+
+
 class DashboardReporter(WMObject):
     """
     _DashboardReporter_
@@ -34,11 +195,17 @@ class DashboardReporter(WMObject):
 
         #Have to default this to the local host otherwise a lot of unit tests
         #die
+        self.sender = None
         if hasattr(config, 'DashboardReporter'):
             self.destHost = getattr(self.config.DashboardReporter, 'dashboardHost',
                                '127.0.0.1')
             self.destPort = getattr(self.config.DashboardReporter, 'dashboardPort',
                                8884)
+            if getattr(self.config.DashboardReporter, 'sendInBackground', False):
+                self.sender = getDashboardSender(
+                    queueSize = getattr(self.config.DashboardReporter, 'queueSize', 10000),
+                    batchSize = getattr(self.config.DashboardReporter, 'batchSize', 100),
+                    maxMsgRate = getattr(self.config.DashboardReporter, 'maxMsgRate', 10000))
         else:
             self.destHost = '127.0.0.1'
             self.destPort = 8884
@@ -48,6 +215,40 @@ class DashboardReporter(WMObject):
         self.taskPrefix = 'wmagent_'
         self.tsFormat = '%Y-%m-%d %H:%M:%S'
 
+    def sendPackage(self, taskId, jobId, package, description):
+        """
+        _sendPackage_
+
+        Send a package to the dashboard, or queue it in the background
+        sender if there is one.
+        """
+        if self.sender != None:
+            self.sender.send(self.serverreport, taskId, jobId, package)
+            return
+
+        result = apmonSend(taskid = taskId, jobid = jobId, params = package,
+                           logr = logging, apmonServer = self.serverreport)
+        if result != 0:
+            msg = "Error %i sending info for %s via UDP\n" % (result, description)
+            msg += "Ignoring"
+            logging.error(msg)
+            logging.debug("Package sent: %s\n" % package)
+            logging.debug("Host info: host %s, port %s" \
+                          % (self.destHost,
+                             self.destPort))
+        return
+
+    def freeApmon(self):
+        """
+        _freeApmon_
+
+        Free the ApMon instance after sending directly, the background
+        sender keeps its instance.
+        """
+        if self.sender == None:
+            apmonFree()
+        return
+
     def handleCreated(self, jobs):
         """
         _handleCreated_
@@ -84,21 +285,9 @@ class DashboardReporter(WMObject):
                                                     'NotAvailable')
 
             logging.debug("Sending: %s" % str(package))
-            result = apmonSend(taskid = package['taskId'],
-                               jobid = package['jobId'],
-                               params = package,
-                               logr = logging,
-                               apmonServer = self.serverreport)
-            if result != 0:
-                msg = "Error %i sending info for submitted job %s via UDP\n" \
-                      % (result, job['name'])
-                msg += "Ignoring"
-                logging.error(msg)
-                logging.debug("Package sent: %s\n" % package)
-                logging.debug("Host info: host %s, port %s" \
-                              % (self.destHost,
-                                 self.destPort))
-            apmonFree()
+            self.sendPackage(package['taskId'], package['jobId'], package,
+                             "submitted job %s" % job['name'])
+            self.freeApmon()
 
         return
 
@@ -140,22 +329,9 @@ class DashboardReporter(WMObject):
                 package['scheduler']     = job['plugin'][:-6]
 
             logging.debug("Sending: %s" % str(package))
-            result = apmonSend(taskid = package['taskId'],
-                               jobid = package['jobId'],
-                               params = package,
-                               logr = logging,
-                               apmonServer = self.serverreport)
-
-            if result != 0:
-                msg =  "Error %i sending info for submitted job %s via UDP\n" \
-                        % (result, job['name'])
-                msg += "Ignoring"
-                logging.error(msg)
-                logging.debug("Package sent: %s\n" % package)
-                logging.debug("Host info: host %s, port %s" \
-                              % (self.destHost,
-                                 self.destPort))
-            apmonFree()
+            self.sendPackage(package['taskId'], package['jobId'], package,
+                             "submitted job %s" % job['name'])
+            self.freeApmon()
 
             if 'fwjr' in job:
                 self.handleSteps(job)
@@ -199,20 +375,9 @@ class DashboardReporter(WMObject):
 
 
             logging.debug("Sending step info: %s" % str(package))
-            result = apmonSend(taskid = package['taskId'],
-                               jobid = package['jobId'], params = package,
-                               logr = logging, apmonServer = self.serverreport)
-
-            if result != 0:
-                msg =  "Error %i sending info for completed job %s via UDP\n" \
-                        % (result, job['name'])
-                msg += "Ignoring"
-                logging.error(msg)
-                logging.debug("Package sent: %s\n" % package)
-                logging.debug("Host info: host %s, port %s" \
-                              % (self.destHost,
-                                 self.destPort))
-        apmonFree()
+            self.sendPackage(package['taskId'], package['jobId'], package,
+                             "completed job %s" % job['name'])
+        self.freeApmon()
 
         return
 
@@ -360,17 +525,6 @@ class DashboardReporter(WMObject):
 
         logging.info("Sending %s info" % taskName)
         logging.debug("Sending task info: %s" % str(package))
-        result = apmonSend(taskid = package['TaskName'],
-                           jobid = package['JobName'], params = package,
-                           logr = logging, apmonServer = self.serverreport)
-
-        if result != 0:
-            msg =  "Error %i sending info for new task %s via UDP\n" % (result,
-                                                                        taskName)
-            msg += "Ignoring"
-            logging.error(msg)
-            logging.debug("Package sent: %s\n" % package)
-            logging.debug("Host info: host %s, port %s" \
-                          % (self.destHost,
-                             self.destPort))
-        apmonFree()
+        self.sendPackage(package['TaskName'], package['JobName'], package,
+                         "new task %s" % taskName)
+        self.freeApmon()
@@ -5,11 +5,13 @@ _SiteDB_
 API for dealing with retrieving information from SiteDB
 
 """
-from WMCore.Services.Service import Service
+from WMCore.Services.Service import Service, cache_expired, isfile
 from WMCore.Services.EmulatorSwitch import emulatorHook
 
 import json
 import re
+import time
+import threading
 
 def row2dict(columns, row):
     """Convert rows to dictionaries with column keys from description"""
@@ -37,6 +39,10 @@ class SiteDBJSON(Service):
         config['endpoint'] = "https://cmsweb.cern.ch/sitedb/data/prod/"
         Service.__init__(self, config)
 
+        self.indexes = None
+        self.indexTime = 0
+        self.indexLock = threading.Lock()
+
     def getJSON(self, callname, file = 'result.json', clearCache = False, verb = 'GET', data={}):
         """
         _getJSON_
@@ -90,6 +96,79 @@ class SiteDBJSON(Service):
         file = 'site-resources.json'
         return self.getJSON('site-resources', file=file)
 
+    def _indexesExpired(self):
+        """
+        _indexesExpired_
+
+        The indexes expire with the cached site names and resources, if
+        they aren't cached on disk they expire after cacheduration hours.
+        """
+        if self.indexes == None:
+            return True
+        for cachefile in ['site-names.json', 'site-resources.json']:
+            cachefile = self.cacheFileName(cachefile)
+            if isfile(cachefile):
+                return time.time() > self.indexTime + self['cacheduration'] * 3600
+            if cache_expired(cachefile):
+                return True
+        return False
+
+    def _buildIndexes(self, sitenames, siteresources):
+        """
+        _buildIndexes_
+
+        Build the name mapping dictionaries from the site names and
+        resources:
+          se: SE name -> CMS names
+          ce: CE name -> CMS names
+          cms: CMS name -> PhEDEx nodes
+        """
+        cmsBySite = {}
+        phedexBySite = {}
+        for sitename in sitenames:
+            if sitename['type'] == 'cms':
+                cmsBySite.setdefault(sitename['site_name'], []).append(sitename['alias'])
+            elif sitename['type'] == 'phedex':
+                phedexBySite.setdefault(sitename['site_name'], []).append(sitename['alias'])
+
+        indexes = {'se': {}, 'ce': {}, 'cms': {}}
+        for resource in siteresources:
+            if resource['type'] == 'SE':
+                index = indexes['se']
+            elif resource['type'] == 'CE':
+                index = indexes['ce']
+            else:
+                continue
+            cmsNames = index.setdefault(resource['fqdn'], [])
+            for cmsName in cmsBySite.get(resource['site_name'], []):
+                if not cmsName in cmsNames:
+                    cmsNames.append(cmsName)
+
+        for siteName, cmsNames in cmsBySite.items():
+            for cmsName in cmsNames:
+                indexes['cms'].setdefault(cmsName, phedexBySite.get(siteName, []))
+
+        return indexes
+
+    def _getIndexes(self):
+        """
+        _getIndexes_
+
+        Return the name mapping indexes, rebuilding them if the cached site
+        information expired.  The new indexes replace the old ones in one go
+        so callers never see a partial index.
+        """
+        if self._indexesExpired():
+            self.indexLock.acquire()
+            try:
+                if self._indexesExpired():
+                    self.indexes = self._buildIndexes(self._sitenames(),
+                                                      self._siteresources())
+                    self.indexTime = time.time()
+            finally:
+                self.indexLock.release()
+        return self.indexes
+
     def dnUserName(self, dn):
         """
         Convert DN to Hypernews name. Clear cache between trys
@@ -184,47 +263,50 @@ class SiteDBJSON(Service):
 
     def ceToCMSName(self, ce):
         """
-        Convert SE name to the CMS Site they belong to,
+        Convert CE name to the CMS Site they belong to,
         this is not a 1-to-1 relation but 1-to-many, return a list of cms site alias
         """
-        try:
-            siteresources = filter(lambda x: x['fqdn']==ce, self._siteresources())
-        except IndexError:
-            return None
-        siteNames = []
-        for resource in siteresources:
-            siteNames.extend(self._sitenames(sitename=resource['site_name']))
-        cmsname = filter(lambda x: x['type']=='cms', siteNames)
-        return [x['alias'] for x in cmsname]
+        return list(self._getIndexes()['ce'].get(ce, []))
+
+    def ceToCMSNames(self, ces):
+        """
+        Convert a list of CE names to a dict of CE name to the CMS sites
+        they belong to
+        """
+        index = self._getIndexes()['ce']
+        return dict([(ce, list(index.get(ce, []))) for ce in ces])
 
     def seToCMSName(self, se):
         """
         Convert SE name to the CMS Site they belong to,
         this is not a 1-to-1 relation but 1-to-many, return a list of cms site alias
         """
-        try:
-            siteresources = filter(lambda x: x['fqdn']==se, self._siteresources())
-        except IndexError:
-            return None
-        siteNames = []
-        for resource in siteresources:
-            siteNames.extend(self._sitenames(sitename=resource['site_name']))
-        cmsname = filter(lambda x: x['type']=='cms', siteNames)
-        return [x['alias'] for x in cmsname]
+        return list(self._getIndexes()['se'].get(se, []))
+
+    def seToCMSNames(self, ses):
+        """
+        Convert a list of SE names to a dict of SE name to the CMS sites
+        they belong to
+        """
+        index = self._getIndexes()['se']
+        return dict([(se, list(index.get(se, []))) for se in ses])
 
 
     def cmsNametoPhEDExNode(self, cmsName):
         """
         Convert CMS name to list of Phedex Nodes
         """
-        sitenames = self._sitenames()
-        try:
-            sitename = filter(lambda x: x['type']=='cms' and x['alias']==cmsName, sitenames)[0]['site_name']
-        except IndexError:
+        phedexnames = self._getIndexes()['cms'].get(cmsName, None)
+        if phedexnames == None:
             return None
-        phedexnames = filter(lambda x: x['type']=='phedex' and x['site_name']==sitename, sitenames)
-        phedexnames = map(lambda x: x['alias'], phedexnames)
-        return phedexnames
+        return list(phedexnames)
+
+    def cmsNamestoPhEDExNodes(self, cmsNames):
+        """
+        Convert a list of CMS names to a dict of CMS name to the list of
+        Phedex Nodes, None for unknown CMS names
+        """
+        return dict([(x, self.cmsNametoPhEDExNode(x)) for x in cmsNames])
 
 
     def phEDExNodetocmsName(self, node):
@@ -249,3 +331,9 @@ class SiteDBJSON(Service):
 #        # need to call CMSNametoPhEDExNode?cms_name= but can't find a way to do
 #        # that. So simply raise an error
 #        raise ValueError, "Unable to find CMS name for \'%s\'" % node
+
+    def phEDExNodestocmsNames(self, nodes):
+        """
+        Convert a list of PhEDEx node names to a dict of node name to cms site
+        """
+        return dict([(x, self.phEDExNodetocmsName(x)) for x in nodes])
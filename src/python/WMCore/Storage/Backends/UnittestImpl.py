@@ -8,11 +8,47 @@ Couple of test implementations for unittests
 
 import os
 import os.path
+import time
+import threading
 
 from WMCore.Storage.Registry import registerStageOutImpl
 from WMCore.Storage.StageOutImpl import StageOutImpl
 from WMCore.Storage.StageOutError import StageOutFailure
 
+class SimulatedTransfers(object):
+    """
+    _SimulatedTransfers_
+
+    Latency added to every transfer of the test plugins and the largest
+    number of transfers that were running at the same time.
+
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self, latency = 0):
+        with self.lock:
+            self.latency = latency
+            self.active = 0
+            self.maxActive = 0
+            self.count = 0
+
+    def transfer(self):
+        with self.lock:
+            self.active += 1
+            self.count += 1
+            self.maxActive = max(self.maxActive, self.active)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+simulatedTransfers = SimulatedTransfers()
+
+
 class WinImpl(StageOutImpl):
     """
     _WinImpl_
@@ -35,6 +71,7 @@ class WinImpl(StageOutImpl):
 
 
     def executeCommand(self, command):
+        simulatedTransfers.transfer()
         return 0
 
 
@@ -62,6 +99,7 @@ class FailImpl(StageOutImpl):
 
 
     def executeCommand(self, command):
+        simulatedTransfers.transfer()
         msg = "FailImpl returns FAIL!!!"
         raise StageOutFailure( msg)
 
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+_ConcurrentStageOut_
+
+Helpers used by StageOutMgr and FileManager to stage out a list of files
+with a bounded number of concurrent transfers.
+
+Each file goes through the usual stage out of the manager (local stage out,
+retries, fallbacks) in one of the threads of a pool, the number of
+transfers running at the same time with the same backend (stage out
+command) can be limited further with BackendSlots.
+"""
+
+import threading
+
+from WMCore.ThreadPool.WorkQueue import ThreadPool
+
+
+class _NoSlot(object):
+    """
+    _NoSlot_
+
+    Context manager that doesn't limit anything.
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class BackendSlots(object):
+    """
+    _BackendSlots_
+
+    One semaphore per backend, a transfer holds a slot of its backend while
+    it runs.  Without a limit the slots don't block.
+    """
+    def __init__(self, maxPerBackend = None):
+        self.maxPerBackend = maxPerBackend
+        self.lock = threading.Lock()
+        self.semaphores = {}
+        return
+
+    def slot(self, command):
+        """
+        _slot_
+
+        Return the context manager to hold while transferring with command.
+        """
+        if not self.maxPerBackend:
+            return _NoSlot()
+
+        with self.lock:
+            if not command in self.semaphores:
+                self.semaphores[command] = threading.BoundedSemaphore(self.maxPerBackend)
+            return self.semaphores[command]
+
+
+def stageFiles(stageFunction, filesToStage, maxConcurrent):
+    """
+    _stageFiles_
+
+    Call stageFunction for every file, in at most maxConcurrent threads.
+    Return a list of (file, exception) tuples in the order of the files,
+    the exception is None for the files that were staged.
+    """
+    def stageOne(fileToStage):
+        try:
+            stageFunction(fileToStage)
+        except Exception, ex:
+            return ex
+        return None
+
+    nThreads = min(maxConcurrent, len(filesToStage))
+    if nThreads <= 1:
+        return [(x, stageOne(x)) for x in filesToStage]
+
+    pool = ThreadPool([stageOne] * nThreads)
+    for index, fileToStage in enumerate(filesToStage):
+        pool.enqueue(index, fileToStage)
+
+    errors = {}
+    for index, error in pool:
+        errors[index] = error
+
+    return [(x, errors[i]) for i, x in enumerate(filesToStage)]
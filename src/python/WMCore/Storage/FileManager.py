@@ -8,6 +8,7 @@ Refactoring of StageOutMgr -- for now, not accessed by default
 """
 
 import os
+import copy
 import logging
 log = logging
 import traceback
@@ -19,6 +20,7 @@ from WMCore.Storage.StageOutError import StageOutInitError
 from WMCore.Storage.DeleteMgr import DeleteMgr
 from WMCore.Storage.Registry import retrieveStageOutImpl, RegistryError
 from WMCore.Storage.SiteLocalConfig import loadSiteLocalConfig
+from WMCore.Storage.ConcurrentStageOut import BackendSlots, stageFiles
 
 import WMCore.Storage.Backends
 import WMCore.Storage.Plugins
@@ -57,6 +59,7 @@ class FileManager:
         self.tfc = None
         self.numberOfRetries = numberOfRetries
         self.retryPauseTime = retryPauseTime
+        self.backendSlots = BackendSlots()
 
         if overrideParams != {}:
             log.critical("Override: %s" % overrideParams)
@@ -298,6 +301,43 @@ class FileManager:
     def stageOut(self,fileToStage):
         return self.stageFile(fileToStage, stageOut=True)
 
+    def stageOutFiles(self, filesToStage, maxConcurrent = 4, maxPerBackend = None):
+        """
+        _stageOutFiles_
+
+        Stage out a list of files with at most maxConcurrent transfers at
+        the same time and at most maxPerBackend transfers using the same
+        command.  Each file goes through all the stage out methods and
+        retries like with stageOut.
+
+        The failed files are kept in failed, once all the transfers are done
+        the exception of the first one is raised.  Return the list of staged
+        out files otherwise.
+        """
+        def stageOutCopy(fileToStage):
+            # stageFile keeps its first exception in the object, each file
+            # gets a shallow copy sharing completedFiles and the slots
+            return copy.copy(self).stageFile(fileToStage, stageOut = True)
+
+        self.backendSlots = BackendSlots(maxPerBackend)
+        try:
+            results = stageFiles(stageOutCopy, filesToStage, maxConcurrent)
+        finally:
+            self.backendSlots = BackendSlots()
+
+        firstException = None
+        for fileToStage, ex in results:
+            if ex == None:
+                continue
+            log.error("Stage out failed for %s" % fileToStage['LFN'])
+            self.failed[fileToStage['LFN']] = ex
+            if firstException == None:
+                firstException = ex
+
+        if firstException != None:
+            raise firstException
+        return [x[0] for x in results]
+
     def _doTransfer(self, currentMethod, methodCounter, localFileName, pfn, stageOut):
         """
         performs a transfer using a selected method and retries.
@@ -324,14 +364,16 @@ class FileManager:
                 logging.error("Tried to load stageout backend %s, a new version isn't there yet" % command)
                 logging.error("Will try to fall back to the oldone, but it's really best to redo it")
                 logging.error("Here goes...")
-                stageOutSlave( protocol, localFileName, pfn, options )
+                with self.backendSlots.slot(command):
+                    stageOutSlave( protocol, localFileName, pfn, options )
                 return pfn
 
             # do the copy. The implementation is responsible for its own verification
             newPfn = None
             try:
                 # FIXME add checksum stuff
-                newPfn = stageOutSlave.doTransfer( localFileName, pfn, stageOut, seName, command, options, protocol, None  )
+                with self.backendSlots.slot(command):
+                    newPfn = stageOutSlave.doTransfer( localFileName, pfn, stageOut, seName, command, options, protocol, None  )
             except StageOutError, ex:
                 log.info("Transfer failed in an expected manner. Exception is:")
                 log.info("%s" % str(ex))
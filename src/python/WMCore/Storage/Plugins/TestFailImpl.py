@@ -13,6 +13,7 @@ import shutil
 
 from WMCore.Storage.StageOutImplV2 import StageOutImplV2
 from WMCore.Storage.StageOutError import StageOutFailure
+from WMCore.Storage.Backends.UnittestImpl import simulatedTransfers
 
 
 
@@ -26,6 +27,7 @@ class TestFailImpl(StageOutImplV2):
     """
 
     def doTransfer(self, lfn, pfn, stageOut, seName, command, options, protocol, checksum  ):
+        simulatedTransfers.transfer()
         raise StageOutFailure("FailImpl returns FAIL!!!")
 
 
@@ -13,6 +13,7 @@ import shutil
 
 from WMCore.Storage.StageOutImplV2 import StageOutImplV2
 from WMCore.Storage.StageOutError import StageOutFailure
+from WMCore.Storage.Backends.UnittestImpl import simulatedTransfers
 
 class TestWinImpl(StageOutImplV2):
     """
@@ -22,6 +23,7 @@ class TestWinImpl(StageOutImplV2):
 
     """
     def doTransfer(self, fromPfn, toPfn, stageOut, seName, command, options, protocol, checksum  ):
+        simulatedTransfers.transfer()
         return "WIN!!!"
 
     def doDelete(self, lfn, pfn, seName, command, options, protocol  ):
@@ -16,6 +16,7 @@ from WMCore.Storage.StageOutError import StageOutFailure
 from WMCore.Storage.StageOutError import StageOutInitError
 from WMCore.Storage.DeleteMgr import DeleteMgr
 from WMCore.Storage.Registry import retrieveStageOutImpl
+from WMCore.Storage.ConcurrentStageOut import BackendSlots, stageFiles
 
 import WMCore.Storage.Backends
 import WMCore.Storage.Plugins
@@ -73,6 +74,7 @@ class StageOutMgr:
 
         self.failed = {}
         self.completedFiles = {}
+        self.backendSlots = BackendSlots()
         return
 
     def initialiseSiteConf(self):
@@ -228,6 +230,39 @@ class StageOutMgr:
 
         raise lastException
 
+    def stageOutFiles(self, filesToStage, maxConcurrent = 4, maxPerBackend = None):
+        """
+        _stageOutFiles_
+
+        Stage out a list of files with at most maxConcurrent transfers at
+        the same time and at most maxPerBackend transfers using the same
+        stage out command.  Each file goes through the local stage out and
+        the fallbacks like with __call__.
+
+        The failed files are kept in failed, once all the transfers are done
+        the exception of the first one is raised.  Return the list of staged
+        out files otherwise.
+
+        """
+        self.backendSlots = BackendSlots(maxPerBackend)
+        try:
+            results = stageFiles(self, filesToStage, maxConcurrent)
+        finally:
+            self.backendSlots = BackendSlots()
+
+        firstException = None
+        for fileToStage, ex in results:
+            if ex == None:
+                continue
+            print "===> Stage Out Failure for file: %s" % fileToStage['LFN']
+            self.failed[fileToStage['LFN']] = ex
+            if firstException == None:
+                firstException = ex
+
+        if firstException != None:
+            raise firstException
+        return [x[0] for x in results]
+
     def fallbackStageOut(self, lfn, localPfn, fbParams, checksums):
         """
         _fallbackStageOut_
@@ -257,7 +292,8 @@ class StageOutMgr:
         impl.retryPause = self.retryPauseTime
 
         try:
-            impl(fbParams['command'], localPfn, pfn, fbParams.get("option", None), checksums)
+            with self.backendSlots.slot(fbParams['command']):
+                impl(fbParams['command'], localPfn, pfn, fbParams.get("option", None), checksums)
         except Exception, ex:
             msg = "Failure for fallback stage out:\n"
             msg += str(ex)
@@ -296,7 +332,8 @@ class StageOutMgr:
         impl.retryPause = self.retryPauseTime
 
         try:
-            impl(protocol, localPfn, pfn, options, checksums)
+            with self.backendSlots.slot(command):
+                impl(protocol, localPfn, pfn, options, checksums)
         except Exception, ex:
             msg = "Failure for local stage out:\n"
             msg += str(ex)
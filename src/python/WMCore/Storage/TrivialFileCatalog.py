@@ -22,6 +22,12 @@ Usage: Given a TFC constact string: trivialcatalog_file:/path?protocol=proto
 
     pfn = tfcInstance.matchLFN(protocol, lfn)
 
+    pfns = tfcInstance.matchLFNs(protocol, [lfn])
+
+
+The mappings are compiled into one ordered rule table per protocol on first
+use and the results are kept in a bounded cache, so that matching the
+same paths again doesn't go through the regular expressions.
 
 """
 
@@ -42,12 +48,47 @@ class TrivialFileCatalog(dict):
     Object that can map LFNs to PFNs based on contents of a Trivial
     File Catalog
     """
+    # Maximum number of matching results kept in the cache
+    cacheSize = 100000
 
     def __init__(self):
         dict.__init__(self)
         self['lfn-to-pfn'] = []
         self['pfn-to-lfn'] = []
         self.preferredProtocol = None # attribute for preferred protocol
+        self._resetCompiled()
+
+
+    def _resetCompiled(self):
+        """
+        _resetCompiled_
+
+        Drop the compiled rule tables and the cached results, they are
+        rebuilt on the next match.
+
+        The cache has two generations of at most cacheSize / 2 results,
+        hits in the old generation are moved to the new one and the old
+        generation is dropped when the new one is full.
+        """
+        self._rules = {}
+        self._results = {}
+        self._oldResults = {}
+        self._compiledSizes = None
+
+
+    def __getstate__(self):
+        """
+        Don't pickle the rule tables and the cache.
+        """
+        state = self.__dict__.copy()
+        for key in ["_rules", "_results", "_oldResults", "_compiledSizes"]:
+            state.pop(key, None)
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._resetCompiled()
 
 
     def addMapping(self, protocol, match, result,
@@ -65,6 +106,62 @@ class TrivialFileCatalog(dict):
         entry.setdefault("result", result)
         entry.setdefault("chain", chain)
         self[mapping_type].append(entry)
+        self._resetCompiled()
+
+
+    def _getRules(self, protocol, style):
+        """
+        _getRules_
+
+        Return the compiled rule table of a protocol, a list of
+        (combined expression, group map, rules) segments.  Each rule is a
+        (regular expression, result, chain, has groups) tuple.
+
+        Consecutive rules without a chain are combined into one alternation
+        that is matched in a single pass, the group map gives the rule that
+        matched for each alternative.  Chained rules and the rules that
+        can't be combined have a segment of their own without a combined
+        expression.
+        """
+        sizes = (len(self['lfn-to-pfn']), len(self['pfn-to-lfn']))
+        if sizes != self._compiledSizes:
+            # Mappings were added to the lists without addMapping
+            self._resetCompiled()
+            self._compiledSizes = sizes
+
+        table = self._rules.get((style, protocol), None)
+        if table is None:
+            rules = [(x['path-match-expr'], x['result'], x['chain'],
+                      x['path-match-expr'].groups > 0)
+                     for x in self[style] if x['protocol'] == protocol]
+            table = _compileRules(rules)
+            self._rules[(style, protocol)] = table
+        return table
+
+
+    def _matchRules(self, rules, path, caller):
+        """
+        _matchRules_
+
+        Try the rules one after the other, return the result of the first
+        one that matches or None.
+        """
+        for matchExpr, mappingResult, chain, hasGroups in rules:
+            if chain != None:
+                matchedPath = caller(chain, path)
+                if not matchedPath:
+                    continue
+            elif matchExpr.match(path):
+                matchedPath = path
+            else:
+                continue
+
+            splitPath = matchExpr.split(matchedPath, 1)
+            if len(splitPath) < 2:
+                continue
+            return mappingResult.replace("$1", splitPath[1])
+
+        return None
 
 
     def _doMatch(self, protocol, path, style, caller):
@@ -76,24 +173,39 @@ class TrivialFileCatalog(dict):
         Return None if no match
 
         """
-        for mapping in self[style]:
-            if mapping['protocol'] != protocol:
-                continue
-            if mapping['path-match-expr'].match(path) or mapping["chain"] != None:
-                if mapping["chain"] != None:
-                    oldpath = path
-                    path = caller(mapping["chain"], path)
-                    if not path:
+        table = self._getRules(protocol, style)
+        key = (style, protocol, path)
+        results = self._results
+        if key in results:
+            return results[key]
+
+        if key in self._oldResults:
+            result = self._oldResults[key]
+        else:
+            result = None
+            for combinedExpr, groupMap, rules in table:
+                if combinedExpr is None:
+                    result = self._matchRules(rules, path, caller)
+                else:
+                    match = combinedExpr.match(path)
+                    if not match:
                         continue
-                try:
-                    splitPath = mapping['path-match-expr'].split(path, 1)[1]
-                except IndexError:
-                    path = oldpath
-                    continue
-                result = mapping['result'].replace("$1", splitPath)
-                return result
-
-        return None
+                    index, group = groupMap[match.lastindex]
+                    if match.end() == 0:
+                        # split ignores empty matches, go the slow way
+                        result = self._matchRules(rules[index:], path, caller)
+                    elif group:
+                        result = rules[index][1].replace("$1", match.group(group))
+                    else:
+                        result = rules[index][1].replace("$1", path[match.end():])
+                if result != None:
+                    break
+
+        results[key] = result
+        if len(results) >= self.cacheSize // 2:
+            self._oldResults = results
+            self._results = {}
+        return result
 
 
     def matchLFN(self, protocol, lfn):
@@ -110,6 +222,21 @@ class TrivialFileCatalog(dict):
         return result
 
 
+    def matchLFNs(self, protocol, lfns):
+        """
+        _matchLFNs_
+
+        Match a list of LFNs, return a dictionary of the results keyed by
+        LFN.  The result is None for the LFNs that don't match.
+
+        """
+        result = {}
+        for lfn in lfns:
+            if not lfn in result:
+                result[lfn] = self._doMatch(protocol, lfn, "lfn-to-pfn", self.matchLFN)
+        return result
+
+
     def matchPFN(self, protocol, pfn):
         """
         _matchLFN_
@@ -165,6 +292,54 @@ class TrivialFileCatalog(dict):
         return result
 
 
+# Patterns that can't be combined with others in an alternation: back
+# references and conditionals would refer to the wrong groups
+_TFCGroupReference = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+
+# Python regular expressions can't have more than 100 groups
+_TFCMaxGroups = 99
+
+def _compileRules(rules):
+    """
+    _compileRules_
+
+    Build the segments of the rule table of a protocol, see
+    TrivialFileCatalog._getRules.
+    """
+    table = []
+    current = []
+    def closeSegment():
+        if not current:
+            return
+        patterns = []
+        groupMap = {}
+        nGroups = 0
+        for index, rule in enumerate(current):
+            nGroups += 1
+            patterns.append("(%s)" % rule[0].pattern)
+            groupMap[nGroups] = (index, rule[3] and nGroups + 1 or None)
+            nGroups += rule[0].groups
+        table.append((re.compile("|".join(patterns)), groupMap, list(current)))
+        del current[:]
+
+    groupCount = 0
+    for rule in rules:
+        matchExpr, chain = rule[0], rule[2]
+        if chain != None or matchExpr.flags or matchExpr.groupindex or \
+               _TFCGroupReference.search(matchExpr.pattern):
+            closeSegment()
+            groupCount = 0
+            table.append((None, None, [rule]))
+            continue
+        if groupCount + matchExpr.groups + 1 > _TFCMaxGroups:
+            closeSegment()
+            groupCount = 0
+        current.append(rule)
+        groupCount += matchExpr.groups + 1
+    closeSegment()
+    return table
+
+
 def tfcProtocol(contactString):
     """
     _tfcProtocol_
@@ -48,7 +48,8 @@ class GetCouchID(DBFormatter):
                 binds.append({'jobid': entry})
 
             result = self.dbi.processData(self.bulkSQL, binds, conn = conn,
-                                          transaction = transaction)
+                                          transaction = transaction,
+                                          bulkSelect = True)
 
             return self.formatDict(result)
 
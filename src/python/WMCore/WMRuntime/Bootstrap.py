@@ -138,15 +138,6 @@ def loadJobDefinition():
     it doesn't know the retry_count and will create the wrong file
     """
     sandboxLoc = locateWMSandbox()
-    package = JobPackage()
-    packageLoc = os.path.join(sandboxLoc, "JobPackage.pcl")
-    try:
-        package.load(packageLoc)
-    except Exception, ex:
-        msg = "Failed to load JobPackage:%s\n" % packageLoc
-        msg += str(ex)
-        createErrorReport(exitCode = 11001, errorType = "JobPackageError", errorDetails = msg)
-        raise BootstrapException, msg
 
     try:
         import WMSandbox.JobIndex
@@ -158,13 +149,22 @@ def loadJobDefinition():
 
     index = WMSandbox.JobIndex.jobIndex
 
+    # Only the indexed job is loaded from the package
+    package = JobPackage()
+    packageLoc = os.path.join(sandboxLoc, "JobPackage.pcl")
     try:
-        job = package[index]
-    except Exception, ex:
+        job = package.loadJob(packageLoc, index)
+    except KeyError, ex:
         msg = "Failed to extract Job %i\n" % (index)
         msg += str(ex)
         createErrorReport(exitCode = 11003, errorType = "JobExtractionError", errorDetails = msg)
         raise BootstrapException, msg
+    except Exception, ex:
+        msg = "Failed to load JobPackage:%s\n" % packageLoc
+        msg += str(ex)
+        createErrorReport(exitCode = 11001, errorType = "JobPackageError", errorDetails = msg)
+        raise BootstrapException, msg
+
     diagnostic = """
     Job Index = %s
     Job Instance = %s
@@ -6,6 +6,9 @@ __PerformanceMonitor_
 Monitor object which checks the job to ensure it is working inside
 the agreed limits of virtual memory and wallclock time, and terminate it
 if it exceeds them.
+
+The memory and CPU usage of the step and all its child processes is read
+from /proc, the samples are kept and summarised in the step report.
 """
 
 import os
@@ -15,9 +18,12 @@ import logging
 import traceback
 import time
 
-import WMCore.Algorithms.SubprocessAlgos as subprocessAlgos
+from collections import deque
+
 import WMCore.FwkJobReport.Report        as Report
 
+from WMCore.Algorithms.ProcessSampler           import ProcessSampler
+
 from WMCore.WMRuntime.Monitors.DashboardMonitor import getStepPID
 from WMCore.WMRuntime.Monitors.WMRuntimeMonitor import WMRuntimeMonitor
 from WMCore.WMSpec.Steps.Executor               import getStepSpace
@@ -45,7 +51,7 @@ class PerformanceMonitor(WMRuntimeMonitor):
     """
     _PerformanceMonitor_
 
-    Monitors the performance by pinging ps and
+    Monitors the performance by sampling /proc and
     recording data regarding the current step
     """
 
@@ -57,15 +63,18 @@ class PerformanceMonitor(WMRuntimeMonitor):
 
         self.pid              = None
         self.uid              = os.getuid()
-        self.monitorBase      = "ps -p %i -o pid,ppid,rss,vsize,pcpu,pmem,cmd -ww | grep %i"
-        self.monitorCommand   = None
+        self.sampler          = None
         self.currentStepSpace = None
         self.currentStepName  = None
 
-        self.rss   = []
-        self.vsize = []
-        self.pcpu  = []
-        self.pmem  = []
+        # Rolling time series of the samples and full step summaries
+        self.maxSamples  = 1000
+        self.sampleTimes = deque()
+        self.rss         = deque()
+        self.pss         = deque()
+        self.vsize       = deque()
+        self.pcpu        = deque()
+        self.summary     = {}
 
         self.maxRSS      = None
         self.maxVSize    = None
@@ -97,6 +106,7 @@ class PerformanceMonitor(WMRuntimeMonitor):
         self.maxVSize    = args.get('maxVSize', None)
         self.softTimeout = args.get('softTimeout', None)
         self.hardTimeout = args.get('hardTimeout', None)
+        self.maxSamples  = args.get('maxSamples', 1000)
 
         self.logPath = os.path.join(logPath)
 
@@ -122,6 +132,14 @@ class PerformanceMonitor(WMRuntimeMonitor):
         self.stepHelper = WMStepHelper(step)
         self.currentStepName  = getStepName(step)
         self.currentStepSpace = None
+        self.sampler          = None
+
+        self.sampleTimes = deque(maxlen = self.maxSamples)
+        self.rss         = deque(maxlen = self.maxSamples)
+        self.pss         = deque(maxlen = self.maxSamples)
+        self.vsize       = deque(maxlen = self.maxSamples)
+        self.pcpu        = deque(maxlen = self.maxSamples)
+        self.summary     = {}
 
         if not self.stepHelper.stepType() in self.watchStepTypes:
             self.disableStep = True
@@ -141,13 +159,66 @@ class PerformanceMonitor(WMRuntimeMonitor):
         Package the information and send it off
         """
 
-        if not self.disableStep:
+        if self.disableStep:
             # No information to correlate
             return
 
+        if stepReport != None and len(self.sampleTimes) > 0:
+            try:
+                self.addToReport(stepReport)
+            except Exception, ex:
+                logging.error("Error adding performance figures to the report: %s" % str(ex))
+
         self.currentStepName  = None
         self.currentStepSpace = None
+        self.sampler          = None
+
+        return
 
+    def recordSample(self, sample):
+        """
+        _recordSample_
+
+        Add a sample to the time series and to the step summaries.
+        """
+        self.sampleTimes.append(sample['time'])
+        self.rss.append(sample['rss'])
+        self.pss.append(sample['pss'])
+        self.vsize.append(sample['vsize'])
+        self.pcpu.append(sample['pcpu'])
+
+        for key in ['rss', 'pss', 'vsize', 'pcpu']:
+            if sample[key] == None:
+                continue
+            if not key in self.summary:
+                self.summary[key] = {'min': sample[key], 'max': sample[key],
+                                     'total': 0, 'count': 0}
+            summary = self.summary[key]
+            summary['min'] = min(summary['min'], sample[key])
+            summary['max'] = max(summary['max'], sample[key])
+            summary['total'] += sample[key]
+            summary['count'] += 1
+        return
+
+    def addToReport(self, stepReport):
+        """
+        _addToReport_
+
+        Put the step summaries and the time series in the step report.
+        """
+        setters = {'rss': stepReport.setStepRSS, 'pss': stepReport.setStepPSS,
+                   'vsize': stepReport.setStepVSize, 'pcpu': stepReport.setStepPCPU}
+        for key, summary in self.summary.items():
+            setters[key](stepName = self.currentStepName, min = summary['min'],
+                         max = summary['max'],
+                         average = float(summary['total']) / summary['count'])
+
+        stepReport.setStepPerformanceSeries(stepName = self.currentStepName,
+                                            times = list(self.sampleTimes),
+                                            rss = list(self.rss),
+                                            pss = list(self.pss),
+                                            vsize = list(self.vsize),
+                                            pcpu = list(self.pcpu))
         return
 
 
@@ -183,23 +254,24 @@ class PerformanceMonitor(WMRuntimeMonitor):
             # Then we have no step PID, we can do nothing
             return
 
-        # Now we run the monitor command and collate the data
-        cmd = self.monitorBase % (stepPID, stepPID)
-        stdout, stderr, retcode = subprocessAlgos.runCommand(cmd)
-
-        output = stdout.split()
-        if not len(output) > 7:
-            # Then something went wrong in getting the ps data
-            msg =  "Error when grabbing output from process ps\n"
-            msg += "output = %s\n" % output
-            msg += "command = %s\n" % self.monitorCommand
-            logging.error(msg)
+        # Now we sample the step process tree and collate the data
+        if self.sampler == None or self.sampler.pid != stepPID:
+            self.sampler = ProcessSampler(stepPID)
+        sample = self.sampler.sample()
+        if sample == None:
+            # Then the step process is gone
+            logging.error("Error when sampling process %i: no such process" % stepPID)
             return
-        rss   = float(output[2])
-        vsize = float(output[3])
-        logging.info("Retrieved following performance figures:")
-        logging.info("RSS: %s;  VSize: %s; PCPU: %s; PMEM: %s" % (output[2], output[3],
-                                                                  output[4], output[5]))
+        self.recordSample(sample)
+
+        vsize = sample['vsize']
+        # PSS doesn't count the memory shared between processes several times
+        rss = sample['rss']
+        if sample['pss'] != None:
+            rss = sample['pss']
+        logging.info("Retrieved following performance figures for %i processes:" % sample['processes'])
+        logging.info("RSS: %s;  PSS: %s; VSize: %s; PCPU: %.1f" % (sample['rss'], sample['pss'],
+                                                                   sample['vsize'], sample['pcpu']))
 
         msg = 'Error in CMSSW step %s\n' % self.currentStepName
         if self.maxRSS != None and rss >= self.maxRSS:
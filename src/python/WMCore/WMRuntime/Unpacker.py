@@ -108,8 +108,12 @@ def installPackage(jobArea, jobPackage, jobIndex):
     """
     target = "%s/WMSandbox" % jobArea
     pkgTarget = "%s/JobPackage.pcl" % target
-    #shutil.copy(jobPackage, pkgTarget)
-    os.system("/bin/cp %s %s" % (jobPackage, pkgTarget))
+    # The package holds every job of the batch, link it instead of copying
+    # it when possible, only the indexed job is read at bootstrap
+    try:
+        os.link(os.path.abspath(jobPackage), pkgTarget)
+    except OSError:
+        os.system("/bin/cp %s %s" % (jobPackage, pkgTarget))
 
     indexPy = "%s/JobIndex.py" % target
     handle = open(indexPy, 'w')
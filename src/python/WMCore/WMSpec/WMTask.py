@@ -62,6 +62,10 @@ def buildLumiMask(runs, lumis):
 
 
     lumiLists = [map(list, zip([int(y) for y in x.split(',')][::2], [int(y) for y in x.split(',')][1::2])) for x in lumis]
+    for lumiList in lumiLists:
+        for lumiRange in lumiList:
+            if lumiRange[0] > lumiRange[1]:
+                raise ValueError("Lumi range %s ends before it starts" % lumiRange)
     strRuns = [str(run) for run in runs]
     lumiMask = dict(zip(strRuns, lumiLists))
     return lumiMask
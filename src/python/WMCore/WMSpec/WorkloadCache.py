@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+"""
+_WorkloadCache_
+
+Process wide cache of WMWorkload specs loaded from local files.
+
+Specs are keyed on their path and are reloaded when the modification time or
+the size of the file change.  The least recently used specs are evicted when
+there are too many of them or when the total size of the spec files goes over
+the limit, the size of the pickled spec is used as an estimate of the memory
+used by the loaded workload.  An index of the task path names of every cached
+spec is kept so tasks can be looked up without walking the task tree.
+
+The cached workloads are shared by all the users of the cache and must be
+treated as read only.
+"""
+
+import os
+import time
+import logging
+import threading
+
+from WMCore.WMSpec.WMWorkload import WMWorkload, WMWorkloadHelper
+
+
+class CachedWorkload(object):
+    """
+    _CachedWorkload_
+
+    A loaded workload with the file information used to validate it and the
+    index of its tasks.
+    """
+    def __init__(self, workload, mtime, size):
+        self.workload = workload
+        self.mtime = mtime
+        self.size = size
+        self.lastUsed = 0
+        self.taskIndex = {}
+
+        for topTask in workload.taskIterator():
+            for task in topTask.taskIterator():
+                self.taskIndex[task.getPathName()] = task
+        return
+
+
+class WorkloadCache(object):
+    """
+    _WorkloadCache_
+
+    LRU cache of workloads keyed on the spec path.
+    """
+    def __init__(self, maxEntries = 50, maxSize = 200 * 1024 * 1024):
+        self.maxEntries = maxEntries
+        self.maxSize = maxSize
+        self.entries = {}
+        self.useCount = 0
+        self.totalSize = 0
+        self.lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.loadTime = 0.0
+        return
+
+    def setLimits(self, maxEntries = None, maxSize = None):
+        """
+        _setLimits_
+
+        Change the maximum number of cached specs and their maximum total
+        size in bytes.
+        """
+        with self.lock:
+            if maxEntries != None:
+                self.maxEntries = maxEntries
+            if maxSize != None:
+                self.maxSize = maxSize
+            self._evict()
+        return
+
+    def _evict(self):
+        """
+        _evict_
+
+        Drop the least recently used specs until the cache is within its
+        limits.  The most recently used spec is always kept.
+        """
+        while len(self.entries) > 1 and \
+                  (len(self.entries) > self.maxEntries or self.totalSize > self.maxSize):
+            specPath = min(self.entries, key = lambda x: self.entries[x].lastUsed)
+            entry = self.entries.pop(specPath)
+            self.totalSize -= entry.size
+            self.evictions += 1
+            logging.debug("Evicted workload %s from the cache" % specPath)
+        return
+
+    def _use(self, specPath, entry):
+        """
+        _use_
+
+        Store an entry as the most recently used one.
+        """
+        self.useCount += 1
+        entry.lastUsed = self.useCount
+        self.entries[specPath] = entry
+        return
+
+    def cachedSpecs(self):
+        """
+        _cachedSpecs_
+
+        Return the paths of the cached specs, least recently used first.
+        """
+        with self.lock:
+            return sorted(self.entries, key = lambda x: self.entries[x].lastUsed)
+
+    def _getEntry(self, specPath):
+        """
+        _getEntry_
+
+        Return the cache entry of a spec, loading the spec if it is not cached
+        or if the file changed since it was loaded.
+        """
+        specStat = os.stat(specPath)
+
+        with self.lock:
+            entry = self.entries.pop(specPath, None)
+            if entry != None and entry.mtime == specStat.st_mtime and \
+                   entry.size == specStat.st_size:
+                self.hits += 1
+                self._use(specPath, entry)
+                return entry
+            if entry != None:
+                self.totalSize -= entry.size
+
+            self.misses += 1
+            startTime = time.time()
+            workload = WMWorkloadHelper(WMWorkload("workload"))
+            workload.load(specPath)
+            entry = CachedWorkload(workload, specStat.st_mtime, specStat.st_size)
+            self.loadTime += time.time() - startTime
+
+            self._use(specPath, entry)
+            self.totalSize += entry.size
+            self._evict()
+
+        return entry
+
+    def getWorkload(self, specPath):
+        """
+        _getWorkload_
+
+        Return the workload stored in the spec file.
+        """
+        return self._getEntry(specPath).workload
+
+    def getTask(self, specPath, taskPath):
+        """
+        _getTask_
+
+        Return the task helper of a task given its path name or None if the
+        workload doesn't have such a task.
+        """
+        return self._getEntry(specPath).taskIndex.get(taskPath, None)
+
+    def invalidate(self, specPath):
+        """
+        _invalidate_
+
+        Remove a spec from the cache.
+        """
+        with self.lock:
+            entry = self.entries.pop(specPath, None)
+            if entry != None:
+                self.totalSize -= entry.size
+        return
+
+    def clear(self):
+        """
+        _clear_
+
+        Remove all the specs from the cache and reset the counters.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.totalSize = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.loadTime = 0.0
+        return
+
+    def getStats(self):
+        """
+        _getStats_
+
+        Return the cache counters: hits, misses, evictions, the total time
+        spent loading specs, the number of cached specs and their size.
+        """
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions, "loadTime": self.loadTime,
+                    "entries": len(self.entries), "size": self.totalSize}
+
+
+_workloadCache = WorkloadCache()
+
+def getWorkloadCache():
+    """
+    _getWorkloadCache_
+
+    Return the workload cache of the process.
+    """
+    return _workloadCache
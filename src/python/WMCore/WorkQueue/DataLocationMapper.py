@@ -7,6 +7,7 @@ import logging
 
 from WMCore.WorkQueue.WorkQueueUtils import get_dbs
 from WMCore.WorkQueue.DataStructs.ACDCBlock import ACDCBlock
+from WMCore.ThreadPool.WorkQueue import ThreadPool
 
 #TODO: Combine with existing dls so DBSreader can do this kind of thing transparently
 #TODO: Known Issue: Can't have same item in multiple dbs's at the same time.
@@ -56,9 +57,14 @@ class DataLocationMapper():
         self.params.setdefault('requireBlocksSubscribed', True)
         self.params.setdefault('fullRefreshInterval', 7200)
         self.params.setdefault('updateIntervalCoarseness', UPDATE_INTERVAL_COARSENESS)
+        self.params.setdefault('locationBatchSize', 100)
+        self.params.setdefault('locationThreads', 5)
+        self.params.setdefault('locationRetries', 2)
 
         self.lastFullResync = 0
         self.lastLocationUpdate = 0
+        self.resyncStats = {'items': 0, 'batches': 0, 'retries': 0,
+                            'failedBatches': 0}
 
         validLocationFrom = ('subscription', 'location')
         if self.params['locationFrom'] not in validLocationFrom:
@@ -79,6 +85,8 @@ class DataLocationMapper():
         if not fullResync and now > (self.lastFullResync + self.params['fullRefreshInterval']):
             fullResync = True
 
+        self.resyncStats = {'items': 0, 'batches': 0, 'retries': 0,
+                            'failedBatches': 0}
         dataByDbs = self.organiseByDbs(dataItems)
 
         for dbs, dataItems in dataByDbs.items():
@@ -94,8 +102,80 @@ class DataLocationMapper():
         if fullResync:
             self.lastFullResync = now
 
+        self.resyncStats['fullResync'] = fullResync
+        self.resyncStats['duration'] = time.time() - now
+        logging.info("Location update of %(items)i items in %(batches)i batches took %(duration).1fs (%(retries)i retries, %(failedBatches)i failed batches)" % self.resyncStats)
+
         return result, fullResync
-    
+
+    def runBatches(self, batchFunction, dataItems, clientFactory = None):
+        """
+        _runBatches_
+
+        Split the data items in batches of locationBatchSize items and call
+        batchFunction(client, batch), which returns a dict of name to
+        locations, for every batch.  Only for services that look up a whole
+        batch in one call.  Service clients can't be shared between
+        threads, so the batches are only run on a pool of locationThreads
+        threads if clientFactory is given to make a client for each thread,
+        otherwise they are run one after the other with a None client.
+
+        A batch that fails is retried locationRetries times, if it still
+        fails its items are tried one by one so that a single bad item
+        doesn't lose the whole batch.
+
+        Returns a dict of name to a set of locations.
+        """
+        batchSize = max(self.params['locationBatchSize'], 1)
+        batches = [dataItems[i:i + batchSize] for i in range(0, len(dataItems), batchSize)]
+        self.resyncStats['items'] += len(dataItems)
+        self.resyncStats['batches'] += len(batches)
+
+        def runBatch(client, batch):
+            """
+            Call batchFunction with retries, never raises so that the
+            thread pool can't lose a worker.
+            """
+            retries = 0
+            for attempt in range(self.params['locationRetries'] + 1):
+                try:
+                    return batchFunction(client, batch), retries, False
+                except Exception, ex:
+                    logging.warning('Error getting location for batch of %i items (attempt %i): %s' % \
+                                    (len(batch), attempt + 1, str(ex)))
+                    if attempt < self.params['locationRetries']:
+                        retries += 1
+
+            batchResult = {}
+            for item in batch:
+                try:
+                    batchResult.update(batchFunction(client, [item]))
+                except Exception, ex:
+                    logging.error('Error getting location for %s: %s' % (item, str(ex)))
+            return batchResult, retries, True
+
+        nThreads = min(self.params['locationThreads'], len(batches))
+        if clientFactory and nThreads > 1:
+            slaves = []
+            for i in range(nThreads):
+                slaves.append(lambda batch, client = clientFactory(): runBatch(client, batch))
+            pool = ThreadPool(slaves)
+            for i, batch in enumerate(batches):
+                pool.enqueue(i, batch)
+            batchResults = [x[1] for x in pool]
+        else:
+            batchResults = [runBatch(None, x) for x in batches]
+
+        result = defaultdict(set)
+        for batchResult, retries, failed in batchResults:
+            self.resyncStats['retries'] += retries
+            if failed:
+                self.resyncStats['failedBatches'] += 1
+            for name, locations in batchResult.items():
+                result[name].update(locations)
+
+        return result
+
     def locationsFromPhEDEx(self, dataItems, fullResync = False,
                             datasetSearch = False):
         """Get data location from phedex"""
@@ -103,7 +183,6 @@ class DataLocationMapper():
             # subscription api doesn't support partial update
             result, fullResync = self.phedex.getSubscriptionMapping(*dataItems), True
         elif self.params['locationFrom'] == 'location':
-            result = defaultdict(set)
             args = {}
             if not self.params['incompleteBlocks']:
                 args['complete'] = 'y'
@@ -111,32 +190,44 @@ class DataLocationMapper():
                 args['subscribed'] = 'y'
             if not fullResync and self.lastLocationUpdate:
                 args['update_since'] = timeFloor(self.lastLocationUpdate, self.params['updateIntervalCoarseness'])
-            for dataItem in dataItems:
-                try:
+
+            def replicaInfo(phedex, batch):
+                """Get the replicas of a batch of blocks or datasets"""
+                batchResult = defaultdict(set)
+                phedex = phedex or self.phedex
+                if datasetSearch:
+                    response = phedex.getReplicaInfoForBlocks(dataset = batch, **args)['phedex']
+                else:
+                    response = phedex.getReplicaInfoForBlocks(block = batch, **args)['phedex']
+                for block in response['block']:
+                    nodes = [se['node'] for se in block['replica']]
                     if datasetSearch:
-                        response = self.phedex.getReplicaInfoForBlocks(dataset = [dataItem], **args)['phedex']
+                        batchResult[block['name'].split('#')[0]].update(nodes)
                     else:
-                        response = self.phedex.getReplicaInfoForBlocks(block = [dataItem], **args)['phedex']
-                    for block in response['block']:
-                        nodes = [se['node'] for se in block['replica']]
-                        if datasetSearch:
-                            result[dataItem].update(nodes)
-                        else:
-                            result[block['name']].update(nodes)
-                except Exception, ex:
-                    logging.error('Error getting block location from phedex for %s: %s' % (dataItem, str(ex)))
+                        batchResult[block['name']].update(nodes)
+                return batchResult
+
+            result = self.runBatches(replicaInfo, dataItems,
+                                     self.params.get('phedexFactory'))
         else:
             raise RuntimeError, "shouldn't get here"
 
         # convert from PhEDEx name to cms site name
+        allNodes = set()
+        for nodes in result.values():
+            allNodes.update(nodes)
+        cmsNames = self.sitedb.phEDExNodestocmsNames(list(allNodes))
         for name, nodes in result.items():
-            result[name] = list(set([self.sitedb.phEDExNodetocmsName(x) for x in nodes]))
+            result[name] = list(set([cmsNames[x] for x in nodes]))
 
         return result, fullResync
 
     def locationsFromDBS(self, dbs, dataItems,
                          datasetSearch = False):
         """Get data location from dbs"""
+        # dbs is asked one item at a time, so there are no batches to retry
+        # and a failure only loses its own item
+        self.resyncStats['items'] += len(dataItems)
         result = defaultdict(set)
         for item in dataItems:
             try:
@@ -144,8 +235,8 @@ class DataLocationMapper():
                     seNames = dbs.listDatasetLocation(item, dbsOnly = True)
                 else:
                     seNames = dbs.listFileBlockLocation(item, dbsOnly = True)
-                for se in seNames:
-                    result[item].update(self.sitedb.seToCMSName(se))
+                for cmsNames in self.sitedb.seToCMSNames(seNames).values():
+                    result[item].update(cmsNames)
             except Exception, ex:
                 logging.error('Error getting block location from dbs for %s: %s' % (item, str(ex)))
 
@@ -117,6 +117,8 @@ class WorkQueue(WorkQueueBase):
         self.params.setdefault('QueueDepth', 0.5) # when less than this locally
         self.params.setdefault('LocationRefreshInterval', 600)
         self.params.setdefault('FullLocationRefreshInterval', 7200)
+        self.params.setdefault('LocationBatchSize', 100)
+        self.params.setdefault('LocationThreads', 5)
         self.params.setdefault('TrackLocationOrSubscription', 'subscription')
         self.params.setdefault('ReleaseIncompleteBlocks', False)
         self.params.setdefault('ReleaseRequireSubscribed', True)
@@ -177,13 +179,16 @@ class WorkQueue(WorkQueueBase):
             if self.params['SplittingMapping']['DatasetBlock']['name'] != 'Block':
                 raise RuntimeError, 'Only blocks can be released on location'
 
+        phedexFactory = None
         if self.params.get('PhEDEx'):
             self.phedexService = self.params['PhEDEx']
         else:
             phedexArgs = {}
             if self.params.get('PhEDExEndpoint'):
                 phedexArgs['endpoint'] = self.params['PhEDExEndpoint']
-            self.phedexService = PhEDEx(phedexArgs)
+            self.phedexService = PhEDEx(dict(phedexArgs))
+            # location lookups use a client per thread
+            phedexFactory = lambda: PhEDEx(dict(phedexArgs))
 
         if self.params.get('SiteDB'):
             self.SiteDB = self.params['SiteDB']
@@ -196,12 +201,15 @@ class WorkQueue(WorkQueueBase):
 
         self.dataLocationMapper = WorkQueueDataLocationMapper(self.logger, self.backend,
                                                               phedex = self.phedexService,
+                                                              phedexFactory = phedexFactory,
                                                               sitedb = self.SiteDB,
                                                               locationFrom = self.params['TrackLocationOrSubscription'],
                                                               incompleteBlocks = self.params['ReleaseIncompleteBlocks'],
                                                               requireBlocksSubscribed = not self.params['ReleaseIncompleteBlocks'],
                                                               fullRefreshInterval = self.params['FullLocationRefreshInterval'],
-                                                              updateIntervalCoarseness = self.params['LocationRefreshInterval'])
+                                                              updateIntervalCoarseness = self.params['LocationRefreshInterval'],
+                                                              locationBatchSize = self.params['LocationBatchSize'],
+                                                              locationThreads = self.params['LocationThreads'])
 
         # initialize alerts sending client (self.sendAlert() method)
         # usage: self.sendAlert(levelNum, msg = msg) ; level - integer 1 .. 10
@@ -45,13 +45,19 @@ def sitesFromStorageEelements(ses):
         from WMCore.Services.SiteDB.SiteDB import SiteDBJSON as SiteDB
         __sitedb = SiteDB()
     result = set()
-    for se in ses:
-        try:
-            sites = __sitedb.seToCMSName(se)
-        except:
-            print "Unable to get site name for %s" % se
-        else:
-            result.update(sites)
+    try:
+        sitesBySE = __sitedb.seToCMSNames(ses)
+    except Exception, ex:
+        # Look the SEs up one by one so a failure only loses its own SE
+        logging.error("Unable to get site names for %s: %s" % (ses, str(ex)))
+        sitesBySE = {}
+        for se in ses:
+            try:
+                sitesBySE[se] = __sitedb.seToCMSName(se)
+            except Exception, ex:
+                logging.error("Unable to get site name for %s: %s" % (se, str(ex)))
+    for sites in sitesBySE.values():
+        result.update(sites)
     return list(result)
 
 __cmsSiteNames = []
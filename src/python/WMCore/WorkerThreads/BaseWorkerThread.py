@@ -6,6 +6,11 @@ _BaseWorkerThread_
 Base class for all regular worker threads managed by WorkerThreadManager.
 Deriving classes should override algorithm, and optionally setup and terminate
 to perform thread-specific setup and clean-up operations
+
+Workers added with a maxIdleTime poll adaptively: algorithm can return whether
+it found work (None means it doesn't tell), the sleep time doubles after every
+cycle without work up to maxIdleTime and goes back to idleTime as soon as work
+is found.
 """
 
 
@@ -51,6 +56,21 @@ class BaseWorkerThread:
         # Init the timing
         self.lastTime = time.time()
 
+        # Adaptive polling, set by WorkerThreadManager
+        self.maxIdleTime = None
+        self.currentIdleTime = None
+        # Set by WorkerThreadManager to end a long sleep at termination
+        self.wakeupEvent = threading.Event()
+
+        # Heartbeats are written at most every heartbeatInterval seconds
+        self.heartbeatInterval = 0
+        self.lastHeartbeat = 0
+
+        # Per cycle metrics
+        self.cycleMetrics = {"cycles": 0, "cyclesWithWork": 0,
+                             "lastDuration": 0.0, "totalDuration": 0.0,
+                             "lastWorkFound": None, "idleTime": None}
+
         # Init alert system
         self.sender = None
         self.sendAlert = None
@@ -143,8 +163,13 @@ class BaseWorkerThread:
             myThread = threading.currentThread()
 
             if hasattr(self.component.config, "Agent"):
+                self.heartbeatInterval = getattr(self.component.config.Agent,
+                                                 "heartbeatInterval", 0)
                 if getattr(self.component.config.Agent, "useHeartbeat", True):
                     self.heartbeatAPI.updateWorkerHeartbeat(myThread.getName())
+
+            self.currentIdleTime = self.idleTime
+
             # Run event loop while termination is not flagged
             while not self.notifyTerminate.isSet():
                 # Check manager hasn't paused threads
@@ -160,16 +185,20 @@ class BaseWorkerThread:
                                 # heartbeat needed to be called after self.initInThread
                                 # to get the right name
                                 if hasattr(self.component.config, "Agent"):
-                                    if getattr(self.component.config.Agent, "useHeartbeat", True):
+                                    if getattr(self.component.config.Agent, "useHeartbeat", True) and \
+                                           time.time() - self.lastHeartbeat >= self.heartbeatInterval:
                                         self.heartbeatAPI.updateWorkerHeartbeat(
                                             myThread.getName(), "Running")
+                                        self.lastHeartbeat = time.time()
                             except (CouchError, CouchConnectionError), ex:
                                 msg  = " Failed to update heartbeat for worker %s" % str(self)
                                 msg += ":\n %s" % str(ex)
                                 msg += "\n Skipping worker algorithm!"
                                 logging.error(msg)
                             else:
-                                self.algorithm(parameters)
+                                cycleStart = time.time()
+                                workFound = self.algorithm(parameters)
+                                self.endCycle(workFound, time.time() - cycleStart)
                                 # Catch if someone forgets to commit/rollback
                                 if myThread.transaction.transaction is not None:
                                     msg = """ Thread %s:  Transaction reached
@@ -229,8 +258,48 @@ class BaseWorkerThread:
         returns control when it's time to wake back up
         doesn't return any values
         """
-        time.sleep( self.idleTime )
-        
+        if self.maxIdleTime == None:
+            time.sleep( self.idleTime )
+            return
+
+        # Adaptive workers can sleep for long, termination wakes them up
+        self.wakeupEvent.wait(self.currentIdleTime)
+        return
+
+    def endCycle(self, workFound, duration):
+        """
+        _endCycle_
+
+        Update the cycle metrics and the time to sleep until the next cycle.
+        workFound is what algorithm returned, None if it didn't tell.
+        """
+        self.cycleMetrics["cycles"] += 1
+        self.cycleMetrics["lastDuration"] = duration
+        self.cycleMetrics["totalDuration"] += duration
+        self.cycleMetrics["lastWorkFound"] = workFound
+        if workFound != None and not workFound:
+            if self.maxIdleTime != None:
+                self.currentIdleTime = min(self.maxIdleTime,
+                                           self.currentIdleTime * 2)
+        else:
+            self.cycleMetrics["cyclesWithWork"] += 1
+            self.currentIdleTime = self.idleTime
+        self.cycleMetrics["idleTime"] = self.currentIdleTime
+        logging.debug("Worker %s cycle took %.3f secs, work found: %s, sleeping %s secs" % \
+                      (self.__class__.__name__, duration, workFound, self.currentIdleTime))
+        return
+
+    def getCycleMetrics(self):
+        """
+        _getCycleMetrics_
+
+        Return the number of cycles and of cycles that found work, the
+        duration of the last cycle and of all the cycles, what the last cycle
+        returned and the current sleep time.
+        """
+        return dict(self.cycleMetrics)
+
+
     def initAlerts(self, compName = None):
         """
         _initAlerts_
@@ -35,6 +35,7 @@ class WorkerThreadManager:
         wtmcount = wtmcount + 1
         self.slavecounter = 0
         self.slavelist = []
+        self.wakeupEvents = []
         self.lock.release()
         logging.info("Started")
         return
@@ -52,12 +53,13 @@ class WorkerThreadManager:
             self.activeThreadCount -= 1
         self.lock.release()
 
-    def prepareWorker(self, worker, idleTime):
+    def prepareWorker(self, worker, idleTime, maxIdleTime = None):
         """
         Prepares a worker thread before running
         """
         # Work timing
         worker.idleTime = idleTime
+        worker.maxIdleTime = maxIdleTime
         worker.component = self.component
         self.lock.acquire()
         self.slavecounter += 1
@@ -70,16 +72,23 @@ class WorkerThreadManager:
         worker.terminateCallback = self.slaveTerminateCallback
         worker.notifyPause = self.pauseSlaves
         worker.notifyResume = self.resumeSlaves
+        if maxIdleTime != None:
+            # adaptive workers can sleep for long, wake them up to terminate
+            self.wakeupEvents.append(worker.wakeupEvent)
         if hasattr(self.component.config, "Agent"):
             if getattr(self.component.config.Agent, "useHeartbeat", True):
                 worker.heartbeatAPI = HeartbeatAPI(self.component.config.Agent.componentName)
 
 
-    def addWorker(self, worker, idleTime = 60, parameters = None):
+    def addWorker(self, worker, idleTime = 60, parameters = None,
+                  maxIdleTime = None):
         """
         Adds a worker object and sets it running. Worker thread will sleep for
         idleTime seconds between runs. Parameters, if present, are passed into
         the worker thread's setup, algorithm and terminate methods
+
+        With maxIdleTime the sleep time doubles after every run that finds no
+        work up to maxIdleTime.
         """
         # Check type of worker
         if not isinstance(worker, BaseWorkerThread):
@@ -89,7 +98,7 @@ class WorkerThreadManager:
             return
 
         # Prepare the new worker thread
-        self.prepareWorker(worker, idleTime)
+        self.prepareWorker(worker, idleTime, maxIdleTime)
         workerThread = threading.Thread(target = worker, args = (parameters,))
         msg = "Created worker thread %s" % str(worker)
         logging.info(msg)
@@ -115,6 +124,8 @@ class WorkerThreadManager:
         self.terminateSlaves.set()
         self.pauseSlaves.clear()
         self.resumeSlaves.set()
+        for event in self.wakeupEvents:
+            event.set()
 
         # Wait for all threads to finished
         finished = False
@@ -0,0 +1,382 @@
+#!/usr/bin/env python
+"""
+_CouchDB_
+
+In memory stand-in for the CMSCouch Database and CouchServer classes.
+
+It implements the subset of the CMSCouch API used by the agent components
+(bulk queue/commit, document access, _all_docs, views with python map
+functions and the update handlers used by the JobStateMachine) and counts
+the number of requests made against it.  An artificial per request latency
+can be configured so that the cost of round trips to a real CouchDB can be
+emulated in profiling tests.
+"""
+
+# pylint: disable-msg=W0613,R0201
+
+import copy
+import time
+import uuid
+import threading
+import urllib
+import urlparse
+
+from WMCore.Database.CMSCouch import CouchNotFoundError
+
+
+def stateTransition(doc, query, docId):
+    """
+    _stateTransition_
+
+    Python version of the JobDump stateTransition update handler.
+    """
+    if doc is None:
+        doc = {"_id": docId, "states": {}}
+
+    maxKey = 0
+    for key in doc["states"].keys():
+        maxKey = max(maxKey, int(key))
+
+    doc["states"][str(maxKey + 1)] = {"oldstate": query["oldstate"],
+                                      "newstate": query["newstate"],
+                                      "location": query["location"],
+                                      "timestamp": int(query["timestamp"])}
+    return doc
+
+def locationTransition(doc, query, docId):
+    """
+    _locationTransition_
+
+    Python version of the JobDump locationTransition update handler.
+    """
+    if doc is None:
+        return None
+
+    maxKey = 0
+    for key in doc["states"].keys():
+        maxKey = max(maxKey, int(key))
+
+    doc["states"][str(maxKey)]["location"] = query["location"]
+    return doc
+
+def jobSummaryState(doc, query, docId):
+    """
+    _jobSummaryState_
+
+    Python version of the WMStats jobSummaryState update handler.
+    """
+    if doc is None:
+        return None
+
+    doc["state"] = query["newstate"]
+    doc["timestamp"] = int(query["timestamp"])
+    return doc
+
+def jobStateTransition(doc, query, docId):
+    """
+    _jobStateTransition_
+
+    Python version of the WMStats jobStateTransition update handler.
+    """
+    if doc is None:
+        doc = {"_id": docId}
+
+    doc.setdefault("state_history", [])
+    doc["state_history"].append({"oldstate": query["oldstate"],
+                                 "newstate": query["newstate"],
+                                 "location": query["location"],
+                                 "timestamp": int(query["timestamp"])})
+    return doc
+
+DEFAULT_UPDATES = {("JobDump", "stateTransition"): stateTransition,
+                   ("JobDump", "locationTransition"): locationTransition,
+                   ("WMStats", "jobSummaryState"): jobSummaryState,
+                   ("WMStats", "jobStateTransition"): jobStateTransition}
+
+
+class Database(object):
+    """
+    _Database_
+
+    In memory CouchDB database.  Every call that would result in an HTTP
+    request against a real CouchDB increments requestCount and sleeps for
+    the configured latency.
+    """
+    def __init__(self, dbname = 'database', url = 'http://localhost:5984',
+                 size = 1000, latency = 0):
+        self.name = urllib.quote_plus(dbname)
+        self.url = url
+        self.latency = latency
+        self.requestCount = 0
+        self._lock = threading.Lock()
+
+        self._docs = {}
+        self._queue = []
+        self._queue_size = size
+        self._updates = dict(DEFAULT_UPDATES)
+        self._views = {}
+
+    def _request(self):
+        """
+        _request_
+
+        Account for a round trip to the server.
+        """
+        with self._lock:
+            self.requestCount += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return
+
+    def _store(self, doc):
+        """
+        _store_
+
+        Store a single document, return the bulk docs result row for it.
+        """
+        docId = doc.get("_id", None)
+        if docId is None:
+            docId = uuid.uuid4().hex
+            doc["_id"] = docId
+
+        current = self._docs.get(docId, None)
+        if current is not None and current["_rev"] != doc.get("_rev", None):
+            return {"id": docId, "error": "conflict",
+                    "reason": "Document update conflict."}
+
+        if doc.get("_deleted", False):
+            self._docs.pop(docId, None)
+            return {"id": docId, "rev": doc.get("_rev", None)}
+
+        revNumber = 1
+        if current is not None:
+            revNumber = int(current["_rev"].split("-")[0]) + 1
+
+        newDoc = copy.deepcopy(doc)
+        newDoc["_rev"] = "%s-%s" % (revNumber, uuid.uuid4().hex)
+        self._docs[docId] = newDoc
+        return {"id": docId, "rev": newDoc["_rev"]}
+
+    def registerUpdate(self, design, update, function):
+        """
+        _registerUpdate_
+
+        Register a python update handler, the function is called with the
+        current document (None if it doesn't exist), the query arguments and
+        the document id and must return the new document.
+        """
+        self._updates[(design, update)] = function
+        return
+
+    def registerView(self, design, view, mapFunction):
+        """
+        _registerView_
+
+        Register a python map function, it is called for every document and
+        must return a list of (key, value) tuples.
+        """
+        self._views[(design, view)] = mapFunction
+        return
+
+    def timestamp(self, data, label = ''):
+        """
+        _timestamp_
+
+        Time stamp each doc in a list
+        """
+        if label == True:
+            label = 'timestamp'
+
+        if isinstance(data, dict):
+            data[label] = int(time.time())
+        else:
+            for doc in data:
+                if label not in doc.keys():
+                    doc[label] = int(time.time())
+        return data
+
+    def queue(self, doc, timestamp = False, viewlist = [], callback = None):
+        """
+        _queue_
+
+        Queue up a doc for bulk insert.
+        """
+        if timestamp:
+            self.timestamp(doc, timestamp)
+        if len(self._queue) >= self._queue_size:
+            self.commit(callback = callback)
+        self._queue.append(doc)
+        return
+
+    def queueDelete(self, doc, viewlist = []):
+        """
+        _queueDelete_
+
+        Queue up a document for deletion
+        """
+        self.queue({'_id': doc['_id'], '_rev': doc['_rev'], '_deleted': True})
+        return
+
+    def commitOne(self, doc, returndocs = False, timestamp = False, viewlist = []):
+        """
+        _commitOne_
+
+        Commit a single document.
+        """
+        self._request()
+        if timestamp:
+            self.timestamp(doc, timestamp)
+        return [self._store(doc)]
+
+    def commit(self, doc = None, returndocs = False, timestamp = False,
+               viewlist = [], callback = None, **data):
+        """
+        _commit_
+
+        Commit the queue with a single bulk request, conflicting documents are
+        passed to the callback as CMSCouch does.
+        """
+        if doc:
+            self.queue(doc, timestamp)
+
+        if len(self._queue) == 0:
+            return
+
+        if timestamp:
+            self.timestamp(self._queue, timestamp)
+
+        self._request()
+        data['docs'] = list(self._queue)
+        self._queue = []
+        retval = [self._store(queuedDoc) for queuedDoc in data['docs']]
+
+        if callback:
+            for idx, result in enumerate(retval):
+                if result.get('error', None) == 'conflict':
+                    retval[idx] = callback(self, data, result)
+
+        return retval
+
+    def document(self, id, rev = None):
+        """
+        _document_
+
+        Return a copy of the document with the given id.
+        """
+        self._request()
+        if id not in self._docs:
+            raise CouchNotFoundError("not_found", None, None)
+        return copy.deepcopy(self._docs[id])
+
+    def documentExists(self, id, rev = None):
+        """
+        _documentExists_
+
+        Check if a document exists.
+        """
+        self._request()
+        return id in self._docs
+
+    def allDocs(self, options = {}, keys = []):
+        """
+        _allDocs_
+
+        Emulate _all_docs, optionally restricted to a list of keys.
+        """
+        self._request()
+        if not keys:
+            keys = sorted(self._docs.keys())
+
+        rows = []
+        for key in keys:
+            if key not in self._docs:
+                rows.append({"key": key, "error": "not_found"})
+                continue
+            row = {"id": key, "key": key,
+                   "value": {"rev": self._docs[key]["_rev"]}}
+            if options.get("include_docs", False):
+                row["doc"] = copy.deepcopy(self._docs[key])
+            rows.append(row)
+
+        return {"total_rows": len(self._docs), "offset": 0, "rows": rows}
+
+    def loadView(self, design, view, options = {}, keys = []):
+        """
+        _loadView_
+
+        Run the registered map function over all documents, optionally
+        restricted to a list of keys.
+        """
+        self._request()
+        mapFunction = self._views[(design, view)]
+
+        rows = []
+        for docId in sorted(self._docs.keys()):
+            doc = self._docs[docId]
+            for key, value in mapFunction(doc):
+                row = {"id": docId, "key": key, "value": value}
+                if options.get("include_docs", False):
+                    row["doc"] = copy.deepcopy(doc)
+                rows.append(row)
+
+        if keys:
+            rows = [row for key in keys for row in rows if row["key"] == key]
+        elif "key" in options:
+            rows = [row for row in rows if row["key"] == options["key"]]
+
+        return {"total_rows": len(rows), "offset": 0, "rows": rows}
+
+    def makeRequest(self, uri = None, data = None, type = 'GET',
+                    incoming_headers = {}, encode = True, decode = True,
+                    contentType = None, cache = False):
+        """
+        _makeRequest_
+
+        Only update handler requests are supported:
+          /db/_design/<design>/_update/<handler>/<docid>?<query>
+        """
+        self._request()
+        path, query = urllib.splitquery(uri)
+        parts = path.strip("/").split("/")
+        if len(parts) != 6 or parts[1] != "_design" or parts[3] != "_update":
+            raise NotImplementedError("Unsupported request %s %s" % (type, uri))
+
+        design, update, docId = parts[2], parts[4], urllib.unquote(parts[5])
+        queryArgs = dict(urlparse.parse_qsl(query or ""))
+
+        current = copy.deepcopy(self._docs.get(docId, None))
+        newDoc = self._updates[(design, update)](current, queryArgs, docId)
+        if newDoc is None:
+            raise CouchNotFoundError("not_found", None, None)
+        self._store(newDoc)
+        return 'OK'
+
+
+class CouchServer(object):
+    """
+    _CouchServer_
+
+    In memory stand-in for CMSCouch.CouchServer, databases created through
+    it share the server latency.
+    """
+    def __init__(self, dburl = 'http://localhost:5984', latency = 0):
+        self.url = dburl
+        self.latency = latency
+        self.databases = {}
+
+    def listDatabases(self):
+        return self.databases.keys()
+
+    def createDatabase(self, dbname, size = 1000):
+        self.databases[dbname] = Database(dbname, self.url, size, self.latency)
+        return self.databases[dbname]
+
+    def deleteDatabase(self, dbname):
+        self.databases.pop(dbname, None)
+
+    def connectDatabase(self, dbname = 'database', create = True, size = 1000):
+        if dbname not in self.databases:
+            if not create:
+                raise CouchNotFoundError("not_found", None, None)
+            return self.createDatabase(dbname, size)
+        return self.databases[dbname]
@@ -202,3 +202,27 @@ class SiteDBJSON(object):
                                         '').replace('_Export', '')
 
         return name
+
+    def ceToCMSNames(self, ces):
+        """
+        Convert a list of CE names to a dict of CE name to CMS sites
+        """
+        return dict([(x, self.ceToCMSName(x)) for x in ces])
+
+    def seToCMSNames(self, ses):
+        """
+        Convert a list of SE names to a dict of SE name to CMS sites
+        """
+        return dict([(x, self.seToCMSName(x)) for x in ses])
+
+    def cmsNamestoPhEDExNodes(self, cmsNames):
+        """
+        Convert a list of CMS names to a dict of CMS name to Phedex Nodes
+        """
+        return dict([(x, self.cmsNametoPhEDExNode(x)) for x in cmsNames])
+
+    def phEDExNodestocmsNames(self, nodes):
+        """
+        Convert a list of PhEDEx node names to a dict of node name to cms site
+        """
+        return dict([(x, self.phEDExNodetocmsName(x)) for x in nodes])
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+"""
+_DBSUploadProfile_t_
+
+Measure the DBSUploadPoller cycle time for a large number of buffered files
+with a stand-in DBS3 writer that only waits a bit for every block, with and
+without handing the closed blocks to the upload workers while loading.
+"""
+
+import os
+import time
+import logging
+import threading
+import unittest
+
+from WMCore.DAOFactory import DAOFactory
+from WMCore.DataStructs.Run import Run
+from WMCore.Services.UUID import makeUUID
+
+from WMComponent.DBS3Buffer.DBSBufferFile import DBSBufferFile
+from WMComponent.DBS3Buffer import DBSUploadPoller as ProfileDBSUploadPoller
+
+from WMQuality.TestInit import TestInit
+from WMQuality.Emulators import EmulatorSetup
+
+
+class LatencyDbsApi(object):
+    """
+    _LatencyDbsApi_
+
+    Stand-in DBS3 writer, every block insertion takes the same time and
+    nothing is kept.
+    """
+    latency = 0.2
+
+    def __init__(self, url):
+        self.dbsPath = url
+
+    def insertBulkBlock(self, blockDump):
+        time.sleep(self.latency)
+        return
+
+    def listBlocks(self, block_name):
+        return []
+
+
+class DBSUploadProfileTest(unittest.TestCase):
+    """
+    _DBSUploadProfileTest_
+
+    """
+    def setUp(self):
+        """
+        _setUp_
+
+        The uploaders are built with the stand-in writer, DBSBuffer is in the
+        test database.
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+        self.testInit.setDatabaseConnection()
+        self.testInit.setSchema(customModules = ["WMComponent.DBS3Buffer"],
+                                useDefault = False)
+        self.testDir = self.testInit.generateWorkDir()
+        self.configFile = EmulatorSetup.setupWMAgentConfig()
+
+        myThread = threading.currentThread()
+        self.bufferFactory = DAOFactory(package = "WMComponent.DBSBuffer.Database",
+                                        logger = myThread.logger,
+                                        dbinterface = myThread.dbi)
+        self.buffer3Factory = DAOFactory(package = "WMComponent.DBS3Buffer",
+                                         logger = myThread.logger,
+                                         dbinterface = myThread.dbi)
+
+        locationAction = self.bufferFactory(classname = "DBSBufferFiles.AddLocation")
+        locationAction.execute(siteName = "se1.cern.ch")
+
+        self.nFiles = 100000
+        self.nDatasets = 10
+        self.maxFiles = 500
+
+        os.environ["DONT_TRAP_EXIT"] = "True"
+        self.realDbsApi = ProfileDBSUploadPoller.DbsApi
+        ProfileDBSUploadPoller.DbsApi = LatencyDbsApi
+        return
+
+    def tearDown(self):
+        """
+        _tearDown_
+
+        """
+        ProfileDBSUploadPoller.DbsApi = self.realDbsApi
+        del os.environ["DONT_TRAP_EXIT"]
+        self.testInit.clearDatabase()
+        self.testInit.delWorkDir()
+        EmulatorSetup.deleteConfig(self.configFile)
+        return
+
+    def getConfig(self, pipelineUpload):
+        """
+        _getConfig_
+
+        """
+        config = self.testInit.getConfiguration()
+        config.component_("DBS3Upload")
+        config.DBS3Upload.dbsUrl = "https://localhost:1443/dbs/dev/global/DBSWriter"
+        config.DBS3Upload.nProcesses = 4
+        config.DBS3Upload.dbsWaitTime = 0.1
+        config.DBS3Upload.datasetType = "VALID"
+        config.DBS3Upload.pipelineUpload = pipelineUpload
+        return config
+
+    def bufferFiles(self, acqEra):
+        """
+        _bufferFiles_
+
+        Put nFiles parentless files in DBSBuffer, spread over nDatasets.
+        """
+        workflowName = "ProfileWorkload%s" % acqEra
+        injectWorkflowDAO = self.buffer3Factory("InsertWorkflow")
+        workflowId = injectWorkflowDAO.execute(workflowName,
+                                               "/%s/Processing" % workflowName,
+                                               3600, self.maxFiles,
+                                               250000000, 99999000000999999)
+
+        myThread = threading.currentThread()
+        for i in range(self.nFiles):
+            if i % 1000 == 0:
+                myThread.transaction.begin()
+            dataset = i % self.nDatasets
+            testFile = DBSBufferFile(lfn = "/store/data/%s/Cosmics%i/RAW/v1/%s.root" % (acqEra, dataset, makeUUID()),
+                                     size = 1024, events = 20, checksums = {"cksum": 1},
+                                     workflowId = workflowId)
+            testFile.setAlgorithm(appName = "cmsRun", appVer = "CMSSW_3_1_1",
+                                  appFam = "RAW", psetHash = "GIBBERISH",
+                                  configContent = "MOREGIBBERISH")
+            testFile.setDatasetPath("/Cosmics%i/%s-v1/RAW" % (dataset, acqEra))
+            testFile.addRun(Run(143316, i))
+            testFile.setAcquisitionEra(acqEra)
+            testFile.setProcessingVer("1")
+            testFile.setGlobalTag("START54::All")
+            testFile.create()
+            testFile.setLocation("se1.cern.ch")
+            if i % 1000 == 999:
+                myThread.transaction.commit()
+        return
+
+    def uploadCycle(self, acqEra, pipelineUpload):
+        """
+        _uploadCycle_
+
+        Buffer the files and time one polling cycle of a new uploader.
+        Return the time and the number of files uploaded.
+        """
+        self.bufferFiles(acqEra)
+
+        dbsUploader = ProfileDBSUploadPoller.DBSUploadPoller(config = self.getConfig(pipelineUpload))
+        startTime = time.time()
+        dbsUploader.algorithm()
+        cycleTime = time.time() - startTime
+
+        myThread = threading.currentThread()
+        uploaded = myThread.dbi.processData("""SELECT COUNT(*) FROM dbsbuffer_file
+                                                 WHERE status = 'InDBS'
+                                                 AND lfn LIKE :lfn""",
+                                            {'lfn': "/store/data/%s/%%" % acqEra})[0].fetchall()[0][0]
+        return cycleTime, uploaded
+
+    def testUploadCycle(self):
+        """
+        _testUploadCycle_
+
+        All the full blocks must be uploaded in one cycle in both modes, the
+        pipelined one must be faster.
+        """
+        serialTime, serialUploaded = self.uploadCycle("SerialEra", False)
+        pipelineTime, pipelineUploaded = self.uploadCycle("PipelineEra", True)
+
+        logging.info("%s files, load then upload: %.2fs, %s uploaded" \
+                     % (self.nFiles, serialTime, serialUploaded))
+        logging.info("%s files, pipelined upload: %.2fs, %s uploaded" \
+                     % (self.nFiles, pipelineTime, pipelineUploaded))
+
+        # The last block of every dataset is full but stays open
+        fullBlocks = self.nFiles - self.nDatasets * self.maxFiles
+        self.assertEqual(serialUploaded, fullBlocks)
+        self.assertEqual(pipelineUploaded, fullBlocks)
+        self.assertTrue(pipelineTime < serialTime)
+        return
+
+if __name__ == "__main__":
+    unittest.main()
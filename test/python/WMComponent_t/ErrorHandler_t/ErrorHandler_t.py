@@ -5,11 +5,13 @@ ErrorHandler test TestErrorHandler module and the harness
 
 import os
 import os.path
+import shutil
+import tempfile
 import threading
 import time
 import unittest
 
-from WMComponent.ErrorHandler.ErrorHandlerPoller import ErrorHandlerPoller
+from WMComponent.ErrorHandler.ErrorHandlerPoller import ErrorHandlerPoller, classifyFWJR
 
 import WMCore.WMBase
 from WMQuality.TestInitCouchApp import TestInitCouchApp
@@ -531,5 +533,87 @@ class ErrorHandlerTest(unittest.TestCase):
 
         return
 
+class FWJRReader(ErrorHandlerPoller):
+    """
+    ErrorHandlerPoller with only what is needed to read FWJRs
+    """
+    def __init__(self, processes):
+        self.maxFailTime = 32 * 3600
+        self.exitCodes = [8020]
+        self.passCodes = []
+        self.readFWJRProcesses = processes
+        self.alerts = []
+        self.sender = None
+
+    def sendAlert(self, level, msg):
+        self.alerts.append(msg)
+
+
+class ReadFWJRTest(unittest.TestCase):
+    """
+    Test the classification of failed jobs from their FWJR, without a database
+    """
+    def setUp(self):
+        self.testDir = tempfile.mkdtemp()
+        self.oldPath = os.path.join(WMCore.WMBase.getTestBase(),
+                                    "WMComponent_t/JobAccountant_t",
+                                    "fwjrs/badBackfillJobReport.pkl")
+        report = Report()
+        report.load(self.oldPath)
+        self.newPath = os.path.join(self.testDir, "badBackfillJobReport.pkl")
+        report.save(self.newPath)
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.testDir)
+        return
+
+    def testClassifyFWJR(self):
+        """
+        _testClassifyFWJR_
+
+        Both the old pickled FWJRs and the new ones with a summary header are
+        classified the same way
+        """
+        for reportPath in [self.oldPath, self.newPath]:
+            self.assertEqual(classifyFWJR(reportPath, 32 * 3600, [8020], []),
+                             ('failureExitCode', set([8020, 99999])))
+            decision, runTime = classifyFWJR(reportPath, 10, [], [])
+            self.assertEqual(decision, 'maxFailTime')
+            self.assertEqual(int(runTime), 50)
+            self.assertEqual(classifyFWJR(reportPath, 32 * 3600, [], [99999]),
+                             ('passExitCode', set([8020, 99999])))
+            self.assertEqual(classifyFWJR(reportPath, 32 * 3600, [], []),
+                             ('cooloff', True))
+
+        badPath = os.path.join(self.testDir, "bad.pkl")
+        handle = open(badPath, "w")
+        handle.write("not a report")
+        handle.close()
+        self.assertEqual(classifyFWJR(badPath, 32 * 3600, [], [])[0], 'error')
+        return
+
+    def testReadFWJRProcesses(self):
+        """
+        _testReadFWJRProcesses_
+
+        The jobs are split the same way with a pool of processes
+        """
+        jobList = []
+        for i in range(20):
+            jobList.append({'id': i, 'fwjr_path': [self.oldPath, self.newPath][i % 2]})
+        jobList.append({'id': 20, 'fwjr_path': None})
+        jobList.append({'id': 21, 'fwjr_path': os.path.join(self.testDir, "missing.pkl")})
+
+        for processes in [1, 4]:
+            reader = FWJRReader(processes)
+            cooloffJobs, passJobs, exhaustJobs = reader.readFWJRForErrors(jobList)
+            self.assertEqual([x['id'] for x in exhaustJobs], range(20))
+            self.assertEqual([x['id'] for x in cooloffJobs], [20, 21])
+            self.assertEqual(passJobs, [])
+            self.assertEqual(len(reader.alerts), 20)
+        return
+
+
 if __name__ == '__main__':
     unittest.main()
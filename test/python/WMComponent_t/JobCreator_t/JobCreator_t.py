@@ -30,6 +30,7 @@ from WMCore.DataStructs.Run   import Run
 
 from WMCore.Agent.Configuration              import Configuration
 from WMComponent.JobCreator.JobCreatorPoller import JobCreatorPoller
+from WMComponent.JobCreator.JobMetadataStore import JobMetadataStore, getSubmitAttributes
 
 from WMCore.Services.UUID import makeUUID
 
@@ -234,6 +235,10 @@ class JobCreatorTest(unittest.TestCase):
         config.JobCreator.useWorkQueue              = True
         config.JobCreator.WorkQueueParams           = {'emulateDBSReader': True}
 
+        # The JobCreator fills the job metadata store the JobSubmitter reads
+        config.component_("JobSubmitter")
+        config.JobSubmitter.useJobMetadataStore = True
+
         # We now call the JobMaker from here
         config.component_('JobMaker')
         config.JobMaker.logLevel        = 'INFO'
@@ -317,6 +322,21 @@ class JobCreatorTest(unittest.TestCase):
         self.assertEqual(len(job['input_files']), 1)
         self.assertEqual(os.path.basename(job['sandbox']), 'TestWorkload-Sandbox.tar.bz2')
 
+        # The job metadata store of the task has every job
+        store = JobMetadataStore(os.path.join(testDirectory, 'JobMetadata.db'))
+        self.assertTrue(store.exists())
+        jobIDs = range(1, nSubs * nFiles + 1)
+        attributes = store.loadSubmitAttributes(jobIDs)
+        storedJobs = store.loadJobs(jobIDs)
+        store.close()
+        self.assertEqual(sorted(attributes.keys()), jobIDs)
+        self.assertEqual(sorted(storedJobs.keys()), jobIDs)
+        self.assertEqual(attributes[job['id']], getSubmitAttributes(job))
+        self.assertEqual(storedJobs[job['id']]['name'], job['name'])
+        self.assertEqual(storedJobs[job['id']]['input_files'][0]['lfn'],
+                         job['input_files'][0]['lfn'])
+        self.assertEqual(storedJobs[job['id']].baggage.PresetSeeder.generator.initialSeed, 1001)
+
         return
 
     @attr('performance')
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+_JobMetadataStore_t_
+
+Unit tests for the JobCreator job metadata store.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from WMCore.DataStructs.Job import Job
+from WMCore.DataStructs.File import File
+
+from WMComponent.JobCreator.JobMetadataStore import JobMetadataStore, getStorePath
+
+
+class StoredJob(Job):
+    """
+    _StoredJob_
+
+    DataStructs job that can be saved in the store like a WMBS job.
+    """
+    def getDataStructsJob(self):
+        job = Job(name = self["name"])
+        job.update(self)
+        return job
+
+
+class JobMetadataStoreTest(unittest.TestCase):
+    """
+    _JobMetadataStoreTest_
+
+    """
+    def setUp(self):
+        self.testDir = tempfile.mkdtemp()
+        self.taskDir = os.path.join(self.testDir, "TestWorkload", "ReReco")
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.testDir)
+        return
+
+    def makeJob(self, jobID):
+        """
+        _makeJob_
+
+        Create a job in the task directory.
+        """
+        job = StoredJob(name = "Job%i" % jobID)
+        job["id"] = jobID
+        job["workflow"] = "TestWorkload"
+        job["sandbox"] = "/somewhere/TestWorkload-Sandbox.tar.bz2"
+        job["cache_dir"] = os.path.join(self.taskDir, "JobCollection_1_0",
+                                        "job_%i" % jobID)
+        job["siteWhitelist"] = ["T1_US_FNAL"]
+        job["siteBlacklist"] = []
+        job["ownerDN"] = "/CN=Test"
+        job.addFile(File(lfn = "/store/file%i.root" % jobID,
+                         locations = set(["se2.example.com", "se1.example.com"])))
+        return job
+
+    def testStorePath(self):
+        """
+        _testStorePath_
+
+        The store lives in the task directory.
+        """
+        job = self.makeJob(1)
+        self.assertEqual(getStorePath(job["cache_dir"]),
+                         os.path.join(self.taskDir, "JobMetadata.db"))
+        self.assertEqual(getStorePath(job["cache_dir"] + "/"),
+                         os.path.join(self.taskDir, "JobMetadata.db"))
+        return
+
+    def testSaveLoad(self):
+        """
+        _testSaveLoad_
+
+        Save jobs and load them back in bulk.
+        """
+        os.makedirs(self.taskDir)
+        jobs = [self.makeJob(x) for x in range(1, 1201)]
+        store = JobMetadataStore(getStorePath(jobs[0]["cache_dir"]))
+        self.assertFalse(store.exists())
+        self.assertEqual(store.loadSubmitAttributes([1, 2]), {})
+
+        store.saveJobs(jobs)
+        store.close()
+        self.assertTrue(store.exists())
+
+        store = JobMetadataStore(getStorePath(jobs[0]["cache_dir"]))
+        jobIDs = range(1, 1301)
+        attributes = store.loadSubmitAttributes(jobIDs)
+        storedJobs = store.loadJobs(jobIDs)
+        self.assertEqual(sorted(attributes.keys()), range(1, 1201))
+        self.assertEqual(sorted(storedJobs.keys()), range(1, 1201))
+
+        self.assertEqual(attributes[5]["name"], "Job5")
+        self.assertEqual(attributes[5]["workflow"], "TestWorkload")
+        self.assertEqual(attributes[5]["cache_dir"], jobs[4]["cache_dir"])
+        self.assertEqual(attributes[5]["locations"], ["se1.example.com", "se2.example.com"])
+        self.assertEqual(attributes[5]["siteWhitelist"], ["T1_US_FNAL"])
+        self.assertEqual(attributes[5]["ownerDN"], "/CN=Test")
+        self.assertEqual(attributes[5]["ownerGroup"], "")
+        self.assertEqual(attributes[5]["proxyPath"], None)
+        self.assertEqual(storedJobs[5]["input_files"][0]["lfn"], "/store/file5.root")
+
+        # Saving a job again replaces it
+        jobs[4]["siteBlacklist"] = ["T2_CH_CERN"]
+        store.saveJobs([jobs[4]])
+        self.assertEqual(store.loadSubmitAttributes([5])[5]["siteBlacklist"], ["T2_CH_CERN"])
+        store.close()
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -836,6 +836,64 @@ class JobSubmitterTest(unittest.TestCase):
 
         return
 
+    def testG_PriorityChange(self):
+        """
+        _testG_PriorityChange_
+
+        Check that a priority change of a cached workflow reorders the
+        workflows pulled from the cache.
+        """
+        workloadName = "basicWorkload"
+        workload = self.createTestWorkload()
+        config = self.getConfig()
+        changeState = ChangeState(config)
+
+        nSubs = 1
+        nJobs = 10
+        site = 'T1_US_FNAL'
+
+        self.setResourceThresholds(site, pendingSlots = 10, runningSlots = -1, tasks = ['Processing'],
+                                   Processing = {'pendingSlots' : 10, 'runningSlots' :-1})
+
+        # Always initialize the submitter after setting the sites, flaky!
+        jobSubmitter = JobSubmitterPoller(config = config)
+
+        jobGroupList = []
+        for name in ['OldestWorkflow', 'NewestWorkflow']:
+            jobGroupList.extend(self.createJobGroups(nSubs = nSubs, nJobs = nJobs,
+                                                     task = workload.getTask("ReReco"),
+                                                     workloadSpec = os.path.join(self.testDir, 'workloadTest',
+                                                                                 workloadName),
+                                                     site = 'se.%s' % site,
+                                                     name = name))
+        for group in jobGroupList:
+            changeState.propagate(group.jobs, 'created', 'new')
+
+        jobSubmitter.getThresholds()
+        jobSubmitter.refreshCache()
+        self.assertEqual(len(jobSubmitter.cachedJobIDs), 20)
+        self.assertEqual(jobSubmitter.getWorkflowHeap(site, 'Processing')[0][2], 'OldestWorkflow')
+
+        updatePriority = self.daoFactory(classname = "Workflow.UpdatePriority")
+        updatePriority.execute({'NewestWorkflow' : 10})
+        jobSubmitter.refreshCache()
+        self.assertEqual(jobSubmitter.workflowPrios['NewestWorkflow'], 10)
+
+        jobsToSubmit = jobSubmitter.assignJobLocations()
+        jobs = []
+        for package in jobsToSubmit:
+            jobs.extend(jobsToSubmit[package])
+        self.assertEqual(len(jobs), 10)
+        newestJobIDs = [x['id'] for x in jobGroupList[1].jobs]
+        for job in jobs:
+            self.assertEqual(job['taskPriority'], 10)
+            self.assertTrue(job['id'] in newestJobIDs)
+
+        # Only the oldest workflow is left in the cache
+        self.assertEqual(len(jobSubmitter.cachedJobIDs), 10)
+        self.assertEqual(jobSubmitter.getWorkflowHeap(site, 'Processing')[0][2], 'OldestWorkflow')
+        return
+
     @attr('integration')
     def testF_PollerProfileTest(self):
         """
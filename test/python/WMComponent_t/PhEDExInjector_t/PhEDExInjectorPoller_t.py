@@ -11,8 +11,10 @@ import threading
 import time
 import unittest
 import logging
+from httplib import HTTPException
+from xml.dom.minidom import parseString
 
-from WMComponent.PhEDExInjector.PhEDExInjectorPoller import PhEDExInjectorPoller
+from WMComponent.PhEDExInjector.PhEDExInjectorPoller import PhEDExInjectorPoller, PhEDExInjectorPassableError
 from WMComponent.DBS3Buffer.DBSBufferFile import DBSBufferFile
 
 from WMCore.Services.PhEDEx.PhEDEx import PhEDEx
@@ -20,6 +22,7 @@ from WMCore.Services.UUID import makeUUID
 
 from WMCore.DAOFactory import DAOFactory
 from WMCore.DataStructs.Run import Run
+from WMCore.Configuration import Configuration
 from WMQuality.TestInit import TestInit
 
 from nose.plugins.attrib import attr
@@ -316,5 +319,273 @@ class PhEDExInjectorPollerTest(unittest.TestCase):
 
         return
 
+class MockPhEDEx(object):
+    """
+    _MockPhEDEx_
+
+    Stand-in for the PhEDEx data service.  Records the files injected at
+    every node and the largest number of injections running at the same
+    time.  Each injection takes latency seconds, the injections at the nodes
+    in failures raise the given exception.
+    """
+    def __init__(self, latency = 0, failures = None):
+        self.latency = latency
+        self.failures = failures or {}
+        self.lock = threading.Lock()
+        self.injected = {}
+        self.injections = 0
+        self.active = 0
+        self.maxActive = 0
+
+    def getNodeMap(self):
+        nodes = []
+        for name, kind, se in [("T1_US_FNAL_MSS", "MSS", "cmssrm.fnal.gov"),
+                               ("T1_US_FNAL_Buffer", "Buffer", "cmssrm.fnal.gov"),
+                               ("T0_CH_CERN_MSS", "MSS", "srm-cms.cern.ch"),
+                               ("T1_UK_RAL_MSS", "MSS", "srm-cms-disk.gridpp.rl.ac.uk"),
+                               ("T1_UK_RAL_Buffer", "Buffer", "srm-cms-disk.gridpp.rl.ac.uk"),
+                               ("T1_UK_RAL_Disk", "Disk", "srm-cms-disk.gridpp.rl.ac.uk"),
+                               ("T2_CH_CERN", "Disk", "srm-eoscms.cern.ch")]:
+            nodes.append({"name": name, "kind": kind, "se": se})
+        return {"phedex": {"node": nodes}}
+
+    def injectBlocks(self, node, xmlData, strict = 1):
+        with self.lock:
+            self.active += 1
+            self.injections += 1
+            self.maxActive = max(self.maxActive, self.active)
+        try:
+            time.sleep(self.latency)
+            if node in self.failures:
+                raise self.failures[node]
+            lfns = [x.getAttribute("name") for x in
+                    parseString(xmlData).getElementsByTagName("file")]
+            with self.lock:
+                self.injected.setdefault(node, []).extend(lfns)
+        finally:
+            with self.lock:
+                self.active -= 1
+        return {"phedex": {"injected": {"stats": {"new_files": len(lfns)}}}}
+
+
+class MockTransaction(object):
+    """
+    _MockTransaction_
+
+    Count the committed transactions.
+    """
+    conn = None
+
+    def __init__(self):
+        self.commits = 0
+
+    def begin(self):
+        pass
+
+    def commit(self):
+        self.commits += 1
+
+    def rollbackForError(self):
+        pass
+
+
+class MockDAO(object):
+    """
+    _MockDAO_
+
+    Return the result and record the arguments of every call.
+    """
+    def __init__(self, result = None):
+        self.result = result
+        self.calls = []
+
+    def execute(self, *args, **kwargs):
+        self.calls.append(args)
+        return self.result
+
+
+class MockInjectorPoller(PhEDExInjectorPoller):
+    """
+    _MockInjectorPoller_
+
+    PhEDExInjectorPoller using a MockPhEDEx and no database.
+    """
+    def __init__(self, config, phedex):
+        self.mockPhEDEx = phedex
+        PhEDExInjectorPoller.__init__(self, config)
+
+    def connectPhEDEx(self):
+        return self.mockPhEDEx
+
+    def setup(self, parameters):
+        nodeMappings = self.phedex.getNodeMap()
+        for node in nodeMappings["phedex"]["node"]:
+            self.seMap.setdefault(node["kind"], {})[node["se"]] = node["name"]
+            self.nodeNames.append(node["name"])
+        self.buildNodeLookups()
+        self.setStatus = MockDAO()
+
+
+class PhEDExInjectionTest(unittest.TestCase):
+    """
+    _PhEDExInjectionTest_
+
+    Test the chunked and parallel injection against a mock PhEDEx service.
+    """
+    def setUp(self):
+        myThread = threading.currentThread()
+        self.threadAttributes = {}
+        for name in ["dbFactory", "logger", "transaction"]:
+            self.threadAttributes[name] = getattr(myThread, name, None)
+        myThread.dbFactory = None
+        myThread.logger = logging
+        myThread.transaction = MockTransaction()
+
+        self.config = Configuration()
+        self.config.component_("DBSInterface")
+        self.config.DBSInterface.globalDBSUrl = "http://dbs.example/DBSServlet"
+        self.config.component_("PhEDExInjector")
+        self.config.PhEDExInjector.phedexurl = "https://phedex.example/json/test"
+        return
+
+    def tearDown(self):
+        myThread = threading.currentThread()
+        for name, value in self.threadAttributes.items():
+            if value == None:
+                delattr(myThread, name)
+            else:
+                setattr(myThread, name, value)
+        return
+
+    def createUninjected(self, sites, nDatasets, nFiles):
+        """
+        _createUninjected_
+
+        Uninjected files in the format of the GetUninjectedFiles DAO, with
+        two blocks per dataset.
+        """
+        uninjected = {}
+        for site in sites:
+            uninjected[site] = {}
+            for i in range(nDatasets):
+                dataset = "/Primary%i/%s/RECO" % (i, site)
+                uninjected[site][dataset] = {}
+                for j in range(2):
+                    files = []
+                    for k in range(nFiles):
+                        files.append({"lfn": "/store/%s/%i/%i/%i.root" % (site, i, j, k),
+                                      "size": 1024, "checksum": {"cksum": "1234"}})
+                    uninjected[site][dataset]["%s#%i" % (dataset, j)] = {"is-open": "y",
+                                                                        "files": files}
+        return uninjected
+
+    def createPoller(self, phedex, uninjected):
+        poller = MockInjectorPoller(self.config, phedex)
+        poller.setup(parameters = None)
+        poller.getUninjected = MockDAO(uninjected)
+        return poller
+
+    def testNodeLookups(self):
+        """
+        _testNodeLookups_
+
+        Check the SE names are mapped to the same nodes as before.
+        """
+        poller = self.createPoller(MockPhEDEx(), {})
+        self.assertEqual(poller.injectionNodes["cmssrm.fnal.gov"], "T1_US_FNAL_Buffer")
+        self.assertEqual(poller.injectionNodes["srm-cms.cern.ch"], "T0_CH_CERN_MSS")
+        self.assertEqual(poller.injectionNodes["srm-cms-disk.gridpp.rl.ac.uk"], "T1_UK_RAL_Disk")
+        self.assertEqual(poller.injectionNodes["T1_US_FNAL_MSS"], "T1_US_FNAL_MSS")
+        self.assertEqual(poller.closingNodes["srm-cms-disk.gridpp.rl.ac.uk"], "T1_UK_RAL_Buffer")
+        self.assertEqual(poller.closingNodes["srm-eoscms.cern.ch"], "T2_CH_CERN")
+        self.assertFalse("unknown.se" in poller.injectionNodes)
+        return
+
+    def testInjectionChunks(self):
+        """
+        _testInjectionChunks_
+
+        Check that all the files are injected once at the right node, with
+        one status update per chunk.
+        """
+        sites = ["cmssrm.fnal.gov", "srm-cms.cern.ch", "T2_CH_CERN", "unknown.se"]
+        uninjected = self.createUninjected(sites, 3, 7)
+        phedex = MockPhEDEx()
+        self.config.PhEDExInjector.injectionThreads = 4
+        self.config.PhEDExInjector.injectionChunkSize = 10
+        poller = self.createPoller(phedex, uninjected)
+
+        chunks = poller.createInjectionChunks(uninjected["T2_CH_CERN"])
+        self.assertEqual([sum([len(b["files"]) for d in c.values() for b in d.values()])
+                          for c in chunks], [10, 10, 10, 10, 2])
+
+        poller.injectFiles()
+
+        # 42 files per site in chunks of 10
+        self.assertEqual(phedex.injections, 3 * 5)
+        self.assertEqual(len(poller.setStatus.calls), 3 * 5)
+        self.assertEqual(threading.currentThread().transaction.commits, 3 * 5)
+        for site, node in [("cmssrm.fnal.gov", "T1_US_FNAL_Buffer"),
+                           ("srm-cms.cern.ch", "T0_CH_CERN_MSS"),
+                           ("T2_CH_CERN", "T2_CH_CERN")]:
+            lfns = [f["lfn"] for d in uninjected[site].values()
+                    for b in d.values() for f in b["files"]]
+            self.assertEqual(sorted(phedex.injected[node]), sorted(lfns))
+        marked = []
+        for call in poller.setStatus.calls:
+            self.assertEqual(call[1], 1)
+            marked.extend(call[0])
+        self.assertEqual(len(marked), 3 * 42)
+        self.assertEqual(len(set(marked)), 3 * 42)
+        return
+
+    def testInjectionFailures(self):
+        """
+        _testInjectionFailures_
+
+        A node failing doesn't stop the injection at the other nodes, the
+        files of a duplicate injection error are recovered later.
+        """
+        uninjected = self.createUninjected(["cmssrm.fnal.gov", "srm-cms.cern.ch"], 1, 3)
+        duplicate = HTTPException()
+        duplicate.status = 400
+        duplicate.result = "Duplicate injection"
+        phedex = MockPhEDEx(failures = {"T1_US_FNAL_Buffer": duplicate})
+        self.config.PhEDExInjector.injectionThreads = 2
+        poller = self.createPoller(phedex, uninjected)
+
+        self.assertRaises(PhEDExInjectorPassableError, poller.injectFiles)
+        self.assertEqual(len(phedex.injected["T0_CH_CERN_MSS"]), 6)
+        self.assertEqual(len(poller.setStatus.calls), 1)
+        self.assertEqual(sorted(poller.filesToRecover.keys()),
+                         sorted(uninjected["cmssrm.fnal.gov"].values()[0].keys()))
+        self.assertEqual(sum([len(x) for x in poller.filesToRecover.values()]), 6)
+        return
+
+    def testInjectionSpeedup(self):
+        """
+        _testInjectionSpeedup_
+
+        Injecting the nodes in parallel must be faster when each injection
+        takes some time.
+        """
+        sites = ["cmssrm.fnal.gov", "srm-cms.cern.ch", "srm-cms-disk.gridpp.rl.ac.uk",
+                 "T2_CH_CERN"]
+        uninjected = self.createUninjected(sites, 2, 50)
+        times = {}
+        for nThreads in [1, 4]:
+            phedex = MockPhEDEx(latency = 0.1)
+            self.config.PhEDExInjector.injectionThreads = nThreads
+            poller = self.createPoller(phedex, uninjected)
+            startTime = time.time()
+            poller.injectFiles()
+            times[nThreads] = time.time() - startTime
+            self.assertEqual(sum([len(x) for x in phedex.injected.values()]), 4 * 200)
+            self.assertEqual(phedex.maxActive, nThreads)
+
+        logging.info("Injection of 4 nodes, serial: %.2fs, 4 threads: %.2fs" % (times[1], times[4]))
+        self.assertTrue(times[4] < times[1] / 2)
+        return
+
 if __name__ == '__main__':
     unittest.main()
@@ -45,6 +45,7 @@ from WMComponent.TaskArchiver.TaskArchiverPoller import TaskArchiverPoller
 from WMCore.JobStateMachine.ChangeState import ChangeState
 from WMCore.FwkJobReport.Report         import Report
 from WMCore.Database.CMSCouch           import CouchServer, CouchNotFoundError
+from WMQuality.Emulators.CouchDBClient.CouchDB import CouchServer as CouchServerEmulator
 
 from WMCore_t.WMSpec_t.TestSpec     import testWorkload
 from WMCore.WMSpec.Makers.TaskMaker import TaskMaker
@@ -1008,5 +1009,148 @@ class TaskArchiverTest(unittest.TestCase):
 
 
 
+def logArchivesByJobID(doc):
+    """
+    Python version of the FWJRDump logArchivesByJobID view
+    """
+    if doc.get('type') != 'fwjr' or not 'logArch1' in doc['fwjr']['steps']:
+        return []
+    logArchive = doc['fwjr']['steps']['logArch1']['output']['logArchive'][0]
+    return [([doc['jobid'], doc['retrycount']],
+             {'lfn': logArchive['lfn'], 'retrycount': doc['retrycount'],
+              'location': logArchive['location']})]
+
+def outputByJobID(doc):
+    """
+    Python version of the FWJRDump outputByJobID view
+    """
+    if doc.get('type') != 'fwjr':
+        return []
+    rows = []
+    for step in doc['fwjr']['steps'].values():
+        for moduleName, outputFiles in step['output'].items():
+            if moduleName == 'logArchive':
+                continue
+            for outputFile in outputFiles:
+                rows.append((doc['jobid'], {'lfn': outputFile['lfn'],
+                                            'location': outputFile['location']}))
+    return rows
+
+def jobsByInputLFN(doc):
+    """
+    Python version of the JobDump jobsByInputLFN view
+    """
+    if doc.get('type') != 'job':
+        return []
+    return [([doc['task'].split('/')[1], x['lfn']], doc['jobid']) for x in doc['inputfiles']]
+
+
+class LogLookupPoller(TaskArchiverPoller):
+    """
+    TaskArchiverPoller with only the couch databases set up
+    """
+    def __init__(self, couchServer, batchSize, threads):
+        self.jobDBName = "taskarchiver_t"
+        self.jobCouchdb = couchServer
+        self.jobsdatabase = couchServer.connectDatabase("taskarchiver_t/jobs")
+        self.fwjrdatabase = couchServer.connectDatabase("taskarchiver_t/fwjrs")
+        self.logLookupBatchSize = batchSize
+        self.logLookupThreads = threads
+        self.sender = None
+
+
+class TaskArchiverLogLookupTest(unittest.TestCase):
+    """
+    Test the log archive lookups of the worst offenders against the couch
+    emulator
+    """
+    def setUp(self):
+        self.couchServer = CouchServerEmulator()
+        jobsdatabase = self.couchServer.connectDatabase("taskarchiver_t/jobs")
+        fwjrdatabase = self.couchServer.connectDatabase("taskarchiver_t/fwjrs")
+        jobsdatabase.registerView("JobDump", "jobsByInputLFN", jobsByInputLFN)
+        fwjrdatabase.registerView("FWJRDump", "logArchivesByJobID", logArchivesByJobID)
+        fwjrdatabase.registerView("FWJRDump", "outputByJobID", outputByJobID)
+
+        # Jobs 1 to 20 have a log archive for each retry, job 20 has no
+        # logCollect, jobs 21 and up have no log archive. Job 100 collects
+        # the logs of odd jobs, job 101 the ones of even jobs.
+        for jobID in range(1, 21):
+            for retry in range(2):
+                lfn = "/store/unmerged/logs/%i-%i-logArchive.tar.gz" % (jobID, retry)
+                fwjrdatabase.queue({'_id': "%i-%i" % (jobID, retry), 'type': 'fwjr',
+                                    'jobid': jobID, 'retrycount': retry,
+                                    'fwjr': {'steps': {'logArch1': {'output': {'logArchive':
+                                                                               [{'lfn': lfn, 'location': 'T1_US_FNAL'}]}}}}})
+                if jobID < 20:
+                    jobsdatabase.queue({'_id': "%i-%i" % (jobID, retry), 'type': 'job',
+                                        'jobid': 100 + jobID % 2, 'task': '/TestWorkload/LogCollect',
+                                        'inputfiles': [{'lfn': lfn}]})
+        for jobID in [100, 101]:
+            fwjrdatabase.queue({'_id': "%i-0" % jobID, 'type': 'fwjr', 'jobid': jobID, 'retrycount': 0,
+                                'fwjr': {'steps': {'logCollect1': {'output': {'LogCollect':
+                                                                              [{'lfn': "/store/logs/%i.tar" % jobID,
+                                                                                'location': 'T1_US_FNAL'}]}}}}})
+        jobsdatabase.commit()
+        fwjrdatabase.commit()
+        jobsdatabase.requestCount = 0
+        fwjrdatabase.requestCount = 0
+        return
+
+    def getOffenders(self):
+        """
+        The offenders of three keys, most jobs are offenders for several keys
+        """
+        offenders = []
+        for key in range(3):
+            for jobID in range(key * 5 + 1, key * 5 + 15):
+                offenders.append({'jobID': jobID, 'retry_count': jobID % 2, 'key': key})
+        offenders.append({'jobID': 25, 'retry_count': 0})
+        offenders.append({'jobID': 26, 'retry_count': None})
+        return offenders
+
+    def checkOffenders(self, offenders):
+        for offender in offenders:
+            jobID = offender['jobID']
+            if jobID >= 20:
+                self.assertFalse('logArchive' in offender)
+                self.assertFalse('logCollect' in offender)
+                continue
+            # the first retry is the one that is used
+            self.assertEqual(offender['logArchive'], "%i-0-logArchive.tar.gz" % jobID)
+            self.assertEqual(offender['logCollect'], "/store/logs/%i.tar" % (100 + jobID % 2))
+        return
+
+    def testLogArchives(self):
+        """
+        _testLogArchives_
+
+        Each view is loaded once for all the offenders
+        """
+        poller = LogLookupPoller(self.couchServer, batchSize = 100, threads = 4)
+        offenders = self.getOffenders()
+        poller.addLogArchives("TestWorkload", offenders)
+        self.checkOffenders(offenders)
+        self.assertEqual(poller.fwjrdatabase.requestCount, 2)
+        self.assertEqual(poller.jobsdatabase.requestCount, 1)
+        return
+
+    def testLogArchivesBatches(self):
+        """
+        _testLogArchivesBatches_
+
+        Batches of keys loaded on a thread pool give the same result
+        """
+        poller = LogLookupPoller(self.couchServer, batchSize = 5, threads = 3)
+        offenders = self.getOffenders()
+        poller.addLogArchives("TestWorkload", offenders)
+        self.checkOffenders(offenders)
+        # 25 jobs up to their retry count make 37 keys, then the 2 logCollect jobs
+        self.assertEqual(poller.fwjrdatabase.requestCount, 8 + 1)
+        # 19 log archives
+        self.assertEqual(poller.jobsdatabase.requestCount, 4)
+        return
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -6,6 +6,8 @@ Test class for basic Math Algorithms
 """
 
 
+import json
+import random
 import unittest
 
 from WMCore.Algorithms import MathAlgos
@@ -160,6 +162,40 @@ class MathAlgoTest(unittest.TestCase):
         self.assertEqual(result, [{'a': 102, 'b': 200, 'name': 'One'},
                                   {'a': 101, 'b': 199, 'name': 'Two'},
                                   {'a': 100, 'b': 198, 'name': 'Three'}])
+
+        # Ties keep the order of the list, like a stable sort
+        l = [{'a': i % 3, 'name': i} for i in range(20)] + [{'name': 'noKey'}]
+        for n in [0, 1, 5, 30]:
+            self.assertEqual(MathAlgos.getLargestValues(dictList = l, key = 'a', n = n),
+                             MathAlgos.sortDictionaryListByKey(dictList = l, key = 'a',
+                                                               reverse = True)[:n])
+        return
+
+    def testArrays(self):
+        """
+        _testArrays_
+
+        Check that arrays give exactly the same statistics as lists
+        """
+        random.seed(12345)
+        numLists = [[], [1, 1, 1], [-0.0], [0.0, -0.0, 0.0],
+                    [float('nan'), 1.0, 2.0], [float('inf'), 1.0, 2.0],
+                    [random.randint(0, 1000) for i in range(500)],
+                    [random.gauss(100, 30) for i in range(1000)],
+                    [random.expovariate(0.01) for i in range(1000)],
+                    [float(random.randint(0, 5)) for i in range(1000)]]
+        for numList in numLists:
+            numArray = MathAlgos.toArray(numList)
+            self.assertEqual(json.dumps(MathAlgos.getAverageStdDev(numList = numArray)),
+                             json.dumps(MathAlgos.getAverageStdDev(numList = numList)))
+            for limit in [1, 3]:
+                for nBins in [1, 10]:
+                    self.assertEqual(json.dumps(MathAlgos.createHistogram(numList = numArray,
+                                                                          nBins = nBins,
+                                                                          limit = limit)),
+                                     json.dumps(MathAlgos.createHistogram(numList = numList,
+                                                                          nBins = nBins,
+                                                                          limit = limit)))
         return
 
 
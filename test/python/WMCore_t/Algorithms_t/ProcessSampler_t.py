@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+_ProcessSampler_t_
+
+Test class for the /proc process sampler
+"""
+
+import os
+import time
+import subprocess
+import unittest
+
+from WMCore.Algorithms import ProcessSampler
+
+class ProcessSamplerTest(unittest.TestCase):
+    """
+    Main test body
+
+    """
+
+    def setUp(self):
+        """
+        Start a child process to sample
+        """
+        self.child = subprocess.Popen(["sleep", "30"])
+        return
+
+    def tearDown(self):
+        """
+        Stop the child process
+        """
+        if self.child.poll() == None:
+            self.child.kill()
+            self.child.wait()
+        return
+
+    def testReadProc(self):
+        """
+        _testReadProc_
+
+        Read the stat and statm files of this process.
+        """
+        ppid, cpuTime = ProcessSampler.readProcStat(os.getpid())
+        self.assertEqual(ppid, os.getppid())
+        self.assertTrue(cpuTime > 0)
+
+        vsize, rss = ProcessSampler.readProcStatm(os.getpid())
+        self.assertTrue(vsize > rss > 0)
+
+        pss = ProcessSampler.readProcPSS(os.getpid())
+        if pss != None:
+            self.assertTrue(pss > 0)
+
+        self.assertEqual(ProcessSampler.readProcStat(self.child.pid)[0], os.getpid())
+        self.assertEqual(ProcessSampler.readProcStat(2 ** 22 + 1), None)
+        self.assertEqual(ProcessSampler.readProcStatm(2 ** 22 + 1), None)
+        return
+
+    def testSample(self):
+        """
+        _testSample_
+
+        Sample this process and its child.
+        """
+        tree = ProcessSampler.getProcessTree(os.getpid())
+        self.assertEqual(tree[0], os.getpid())
+        self.assertTrue(self.child.pid in tree)
+
+        sampler = ProcessSampler.ProcessSampler(os.getpid())
+        firstSample = sampler.sample()
+        self.assertTrue(firstSample["processes"] >= 2)
+        self.assertEqual(firstSample["pcpu"], 0.0)
+        self.assertTrue(firstSample["rss"] > 0)
+        self.assertTrue(firstSample["vsize"] > firstSample["rss"])
+
+        # Burn some CPU
+        startTime = time.time()
+        while time.time() - startTime < 0.3:
+            pass
+        secondSample = sampler.sample()
+        self.assertTrue(secondSample["pcpu"] > 10)
+        self.assertTrue(secondSample["time"] > firstSample["time"])
+
+        self.child.kill()
+        self.child.wait()
+        self.assertEqual(sampler.sample()["processes"], firstSample["processes"] - 1)
+
+        self.assertEqual(ProcessSampler.ProcessSampler(self.child.pid).sample(), None)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
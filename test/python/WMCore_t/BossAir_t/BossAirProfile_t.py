@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+_BossAirProfile_t_
+
+Time BossAirAPI.track for growing numbers of running jobs with a dummy
+plugin that changes, completes and loses some of them.
+"""
+
+import time
+import logging
+import unittest
+
+from WMCore.BossAir.BossAirAPI import BossAirAPI
+from WMCore.BossAir.Plugins.TestPlugin import TestPlugin
+
+from WMCore_t.BossAir_t.BossAir_t import BossAirTest
+
+
+class DummyTrackPlugin(TestPlugin):
+    """
+    _DummyTrackPlugin_
+
+    Out of every ten jobs one is complete, one isn't reported, two
+    changed state and the others are still running.
+    """
+    def track(self, jobs, info = None):
+        changeList   = []
+        completeList = []
+        runningList  = []
+        for job in jobs:
+            category = job['id'] % 10
+            if category == 0:
+                completeList.append(job)
+                continue
+            if category == 1:
+                continue
+            if category in [2, 3] and job['status'] != 'Dead':
+                job['status'] = 'Dead'
+                job['status_time'] = int(time.time())
+                changeList.append(job)
+            job['globalState'] = TestPlugin.stateMap()[job['status']]
+            runningList.append(job)
+        return runningList, changeList, completeList
+
+
+class BossAirProfileTest(BossAirTest):
+    """
+    _BossAirProfileTest_
+
+    Inherit the database setup from BossAir
+    """
+    def trackJobs(self, nJobs):
+        """
+        _trackJobs_
+
+        Create nJobs running jobs, time one tracking cycle.
+        """
+        config = self.getConfig()
+        baAPI  = BossAirAPI(config = config)
+        baAPI.plugins['TestPlugin'] = DummyTrackPlugin(config)
+
+        jobDummies = self.createDummyJobs(nJobs = nJobs, location = 'Xanadu')
+        baAPI.createNewJobs(wmbsJobs = jobDummies)
+        runJobs = baAPI._listRunJobs()
+
+        startTime = time.time()
+        returnList = baAPI.track()
+        trackTime = time.time() - startTime
+
+        nComplete = len([x for x in runJobs if x['id'] % 10 == 0])
+        nChanged  = len([x for x in runJobs if x['id'] % 10 in [2, 3]])
+        nRunning  = len([x for x in runJobs if x['id'] % 10 != 0 and x['id'] % 10 != 1])
+        self.assertEqual(len(returnList), nRunning)
+        self.assertEqual(len(baAPI._loadByStatus(status = 'Dead')), nChanged)
+        self.assertEqual(len(baAPI._listRunJobs()), nJobs - nComplete)
+
+        # Clean up for the next round
+        baAPI._deleteJobs(jobs = runJobs)
+        return trackTime
+
+    def testTrack(self):
+        """
+        _testTrack_
+
+        A tracking cycle must scale about linearly with the number of jobs.
+        """
+        smallJobs = 10000
+        largeJobs = 40000
+
+        smallTime = self.trackJobs(smallJobs)
+        largeTime = self.trackJobs(largeJobs)
+
+        logging.info("%s jobs tracked in %.2fs" % (smallJobs, smallTime))
+        logging.info("%s jobs tracked in %.2fs" % (largeJobs, largeTime))
+
+        # Four times the jobs, quadratic would take sixteen times longer
+        self.assertTrue(largeTime < 8 * smallTime)
+        return
+
+if __name__ == "__main__":
+    unittest.main()
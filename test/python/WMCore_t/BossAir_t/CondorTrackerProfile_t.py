@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+_CondorTrackerProfile_t_
+
+Compare the retrieval of 200k classAds from a fake schedd with the way the
+CondorPlugin parsed the whole condor_q output before.
+"""
+
+import re
+import time
+import logging
+import unittest
+
+from StringIO import StringIO
+
+from WMCore.BossAir.Plugins.CondorTracker import CondorTracker, parseClassAds
+
+from WMCore_t.BossAir_t.CondorTracker_t import fakeClassAds, condorQOutput, FakeSchedd
+
+
+def parseWholeOutput(stdout):
+    """
+    _parseWholeOutput_
+
+    Split and parse the condor_q output like CondorPlugin.getClassAds did.
+    """
+    jobInfo = {}
+    classAdsRaw = stdout.split(':::')
+    for ad in classAdsRaw:
+        if not re.search("\(", ad):
+            continue
+        statements = ad.split('(')
+        tmpDict = {}
+        for statement in statements:
+            if not re.search(':', statement):
+                continue
+            key = str(statement.split(':')[0])
+            value = statement.split(':')[1].split(')')[0]
+            tmpDict[key] = value
+        if not 'WMAgentID' in tmpDict.keys():
+            continue
+        else:
+            jobInfo[int(tmpDict['WMAgentID'])] = tmpDict
+    return jobInfo
+
+
+class CondorTrackerProfileTest(unittest.TestCase):
+    """
+    _CondorTrackerProfileTest_
+
+    """
+    def setUp(self):
+        self.nJobs = 200000
+        self.ads = fakeClassAds(self.nJobs)
+        return
+
+    def testRetrieveClassAds(self):
+        """
+        _testRetrieveClassAds_
+
+        All the ways must give the same ads, the streamed parsing must not be
+        slower than parsing the whole output.
+        """
+        output = condorQOutput(self.ads)
+
+        startTime = time.time()
+        wholeInfo = parseWholeOutput(output)
+        wholeTime = time.time() - startTime
+
+        startTime = time.time()
+        streamedInfo = parseClassAds(StringIO(output))
+        streamedTime = time.time() - startTime
+
+        tracker = CondorTracker("testAgent", schedd = FakeSchedd(self.ads))
+        startTime = time.time()
+        bindingsInfo, changed = tracker.getChanges()
+        bindingsTime = time.time() - startTime
+
+        nChanges = 0
+        for ad in self.ads[::100]:
+            if ad['JobStatus'] != 4:
+                ad['JobStatus'] = 4
+                nChanges += 1
+        startTime = time.time()
+        _, newChanged = tracker.getChanges()
+        pollTime = time.time() - startTime
+
+        logging.info("%s ads, whole condor_q output: %.2fs" % (self.nJobs, wholeTime))
+        logging.info("%s ads, streamed condor_q output: %.2fs" % (self.nJobs, streamedTime))
+        logging.info("%s ads, fake schedd: %.2fs, next poll %.2fs with %i changes" \
+                     % (self.nJobs, bindingsTime, pollTime, len(newChanged)))
+
+        self.assertEqual(streamedInfo, wholeInfo)
+        self.assertEqual(bindingsInfo, wholeInfo)
+        self.assertEqual(len(changed), self.nJobs)
+        self.assertEqual(len(newChanged), nChanges)
+        self.assertTrue(streamedTime < wholeTime)
+        return
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+"""
+_CondorTracker_t_
+
+Test the classAd retrieval of the CondorPlugin against a fake schedd.
+"""
+
+import unittest
+
+from StringIO import StringIO
+
+from WMCore.BossAir.Plugins.CondorTracker import CondorTracker, parseClassAds, \
+                                                 trackedAttributes, adSeparator
+
+
+def fakeClassAds(nJobs, agentName = "testAgent"):
+    """
+    _fakeClassAds_
+
+    Ads of WMAgent jobs in every state, with more attributes than tracked.
+    """
+    ads = []
+    for i in range(nJobs):
+        ad = {'ClusterId': 1000 + i, 'ProcId': 0,
+              'Owner': 'cmsdataops', 'Iwd': '/data/srv/wmagent/job%i' % i,
+              'JobStatus': i % 6 + 1, 'EnteredCurrentStatus': 1380000000 + i,
+              'QDate': 1370000000 + i,
+              'DESIRED_Sites': 'T1_US_FNAL,T2_CH_CERN',
+              'WMAgent_JobID': i + 1, 'WMAgent_AgentName': agentName}
+        if ad['JobStatus'] == 2:
+            ad['JobStartDate'] = 1375000000 + i
+            ad['MATCH_EXP_JOBGLIDEIN_CMSSite'] = 'T1_US_FNAL'
+        ads.append(ad)
+    return ads
+
+
+def condorQOutput(ads):
+    """
+    _condorQOutput_
+
+    What condor_q prints for the ads with the format of the tracker.
+    """
+    output = []
+    for ad in ads:
+        for attribute, key in trackedAttributes:
+            if not attribute in ad:
+                continue
+            if attribute == 'WMAgent_JobID':
+                output.append('(%s:%d)%s' % (key, ad[attribute], adSeparator))
+            else:
+                output.append('(%s:%s)  ' % (key, ad[attribute]))
+    return ''.join(output)
+
+
+class FakeSchedd(object):
+    """
+    _FakeSchedd_
+
+    Answer queries with the projection of the ads of one agent, the
+    constraint is not evaluated.
+    """
+    def __init__(self, ads):
+        self.ads = ads
+        self.queries = []
+
+    def xquery(self, requirements, projection):
+        self.queries.append((requirements, projection))
+        for ad in self.ads:
+            yield dict([(x, ad[x]) for x in projection if x in ad])
+
+
+class CondorTrackerTest(unittest.TestCase):
+    """
+    _CondorTrackerTest_
+
+    """
+    def testParseClassAds(self):
+        """
+        _testParseClassAds_
+
+        The condor_q output is parsed the same whatever the size of the chunks
+        it is read in.
+        """
+        ads = fakeClassAds(100)
+        output = condorQOutput(ads) + '(JobStatus:1)  ' + adSeparator
+
+        for chunkSize in [7, 100, 65536]:
+            jobInfo = parseClassAds(StringIO(output), chunkSize)
+            self.assertEqual(len(jobInfo), 100)
+            self.assertEqual(jobInfo[1], {'JobStatus': '1', 'stateTime': '1380000000',
+                                          'submitTime': '1370000000',
+                                          'DESIRED_Sites': 'T1_US_FNAL,T2_CH_CERN',
+                                          'WMAgentID': '1'})
+            self.assertEqual(jobInfo[2]['runningTime'], '1375000001')
+            self.assertEqual(jobInfo[2]['runningCMSSite'], 'T1_US_FNAL')
+
+        self.assertEqual(parseClassAds(StringIO('')), {})
+        return
+
+    def testQueryBindings(self):
+        """
+        _testQueryBindings_
+
+        The bindings must give the same ads as condor_q, with only the
+        tracked attributes.
+        """
+        ads = fakeClassAds(100)
+        schedd = FakeSchedd(ads)
+        tracker = CondorTracker("testAgent", schedd = schedd)
+
+        jobInfo = tracker.getClassAds()
+        self.assertEqual(jobInfo, parseClassAds(StringIO(condorQOutput(ads))))
+        self.assertEqual(schedd.queries,
+                         [('WMAgent_JobID =!= UNDEFINED && WMAgent_AgentName == "testAgent"',
+                           [x[0] for x in trackedAttributes])])
+
+        # A failing schedd gives no ads
+        schedd.ads = None
+        self.assertEqual(tracker.getClassAds(), None)
+        return
+
+    def testGetChanges(self):
+        """
+        _testGetChanges_
+
+        Only the new ads and the ones that changed since the previous poll
+        are reported as changed.
+        """
+        ads = fakeClassAds(10)
+        schedd = FakeSchedd(ads)
+        tracker = CondorTracker("testAgent", schedd = schedd)
+
+        jobInfo, changed = tracker.getChanges()
+        self.assertEqual(len(jobInfo), 10)
+        self.assertEqual(changed, set(range(1, 11)))
+
+        jobInfo, changed = tracker.getChanges()
+        self.assertEqual(len(jobInfo), 10)
+        self.assertEqual(changed, set())
+
+        ads[0]['JobStatus'] = 2
+        ads[1]['EnteredCurrentStatus'] += 10
+        del ads[2]
+        ads.extend(fakeClassAds(12)[10:])
+        jobInfo, changed = tracker.getChanges()
+        self.assertEqual(len(jobInfo), 11)
+        self.assertEqual(changed, set([1, 2, 11, 12]))
+
+        # The previous poll is kept when the schedd can't be queried
+        tracker.schedd = None
+        tracker.useBindings = True
+        tracker.getClassAds = lambda: None
+        self.assertEqual(tracker.getChanges(), (None, set()))
+        self.assertEqual(len(tracker.previousAds), 11)
+        return
+
+if __name__ == "__main__":
+    unittest.main()
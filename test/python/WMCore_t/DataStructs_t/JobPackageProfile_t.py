@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""
+_JobPackageProfile_t_
+
+Compare the time needed to load one job from a JobPackage with the time
+needed to load the whole package.
+"""
+
+import os
+import time
+import logging
+import unittest
+
+from WMQuality.TestInit import TestInit
+
+from WMCore.DataStructs.JobPackage import JobPackage
+from WMCore.DataStructs.Job import Job
+
+
+class JobPackageProfileTest(unittest.TestCase):
+    """
+    _JobPackageProfileTest_
+
+    """
+    def setUp(self):
+        """
+        _setUp_
+
+        Create a temporary file to persist the JobPackage to.
+        """
+        self.testInit = TestInit(__file__)
+        self.testDir = self.testInit.generateWorkDir()
+        self.persistFile = os.path.join(self.testDir, "JobPackage.pkl")
+        return
+
+    def tearDown(self):
+        self.testInit.delWorkDir()
+        return
+
+    def testLoadJob(self):
+        """
+        _testLoadJob_
+
+        Loading one job must be faster than loading the whole package, for
+        several package sizes.
+        """
+        for nJobs in [10, 100, 1000, 5000]:
+            package = JobPackage()
+            for i in range(nJobs):
+                newJob = Job("Job%s" % i)
+                newJob["id"] = i
+                newJob["mask"]["FirstEvent"] = i * 1000
+                setattr(newJob.getBaggage(), "seed1", 11111111)
+                package[i] = newJob
+            package.save(self.persistFile)
+
+            startTime = time.time()
+            JobPackage().load(self.persistFile)
+            loadTime = time.time() - startTime
+
+            startTime = time.time()
+            job = JobPackage().loadJob(self.persistFile, nJobs // 2)
+            loadJobTime = time.time() - startTime
+            self.assertEqual(job["id"], nJobs // 2)
+
+            logging.info("%i jobs (%i bytes): load %.4fs, loadJob %.4fs" % \
+                         (nJobs, os.path.getsize(self.persistFile), loadTime, loadJobTime))
+
+        self.assertTrue(loadJobTime < loadTime)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
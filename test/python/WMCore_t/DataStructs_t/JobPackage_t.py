@@ -6,6 +6,7 @@ Unittests for JobPackage persistency mechanism
 """
 
 import os
+import cPickle
 import unittest
 
 from WMQuality.TestInit import TestInit
@@ -144,5 +145,44 @@ class JobPackageTest(unittest.TestCase):
 
         return
 
+    def testLoadJob(self):
+        """
+        _testLoadJob_
+
+        Verify that single jobs can be loaded from new and old packages.
+        """
+        package = JobPackage(directory = "/some/dir")
+
+        for i in range(1, 200, 2):
+            newJob = Job("Job%s" % i)
+            newJob["id"] = i
+            package[i] = newJob
+
+        package.save(self.persistFile)
+
+        for i in [1, 99, 101, 199]:
+            singlePackage = JobPackage()
+            job = singlePackage.loadJob(self.persistFile, i)
+            self.assertEqual(job["id"], i)
+            self.assertEqual(job["name"], "Job%d" % i)
+            self.assertEqual(singlePackage.keys(), ["directory"])
+            self.assertEqual(singlePackage["directory"], "/some/dir")
+
+        for i in [0, 2, 200]:
+            self.assertRaises(KeyError, JobPackage().loadJob, self.persistFile, i)
+
+        # Packages pickled by older versions
+        fileHandle = open(self.persistFile, "w")
+        cPickle.dump(package, fileHandle, -1)
+        fileHandle.close()
+
+        newPackage = JobPackage()
+        newPackage.load(self.persistFile)
+        self.assertEqual(len(newPackage.keys()), 101)
+        self.assertEqual(newPackage["directory"], "/some/dir")
+        self.assertEqual(JobPackage().loadJob(self.persistFile, 5)["name"], "Job5")
+        self.assertRaises(KeyError, JobPackage().loadJob, self.persistFile, 2)
+        return
+
 if __name__ == '__main__':
     unittest.main()
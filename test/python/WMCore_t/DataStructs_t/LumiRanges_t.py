@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+"""
+_LumiRanges_t_
+
+Unittest for the WMCore.DataStructs.LumiRanges class
+"""
+
+import time
+import random
+import logging
+import unittest
+
+from WMCore.DataStructs.LumiRanges import LumiRanges
+from WMCore.DataStructs.Mask import Mask
+from WMCore.DataStructs.Run import Run
+from WMCore.JobSplitting.LumiBased import isGoodLumi
+
+
+def expandCompactList(compactList):
+    """
+    _expandCompactList_
+
+    Brute force expansion of a compact list into a set of (run, lumi) pairs.
+    """
+    pairs = set()
+    for run, ranges in compactList.items():
+        for first, last in ranges:
+            pairs.update([(int(run), lumi) for lumi in range(first, last + 1)])
+    return pairs
+
+
+class LumiRangesTest(unittest.TestCase):
+    """
+    _LumiRangesTest_
+
+    """
+    def setUp(self):
+        random.seed(1234)
+        return
+
+    def randomCompactList(self, nRuns, nRanges, maxLumi):
+        """
+        _randomCompactList_
+
+        Create a compact list with random, possibly overlapping, ranges.
+        """
+        compactList = {}
+        for run in range(1, nRuns + 1):
+            ranges = []
+            for i in range(nRanges):
+                first = random.randint(1, maxLumi)
+                ranges.append([first, first + random.randint(0, 10)])
+            compactList[str(run)] = ranges
+        return compactList
+
+    def testMerge(self):
+        """
+        _testMerge_
+
+        Overlapping and adjacent ranges are merged, invalid ranges ignored.
+        """
+        lumiRanges = LumiRanges({1: [[10, 20], [1, 5], [6, 8], [15, 30], [40, 40], [50, 45]],
+                                 "2": [[3, 3]]})
+        self.assertEqual(lumiRanges.getRanges(1), [[1, 8], [10, 30], [40, 40]])
+        self.assertEqual(lumiRanges.getCompactList(),
+                         {"1": [[1, 8], [10, 30], [40, 40]], "2": [[3, 3]]})
+        self.assertEqual(lumiRanges.getRuns(), [1, 2])
+        self.assertEqual(len(lumiRanges), 2)
+
+        lumiRanges.addRanges("2", [[4, 10]])
+        self.assertEqual(lumiRanges.getRanges(2), [[3, 10]])
+        return
+
+    def testContains(self):
+        """
+        _testContains_
+
+        Check membership against a brute force expansion.
+        """
+        compactList = self.randomCompactList(nRuns = 5, nRanges = 50, maxLumi = 500)
+        lumiRanges = LumiRanges(compactList)
+        expanded = expandCompactList(compactList)
+
+        for run in range(0, 7):
+            self.assertEqual(lumiRanges.hasRun(run), str(run) in compactList)
+            self.assertEqual(lumiRanges.hasRun(str(run)), str(run) in compactList)
+            for lumi in range(0, 520):
+                self.assertEqual(lumiRanges.contains(run, lumi), (run, lumi) in expanded)
+                self.assertEqual((run, lumi) in lumiRanges, (run, lumi) in expanded)
+
+        lumis = range(520, 0, -1)
+        self.assertEqual(lumiRanges.filterLumis(3, lumis),
+                         [x for x in lumis if (3, x) in expanded])
+        self.assertEqual(lumiRanges.filterLumis(10, lumis), [])
+        return
+
+    def testSetOperations(self):
+        """
+        _testSetOperations_
+
+        Check intersection, subtraction and union against a brute force
+        expansion.
+        """
+        for i in range(10):
+            compactListA = self.randomCompactList(nRuns = 4, nRanges = 30, maxLumi = 300)
+            compactListB = self.randomCompactList(nRuns = 5, nRanges = 30, maxLumi = 300)
+            del compactListB["2"]
+            rangesA = LumiRanges(compactListA)
+            rangesB = LumiRanges(compactListB)
+            expandedA = expandCompactList(compactListA)
+            expandedB = expandCompactList(compactListB)
+
+            self.assertEqual(expandCompactList((rangesA & rangesB).getCompactList()),
+                             expandedA & expandedB)
+            self.assertEqual(expandCompactList((rangesA - rangesB).getCompactList()),
+                             expandedA - expandedB)
+            self.assertEqual(expandCompactList((rangesB - rangesA).getCompactList()),
+                             expandedB - expandedA)
+            self.assertEqual(expandCompactList((rangesA | rangesB).getCompactList()),
+                             expandedA | expandedB)
+            self.assertEqual(rangesA | rangesB, rangesB | rangesA)
+            self.assertEqual(rangesA & rangesB, rangesB & rangesA)
+
+        return
+
+    def testLargeRange(self):
+        """
+        _testLargeRange_
+
+        Filtering runs against a mask with a very large range must not expand
+        the range.
+        """
+        testMask = Mask()
+        testMask.addRunAndLumis(run = 1, lumis = [1, 1000000])
+        testMask.addRunAndLumis(run = 2, lumis = [5, 5])
+
+        runs = [Run(1, 5, 999999, 1000001), Run(2, 4, 5, 6), Run(3, 1)]
+        filteredRuns = testMask.filterRunLumisByMask(runs = runs)
+        self.assertEqual(sorted([(x.run, sorted(x.lumis)) for x in filteredRuns]),
+                         [(1, [5, 999999]), (2, [5])])
+        return
+
+    def testWhitelistPerformance(self):
+        """
+        _testWhitelistPerformance_
+
+        Micro-benchmark with an ACDC sized whitelist of 10^5 ranges, compare
+        the linear scan done on the compact list with the bisect lookups.
+        """
+        nRanges = 100000
+        nLookups = 200
+        goodRunList = {"1": [[10 * x + 1, 10 * x + 5] for x in range(nRanges)]}
+        lookups = [random.randint(1, 10 * nRanges) for x in range(nLookups)]
+
+        def linearIsGoodLumi(run, lumi):
+            for runRange in goodRunList.get(str(run), []):
+                if runRange[0] <= lumi and runRange[1] >= lumi:
+                    return True
+            return False
+
+        startTime = time.time()
+        linearResult = [linearIsGoodLumi(1, lumi) for lumi in lookups]
+        linearTime = time.time() - startTime
+
+        startTime = time.time()
+        lumiRanges = LumiRanges(compactList = goodRunList)
+        buildTime = time.time() - startTime
+
+        startTime = time.time()
+        bisectResult = [isGoodLumi(lumiRanges, 1, lumi) for lumi in lookups]
+        bisectTime = time.time() - startTime
+
+        logging.info("%i lookups in %i ranges: linear %.3fs, bisect %.3fs (build %.3fs)" % \
+                     (nLookups, nRanges, linearTime, bisectTime, buildTime))
+        self.assertEqual(linearResult, bisectResult)
+        self.assertTrue(bisectTime * 10 < linearTime)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,9 +12,11 @@ Unittest for the WMCore.DataStructs.Mask class
 # -mnorman
 
 
+import cPickle
 import unittest
 from WMCore.DataStructs.Mask import Mask
 from WMCore.DataStructs.Run import Run
+from WMCore.DataStructs.LumiList import LumiList
 
 
 class MaskTest(unittest.TestCase):
@@ -178,6 +180,40 @@ class MaskTest(unittest.TestCase):
         self.assertEqual(run.run, 1)
         self.assertEqual(run.lumis, [2,9])
 
+    def testRunLumiInMask(self):
+        """
+        Test that the cached lumi ranges follow the changes of the mask
+        """
+        mask = Mask()
+        self.assertTrue(mask.runLumiInMask(run = 1, lumi = 5))
+
+        mask.addRunWithLumiRanges(run = 1, lumiList = [[1, 9], [12, 12]])
+        self.assertTrue(mask.runLumiInMask(run = 1, lumi = 5))
+        self.assertFalse(mask.runLumiInMask(run = 1, lumi = 10))
+        self.assertFalse(mask.runLumiInMask(run = 2, lumi = 5))
+        lumiRanges = mask.getLumiRanges()
+        self.assertTrue(mask.getLumiRanges() is lumiRanges)
+
+        mask.addRunAndLumis(run = 1, lumis = [10, 11])
+        self.assertTrue(mask.runLumiInMask(run = 1, lumi = 10))
+        mask.addRun(Run(2, 5, 6))
+        self.assertTrue(mask.runLumiInMask(run = 2, lumi = 5))
+        self.assertFalse(mask.getLumiRanges() is lumiRanges)
+
+        mask['runAndLumis'] = {3: [[1, 2]]}
+        self.assertTrue(mask.runLumiInMask(run = 3, lumi = 2))
+        self.assertFalse(mask.runLumiInMask(run = 1, lumi = 5))
+
+        mask.removeLumiList(LumiList(compactList = {'3': [[2, 2]]}))
+        self.assertFalse(mask.runLumiInMask(run = '3', lumi = 2))
+        self.assertTrue(mask.runLumiInMask(run = '3', lumi = 1))
+
+        # The cached ranges aren't pickled
+        pickledMask = cPickle.loads(cPickle.dumps(mask, cPickle.HIGHEST_PROTOCOL))
+        self.assertEqual(pickledMask, mask)
+        self.assertEqual(pickledMask._lumiRanges, None)
+        self.assertTrue(pickledMask.runLumiInMask(run = '3', lumi = 1))
+
 
 if __name__ == '__main__':
     unittest.main()
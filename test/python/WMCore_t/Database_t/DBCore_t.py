@@ -285,6 +285,69 @@ class DBCoreTest(unittest.TestCase):
 
         return
 
+    def testBulkSelect(self):
+        """
+        _testBulkSelect_
+
+        Verify that selects on a single bind variable can be run as IN list
+        queries and that they return the same rows as the regular selects.
+        """
+        binds = []
+        for i in range(1201):
+            binds.append({"one": i, "two": i * 2, "three": str(i * 3)})
+
+        insertSQL = "INSERT INTO test_tablea VALUES (:one, :two, :three)"
+        selectSQL = \
+          """SELECT column1, column2, column3 FROM test_tablea
+             WHERE column1 = :one"""
+
+        myThread = threading.currentThread()
+        myThread.dbi.processData(insertSQL, binds = binds)
+
+        # Some of these binds don't match any rows and some are duplicated
+        selectBinds = [{"one": i} for i in range(0, 1800, 3)]
+        selectBinds.extend([{"one": i} for i in range(0, 1800, 3)])
+
+        bulkStatements = myThread.dbi.buildBulkSelect(selectSQL, selectBinds)
+        self.assertEqual(len(bulkStatements), 2)
+        self.assertEqual(len(bulkStatements[0][1]), myThread.dbi.maxBindsPerQuery)
+        self.assertEqual(len(bulkStatements[1][1]), 128)
+        self.assertTrue("column1 IN (:one_0, :one_1," in bulkStatements[0][0])
+        self.assertEqual(myThread.dbi.buildBulkSelect(selectSQL, [{"two": 2}]), None)
+
+        # Only equalities with a bind used once can be rewritten
+        for operator in ["<=", ">=", "!="]:
+            self.assertEqual(myThread.dbi.buildBulkSelect(
+                "SELECT column1 FROM test_tablea WHERE column1 %s :one" % operator,
+                selectBinds), None)
+        self.assertEqual(myThread.dbi.buildBulkSelect(
+            "SELECT column1 FROM test_tablea WHERE column1 = :one AND column2 <= :one",
+            selectBinds), None)
+        bulkStatements = myThread.dbi.buildBulkSelect(
+            "SELECT column1 FROM test_tablea WHERE column2 <= :two AND column1=:one",
+            [{"one": 1}])
+        self.assertEqual(bulkStatements[0][0],
+                         "SELECT column1 FROM test_tablea WHERE column2 <= :two AND column1 IN (:one_0)")
+
+        regularResults = []
+        for resultSet in myThread.dbi.processData(selectSQL, selectBinds):
+            regularResults.extend(resultSet.fetchall())
+        bulkResults = []
+        for resultSet in myThread.dbi.processData(selectSQL, selectBinds, bulkSelect = True):
+            bulkResults.extend(resultSet.fetchall())
+
+        self.assertEqual(len(regularResults), 802)
+        self.assertEqual(len(bulkResults), 401)
+        self.assertEqual(sorted(set([tuple(x) for x in regularResults])),
+                         sorted([tuple(x) for x in bulkResults]))
+
+        # Selects with several bind variables still work
+        bulkResults = myThread.dbi.processData(
+            """SELECT column1 FROM test_tablea WHERE column1 = :one AND column2 = :two""",
+            binds[:10], bulkSelect = True)
+        self.assertEqual(len(bulkResults[0].fetchall()), 10)
+        return
+
     def testInsertHugeNumber(self):
         """
         _testInsertHugeNumber_
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""
+_DBFormatterProfile_t_
+
+Compare the time formatDict takes on 100k rows with the original row by row
+formatting.
+"""
+
+import time
+import logging
+import unittest
+
+from WMCore.Database.DBFormatter import DBFormatter
+from WMCore.Database.ResultSet import ResultSet
+
+from WMCore_t.Database_t.DBFormatter_t import FakeCursor, formatDictRowByRow
+
+
+class DBFormatterProfileTest(unittest.TestCase):
+    """
+    _DBFormatterProfileTest_
+
+    """
+    def testFormatDict(self):
+        """
+        _testFormatDict_
+
+        Format the same rows from a ResultSet and a cursor, formatDict must
+        not be slower than the original formatting.
+        """
+        dbformatter = DBFormatter(logging, None)
+        keys = ["ID", "LFN", "Size", "events", "first_event", "last_event",
+                "merged", "create_by", "checksum", "location"]
+        rows = [(i, u"/store/file%i.root" % i, 1000 + i, 100, i * 100, i * 100 + 99,
+                 0, "/CN=Test", None, "T1_US_FNAL") for i in range(100000)]
+        result = ResultSet()
+        result.keys = keys
+        result.data = rows
+
+        startTime = time.time()
+        formatDictRowByRow([result])
+        rowByRowTime = time.time() - startTime
+
+        startTime = time.time()
+        dbformatter.formatDict([result])
+        formatDictTime = time.time() - startTime
+
+        startTime = time.time()
+        dbformatter.formatDict([FakeCursor(keys, rows)])
+        cursorTime = time.time() - startTime
+
+        logging.info("Formatted %i rows: original %.3fs, ResultSet %.3fs, cursor %.3fs" % \
+                     (len(rows), rowByRowTime, formatDictTime, cursorTime))
+        self.assertTrue(formatDictTime < rowByRowTime)
+        return
+
+if __name__ == "__main__":
+    unittest.main()
@@ -17,6 +17,7 @@ import threading
 
 from WMCore.Database.DBFactory import DBFactory
 from WMCore.Database.DBFormatter import DBFormatter
+from WMCore.Database.ResultSet import ResultSet
 from WMCore.Database.Transaction import Transaction
 from WMQuality.TestInit import TestInit
 
@@ -90,6 +91,12 @@ insert into test (bind1, bind2) values (:bind1, :bind2) """
         self.assertEqual( output , ['value1a', 'value2a'] )
         result = myThread.transaction.processData(myThread.select)
         output = dbformatter.formatDict(result)
+        self.assertEqual( output , [{'bind2': 'value2a', 'bind1': 'value1a'}, \
+            {'bind2': 'value2b', 'bind1': 'value1b'},\
+            {'bind2': 'value2d', 'bind1': 'value1c'}] )
+        result = myThread.transaction.processData(myThread.select,
+                                                  returnCursor = True)
+        output = dbformatter.formatDict(result, size = 2)
         self.assertEqual( output , [{'bind2': 'value2a', 'bind1': 'value1a'}, \
             {'bind2': 'value2b', 'bind1': 'value1b'},\
             {'bind2': 'value2d', 'bind1': 'value1c'}] )
@@ -98,5 +105,96 @@ insert into test (bind1, bind2) values (:bind1, :bind2) """
         self.assertEqual( output,  {'bind2': 'value2a', 'bind1': 'value1a'} )
 
 
+class FakeCursor:
+    """
+    _FakeCursor_
+
+    Just enough of a SQLAlchemy result proxy to be formatted.
+    """
+    def __init__(self, keys, rows):
+        self.columns = keys
+        self.rows = rows
+        self.position = 0
+        self.closed = False
+
+    def keys(self):
+        return self.columns
+
+    def fetchmany(self, size):
+        rows = self.rows[self.position:self.position + size]
+        self.position += size
+        return rows
+
+    def close(self):
+        self.closed = True
+
+
+def formatDictRowByRow(result):
+    """
+    _formatDictRowByRow_
+
+    The original formatDict loop, kept as the reference.
+    """
+    dictOut = []
+    for r in result:
+        descriptions = r.keys
+        for i in r.fetchall():
+            entry = {}
+            for index in xrange(0,len(descriptions)):
+                if type(i[index]) == unicode:
+                    entry[str(descriptions[index].lower())] = str(i[index])
+                else:
+                    entry[str(descriptions[index].lower())] = i[index]
+
+            dictOut.append(entry)
+
+        r.close()
+
+    return dictOut
+
+
+class DBFormatterRowsTest(unittest.TestCase):
+    """
+    _DBFormatterRowsTest_
+
+    Formatting tests that don't need a database.
+    """
+    def makeResultSet(self, rows):
+        result = ResultSet()
+        result.keys = ["ID", "LFN", "Size", "events"]
+        result.data = rows
+        return result
+
+    def makeRows(self, nRows):
+        return [(i, u"/store/file%i.root" % i, 1000 + i, u"" if i % 2 else None)
+                for i in range(nRows)]
+
+    def testFormatDict(self):
+        """
+        _testFormatDict_
+
+        ResultSets and cursors give the same dictionaries as the original
+        formatting.
+        """
+        dbformatter = DBFormatter(logging, None)
+        rows = self.makeRows(25)
+
+        output = dbformatter.formatDict([self.makeResultSet(rows[:10]),
+                                         self.makeResultSet(rows[10:])])
+        self.assertEqual(output, formatDictRowByRow([self.makeResultSet(rows)]))
+        self.assertEqual(output[3], {"id": 3, "lfn": "/store/file3.root",
+                                     "size": 1003, "events": ""})
+        self.assertEqual(output[4]["events"], None)
+        self.assertEqual(type(output[3]["lfn"]), str)
+        self.assertEqual(type(output[3]["events"]), str)
+
+        cursor = FakeCursor(["ID", "LFN", "Size", "events"], rows)
+        self.assertEqual(dbformatter.formatDict([cursor], size = 7), output)
+        self.assertTrue(cursor.closed)
+        self.assertEqual(dbformatter.formatDict([cursor]), [])
+        self.assertEqual(dbformatter.formatDict([ResultSet()]), [])
+        return
+
+
 if __name__ == "__main__":
     unittest.main()
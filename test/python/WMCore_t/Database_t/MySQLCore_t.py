@@ -8,12 +8,46 @@ Unit tests for the MySQL version of DBCore.
 
 
 
+import os
+import re
+import time
 import unittest
 import logging
 
-from WMCore.Database.MySQLCore import MySQLInterface
+import WMCore.WMBS
+from WMCore.Database.MySQLCore import MySQLInterface, parseBindVariables
+from WMCore.Database.MySQLCore import substitutionCache
 from WMQuality.TestInit import TestInit
 
+def loadWMBSDAOSQL():
+    """
+    _loadWMBSDAOSQL_
+
+    Return a list of (sql, bind names) for all the MySQL WMBS DAOs that have
+    static SQL with bind variables.
+    """
+    daoSQL = []
+    daoDir = os.path.join(os.path.dirname(WMCore.WMBS.__file__), "MySQL")
+    for dirPath, dirNames, fileNames in os.walk(daoDir):
+        for fileName in sorted(fileNames):
+            if not fileName.endswith(".py") or fileName == "__init__.py":
+                continue
+            moduleName = "WMCore.WMBS.MySQL%s.%s" % \
+                         (dirPath[len(daoDir):].replace("/", "."), fileName[:-3])
+            className = fileName[:-3]
+            try:
+                module = __import__(moduleName, globals(), locals(), [className])
+                sql = getattr(getattr(module, className), "sql", None)
+            except Exception:
+                continue
+            if type(sql) != str:
+                continue
+            bindNames = list(set(re.findall(r":(\w+)", sql)))
+            if bindNames:
+                daoSQL.append((sql, bindNames))
+
+    return daoSQL
+
 class DBCoreTest(unittest.TestCase):
     def setUp(self):
         """
@@ -122,5 +156,71 @@ class DBCoreTest(unittest.TestCase):
 
         return
 
+    def testSubstitutionCache(self):
+        """
+        _testSubstitutionCache_
+
+        Verify that the cached substitution gives the same result as parsing
+        the SQL for all the WMBS DAOs, and that bind dictionaries with
+        different keys don't share a cache entry.
+        """
+        myInterface = MySQLInterface(logger = logging, engine = None)
+        daoSQL = loadWMBSDAOSQL()
+        self.assertTrue(len(daoSQL) > 100)
+
+        for sql, bindNames in daoSQL:
+            binds = [dict([(x, "%s%i" % (x, i)) for x in bindNames]) for i in range(3)]
+            parsedSQL, parsedNames = parseBindVariables(sql, bindNames)
+            for i in range(2):
+                (updatedSQL, bindList) = myInterface.substitute(sql, binds)
+                self.assertEqual(updatedSQL, parsedSQL)
+                self.assertEqual(bindList, [tuple([x[y] for y in parsedNames]) for x in binds])
+            self.assertTrue((sql, frozenset(bindNames)) in substitutionCache)
+
+        sql = "SELECT id FROM wmbs_job WHERE name = :name"
+        (updatedSQL, bindList) = myInterface.substitute(sql, {"name": "a", "other": 1})
+        self.assertEqual(bindList, [("a",)])
+        (updatedSQL, bindList) = myInterface.substitute(sql, {"name": "b"})
+        self.assertEqual(updatedSQL, "SELECT id FROM wmbs_job WHERE name = %s")
+        self.assertEqual(bindList, [("b",)])
+        return
+
+    def testSubstitutionPerformance(self):
+        """
+        _testSubstitutionPerformance_
+
+        Benchmark the bind substitution over the SQL of the WMBS DAOs, with
+        and without the cache, for a single set of binds and for the maximum
+        number of binds per query.
+        """
+        myInterface = MySQLInterface(logger = logging, engine = None)
+        daoSQL = loadWMBSDAOSQL()
+
+        for nBinds in [1, myInterface.maxBindsPerQuery]:
+            bindsList = []
+            for sql, bindNames in daoSQL:
+                bindsList.append([dict([(x, i) for x in bindNames]) for i in range(nBinds)])
+
+            startTime = time.time()
+            for i in range(5):
+                for (sql, bindNames), binds in zip(daoSQL, bindsList):
+                    substitutionCache.clear()
+                    myInterface.substitute(sql, binds)
+            uncachedTime = time.time() - startTime
+
+            startTime = time.time()
+            for i in range(5):
+                for (sql, bindNames), binds in zip(daoSQL, bindsList):
+                    myInterface.substitute(sql, binds)
+            cachedTime = time.time() - startTime
+
+            logging.info("Substitution of %i DAOs with %i binds: uncached %.3fs, cached %.3fs" % \
+                         (len(daoSQL), nBinds, uncachedTime, cachedTime))
+            if nBinds == 1:
+                # With many binds building the tuples dominates
+                self.assertTrue(cachedTime < uncachedTime)
+
+        return
+
 if __name__ == "__main__":
     unittest.main()
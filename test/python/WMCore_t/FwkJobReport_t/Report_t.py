@@ -429,6 +429,7 @@ cms::Exception caught in EventProcessor and rethrown
         report.setStepRSS(stepName = "cmsRun1", min = 100, max = 800, average = 244)
         report.setStepPCPU(stepName = "cmsRun1", min = 100, max = 800, average = 244)
         report.setStepPMEM(stepName = "cmsRun1", min = 100, max = 800, average = 244)
+        report.setStepPSS(stepName = "cmsRun1", min = 100, max = 800, average = 244)
 
         perf = report.retrieveStep("cmsRun1").performance
         for section in perf.dictionary_().values():
@@ -436,6 +437,12 @@ cms::Exception caught in EventProcessor and rethrown
             self.assertEqual(d['min'], 100)
             self.assertEqual(d['max'], 800)
             self.assertEqual(d['average'], 244)
+
+        report.setStepPerformanceSeries(stepName = "cmsRun1", times = [1.0, 2.0],
+                                        rss = [100, 800], pss = [90, 700],
+                                        vsize = [200, 900], pcpu = [50.0, 99.0])
+        self.assertEqual(perf.TimeSeries.pss, [90, 700])
+        self.assertEqual(perf.TimeSeries.times, [1.0, 2.0])
         return
 
     def testPerformanceSummary(self):
@@ -660,6 +667,104 @@ cms::Exception caught in EventProcessor and rethrown
         self.assertTrue(myReport.taskSuccessful(ignoreString = 'cmsRun'))
         return
 
+    def testPersistFormats(self):
+        """
+        _testPersistFormats_
+
+        Verify that reports persisted in the new format can be loaded, that
+        the summary methods are answered from the header without unpickling
+        the report data and that old pickled reports can still be loaded.
+        """
+        myReport = Report("cmsRun1")
+        myReport.parse(os.path.join(getTestBase(),
+                                    "WMCore_t/FwkJobReport_t/CMSSWFailReport.xml"))
+        myReport.setStepStartTime(stepName = "cmsRun1")
+        myReport.setStepStopTime(stepName = "cmsRun1")
+        myReport.addStep("logArch1", status = 0)
+
+        reportPath = os.path.join(self.testDir, "Report.pkl")
+        myReport.persist(reportPath)
+
+        newReport = Report()
+        newReport.load(reportPath)
+        self.assertFalse("data" in newReport.__dict__)
+        self.assertEqual(newReport.listSteps(), ["cmsRun1", "logArch1"])
+        self.assertEqual(newReport.getExitCodes(), myReport.getExitCodes())
+        self.assertEqual(newReport.getExitCode(), myReport.getExitCode())
+        self.assertEqual(newReport.getStepExitCode(stepName = "logArch1"), 0)
+        self.assertEqual(newReport.getFirstStartLastStop(),
+                         myReport.getFirstStartLastStop())
+        self.assertFalse(newReport.taskSuccessful())
+        self.assertTrue(newReport.stepSuccessful(stepName = "logArch1"))
+        self.assertEqual(newReport.summary["stepInfo"]["cmsRun1"]["fileCount"],
+                         len(myReport.getAllFilesFromStep("cmsRun1")))
+        self.assertFalse("data" in newReport.__dict__)
+
+        # Anything else unpickles the report data and drops the header
+        self.assertEqual(len(newReport.getAllFilesFromStep("cmsRun1")),
+                         len(myReport.getAllFilesFromStep("cmsRun1")))
+        self.assertEqual(newReport.summary, None)
+        self.assertEqual(newReport.getStepErrors("cmsRun1"),
+                         myReport.getStepErrors("cmsRun1"))
+        self.assertEqual(newReport.getExitCode(), myReport.getExitCode())
+
+        # Reports pickled by older versions
+        oldPath = os.path.join(getTestBase(),
+                               "WMCore_t/JobStateMachine_t/FailedReport.pkl")
+        oldReport = Report()
+        oldReport.load(oldPath)
+        self.assertEqual(oldReport.summary, None)
+        self.assertTrue(len(oldReport.listSteps()) > 0)
+
+        oldReport.save(reportPath)
+        newReport = Report()
+        newReport.load(reportPath)
+        self.assertEqual(newReport.listSteps(), oldReport.listSteps())
+        self.assertEqual(newReport.getExitCodes(), oldReport.getExitCodes())
+        self.assertEqual(newReport.getFirstStartLastStop(),
+                         oldReport.getFirstStartLastStop())
+        self.assertEqual(newReport.taskSuccessful(), oldReport.taskSuccessful())
+        return
+
+    def testReadSummary(self):
+        """
+        _testReadSummary_
+
+        Verify that only the header is read by readSummary and that the
+        report data is read from the file when it is needed.
+        """
+        myReport = Report("cmsRun1")
+        myReport.parse(os.path.join(getTestBase(),
+                                    "WMCore_t/FwkJobReport_t/CMSSWFailReport.xml"))
+        myReport.setStepStartTime(stepName = "cmsRun1")
+        myReport.setStepStopTime(stepName = "cmsRun1")
+
+        reportPath = os.path.join(self.testDir, "Report.pkl")
+        myReport.persist(reportPath)
+
+        newReport = Report()
+        self.assertTrue(newReport.readSummary(reportPath))
+        self.assertFalse("data" in newReport.__dict__)
+        self.assertEqual(newReport.listSteps(), ["cmsRun1"])
+        self.assertEqual(newReport.getExitCodes(), myReport.getExitCodes())
+        self.assertEqual(newReport.getFirstStartLastStop(),
+                         myReport.getFirstStartLastStop())
+        errors = myReport.retrieveStep("cmsRun1").errors
+        self.assertEqual(newReport.summary["stepInfo"]["cmsRun1"]["errorTypes"],
+                         [errors.error0.type])
+        self.assertEqual(newReport.getStepErrors("cmsRun1"),
+                         myReport.getStepErrors("cmsRun1"))
+        self.assertEqual(newReport.summary, None)
+
+        # Nothing is loaded from the reports pickled by older versions
+        oldPath = os.path.join(getTestBase(),
+                               "WMCore_t/JobStateMachine_t/FailedReport.pkl")
+        oldReport = Report()
+        self.assertFalse(oldReport.readSummary(oldPath))
+        self.assertEqual(oldReport.summary, None)
+        self.assertEqual(oldReport.listSteps(), [])
+        return
+
     def testMultiCoreReport(self):
         """
         _testMultiCoreReport_
@@ -700,7 +805,7 @@ cms::Exception caught in EventProcessor and rethrown
 
         myReport.save(path1)
         info = BasicAlgos.getFileInfo(filename = path1)
-        self.assertEqual(info['Size'], 7101)
+        self.assertEqual(info['Size'], 4381)
 
         inputFiles = myReport.getAllInputFiles()
         self.assertEqual(len(inputFiles), 1)
@@ -709,7 +814,7 @@ cms::Exception caught in EventProcessor and rethrown
 
         myReport.save(path2)
         info = BasicAlgos.getFileInfo(filename = path2)
-        self.assertEqual(info['Size'], 6210)
+        self.assertEqual(info['Size'], 3752)
 
         return
 
@@ -0,0 +1,199 @@
+"""
+Test the GlobalMonitor overviews against fake endpoints with injected latency.
+"""
+import time
+import unittest
+
+import WMCore.HTTPFrontEnd.GlobalMonitor.API.RequestMonitor as RequestMonitor
+import WMCore.HTTPFrontEnd.GlobalMonitor.API.AgentMonitor as AgentMonitor
+from WMCore.HTTPFrontEnd.GlobalMonitor.DataCache import DataCache
+
+# latency in seconds of each endpoint, None means the endpoint is down
+LATENCY = {}
+
+def _wait(url):
+    latency = LATENCY.get(url, 0.2)
+    if latency == None:
+        raise RuntimeError("%s is down" % url)
+    time.sleep(latency)
+
+class FakeRequestManager(object):
+    """
+    Request manager with two global queues.
+    """
+    def __init__(self, config):
+        self.url = config['endpoint']
+
+    def getRequestNames(self):
+        _wait(self.url)
+        return [{'request_name': 'request_%s' % i} for i in range(4)]
+
+    def getWorkQueue(self):
+        return ["http://globalqueue%s:5984/workqueue" % i for i in range(2)]
+
+class FakeWorkQueue(object):
+    """
+    Global queue globalqueueN has the requests 2N and 2N + 1, each one in
+    its own local queue, with a single agent.
+    """
+    def __init__(self, url, dbName):
+        self.url = url
+        self.host = url.split('/')[2].split(':')[0]
+
+    def getTopLevelJobsByRequest(self):
+        _wait(self.url)
+        index = int(self.host[-1])
+        return [{'request_name': 'request_%s' % (2 * index + i),
+                 'total_jobs': 10} for i in range(2)]
+
+    def getChildQueuesByRequest(self):
+        index = int(self.host[-1])
+        return [{'request_name': 'request_%s' % (2 * index + i),
+                 'local_queue': 'http://localqueue%s:5984/workqueue' % (2 * index + i)}
+                for i in range(2)]
+
+    def getSiteWhitelistByRequest(self):
+        return []
+
+    def getChildQueues(self):
+        _wait(self.url)
+        return [x['local_queue'] for x in self.getChildQueuesByRequest()]
+
+    def getWMBSUrl(self):
+        _wait(self.url)
+        return ['http://agent%s:9999/wmbsservice/wmbs' % self.host[-1]]
+
+    def getJobInjectStatusByRequest(self):
+        return [{'request_name': 'request_%s' % self.host[-1],
+                 'inQueue': 1, 'inWMBS': 2}]
+
+class FakeWMBS(object):
+    """
+    WMBS service of an agent.
+    """
+    def __init__(self, config):
+        self.url = config['endpoint']
+
+    def getBatchJobStatus(self):
+        _wait(self.url)
+        return [{'request_name': 'request_%s' % self.url.split('/')[2][5],
+                 'Running': 3}]
+
+    def getJobSummaryFromCouchDB(self):
+        return [{'request_name': 'request_%s' % self.url.split('/')[2][5],
+                 'success': 4}]
+
+class FakeWMAgent(object):
+    """
+    Agent status service.
+    """
+    def __init__(self, config):
+        self.url = config['endpoint']
+
+    def getAgentStatus(self, detail = False):
+        _wait(self.url)
+        return {'status': 'ok'}
+
+    def getACDCInfo(self):
+        return {'url': 'http://couch/acdc'}
+
+class RequestMonitorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.services = {}
+        for module, name, fake in [(RequestMonitor, 'RequestManager', FakeRequestManager),
+                                   (RequestMonitor, 'WorkQueue', FakeWorkQueue),
+                                   (RequestMonitor, 'WMBS', FakeWMBS),
+                                   (AgentMonitor, 'RequestManager', FakeRequestManager),
+                                   (AgentMonitor, 'WorkQueue', FakeWorkQueue),
+                                   (AgentMonitor, 'WMAgent', FakeWMAgent)]:
+            self.services[(module, name)] = getattr(module, name)
+            setattr(module, name, fake)
+        LATENCY.clear()
+        self.endpointCache = DataCache.getEndpointCache()
+        self.endpointCache.clear()
+        self.endpointCache.configure(duration = 300, staleDuration = 3600,
+                                     timeout = 1)
+
+    def tearDown(self):
+        for (module, name), service in self.services.items():
+            setattr(module, name, service)
+        LATENCY.clear()
+        self.endpointCache.clear()
+        self.endpointCache.configure(duration = 300, staleDuration = 3600,
+                                     timeout = 60)
+
+    def testRequestOverview(self):
+        # 4 levels of 0.2 seconds, 11 endpoints if done serially
+        startTime = time.time()
+        results = RequestMonitor.getRequestOverview("http://reqmgr/reqmgr",
+                                                    "RequestManager")
+        self.assertTrue(time.time() - startTime < 1.5)
+        results.sort(key = lambda x: x['request_name'])
+        self.assertEqual(len(results), 4)
+        for i, result in enumerate(results):
+            self.assertEqual(result['request_name'], 'request_%s' % i)
+            self.assertEqual(result['total_jobs'], 10)
+            self.assertEqual(result['local_queue'],
+                             ['http://localqueue%s:5984/workqueue' % i])
+            self.assertEqual(result['inWMBS'], 2)
+            self.assertEqual(result['Running'], 3)
+            self.assertEqual(result['success'], 4)
+
+        # everything is cached now
+        startTime = time.time()
+        self.assertEqual(sorted(RequestMonitor.getRequestOverview("http://reqmgr/reqmgr",
+                                                                  "RequestManager"),
+                                key = lambda x: x['request_name']), results)
+        self.assertTrue(time.time() - startTime < 0.1)
+
+    def testSlowEndpoint(self):
+        # a slow agent only loses its own data
+        LATENCY['http://agent3:9999/wmbsservice/wmbs'] = 3
+        LATENCY['http://localqueue2:5984'] = None
+        startTime = time.time()
+        results = RequestMonitor.getRequestOverview("http://reqmgr/reqmgr",
+                                                    "RequestManager")
+        self.assertTrue(time.time() - startTime < 2.5)
+        results = dict([(x['request_name'], x) for x in results])
+        self.assertEqual(results['request_0']['Running'], 3)
+        self.assertEqual(results['request_1']['Running'], 3)
+        self.assertFalse('Running' in results['request_2'])
+        self.assertFalse('Running' in results['request_3'])
+        self.assertTrue('LocalQueue Down' in results['request_2']['error'])
+
+        # the slow agent answer is cached when it arrives
+        while self.endpointCache.pending:
+            time.sleep(0.1)
+        self.assertTrue(('request', 'WMBS', 'http://agent3:9999/wmbsservice/wmbs')
+                        in self.endpointCache.data)
+
+        # stale data is used while the endpoints are refreshed
+        for key, (cacheTime, value) in self.endpointCache.data.items():
+            self.endpointCache.data[key] = (cacheTime - 600, value)
+        LATENCY.clear()
+        LATENCY['http://agent0:9999/wmbsservice/wmbs'] = 3
+        startTime = time.time()
+        results = RequestMonitor.getRequestOverview("http://reqmgr/reqmgr",
+                                                    "RequestManager")
+        self.assertTrue(time.time() - startTime < 1.0)
+        results = dict([(x['request_name'], x) for x in results])
+        self.assertEqual(results['request_0']['Running'], 3)
+        self.assertEqual(results['request_2']['Running'], 3)
+        self.assertEqual(results['request_3']['Running'], 3)
+
+    def testAgentOverview(self):
+        LATENCY['http://agent1:9999/wmbsservice/wmagent'] = None
+        startTime = time.time()
+        results = AgentMonitor.getAgentOverview("http://reqmgr/reqmgr",
+                                                "RequestManager")
+        self.assertTrue(time.time() - startTime < 1.2)
+        results = dict([(x['url'], x) for x in results])
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results['http://agent0:9999/wmbsservice/wmagent']['status'], 'ok')
+        self.assertEqual(results['http://agent0:9999/wmbsservice/wmagent']['acdc'],
+                         'http://couch/acdc')
+        self.assertEqual(results['http://agent1:9999/wmbsservice/wmagent']['acdc'], 'N/A')
+
+if __name__ == '__main__':
+    unittest.main()
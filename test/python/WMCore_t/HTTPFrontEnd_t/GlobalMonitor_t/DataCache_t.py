@@ -1,5 +1,7 @@
+import time
 import unittest
-from WMCore.HTTPFrontEnd.GlobalMonitor.DataCache import DataCache
+from WMCore.HTTPFrontEnd.GlobalMonitor.DataCache import DataCache, EndpointCache, \
+     EndpointTimeout, fanOut
 
 class DataCacheTest(unittest.TestCase):
 
@@ -27,5 +29,54 @@ class DataCacheTest(unittest.TestCase):
         self.assertEqual(self.dataCache.isRequestDataExpired(), True)
         self.assertEqual(self.dataCache.isSiteDataExpired(), True)
 
+    def testEndpointCache(self):
+        calls = []
+        def endpoint(value, latency = 0):
+            calls.append(value)
+            time.sleep(latency)
+            if value == None:
+                raise RuntimeError("endpoint down")
+            return {'value': value}
+
+        cache = EndpointCache(duration = 60, staleDuration = 120, timeout = 0.5)
+        self.assertEqual(cache.get("a", endpoint, 1), {'value': 1})
+        # fresh data doesn't call the endpoint and is a copy
+        cache.get("a", endpoint, 2)['value'] = 3
+        self.assertEqual(cache.get("a", endpoint, 2), {'value': 1})
+        self.assertEqual(calls, [1])
+
+        # stale data is returned while it is refreshed in the background
+        cache.data["a"] = (time.time() - 90, cache.data["a"][1])
+        self.assertEqual(cache.get("a", endpoint, 2, 0.2), {'value': 1})
+        self.assertEqual(cache.get("a", endpoint, 3, 0.2), {'value': 1})
+        time.sleep(0.4)
+        self.assertEqual(cache.get("a", endpoint, 3), {'value': 2})
+        self.assertEqual(calls, [1, 2])
+
+        # slow endpoints time out, their answer is kept for later
+        startTime = time.time()
+        self.assertRaises(EndpointTimeout, cache.get, "b", endpoint, 4, 1)
+        self.assertTrue(time.time() - startTime < 0.9)
+        time.sleep(0.6)
+        self.assertEqual(cache.get("b", endpoint, 5), {'value': 4})
+
+        # errors aren't cached
+        self.assertRaises(RuntimeError, cache.get, "c", endpoint, None)
+        self.assertEqual(cache.get("c", endpoint, 6), {'value': 6})
+        self.assertEqual(calls, [1, 2, 4, None, 6])
+
+    def testFanOut(self):
+        def slowSquare(x):
+            time.sleep(0.2)
+            if x < 0:
+                raise ValueError(x)
+            return x * x
+
+        startTime = time.time()
+        self.assertEqual(fanOut(slowSquare, range(10)), [x * x for x in range(10)])
+        self.assertTrue(time.time() - startTime < 1.0)
+        self.assertEqual(fanOut(slowSquare, []), [])
+        self.assertRaises(ValueError, fanOut, slowSquare, [1, -1])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+"""
+_ChangeStateProfile_t_
+
+Compare the per job update handler requests with the bulk state transition
+mode of ChangeState.recordInCouch against the in memory CouchDB emulator.
+"""
+
+import time
+import logging
+import unittest
+
+from WMQuality.TestInit import TestInit
+from WMQuality.Emulators.CouchDBClient.CouchDB import CouchServer
+
+from WMCore.JobStateMachine.ChangeState import ChangeState
+
+
+class ChangeStateProfileTest(unittest.TestCase):
+    """
+    _ChangeStateProfileTest_
+
+    """
+    def setUp(self):
+        """
+        _setUp_
+
+        Only the database connection is needed to build the DAOs, couch is
+        replaced by the emulator.
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+        self.testInit.setDatabaseConnection()
+        self.config = self.testInit.getConfiguration()
+        self.config.JobStateMachine.couchDBName = "changestate_profile_t"
+        self.config.JobStateMachine.jobSummaryDBName = "changestate_profile_summary_t"
+        self.config.JobStateMachine.summaryStatsDBName = "changestate_profile_stats_t"
+
+        self.nJobs = 2000
+        self.latency = 0.001
+        return
+
+    def tearDown(self):
+        """
+        _tearDown_
+
+        """
+        self.testInit.clearDatabase()
+        return
+
+    def createChangeState(self, bulk):
+        """
+        _createChangeState_
+
+        Create a ChangeState object that talks to a fresh emulated couch
+        server, with one job document and one summary document per job.
+        """
+        self.config.JobStateMachine.bulkStateTransitions = bulk
+        change = ChangeState(self.config)
+
+        change.couchdb = CouchServer(latency = self.latency)
+        change.jobsdatabase = None
+        change.fwjrdatabase = None
+        change.jsumdatabase = None
+        change.statsumdatabase = None
+        change._connectDatabases()
+
+        jobs = []
+        for jobID in range(1, self.nJobs + 1):
+            jobs.append({"id": jobID, "couch_record": str(jobID),
+                         "name": "job%s" % jobID, "location": "T1_US_FNAL",
+                         "site_cms_name": "T1_US_FNAL", "retry_count": 0})
+            change.jobsdatabase.queue({"_id": str(jobID), "type": "job",
+                                       "states": {"0": {"oldstate": "none",
+                                                        "newstate": "new",
+                                                        "location": "Agent",
+                                                        "timestamp": 0}}})
+            change.jsumdatabase.queue({"_id": "job%s" % jobID,
+                                       "type": "jobsummary",
+                                       "state": "new"})
+        change.jobsdatabase.commit()
+        change.jsumdatabase.commit()
+        change.jobsdatabase.requestCount = 0
+        change.jsumdatabase.requestCount = 0
+        return change, jobs
+
+    def runTransitions(self, bulk):
+        """
+        _runTransitions_
+
+        Record two state transitions for every job, return the elapsed time,
+        the number of requests made and the final job documents.
+        """
+        change, jobs = self.createChangeState(bulk)
+
+        startTime = time.time()
+        change.recordInCouch(jobs, "created", "new")
+        change.recordInCouch(jobs, "executing", "created", updatesummary = True)
+        elapsed = time.time() - startTime
+
+        nRequests = change.jobsdatabase.requestCount + change.jsumdatabase.requestCount
+        jobDocs = change.jobsdatabase.allDocs(options = {"include_docs": True})
+        summaryDocs = change.jsumdatabase.allDocs(options = {"include_docs": True})
+        return elapsed, nRequests, jobDocs["rows"], summaryDocs["rows"]
+
+    def testBulkStateTransitions(self):
+        """
+        _testBulkStateTransitions_
+
+        Both modes must produce the same documents, the bulk mode with a
+        constant number of requests.
+        """
+        serialTime, serialRequests, serialJobs, serialSummaries = self.runTransitions(False)
+        bulkTime, bulkRequests, bulkJobs, bulkSummaries = self.runTransitions(True)
+
+        logging.info("%s jobs, update handlers: %.2fs %s requests" % (self.nJobs, serialTime,
+                                                                      serialRequests))
+        logging.info("%s jobs, bulk transitions: %.2fs %s requests" % (self.nJobs, bulkTime,
+                                                                       bulkRequests))
+
+        self.assertEqual(serialRequests, 4 * self.nJobs)
+        self.assertTrue(bulkRequests < self.nJobs / 50)
+        self.assertTrue(bulkTime < serialTime)
+
+        def stripTimestamps(transitions):
+            return [(x["oldstate"], x["newstate"], x["location"]) for x in transitions]
+
+        for serialRow, bulkRow in zip(serialJobs, bulkJobs):
+            serialStates = serialRow["doc"]["states"]
+            bulkStates = bulkRow["doc"]["states"]
+            self.assertEqual(sorted(serialStates.keys()), sorted(bulkStates.keys()))
+            self.assertEqual(stripTimestamps([serialStates[x] for x in sorted(serialStates.keys())]),
+                             stripTimestamps([bulkStates[x] for x in sorted(bulkStates.keys())]))
+        for serialRow, bulkRow in zip(serialSummaries, bulkSummaries):
+            self.assertEqual(serialRow["doc"]["state"], bulkRow["doc"]["state"])
+            self.assertEqual(stripTimestamps(serialRow["doc"]["state_history"]),
+                             stripTimestamps(bulkRow["doc"]["state_history"]))
+        return
+
+if __name__ == "__main__":
+    unittest.main()
@@ -274,6 +274,96 @@ class TestChangeState(unittest.TestCase):
         self.assertTrue(testJobADoc["states"].has_key("1"))
         return
 
+    def testBulkStateTransitions(self):
+        """
+        _testBulkStateTransitions_
+
+        Verify that the bulk state transition mode records the same state
+        history in the job and job summary documents as the update handlers.
+        """
+        self.config.JobStateMachine.bulkStateTransitions = True
+        change = ChangeState(self.config, "changestate_t")
+        self.assertTrue(change.bulkStateTransitions)
+
+        locationAction = self.daoFactory(classname = "Locations.New")
+        locationAction.execute("site1", seName = "somese.cern.ch")
+
+        testWorkflow = Workflow(spec = "spec.xml", owner = "Steve",
+                                name = "wf001", task = self.taskName)
+        testWorkflow.create()
+        testFileset = Fileset(name = "TestFileset")
+        testFileset.create()
+        testSubscription = Subscription(fileset = testFileset,
+                                        workflow = testWorkflow,
+                                        split_algo = "FileBased")
+        testSubscription.create()
+
+        testFileA = File(lfn = "SomeLFNA", events = 1024, size = 2048,
+                         locations = set(["somese.cern.ch"]))
+        testFileB = File(lfn = "SomeLFNB", events = 1025, size = 2049,
+                         locations = set(["somese.cern.ch"]))
+        testFileA.create()
+        testFileB.create()
+
+        testFileset.addFile(testFileA)
+        testFileset.addFile(testFileB)
+        testFileset.commit()
+
+        splitter = SplitterFactory()
+        jobFactory = splitter(package = "WMCore.WMBS",
+                              subscription = testSubscription)
+        jobGroup = jobFactory(files_per_job = 1)[0]
+
+        testJobA = jobGroup.jobs[0]
+        testJobA["user"] = "sfoulkes"
+        testJobA["group"] = "DMWM"
+        testJobA["taskType"] = "Processing"
+        testJobB = jobGroup.jobs[1]
+        testJobB["user"] = "sfoulkes"
+        testJobB["group"] = "DMWM"
+        testJobB["taskType"] = "Processing"
+
+        change.propagate([testJobA, testJobB], "new", "none")
+        change.propagate([testJobA, testJobB], "created", "new")
+        change.propagate([testJobA, testJobB], "executing", "created")
+
+        myReport = Report()
+        reportPath = os.path.join(getTestBase(),
+                                  "WMCore_t/JobStateMachine_t/Report.pkl")
+        myReport.unpersist(reportPath)
+        testJobA["fwjr"] = myReport
+        change.propagate([testJobA], "jobfailed", "executing")
+        del testJobA["fwjr"]
+        change.propagate([testJobA], "jobcooloff", "jobfailed", updatesummary = True)
+
+        for testJob in [testJobA, testJobB]:
+            testJobDoc = change.jobsdatabase.document(testJob["couch_record"])
+            self.assertEqual(testJobDoc["jobid"], testJob["id"])
+            self.assertEqual(len(testJobDoc["inputfiles"]), 1)
+
+        testJobADoc = change.jobsdatabase.document(testJobA["couch_record"])
+        self.assertEqual(sorted(testJobADoc["states"].keys()),
+                         ["0", "1", "2", "3", "4"])
+        transitions = [testJobADoc["states"][str(x)] for x in range(5)]
+        self.assertEqual([x["newstate"] for x in transitions],
+                         ["new", "created", "executing", "jobfailed", "jobcooloff"])
+        self.assertEqual([x["oldstate"] for x in transitions],
+                         ["none", "new", "created", "executing", "jobfailed"])
+        for transition in transitions:
+            self.assertTrue(type(transition["timestamp"]) in (types.IntType,
+                                                             types.LongType))
+
+        testJobBDoc = change.jobsdatabase.document(testJobB["couch_record"])
+        self.assertEqual(len(testJobBDoc["states"]), 3)
+        self.assertEqual(testJobBDoc["states"]["2"]["newstate"], "executing")
+
+        summaryDoc = change.jsumdatabase.document(testJobA["name"])
+        self.assertEqual(summaryDoc["state"], "jobcooloff")
+        self.assertEqual(summaryDoc["state_history"][-1]["oldstate"], "jobfailed")
+        self.assertEqual(summaryDoc["state_history"][-1]["newstate"], "jobcooloff")
+        self.assertEqual(summaryDoc["wmbsid"], testJobA["id"])
+        return
+
     def testPersist(self):
         """
         _testPersist_
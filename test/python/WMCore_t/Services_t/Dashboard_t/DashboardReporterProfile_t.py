@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+_DashboardReporterProfile_t_
+
+Compare the per job ApMon instances of the DashboardReporter with the
+background sender, sending to a local UDP listener.
+"""
+
+import time
+import logging
+import unittest
+
+from WMCore.Services.Dashboard.DashboardReporter import DashboardReporter
+
+from WMCore_t.Services_t.Dashboard_t.DashboardReporter_t import UDPListener, reporterConfig, createdJobs
+
+
+class DashboardReporterProfileTest(unittest.TestCase):
+    """
+    _DashboardReporterProfileTest_
+
+    """
+    def setUp(self):
+        self.listener = UDPListener()
+        self.nJobs = 20000
+        return
+
+    def tearDown(self):
+        self.listener.stop()
+        return
+
+    def testHandleCreated(self):
+        """
+        _testHandleCreated_
+
+        The background sender must return to the caller faster and send
+        all the packages faster than creating an ApMon instance per job.
+        """
+        jobs = createdJobs(self.nJobs)
+
+        reporter = DashboardReporter(reporterConfig(self.listener.port))
+        startTime = time.time()
+        reporter.handleCreated(jobs)
+        perJobTime = time.time() - startTime
+        perJobReceived = self.listener.waitFor(self.nJobs)
+
+        reporter = DashboardReporter(reporterConfig(self.listener.port, True))
+        before = reporter.sender.counters()
+        startTime = time.time()
+        reporter.handleCreated(jobs)
+        queuedTime = time.time() - startTime
+        reporter.sender.flush()
+        sentTime = time.time() - startTime
+        counters = reporter.sender.counters()
+        sent = counters['sent'] - before['sent']
+        received = self.listener.waitFor(perJobReceived + sent) - perJobReceived
+
+        logging.info("%s jobs, ApMon per job: %.2fs, %s received" \
+                     % (self.nJobs, perJobTime, perJobReceived))
+        logging.info("%s jobs, background sender: %.2fs queued, %.2fs sent, %s received" \
+                     % (self.nJobs, queuedTime, sentTime, received))
+        logging.info("Sender counters: %s" % counters)
+
+        self.assertEqual(sent + counters['dropped'] - before['dropped'],
+                         self.nJobs)
+        self.assertTrue(queuedTime < perJobTime)
+        self.assertTrue(sentTime < perJobTime)
+        return
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,13 +8,88 @@ Created on Fri Jun  8 11:21:07 2012
 @author: dballest
 """
 
+import time
+import socket
 import unittest
+import threading
 
-from WMCore.Services.Dashboard.DashboardReporter import DashboardReporter
+from WMCore.Configuration import Configuration
+from WMCore.Services.Dashboard.DashboardReporter import DashboardReporter, DashboardSender
 from WMCore.DataStructs.Job import Job
 
 from WMCore_t.Services_t.Dashboard_t.reportSamples import ProcessingSample, MergeSample, ErrorSample
 
+class UDPListener(object):
+    """
+    _UDPListener_
+
+    Stand-in for the dashboard collector, counts the datagrams it receives.
+    """
+    def __init__(self):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
+        self.socket.bind(('127.0.0.1', 0))
+        self.socket.settimeout(0.1)
+        self.port = self.socket.getsockname()[1]
+        self.received = 0
+        self.running = True
+        self.thread = threading.Thread(target = self.run)
+        self.thread.setDaemon(True)
+        self.thread.start()
+
+    def run(self):
+        while self.running:
+            try:
+                self.socket.recv(65536)
+            except socket.timeout:
+                continue
+            self.received += 1
+        self.socket.close()
+
+    def waitFor(self, number, timeout = 10):
+        """
+        _waitFor_
+
+        Wait until number datagrams were received, return how many were.
+        """
+        endTime = time.time() + timeout
+        while self.received < number and time.time() < endTime:
+            time.sleep(0.01)
+        return self.received
+
+    def stop(self):
+        self.running = False
+        self.thread.join()
+
+
+def reporterConfig(port, sendInBackground = False):
+    """
+    _reporterConfig_
+
+    Configuration for a reporter sending to a local port.
+    """
+    config = Configuration()
+    config.section_("DashboardReporter")
+    config.DashboardReporter.dashboardHost = "127.0.0.1"
+    config.DashboardReporter.dashboardPort = port
+    config.DashboardReporter.sendInBackground = sendInBackground
+    return config
+
+
+def createdJobs(number):
+    """
+    _createdJobs_
+
+    Jobs with the information needed by handleCreated.
+    """
+    jobs = []
+    for i in range(number):
+        jobs.append({'workflow': 'testWorkflow', 'name': 'testJob%i' % i,
+                     'retry_count': 0, 'taskType': 'Processing',
+                     'jobType': 'Processing'})
+    return jobs
+
+
 class DashboardReporterTest(unittest.TestCase):
     """
     _DashboardReporterTest_
@@ -31,15 +106,16 @@ class DashboardReporterTest(unittest.TestCase):
         self.processingReport = ProcessingSample.report
         self.mergeReport = MergeSample.report
         self.errorReport = ErrorSample.report
+        self.listener = UDPListener()
         return
 
     def tearDown(self):
         """
         _tearDown_
 
-        Just get out
+        Stop the listener
         """
-        pass
+        self.listener.stop()
 
     def trimNoneValues(self, package):
         """
@@ -163,3 +239,58 @@ class DashboardReporterTest(unittest.TestCase):
                                                       self.errorReport)
         self.assertEqual(eventInfo, {},
                          'Error report event info is not empty')
+
+    def testSendInBackground(self):
+        """
+        _testSendInBackground_
+
+        Check that the packages go through the background sender and that
+        they all reach the destination
+        """
+        reporter = DashboardReporter(reporterConfig(self.listener.port, True))
+        self.assertNotEqual(reporter.sender, None)
+        before = reporter.sender.counters()
+
+        reporter.handleCreated(createdJobs(50))
+        reporter.handleJobStatusChange(createdJobs(50), 'submitted', 'Submitted')
+        reporter.sender.flush()
+
+        counters = reporter.sender.counters()
+        self.assertEqual(counters['sent'] - before['sent'], 100)
+        self.assertEqual(counters['queued'], 0)
+        self.assertEqual(self.listener.waitFor(100), 100)
+
+        # The reporters of a process share the sender
+        otherReporter = DashboardReporter(reporterConfig(self.listener.port, True))
+        self.assertTrue(otherReporter.sender is reporter.sender)
+
+        reporter = DashboardReporter(reporterConfig(self.listener.port))
+        self.assertEqual(reporter.sender, None)
+        return
+
+    def testSenderQueue(self):
+        """
+        _testSenderQueue_
+
+        Check that the packages are dropped once the queue is full and that
+        the queued ones are sent in batches
+        """
+        sender = DashboardSender(queueSize = 20, batchSize = 8)
+        serverreport = ['127.0.0.1:%i' % self.listener.port]
+        for i in range(30):
+            sender.send(serverreport, 'wmagent_testWorkflow', 'testJob%i_0' % i,
+                        {'MessageType': 'JobStatus', 'StatusValue': 'submitted'})
+        self.assertEqual(sender.counters(),
+                         {'queued': 20, 'sent': 0, 'dropped': 10, 'failed': 0})
+
+        self.assertEqual(len(sender.getBatch()), 8)
+        for _ in range(8):
+            sender.queue.task_done()
+
+        sender.start()
+        sender.flush()
+        self.assertEqual(sender.counters(),
+                         {'queued': 0, 'sent': 12, 'dropped': 10, 'failed': 0})
+        self.assertEqual(self.listener.waitFor(12), 12)
+        return
+
@@ -7,6 +7,7 @@ import unittest
 
 from WMCore.Services.SiteDB.SiteDB import SiteDBJSON
 from WMCore.Services.EmulatorSwitch import EmulatorHelper
+from WMQuality.Emulators.SiteDBClient.SiteDB import SiteDBJSON as SiteDBEmulator
 
 from nose.plugins.attrib import attr
 
@@ -122,5 +123,59 @@ class SiteDBTest(unittest.TestCase):
         self.assertTrue('cmssrm.fnal.gov' in seNames)
         return
 
+    def testIndexes(self):
+        """
+        _testIndexes_
+
+        Check the name mapping indexes of the real SiteDB class, using the
+        emulator data instead of the SiteDB service.
+        """
+        EmulatorHelper.resetEmulators()
+        siteDB = SiteDBJSON().wrapped
+        calls = []
+        def sitenames(sitename = None, clearCache = False):
+            calls.append("site-names")
+            return SiteDBEmulator._sitenames_data
+        def siteresources(clearCache = False):
+            calls.append("site-resources")
+            return SiteDBEmulator._siteresources_data
+        siteDB._sitenames = sitenames
+        siteDB._siteresources = siteresources
+        # Without a disk cache the indexes expire after cacheduration hours
+        siteDB['cachepath'] = None
+
+        self.assertEqual(siteDB.seToCMSName("cmssrm.fnal.gov"), ['T1_US_FNAL'])
+        self.assertEqual(sorted(siteDB.seToCMSName("srm-eoscms.cern.ch")),
+                         ['T2_CH_CERN', 'T2_CH_CERN_HLT'])
+        self.assertEqual(siteDB.seToCMSName("unknown.se"), [])
+        self.assertEqual(siteDB.ceToCMSName("red-gw1.unl.edu"), ['T2_US_Nebraska'])
+        self.assertEqual(sorted(siteDB.cmsNametoPhEDExNode("T1_US_FNAL")),
+                         ['T1_US_FNAL_Buffer', 'T1_US_FNAL_MSS'])
+        self.assertEqual(siteDB.cmsNametoPhEDExNode("T1_UK_RAL"), [])
+        self.assertEqual(siteDB.cmsNametoPhEDExNode("T9_XX_Unknown"), None)
+        self.assertEqual(siteDB.phEDExNodetocmsName("T1_US_FNAL_Buffer"), 'T1_US_FNAL')
+        self.assertEqual(siteDB.phEDExNodetocmsName("T2_UK_London_IC"), 'T2_UK_London_IC')
+
+        self.assertEqual(siteDB.seToCMSNames(["cmssrm.fnal.gov", "srm.unl.edu", "unknown.se"]),
+                         {"cmssrm.fnal.gov": ['T1_US_FNAL'], "srm.unl.edu": ['T2_US_Nebraska'],
+                          "unknown.se": []})
+        self.assertEqual(siteDB.ceToCMSNames(["T2_XX_SiteA"]), {"T2_XX_SiteA": ['T2_XX_SiteA']})
+        self.assertEqual(siteDB.phEDExNodestocmsNames(["T1_US_FNAL_MSS", "T2_XX_SiteA"]),
+                         {"T1_US_FNAL_MSS": 'T1_US_FNAL', "T2_XX_SiteA": 'T2_XX_SiteA'})
+        self.assertEqual(siteDB.cmsNamestoPhEDExNodes(["T1_UK_RAL"]), {"T1_UK_RAL": []})
+
+        # The site information was only read once
+        self.assertEqual(calls, ["site-names", "site-resources"])
+
+        # Changing the returned lists doesn't change the indexes
+        siteDB.seToCMSName("cmssrm.fnal.gov").append("T2_XX_SiteA")
+        self.assertEqual(siteDB.seToCMSName("cmssrm.fnal.gov"), ['T1_US_FNAL'])
+
+        # Expired indexes are rebuilt
+        siteDB.indexTime -= siteDB['cacheduration'] * 3600 + 1
+        self.assertEqual(siteDB.seToCMSName("cmssrm.fnal.gov"), ['T1_US_FNAL'])
+        self.assertEqual(len(calls), 4)
+        return
+
 if __name__ == '__main__':
     unittest.main()
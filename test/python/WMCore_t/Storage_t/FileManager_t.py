@@ -9,7 +9,9 @@ import logging
 import shutil
 import tempfile
 import os.path
+import time
 from WMCore.Storage.FileManager import StageInMgr,StageOutMgr,DeleteMgr,FileManager
+from WMCore.Storage.Backends.UnittestImpl import simulatedTransfers
 import WMCore.Storage.StageOutError
 class FileManagerTest(unittest.TestCase):
 
@@ -23,6 +25,7 @@ class FileManagerTest(unittest.TestCase):
             except:
                 # meh, if it fails, I guess something weird happened
                 pass
+        simulatedTransfers.reset()
 
     def testStageFile(self):
         pass
@@ -116,6 +119,55 @@ class FileManagerTest(unittest.TestCase):
         wrapper(fileForTransfer)
         self.assertTrue( os.path.exists(os.path.join(self.testDir, '/etc/hosts')))
 
+    def testStageOutFiles(self):
+        files = [{'LFN': '/store/file%i' % i, 'PFN': 'file%i' % i}
+                 for i in range(8)]
+        simulatedTransfers.reset(latency = 0.2)
+        wrapper = StageOutMgr(  **{
+                                'command'    : 'test-win',
+                                'option'    : '',
+                                'se-name'  : 'test-win',
+                                'lfn-prefix':''})
+        startTime = time.time()
+        staged = wrapper.stageOutFiles(files, maxConcurrent = 4)
+        self.assertTrue(time.time() - startTime < 8 * 0.2)
+        self.assertEqual(staged, files)
+        self.assertEqual(simulatedTransfers.maxActive, 4)
+        self.assertEqual(sorted(wrapper.completedFiles.keys()),
+                         sorted([x['LFN'] for x in files]))
+        self.assertEqual(wrapper.failed, {})
+
+        simulatedTransfers.reset(latency = 0.05)
+        wrapper.completedFiles = {}
+        wrapper.stageOutFiles(files, maxConcurrent = 4, maxPerBackend = 2)
+        self.assertEqual(simulatedTransfers.maxActive, 2)
+        self.assertEqual(len(wrapper.completedFiles), 8)
+
+    def testStageOutFilesFallback(self):
+        files = [{'LFN': '/store/file%i' % i, 'PFN': 'file%i' % i}
+                 for i in range(5)]
+        wrapper = StageOutMgr( numberOfRetries= 1,
+                               retryPauseTime=0, **{
+                                'command'    : 'test-fail',
+                                'option'    : '',
+                                'se-name'  : 'test-win',
+                                'lfn-prefix':''})
+        wrapper.fallbacks = [{'command' : 'test-win',
+                              'se-name' : 'test-win',
+                              'lfn-prefix' : ''}]
+        wrapper.stageOutFiles(files, maxConcurrent = 3)
+        self.assertEqual(len(wrapper.completedFiles), 5)
+        # two failed tries and one transfer for each file
+        self.assertEqual(simulatedTransfers.count, 5 * 3)
+
+        wrapper.fallbacks = []
+        wrapper.completedFiles = {}
+        self.assertRaises(WMCore.Storage.StageOutError.StageOutError,
+                          wrapper.stageOutFiles, files, maxConcurrent = 3)
+        self.assertEqual(wrapper.completedFiles, {})
+        self.assertEqual(sorted(wrapper.failed.keys()),
+                         sorted([x['LFN'] for x in files]))
+
     def testStageInMgrWrapperWin(self):
         fileForTransfer = {'LFN': '/etc/hosts', \
                            'PFN': '/etc/hosts', \
@@ -5,8 +5,11 @@ Created on Jun 18, 2009
 '''
 import unittest
 import os
+import time
 
 import WMCore.Storage.StageOutMgr as StageOutMgr
+from WMCore.Storage.StageOutError import StageOutFailure
+from WMCore.Storage.Backends.UnittestImpl import simulatedTransfers
 
 class StageOutMgrTest(unittest.TestCase):
 
@@ -14,9 +17,92 @@ class StageOutMgrTest(unittest.TestCase):
         # shut up SiteLocalConfig
         os.putenv('CMS_PATH', os.getcwd())
 
+    def tearDown(self):
+        simulatedTransfers.reset()
+
     def testName(self):
         pass
 
+    def getManager(self, command):
+        """
+        _getManager_
+
+        Stage out manager using the test plugins without retry pauses.
+        """
+        manager = StageOutMgr.StageOutMgr(**{'command': command,
+                                             'option': '',
+                                             'se-name': 'test-win',
+                                             'lfn-prefix': ''})
+        manager.retryPauseTime = 0
+        return manager
+
+    def getFiles(self, number):
+        return [{'LFN': '/store/file%i' % i, 'PFN': 'file%i' % i}
+                for i in range(number)]
+
+    def testStageOutFiles(self):
+        """
+        _testStageOutFiles_
+
+        The transfers of the files run at the same time.
+        """
+        simulatedTransfers.reset(latency = 0.2)
+        manager = self.getManager('test-win')
+        files = self.getFiles(8)
+
+        startTime = time.time()
+        staged = manager.stageOutFiles(files, maxConcurrent = 4)
+        elapsed = time.time() - startTime
+
+        self.assertEqual(staged, files)
+        self.assertEqual(sorted(manager.completedFiles.keys()),
+                         sorted([x['LFN'] for x in files]))
+        self.assertEqual(manager.failed, {})
+        for fileToStage in staged:
+            self.assertEqual(fileToStage['SEName'], 'test-win')
+            self.assertEqual(fileToStage['StageOutCommand'], 'test-win')
+        self.assertEqual(simulatedTransfers.maxActive, 4)
+        self.assertTrue(elapsed < 8 * 0.2)
+
+        # The transfers with the same command can be limited
+        simulatedTransfers.reset(latency = 0.05)
+        manager = self.getManager('test-win')
+        manager.stageOutFiles(self.getFiles(6), maxConcurrent = 4,
+                              maxPerBackend = 2)
+        self.assertEqual(simulatedTransfers.maxActive, 2)
+        self.assertEqual(len(manager.completedFiles), 6)
+        return
+
+    def testStageOutFilesFallback(self):
+        """
+        _testStageOutFilesFallback_
+
+        Every file goes through the fallbacks, the failures are raised after
+        all the files were tried.
+        """
+        manager = self.getManager('test-win')
+        manager.fallbacks = [{'command': 'test-fail', 'se-name': 'test-fail',
+                              'lfn-prefix': ''},
+                             {'command': 'test-win', 'se-name': 'test-win',
+                              'lfn-prefix': ''}]
+        files = self.getFiles(5)
+        manager.stageOutFiles(files, maxConcurrent = 3)
+        self.assertEqual(len(manager.completedFiles), 5)
+        for fileToStage in files:
+            self.assertEqual(fileToStage['StageOutCommand'], 'test-win')
+
+        simulatedTransfers.reset()
+        manager = self.getManager('test-fail')
+        manager.numberOfRetries = 2
+        files = self.getFiles(5)
+        self.assertRaises(StageOutFailure, manager.stageOutFiles, files,
+                          maxConcurrent = 3)
+        self.assertEqual(manager.completedFiles, {})
+        self.assertEqual(sorted(manager.failed.keys()),
+                         sorted([x['LFN'] for x in files]))
+        self.assertEqual(simulatedTransfers.count, 5 * 2)
+        return
+
 
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testName']
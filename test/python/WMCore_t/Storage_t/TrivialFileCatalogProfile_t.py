@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+_TrivialFileCatalogProfile_t_
+
+Compare the compiled and cached LFN matching of the TrivialFileCatalog with
+trying every mapping rule one after the other, over the T1_US_FNAL catalog.
+"""
+
+import os
+import time
+import logging
+import unittest
+
+from WMCore.WMBase import getTestBase
+from WMCore.Storage.TrivialFileCatalog import readTFC
+
+
+def matchSequential(tfc, protocol, path, style = "lfn-to-pfn"):
+    """
+    _matchSequential_
+
+    Go through all the mappings for every path, like the TrivialFileCatalog
+    did before the rules were compiled.
+    """
+    for mapping in tfc[style]:
+        if mapping['protocol'] != protocol:
+            continue
+        if mapping['chain'] != None:
+            matchedPath = matchSequential(tfc, mapping['chain'], path, style)
+            if not matchedPath:
+                continue
+        elif mapping['path-match-expr'].match(path):
+            matchedPath = path
+        else:
+            continue
+        splitPath = mapping['path-match-expr'].split(matchedPath, 1)
+        if len(splitPath) < 2:
+            continue
+        return mapping['result'].replace("$1", splitPath[1])
+    return None
+
+
+class TrivialFileCatalogProfileTest(unittest.TestCase):
+    """
+    _TrivialFileCatalogProfileTest_
+
+    """
+    def setUp(self):
+        self.tfcPath = os.path.join(getTestBase(), "WMCore_t/Storage_t",
+                                    "T1_US_FNAL_TrivialFileCatalog.xml")
+        self.nLFNs = 100000
+
+        self.lfns = []
+        for i in range(self.nLFNs):
+            if i % 100 == 0:
+                lfn = "/store/PhEDEx_LoadTest_SingleSource/LoadTest_%i.LTgenerated.T1_US_FNAL_%i" % (i, i)
+            elif i % 100 == 1:
+                lfn = "/MTCC/data/Run%i/file_%i.root" % (i % 1000, i)
+            else:
+                lfn = "/store/data/Run2011A/MinimumBias/RECO/v%i/000/%03i/%X.root" % (i % 5, i % 1000, i)
+            self.lfns.append(lfn)
+        return
+
+    def testMatchLFNs(self):
+        """
+        _testMatchLFNs_
+
+        Both ways must give the same results, the compiled rules must be
+        faster and the cached results even more.
+        """
+        for protocol in ["dcap", "srmv2"]:
+            tfc = readTFC(self.tfcPath)
+
+            startTime = time.time()
+            sequential = [matchSequential(tfc, protocol, x) for x in self.lfns]
+            sequentialTime = time.time() - startTime
+
+            startTime = time.time()
+            compiled = tfc.matchLFNs(protocol, self.lfns)
+            compiledTime = time.time() - startTime
+
+            startTime = time.time()
+            cached = tfc.matchLFNs(protocol, self.lfns[-tfc.cacheSize // 2:])
+            cachedTime = time.time() - startTime
+
+            logging.info("%s %s LFNs, rule by rule: %.2fs" % (protocol, self.nLFNs, sequentialTime))
+            logging.info("%s %s LFNs, compiled: %.2fs" % (protocol, self.nLFNs, compiledTime))
+            logging.info("%s %s LFNs, cached: %.2fs" % (protocol, tfc.cacheSize // 2, cachedTime))
+
+            self.assertEqual(sequential, [compiled[x] for x in self.lfns])
+            for lfn in self.lfns[-tfc.cacheSize // 2:]:
+                self.assertEqual(cached[lfn], compiled[lfn])
+            self.assertTrue(compiledTime < sequentialTime)
+            self.assertTrue(cachedTime < compiledTime)
+        return
+
+if __name__ == "__main__":
+    unittest.main()
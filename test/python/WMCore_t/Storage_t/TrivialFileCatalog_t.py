@@ -6,6 +6,8 @@ Test the parsing of the TFC.
 """
 
 import os
+import re
+import cPickle
 import unittest
 import nose
 import tempfile
@@ -118,6 +120,61 @@ class TrivialFileCatalogTest(unittest.TestCase):
         self.assertEqual(out_lfn, in_lfn)
 
 
+    def testCompiledRules(self):
+        """
+        Test the rules that are matched one by one and the cache of the
+        results.
+
+        """
+        tfc = TrivialFileCatalog()
+        tfc.addMapping("direct", "/+store/(.*)\.root$", "/data/root/$1")
+        tfc.addMapping("direct", "/+store/temp/", "/scratch/$1")
+        tfc.addMapping("direct", "/+(a)\\1/(.*)", "/double/$1")
+        tfc.addMapping("direct", "(x*)", "/empty/$1")
+        tfc.addMapping("direct", "/+store/(.*)", "/data/$1")
+        tfc.addMapping("stageout", "/+data/(.*)", "/mnt/$1", chain = "direct")
+        tfc.addMapping("stageout", "(?i)/+OTHER/(.*)", "/other/$1")
+
+        self.assertEqual(tfc.matchLFN("direct", "/store/file.root"), "/data/root/file")
+        self.assertEqual(tfc.matchLFN("direct", "/store/temp/file"), "/scratch/file")
+        self.assertEqual(tfc.matchLFN("direct", "/aa/file"), "/double/a")
+        self.assertEqual(tfc.matchLFN("direct", "xxfile"), "/empty/xx")
+        # The empty match of the fourth rule is skipped
+        self.assertEqual(tfc.matchLFN("direct", "/store/file"), "/data/file")
+        self.assertEqual(tfc.matchLFN("stageout", "/store/file"), "/mnt/file")
+        self.assertEqual(tfc.matchLFN("stageout", "/other/file"), "/other/file")
+        self.assertEqual(tfc.matchLFN("stageout", "/none/file"), None)
+        self.assertEqual(tfc.matchLFN("srm", "/store/file"), None)
+
+        lfns = ["/store/file.root", "/store/file", "/none/file", "/store/file"]
+        self.assertEqual(tfc.matchLFNs("stageout", lfns),
+                         {"/store/file.root": "/mnt/root/file",
+                          "/store/file": "/mnt/file",
+                          "/none/file": None})
+
+        # Adding a mapping drops the cached results
+        tfc.addMapping("stageout", "/+none/(.*)", "/none/$1")
+        self.assertEqual(tfc.matchLFN("stageout", "/none/file"), "/none/file")
+        tfc["lfn-to-pfn"].insert(0, {"protocol": "stageout",
+                                     "path-match-expr": re.compile("/+none/(.*)"),
+                                     "path-match": "/+none/(.*)",
+                                     "result": "/first/$1", "chain": None})
+        self.assertEqual(tfc.matchLFN("stageout", "/none/file"), "/first/file")
+
+        # The cache is bounded
+        tfc.cacheSize = 10
+        for i in range(100):
+            tfc.matchLFN("direct", "/store/file%i" % i)
+        self.assertTrue(len(tfc._results) + len(tfc._oldResults) <= 10)
+        self.assertEqual(tfc.matchLFN("direct", "/store/file0"), "/data/file0")
+
+        # The compiled rules and the cache aren't pickled
+        newTFC = cPickle.loads(cPickle.dumps(tfc))
+        self.assertEqual(newTFC._results, {})
+        self.assertEqual(newTFC.matchLFN("stageout", "/store/file"), "/mnt/file")
+        return
+
+
     def testDataServiceXML(self):
         # asks for PEM pass phrase ...
         raise nose.SkipTest
@@ -423,6 +423,13 @@ class WMTaskTest(unittest.TestCase):
         lumis=['1,4,23,45', '5,84,234']
         self.assertRaises(ValueError, buildLumiMask, runs, lumis)
 
+        #ranges are kept as they are, an inverted one is an error
+        runs=['3']
+        lumis=['1,4,5,6']
+        self.assertEqual(buildLumiMask(runs, lumis), {'3':[[1,4],[5,6]]})
+        lumis=['1,4,6,5']
+        self.assertRaises(ValueError, buildLumiMask, runs, lumis)
+
     def testAddLumiMask(self):
         """
         _testAddLumiMask_
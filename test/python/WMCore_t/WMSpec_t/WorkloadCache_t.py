@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""
+_WorkloadCache_t_
+
+Unit tests for the WMSpec workload cache.
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+
+from WMCore.WMSpec.WMWorkload import newWorkload
+from WMCore.WMSpec.WorkloadCache import WorkloadCache
+
+
+class WorkloadCacheTest(unittest.TestCase):
+    """
+    _WorkloadCacheTest_
+
+    """
+    def setUp(self):
+        self.testDir = tempfile.mkdtemp()
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.testDir)
+        return
+
+    def saveWorkload(self, name, nTasks = 2, owner = "someone"):
+        """
+        _saveWorkload_
+
+        Create a workload with a few tasks, each one with a merge task, and
+        save it in the test directory.
+        """
+        workload = newWorkload(name)
+        workload.setOwner(owner)
+        for i in range(nTasks):
+            task = workload.newTask("Task%i" % i)
+            task.addTask("Merge%i" % i)
+
+        specPath = os.path.join(self.testDir, "%s.pkl" % name)
+        workload.save(specPath)
+        return specPath
+
+    def testCache(self):
+        """
+        _testCache_
+
+        Check hits, misses and invalidation on file changes.
+        """
+        cache = WorkloadCache()
+        specPath = self.saveWorkload("TestWorkload")
+
+        workload = cache.getWorkload(specPath)
+        self.assertEqual(workload.name(), "TestWorkload")
+        self.assertTrue(cache.getWorkload(specPath) is workload)
+        stats = cache.getStats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["size"], os.path.getsize(specPath))
+        self.assertTrue(stats["loadTime"] > 0)
+
+        # Task lookups use the index and agree with the workload
+        for taskPath in ["/TestWorkload/Task0", "/TestWorkload/Task1/Merge1"]:
+            task = cache.getTask(specPath, taskPath)
+            self.assertEqual(task.getPathName(), taskPath)
+            self.assertEqual(task.getPathName(), workload.getTaskByPath(taskPath).getPathName())
+        self.assertEqual(cache.getTask(specPath, "/TestWorkload/Task5"), None)
+        self.assertEqual(cache.getStats()["misses"], 1)
+
+        # Rewriting the spec reloads it
+        time.sleep(0.01)
+        self.saveWorkload("TestWorkload", nTasks = 3, owner = "someoneelse")
+        reloadedWorkload = cache.getWorkload(specPath)
+        self.assertFalse(reloadedWorkload is workload)
+        self.assertEqual(reloadedWorkload.getOwner()["name"], "someoneelse")
+        self.assertNotEqual(cache.getTask(specPath, "/TestWorkload/Task2"), None)
+        stats = cache.getStats()
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["size"], os.path.getsize(specPath))
+
+        cache.invalidate(specPath)
+        self.assertEqual(cache.getStats()["entries"], 0)
+        self.assertEqual(cache.getStats()["size"], 0)
+
+        self.assertRaises(OSError, cache.getWorkload, os.path.join(self.testDir, "missing.pkl"))
+        return
+
+    def testEviction(self):
+        """
+        _testEviction_
+
+        Least recently used specs are evicted when there are too many of them
+        or when they are too big.
+        """
+        specPaths = [self.saveWorkload("TestWorkload%i" % i) for i in range(4)]
+        specSize = max([os.path.getsize(x) for x in specPaths])
+
+        cache = WorkloadCache(maxEntries = 3)
+        for specPath in specPaths[:3]:
+            cache.getWorkload(specPath)
+        # Use the first one so the second one is the least recently used
+        cache.getWorkload(specPaths[0])
+        cache.getWorkload(specPaths[3])
+        self.assertEqual(cache.cachedSpecs(), [specPaths[2], specPaths[0], specPaths[3]])
+        self.assertEqual(cache.getStats()["evictions"], 1)
+
+        cache.setLimits(maxSize = 2 * specSize)
+        self.assertEqual(cache.cachedSpecs(), [specPaths[0], specPaths[3]])
+        self.assertEqual(cache.getStats()["evictions"], 2)
+
+        # The last spec is kept even if it is over the limit
+        cache.setLimits(maxSize = 1)
+        self.assertEqual(cache.cachedSpecs(), [specPaths[3]])
+
+        cache.clear()
+        self.assertEqual(cache.getStats(), {"hits": 0, "misses": 0, "evictions": 0,
+                                            "loadTime": 0.0, "entries": 0, "size": 0})
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+"""
+_DataLocationMapper_t_
+
+Unit tests for the batched location lookups of the DataLocationMapper.
+"""
+
+import threading
+import unittest
+
+from WMCore.WorkQueue.DataLocationMapper import DataLocationMapper
+
+
+class MockPhEDEx(object):
+    """
+    _MockPhEDEx_
+
+    Return replicas at T1_US_FNAL_MSS for every block and T2_CH_CERN for the
+    even ones, fail the first failures calls.
+    """
+    def __init__(self, failures = 0, badBlocks = None):
+        self.failures = failures
+        self.badBlocks = badBlocks or []
+        self.calls = []
+        self.threads = set()
+        self.lock = threading.Lock()
+
+    def getReplicaInfoForBlocks(self, **args):
+        with self.lock:
+            self.calls.append(args)
+            self.threads.add(threading.currentThread().getName())
+            if self.failures > 0:
+                self.failures -= 1
+                raise RuntimeError("PhEDEx is down")
+        blocks = args.get('block', [])
+        for dataset in args.get('dataset', []):
+            blocks.extend(["%s#%i" % (dataset, i) for i in range(3)])
+        for block in blocks:
+            if block in self.badBlocks:
+                raise RuntimeError("Unknown block %s" % block)
+
+        response = []
+        for block in blocks:
+            replicas = [{'node': 'T1_US_FNAL_MSS'}]
+            if int(block.split('#')[1]) % 2 == 0:
+                replicas.append({'node': 'T2_CH_CERN'})
+            response.append({'name': block, 'replica': replicas})
+        return {'phedex': {'block': response}}
+
+
+class MockDBS(object):
+    """
+    _MockDBS_
+
+    Every block is at se1.cern.ch, the bad ones raise.
+    """
+    def __init__(self, badBlocks = None):
+        self.badBlocks = badBlocks or []
+        self.calls = []
+
+    def listFileBlockLocation(self, block, dbsOnly = False):
+        self.calls.append(block)
+        if block in self.badBlocks:
+            raise RuntimeError("Unknown block %s" % block)
+        return ['se1.cern.ch']
+
+
+class MockSiteDB(object):
+    """
+    _MockSiteDB_
+
+    """
+    def phEDExNodetocmsName(self, node):
+        return node.replace('_MSS', '')
+
+    def phEDExNodestocmsNames(self, nodes):
+        return dict([(x, self.phEDExNodetocmsName(x)) for x in nodes])
+
+    def seToCMSNames(self, ses):
+        return dict([(x, ['T2_CH_CERN']) for x in ses])
+
+
+class DataLocationMapperTest(unittest.TestCase):
+    """
+    _DataLocationMapperTest_
+
+    """
+    def getMapper(self, phedex, **args):
+        return DataLocationMapper(phedex = phedex, sitedb = MockSiteDB(),
+                                  locationFrom = 'location',
+                                  locationBatchSize = 10, **args)
+
+    def testBatches(self):
+        """
+        _testBatches_
+
+        Blocks are looked up in batches on a pool of PhEDEx clients.
+        """
+        blocks = ["/Primary/Processed/RECO#%i" % i for i in range(95)]
+        phedex = MockPhEDEx()
+        mapper = self.getMapper(phedex)
+
+        result, fullResync = mapper.locationsFromPhEDEx(blocks, fullResync = True)
+        self.assertEqual(len(phedex.calls), 10)
+        self.assertEqual(len(result), 95)
+        self.assertEqual(sorted(result[blocks[0]]), ['T1_US_FNAL', 'T2_CH_CERN'])
+        self.assertEqual(result[blocks[1]], ['T1_US_FNAL'])
+        self.assertEqual(len(phedex.threads), 1)
+
+        clients = []
+        def phedexFactory():
+            clients.append(MockPhEDEx())
+            return clients[-1]
+        mapper = self.getMapper(phedex, phedexFactory = phedexFactory,
+                                locationThreads = 4)
+        threadResult, fullResync = mapper.locationsFromPhEDEx(blocks, fullResync = True)
+        self.assertEqual(len(clients), 4)
+        self.assertEqual(sum([len(x.calls) for x in clients]), 10)
+        self.assertEqual(len(phedex.calls), 10)
+        self.assertEqual(set(threadResult.keys()), set(result.keys()))
+        for block in blocks:
+            self.assertEqual(sorted(threadResult[block]), sorted(result[block]))
+        self.assertEqual(mapper.resyncStats['batches'], 10)
+        self.assertEqual(mapper.resyncStats['items'], 95)
+
+        # datasets are mapped back from their blocks
+        result, fullResync = mapper.locationsFromPhEDEx(["/Primary/Processed/RECO"],
+                                                        datasetSearch = True)
+        self.assertEqual(sorted(result["/Primary/Processed/RECO"]),
+                         ['T1_US_FNAL', 'T2_CH_CERN'])
+        return
+
+    def testRetries(self):
+        """
+        _testRetries_
+
+        Failed batches are retried and a bad block only loses itself.
+        """
+        blocks = ["/Primary/Processed/RECO#%i" % i for i in range(30)]
+        phedex = MockPhEDEx(failures = 2)
+        mapper = self.getMapper(phedex)
+        result, fullResync = mapper.locationsFromPhEDEx(blocks)
+        self.assertEqual(len(result), 30)
+        self.assertEqual(len(phedex.calls), 5)
+        self.assertEqual(mapper.resyncStats['retries'], 2)
+        self.assertEqual(mapper.resyncStats['failedBatches'], 0)
+
+        phedex = MockPhEDEx(badBlocks = [blocks[12]])
+        mapper = self.getMapper(phedex)
+        result, fullResync = mapper.locationsFromPhEDEx(blocks)
+        self.assertEqual(len(result), 29)
+        self.assertFalse(blocks[12] in result)
+        self.assertEqual(mapper.resyncStats['retries'], 2)
+        self.assertEqual(mapper.resyncStats['failedBatches'], 1)
+        # 3 batches, 2 retries and the 10 blocks of the bad batch one by one
+        self.assertEqual(len(phedex.calls), 15)
+        return
+
+    def testDBSLocations(self):
+        """
+        _testDBSLocations_
+
+        DBS is asked once per block, a bad block isn't retried.
+        """
+        blocks = ["/Primary/Processed/RECO#%i" % i for i in range(30)]
+        dbs = MockDBS(badBlocks = [blocks[12]])
+        mapper = self.getMapper(MockPhEDEx())
+        result, fullResync = mapper.locationsFromDBS(dbs, blocks)
+        self.assertEqual(len(result), 29)
+        self.assertFalse(blocks[12] in result)
+        self.assertEqual(result[blocks[0]], ['T2_CH_CERN'])
+        self.assertEqual(dbs.calls, blocks)
+        self.assertEqual(mapper.resyncStats['retries'], 0)
+        self.assertEqual(mapper.resyncStats['failedBatches'], 0)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
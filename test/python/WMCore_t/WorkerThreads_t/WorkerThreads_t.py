@@ -210,6 +210,66 @@ class WorkerThreadsTest(unittest.TestCase):
         self.assertEqual(manager.activeThreadCount, 0)
 
 
+class AdaptivePollingTest(unittest.TestCase):
+    """
+    Unit tests for the adaptive polling of the workers, they don't need the
+    worker threads to run.
+    """
+    def setUp(self):
+        myThread = threading.currentThread()
+        myThread.dbFactory = None
+        myThread.logger = logging.getLogger()
+
+    def testBackoff(self):
+        """
+        The sleep time doubles when no work is found
+        """
+        worker = DummyWorker2()
+        worker.idleTime = 1
+        worker.maxIdleTime = 8
+        worker.currentIdleTime = 1
+
+        idleTimes = []
+        for workFound in [False, False, False, False, True, None, 0, []]:
+            worker.endCycle(workFound, 0.5)
+            idleTimes.append(worker.currentIdleTime)
+        self.assertEqual(idleTimes, [2, 4, 8, 8, 1, 1, 2, 4])
+
+        metrics = worker.getCycleMetrics()
+        self.assertEqual(metrics["cycles"], 8)
+        self.assertEqual(metrics["cyclesWithWork"], 2)
+        self.assertEqual(metrics["totalDuration"], 4.0)
+        self.assertEqual(metrics["lastDuration"], 0.5)
+        self.assertEqual(metrics["lastWorkFound"], [])
+        self.assertEqual(metrics["idleTime"], 4)
+
+        # without maxIdleTime the sleep time doesn't change
+        worker.maxIdleTime = None
+        worker.currentIdleTime = 1
+        worker.endCycle(False, 0.5)
+        self.assertEqual(worker.currentIdleTime, 1)
+
+    def testTerminateWakeup(self):
+        """
+        Adaptive workers sleep for the current idle time unless they are
+        woken up to terminate
+        """
+        worker = DummyWorker2()
+        worker.idleTime = 1
+        worker.maxIdleTime = 60
+        worker.currentIdleTime = 0.2
+
+        startTime = time.time()
+        worker.sleepThread()
+        self.assertTrue(time.time() - startTime >= 0.19)
+
+        worker.currentIdleTime = 60
+        timer = threading.Timer(0.2, worker.wakeupEvent.set)
+        timer.start()
+        startTime = time.time()
+        worker.sleepThread()
+        self.assertTrue(time.time() - startTime < 5)
+
 
 if __name__ == "__main__":
     unittest.main()